@@ -22,6 +22,12 @@ logger = logging.getLogger("alembic.env")
 # Importante: Todos os novos modelos devem ser importados aqui
 from app.models.base import Base
 from app.models.social_media import SocialMedia
+from app.models.webhook_event import WebhookEvent
+from app.models.webhook_delivery import WebhookDelivery
+from app.models.webhook_subscription import WebhookSubscription
+from app.models.webhook_outbound_delivery import WebhookOutboundDelivery
+from app.models.social_media_tombstone import SocialMediaTombstone
+from app.models.webhook_dead_letter import WebhookDeadLetter
 # Adicione novos modelos aqui quando criados
 
 # Obtém configuração do Alembic
@@ -0,0 +1,33 @@
+"""add social media keyset index
+
+Revision ID: 20261017_social_media_keyset_idx
+Revises: 20250408_add_nossocontato_table
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_social_media_keyset_idx'
+down_revision = '20250408_add_nossocontato_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria índice composto para paginação keyset por (updated_at, id).
+    """
+    op.create_index(
+        'ix_social_media_updated_at_id',
+        'social_media',
+        ['updated_at', 'id']
+    )
+
+
+def downgrade():
+    """
+    Remove o índice de paginação keyset.
+    """
+    op.drop_index('ix_social_media_updated_at_id', 'social_media')
@@ -0,0 +1,40 @@
+"""add social_media_tombstone table
+
+Revision ID: 20261017_social_media_tombstone
+Revises: 20261017_webhook_subscription
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_social_media_tombstone'
+down_revision = '20261017_webhook_subscription'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria a tabela de lápides de mídias sociais removidas.
+    """
+    op.create_table(
+        'social_media_tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('social_media_id', sa.Integer(), nullable=False, comment='ID da mídia social removida'),
+        sa.Column('name', sa.String(length=100), nullable=False, comment='Nome da mídia social removida'),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False, comment='Momento da remoção'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_social_media_tombstone_id'), 'social_media_tombstone', ['id'], unique=False)
+    op.create_index('ix_social_media_tombstone_deleted_at_id', 'social_media_tombstone', ['deleted_at', 'id'], unique=False)
+
+
+def downgrade():
+    """
+    Remove a tabela de lápides de mídias sociais removidas.
+    """
+    op.drop_index('ix_social_media_tombstone_deleted_at_id', table_name='social_media_tombstone')
+    op.drop_index(op.f('ix_social_media_tombstone_id'), table_name='social_media_tombstone')
+    op.drop_table('social_media_tombstone')
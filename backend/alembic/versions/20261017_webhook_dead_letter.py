@@ -0,0 +1,52 @@
+"""add webhook_dead_letter table
+
+Revision ID: 20261017_webhook_dead_letter
+Revises: 20261017_social_media_tombstone
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_webhook_dead_letter'
+down_revision = '20261017_social_media_tombstone'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria a tabela de eventos de webhook que falharam.
+    """
+    op.create_table(
+        'webhook_dead_letter',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.String(length=100), nullable=False, comment='Identificador do evento'),
+        sa.Column('source', sa.String(length=20), nullable=False, comment='Origem da falha (queue, batch, webhook)'),
+        sa.Column('idempotency_key', sa.String(length=200), nullable=True, comment='Chave de idempotência da entrega original'),
+        sa.Column('event_type', sa.String(length=100), nullable=False, comment='Tipo do evento'),
+        sa.Column('payload', sa.JSON(), nullable=False, comment='Dados originais do evento'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='Estado do evento'),
+        sa.Column('attempts', sa.Integer(), nullable=False, comment='Tentativas de processamento, incluindo reprocessamentos'),
+        sa.Column('error', sa.Text(), nullable=True, comment='Último erro de processamento'),
+        sa.Column('status_code', sa.Integer(), nullable=True, comment='Status HTTP do último erro'),
+        sa.Column('last_failed_at', sa.DateTime(), nullable=False, comment='Momento da última falha'),
+        sa.Column('replayed_at', sa.DateTime(), nullable=True, comment='Momento do reprocessamento bem-sucedido'),
+        sa.Column('result', sa.JSON(), nullable=True, comment='Resultado do reprocessamento'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='Data e hora de criação do registro'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='Data e hora da última atualização'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_id')
+    )
+    op.create_index(op.f('ix_webhook_dead_letter_id'), 'webhook_dead_letter', ['id'], unique=False)
+    op.create_index('ix_webhook_dead_letter_status_id', 'webhook_dead_letter', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    """
+    Remove a tabela de eventos de webhook que falharam.
+    """
+    op.drop_index('ix_webhook_dead_letter_status_id', table_name='webhook_dead_letter')
+    op.drop_index(op.f('ix_webhook_dead_letter_id'), table_name='webhook_dead_letter')
+    op.drop_table('webhook_dead_letter')
@@ -0,0 +1,33 @@
+"""add reserved_at to webhook_delivery
+
+Revision ID: 20261017_webhook_delivery_lease
+Revises: 20261017_webhook_dead_letter
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_webhook_delivery_lease'
+down_revision = '20261017_webhook_dead_letter'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Adiciona o momento da reserva às entregas de webhook, para que
+    reservas abandonadas expirem após WEBHOOK_DEDUP_LEASE_SECONDS.
+    """
+    op.add_column(
+        'webhook_delivery',
+        sa.Column('reserved_at', sa.DateTime(), nullable=True, comment='Momento da reserva da entrega em processamento')
+    )
+
+
+def downgrade():
+    """
+    Remove o momento da reserva das entregas de webhook.
+    """
+    op.drop_column('webhook_delivery', 'reserved_at')
@@ -0,0 +1,42 @@
+"""add webhook_delivery table
+
+Revision ID: 20261017_webhook_delivery_table
+Revises: 20261017_webhook_event_table
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_webhook_delivery_table'
+down_revision = '20261017_webhook_event_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria a tabela webhook_delivery, registro de idempotência de webhooks.
+    """
+    op.create_table(
+        'webhook_delivery',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=200), nullable=False, comment='Chave de idempotência (ID de entrega ou hash do corpo)'),
+        sa.Column('response', sa.JSON(), nullable=True, comment='Resposta enviada na primeira entrega'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='Data e hora de criação do registro'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='Data e hora da última atualização'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    op.create_index(op.f('ix_webhook_delivery_id'), 'webhook_delivery', ['id'], unique=False)
+    op.create_index('ix_webhook_delivery_created_at', 'webhook_delivery', ['created_at'], unique=False)
+
+
+def downgrade():
+    """
+    Remove a tabela webhook_delivery.
+    """
+    op.drop_index('ix_webhook_delivery_created_at', table_name='webhook_delivery')
+    op.drop_index(op.f('ix_webhook_delivery_id'), table_name='webhook_delivery')
+    op.drop_table('webhook_delivery')
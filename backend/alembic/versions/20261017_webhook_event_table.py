@@ -0,0 +1,51 @@
+"""add webhook_event table
+
+Revision ID: 20261017_webhook_event_table
+Revises: 20261017_social_media_keyset_idx
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_webhook_event_table'
+down_revision = '20261017_social_media_keyset_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria a tabela webhook_event, fila durável de webhooks recebidos.
+    """
+    op.create_table(
+        'webhook_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.String(length=64), nullable=False, comment='Identificador do evento retornado ao remetente'),
+        sa.Column('event_type', sa.String(length=100), nullable=False, comment='Tipo do evento'),
+        sa.Column('payload', sa.JSON(), nullable=False, comment='Dados do evento'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='Estado do processamento'),
+        sa.Column('attempts', sa.Integer(), nullable=False, comment='Número de tentativas de processamento'),
+        sa.Column('available_at', sa.DateTime(), nullable=False, comment='Momento a partir do qual o evento pode ser processado'),
+        sa.Column('locked_at', sa.DateTime(), nullable=True, comment='Momento em que um worker reservou o evento'),
+        sa.Column('locked_by', sa.String(length=100), nullable=True, comment='Worker que reservou o evento'),
+        sa.Column('processed_at', sa.DateTime(), nullable=True, comment='Momento da conclusão do processamento'),
+        sa.Column('result', sa.JSON(), nullable=True, comment='Resultado do processamento'),
+        sa.Column('error', sa.Text(), nullable=True, comment='Último erro de processamento'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='Data e hora de criação do registro'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='Data e hora da última atualização'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_id')
+    )
+    op.create_index(op.f('ix_webhook_event_id'), 'webhook_event', ['id'], unique=False)
+    op.create_index('ix_webhook_event_status_available_at', 'webhook_event', ['status', 'available_at'], unique=False)
+
+
+def downgrade():
+    """
+    Remove a tabela webhook_event.
+    """
+    op.drop_index('ix_webhook_event_status_available_at', table_name='webhook_event')
+    op.drop_index(op.f('ix_webhook_event_id'), table_name='webhook_event')
+    op.drop_table('webhook_event')
@@ -0,0 +1,73 @@
+"""add webhook_subscription and webhook_outbound_delivery tables
+
+Revision ID: 20261017_webhook_subscription
+Revises: 20261017_webhook_delivery_table
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_webhook_subscription'
+down_revision = '20261017_webhook_delivery_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria as tabelas de assinantes e de entregas de webhooks enviados.
+    """
+    op.create_table(
+        'webhook_subscription',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=500), nullable=False, comment='URL que recebe as entregas'),
+        sa.Column('secret', sa.String(length=200), nullable=False, comment='Segredo do HMAC das entregas'),
+        sa.Column('event_types', sa.JSON(), nullable=True, comment='Tipos de evento assinados (nulo para todos)'),
+        sa.Column('max_concurrency', sa.Integer(), nullable=False, comment='Entregas simultâneas para este assinante'),
+        sa.Column('active', sa.Boolean(), nullable=False, comment='Se o assinante recebe entregas'),
+        sa.Column('description', sa.String(length=200), nullable=True, comment='Descrição do assinante'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='Data e hora de criação do registro'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='Data e hora da última atualização'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_subscription_id'), 'webhook_subscription', ['id'], unique=False)
+
+    op.create_table(
+        'webhook_outbound_delivery',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('delivery_id', sa.String(length=64), nullable=False, comment='Identificador enviado em X-Webhook-Delivery'),
+        sa.Column('subscription_id', sa.Integer(), nullable=False, comment='Assinante de destino'),
+        sa.Column('event_type', sa.String(length=100), nullable=False, comment='Tipo do evento'),
+        sa.Column('payload', sa.JSON(), nullable=False, comment='Dados do evento'),
+        sa.Column('status', sa.String(length=20), nullable=False, comment='Estado da entrega'),
+        sa.Column('attempts', sa.Integer(), nullable=False, comment='Número de tentativas de envio'),
+        sa.Column('available_at', sa.DateTime(), nullable=False, comment='Momento a partir do qual a entrega pode ser enviada'),
+        sa.Column('locked_at', sa.DateTime(), nullable=True, comment='Momento em que o despachante reservou a entrega'),
+        sa.Column('response_status', sa.Integer(), nullable=True, comment='Status HTTP da última tentativa'),
+        sa.Column('response_body', sa.Text(), nullable=True, comment='Início do corpo da última resposta'),
+        sa.Column('duration_ms', sa.Float(), nullable=True, comment='Duração da última tentativa em milissegundos'),
+        sa.Column('error', sa.Text(), nullable=True, comment='Último erro de envio'),
+        sa.Column('delivered_at', sa.DateTime(), nullable=True, comment='Momento da entrega bem-sucedida'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='Data e hora de criação do registro'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='Data e hora da última atualização'),
+        sa.ForeignKeyConstraint(['subscription_id'], ['webhook_subscription.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('delivery_id')
+    )
+    op.create_index(op.f('ix_webhook_outbound_delivery_id'), 'webhook_outbound_delivery', ['id'], unique=False)
+    op.create_index('ix_webhook_outbound_delivery_status_available_at', 'webhook_outbound_delivery', ['status', 'available_at'], unique=False)
+    op.create_index('ix_webhook_outbound_delivery_subscription_id', 'webhook_outbound_delivery', ['subscription_id', 'id'], unique=False)
+
+
+def downgrade():
+    """
+    Remove as tabelas de assinantes e de entregas de webhooks enviados.
+    """
+    op.drop_index('ix_webhook_outbound_delivery_subscription_id', table_name='webhook_outbound_delivery')
+    op.drop_index('ix_webhook_outbound_delivery_status_available_at', table_name='webhook_outbound_delivery')
+    op.drop_index(op.f('ix_webhook_outbound_delivery_id'), table_name='webhook_outbound_delivery')
+    op.drop_table('webhook_outbound_delivery')
+    op.drop_index(op.f('ix_webhook_subscription_id'), table_name='webhook_subscription')
+    op.drop_table('webhook_subscription')
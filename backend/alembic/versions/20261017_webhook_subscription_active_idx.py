@@ -0,0 +1,34 @@
+"""add active index to webhook_subscription
+
+Revision ID: 20261017_webhook_subscription_active_idx
+Revises: 20261017_webhook_delivery_lease
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_webhook_subscription_active_idx'
+down_revision = '20261017_webhook_delivery_lease'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Cria índice dos assinantes ativos, lidos na transação de cada
+    evento publicado.
+    """
+    op.create_index(
+        'ix_webhook_subscription_active',
+        'webhook_subscription',
+        ['active']
+    )
+
+
+def downgrade():
+    """
+    Remove o índice dos assinantes ativos.
+    """
+    op.drop_index('ix_webhook_subscription_active', 'webhook_subscription')
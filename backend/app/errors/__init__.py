@@ -15,11 +15,9 @@ import traceback
 import json
 import datetime
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from ..services.responses import CodecJSONResponse
+
+# Configuração de logging (handlers definidos em services/logging_setup.py)
 logger = logging.getLogger("api.errors")
 
 class BaseAPIError(Exception):
@@ -54,7 +52,7 @@ class BaseAPIError(Exception):
         # Registra o erro se solicitado
         if log_error:
             logger.error(
-                f"API Error: {message} (Code: {status_code})",
+                "API Error: %s (Code: %s)", message, status_code,
                 extra={"details": self.details}
             )
             
@@ -201,20 +199,20 @@ class APIErrorHandler:
         # Registra o stack trace para erros não tratados
         if not isinstance(exc, (BaseAPIError, HTTPException)):
             logger.error(
-                f"Unhandled exception: {str(exc)}",
+                "Unhandled exception: %s", exc,
                 exc_info=True,
                 extra={"traceback": traceback.format_exc()}
             )
         
         # Trata erros específicos da API
         if isinstance(exc, BaseAPIError):
-            return JSONResponse(
+            return CodecJSONResponse(
                 status_code=exc.status_code,
                 content=exc.to_dict()
             )
         # Trata exceções HTTP do FastAPI
         elif isinstance(exc, HTTPException):
-            return JSONResponse(
+            return CodecJSONResponse(
                 status_code=exc.status_code,
                 content={
                     "error": {
@@ -226,7 +224,7 @@ class APIErrorHandler:
             )
             
         # Erro 500 padrão para exceções não tratadas
-        return JSONResponse(
+        return CodecJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "error": {
@@ -260,7 +258,7 @@ class APIErrorHandler:
         
         # Registra informações da requisição
         logger.error(
-            f"Error processing request: {method} {url} from {client_host}",
+            "Error processing request: %s %s from %s", method, url, client_host,
             extra={
                 "request_info": {
                     "method": method,
@@ -278,29 +276,18 @@ def register_error_handlers(app):
     
     Esta função configura a aplicação para usar nosso sistema
     personalizado de tratamento de erros para vários tipos de exceções.
+    O registro das exceções não tratadas (com método, caminho e cliente)
+    é feito pelo RequestDiagnosticsMiddleware em app/middleware.py.
     
     Args:
         app: Instância da aplicação FastAPI
     """
+    # Manipulador assíncrono: handlers síncronos (ex: lambda) rodariam no
+    # threadpool a cada erro, inclusive em rejeições baratas como 401/404
+    async def handle(request, exc):
+        return APIErrorHandler.handle_exception(exc)
+
     # Registra manipuladores para tipos específicos de erro
-    app.add_exception_handler(
-        BaseAPIError,
-        lambda request, exc: APIErrorHandler.handle_exception(exc)
-    )
-    app.add_exception_handler(
-        HTTPException,
-        lambda request, exc: APIErrorHandler.handle_exception(exc)
-    )
-    app.add_exception_handler(
-        Exception,
-        lambda request, exc: APIErrorHandler.handle_exception(exc)
-    )
-    
-    # Middleware para logging de erros
-    @app.middleware("http")
-    async def error_logging_middleware(request: Request, call_next):
-        try:
-            return await call_next(request)
-        except Exception as exc:
-            await APIErrorHandler.log_request_info(request, exc)
-            raise  # Re-lança a exceção para ser tratada pelos manipuladores
\ No newline at end of file
+    app.add_exception_handler(BaseAPIError, handle)
+    app.add_exception_handler(HTTPException, handle)
+    app.add_exception_handler(Exception, handle)
@@ -7,10 +7,16 @@ Fornece classes base e utilitários para:
 - Normalização de dados
 - Operações comuns de dados
 """
-from typing import Any, Dict, Optional, List, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, List, Tuple, Union
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from operator import attrgetter
+import os
 import re
-import json
-from datetime import datetime
+from datetime import date, datetime, time
+
+from ..services.json_codec import json_codec
 
 class DataProcessor:
     """
@@ -51,6 +57,38 @@ class DataProcessor:
         """
         raise NotImplementedError("Subclasses devem implementar validate()")
 
+# Modos de execução de DataTransformer.batch_transform
+MODE_SERIAL = "serial"
+MODE_THREAD = "thread"
+MODE_PROCESS = "process"
+
+# Itens por tarefa enviada ao pool (processos; threads usam 1 por padrão)
+DEFAULT_CHUNK_SIZE = 500
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Divide um iterável em listas de até size itens, sob demanda."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _transform_chunk(transformer: "DataTransformer", chunk: List[Any]) -> tuple:
+    """
+    Transforma um bloco de itens (executado nos workers do pool).
+    
+    Returns:
+        (itens transformados até a primeira falha, exceção ou None)
+    """
+    results = []
+    try:
+        for item in chunk:
+            results.append(transformer.transform(item))
+    except Exception as e:
+        return results, e
+    return results, None
+
 class DataTransformer(DataProcessor):
     """
     Classe base para operações de transformação de dados.
@@ -74,17 +112,240 @@ class DataTransformer(DataProcessor):
         """
         return self.process(data)
     
-    def batch_transform(self, items: List[Any]) -> List[Any]:
+    def batch_transform(
+        self,
+        items: Iterable[Any],
+        mode: str = MODE_SERIAL,
+        lazy: bool = False,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> Union[List[Any], Iterator[Any]]:
+        """
+        Transforma vários itens, na ordem recebida.
+        
+        Modos:
+        - serial: na thread atual;
+        - thread: pool de threads, para transformações que esperam I/O;
+        - process: pool de processos com os itens em blocos, para
+          transformações que usam CPU (o transformador e os itens
+          precisam ser serializáveis com pickle).
+        
+        Com lazy=True o resultado é um iterador: os itens são lidos da
+        entrada sob demanda e no máximo 2 blocos por worker ficam em
+        andamento, de forma que importações e exportações grandes não
+        ficam inteiras em memória. Se a transformação de um item falhar,
+        os resultados anteriores são entregues e a exceção original é
+        lançada na posição do item; os blocos pendentes são cancelados.
+        
+        Args:
+            items: Itens a serem transformados (lista ou qualquer iterável)
+            mode: MODE_SERIAL, MODE_THREAD ou MODE_PROCESS
+            lazy: Se True, retorna um iterador em vez de uma lista
+            workers: Número de workers do pool (padrão do executor)
+            chunk_size: Itens por tarefa do pool (padrão: 1 em threads,
+                DEFAULT_CHUNK_SIZE em processos)
+            
+        Returns:
+            Lista (ou iterador, com lazy) de itens transformados
+            
+        Raises:
+            ValueError: Se o modo for desconhecido
+        """
+        if mode == MODE_SERIAL:
+            results = (self.transform(item) for item in items)
+        elif mode == MODE_THREAD:
+            workers = workers or min(32, (os.cpu_count() or 1) + 4)
+            results = self._pool_transform(ThreadPoolExecutor, items, workers, chunk_size or 1)
+        elif mode == MODE_PROCESS:
+            workers = workers or os.cpu_count() or 1
+            results = self._pool_transform(ProcessPoolExecutor, items, workers, chunk_size or DEFAULT_CHUNK_SIZE)
+        else:
+            raise ValueError(f"Unsupported batch mode: {mode}")
+        return results if lazy else list(results)
+    
+    def _pool_transform(
+        self,
+        executor_class: type,
+        items: Iterable[Any],
+        workers: int,
+        chunk_size: int
+    ) -> Iterator[Any]:
+        """
+        Transforma os itens em blocos em um pool, entregando-os em ordem.
+        
+        O pool só é criado na primeira leitura do iterador e é
+        encerrado ao final, inclusive se o consumo for interrompido.
+        
+        Args:
+            executor_class: ThreadPoolExecutor ou ProcessPoolExecutor
+            items: Itens a serem transformados
+            workers: Número de workers do pool
+            chunk_size: Itens por bloco
+            
+        Yields:
+            Itens transformados, na ordem recebida
         """
-        Transforma uma lista de itens.
+        chunks = _chunks(items, chunk_size)
+        pending = deque()
+        executor: Executor
+        with executor_class(max_workers=workers) as executor:
+            try:
+                for chunk in islice(chunks, workers * 2):
+                    pending.append(executor.submit(_transform_chunk, self, chunk))
+                while pending:
+                    results, error = pending.popleft().result()
+                    chunk = next(chunks, None) if error is None else None
+                    if chunk is not None:
+                        pending.append(executor.submit(_transform_chunk, self, chunk))
+                    # Itens anteriores à falha são entregues antes da exceção
+                    yield from results
+                    if error is not None:
+                        raise error
+            finally:
+                for future in pending:
+                    future.cancel()
+
+# Função que converte uma linha de um modelo em dicionário
+RowSerializer = Callable[[Any], Dict[str, Any]]
+
+def _is_temporal(column: Any) -> bool:
+    """Verifica se uma coluna guarda datetime, date ou time."""
+    try:
+        return issubclass(column.type.python_type, (date, time))
+    except (AttributeError, NotImplementedError):
+        return False
+
+class ModelSerializer:
+    """
+    Serialização de modelos SQLAlchemy para dicionários e JSON.
+    
+    Para cada classe de modelo (e opções) é montada e guardada em cache
+    uma função que lê todas as colunas com um único operator.attrgetter,
+    em vez de percorrer __table__.columns com getattr a cada linha.
+    """
+    
+    def __init__(self):
+        """Inicializa o cache de funções compiladas."""
+        self._compiled: Dict[Tuple[type, bool], RowSerializer] = {}
+    
+    def compile(self, model: type, iso_datetimes: bool = False) -> RowSerializer:
+        """
+        Obtém a função de serialização de uma classe de modelo.
         
         Args:
-            items: Lista de itens a serem transformados
+            model: Classe com __table__ (modelo SQLAlchemy declarativo)
+            iso_datetimes: Se True, colunas de data/hora são convertidas
+                com isoformat() (None permanece None)
             
         Returns:
-            Lista de itens transformados
+            Função (linha) -> dicionário com as colunas da tabela
+            
+        Raises:
+            TypeError: Se a classe não tiver __table__
         """
-        return [self.transform(item) for item in items]
+        key = (model, iso_datetimes)
+        serializer = self._compiled.get(key)
+        if serializer is None:
+            serializer = self._compiled[key] = self._build(model, iso_datetimes)
+        return serializer
+    
+    def _build(self, model: type, iso_datetimes: bool) -> RowSerializer:
+        """
+        Gera a função de serialização de uma classe de modelo.
+        
+        Args:
+            model: Classe com __table__
+            iso_datetimes: Se colunas de data/hora usam isoformat()
+            
+        Returns:
+            Função (linha) -> dicionário
+        """
+        table = getattr(model, "__table__", None)
+        if table is None:
+            raise TypeError(f"{model.__name__} não é um modelo com __table__")
+        columns = list(table.columns)
+        names = tuple(column.name for column in columns)
+        temporal = tuple(column.name for column in columns if iso_datetimes and _is_temporal(column))
+        if any("." in name for name in names):
+            # attrgetter interpretaria o ponto como acesso encadeado
+            getter = lambda row: tuple(getattr(row, name) for name in names)
+        elif len(names) == 1:
+            single = attrgetter(names[0])
+            getter = lambda row: (single(row),)
+        else:
+            getter = attrgetter(*names)
+        
+        if not temporal:
+            def serialize(row: Any) -> Dict[str, Any]:
+                return dict(zip(names, getter(row)))
+        else:
+            def serialize(row: Any) -> Dict[str, Any]:
+                values = dict(zip(names, getter(row)))
+                for name in temporal:
+                    value = values[name]
+                    if value is not None:
+                        values[name] = value.isoformat()
+                return values
+        serialize.__qualname__ = f"serialize_{model.__name__}"
+        return serialize
+    
+    def to_dict(self, row: Any, iso_datetimes: bool = False) -> Dict[str, Any]:
+        """
+        Converte uma linha em dicionário.
+        
+        Args:
+            row: Instância de um modelo
+            iso_datetimes: Se colunas de data/hora usam isoformat()
+            
+        Returns:
+            Dicionário com as colunas da tabela
+        """
+        return self.compile(type(row), iso_datetimes)(row)
+    
+    def to_dicts(self, rows: Iterable[Any], iso_datetimes: bool = False) -> List[Dict[str, Any]]:
+        """
+        Converte um conjunto de linhas em dicionários.
+        
+        A função é obtida uma vez por classe; conjuntos com uma única
+        classe (o caso de um SELECT) não consultam o cache por linha.
+        
+        Args:
+            rows: Instâncias de modelos
+            iso_datetimes: Se colunas de data/hora usam isoformat()
+            
+        Returns:
+            Lista de dicionários, na ordem recebida
+        """
+        results = []
+        append = results.append
+        model = None
+        serialize = None
+        for row in rows:
+            if type(row) is not model:
+                model = type(row)
+                serialize = self.compile(model, iso_datetimes)
+            append(serialize(row))
+        return results
+    
+    def to_json(self, data: Any) -> bytes:
+        """
+        Serializa uma linha ou um conjunto de linhas direto para JSON.
+        
+        Usa o codec de services/json_codec.py; data/hora sai em
+        isoformat() em todos os backends.
+        
+        Args:
+            data: Instância de um modelo ou iterável de instâncias
+            
+        Returns:
+            JSON em bytes (objeto ou lista)
+        """
+        if hasattr(type(data), "__table__"):
+            return json_codec.dumps(self.to_dict(data))
+        return json_codec.dumps(self.to_dicts(data))
+
+# Serializador compartilhado (usado por ModelMixin.to_dict e DataNormalizer)
+model_serializer = ModelSerializer()
 
 class DataNormalizer(DataProcessor):
     """
@@ -92,6 +353,7 @@ class DataNormalizer(DataProcessor):
     
     Especializada em converter dados de vários formatos para
     um formato padrão consistente, geralmente um dicionário.
+    Instâncias de modelos são convertidas por model_serializer.
     """
     
     def normalize(self, data: Any) -> Dict[str, Any]:
@@ -111,6 +373,10 @@ class DataNormalizer(DataProcessor):
         """
         Converte dados processados para formato de dicionário.
         
+        Dicionários são copiados e instâncias de modelos são convertidas
+        por model_serializer; subclasses que produzem outros tipos devem
+        sobrescrever este método.
+        
         Args:
             data: Dados a serem convertidos
             
@@ -118,15 +384,25 @@ class DataNormalizer(DataProcessor):
             Dicionário representando os dados
             
         Raises:
-            NotImplementedError: Se a subclasse não implementar este método
+            NotImplementedError: Se os dados não forem um dicionário nem
+                uma instância de modelo
         """
+        if isinstance(data, dict):
+            return dict(data)
+        if hasattr(type(data), "__table__"):
+            return model_serializer.to_dict(data)
         raise NotImplementedError("Subclasses devem implementar _to_dict()")
 
+# Padrões de validação, compilados uma única vez
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+URL_PATTERN = re.compile(r'^(http|https)://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?$')
+
 class StringProcessor(DataProcessor):
     """
     Processador especializado para manipulação de strings.
     
     Fornece métodos úteis para validação e transformação de strings.
+    Não guarda estado: use a instância compartilhada string_processor.
     """
     
     def process(self, data: str) -> str:
@@ -167,8 +443,7 @@ class StringProcessor(DataProcessor):
         Returns:
             bool: True se for um email válido, False caso contrário
         """
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return EMAIL_PATTERN.match(email) is not None
     
     def validate_url(self, url: str) -> bool:
         """
@@ -180,14 +455,46 @@ class StringProcessor(DataProcessor):
         Returns:
             bool: True se for uma URL válida, False caso contrário
         """
-        pattern = r'^(http|https)://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?$'
-        return bool(re.match(pattern, url))
+        return URL_PATTERN.match(url) is not None
+    
+    def validate_emails(self, emails: Iterable[Any]) -> List[bool]:
+        """
+        Valida vários endereços de email de uma vez.
+        
+        Args:
+            emails: Valores a serem validados como email
+            
+        Returns:
+            Lista com True para cada email válido, na ordem recebida
+            (valores que não são strings são inválidos)
+        """
+        match = EMAIL_PATTERN.match
+        return [isinstance(email, str) and match(email) is not None for email in emails]
+    
+    def validate_urls(self, urls: Iterable[Any]) -> List[bool]:
+        """
+        Valida várias URLs de uma vez.
+        
+        Args:
+            urls: Valores a serem validados como URL
+            
+        Returns:
+            Lista com True para cada URL válida, na ordem recebida
+            (valores que não são strings são inválidos)
+        """
+        match = URL_PATTERN.match
+        return [isinstance(url, str) and match(url) is not None for url in urls]
+
+# Instância compartilhada do processador de strings
+string_processor = StringProcessor()
 
 class JsonProcessor(DataProcessor):
     """
     Processador especializado para manipulação de dados JSON.
     
     Fornece métodos para validação, parsing e transformação de JSON.
+    Usa o codec de services/json_codec.py (orjson ou ujson, quando
+    instalados).
     """
     
     def process(self, data: Union[str, Dict, List]) -> Dict:
@@ -205,8 +512,8 @@ class JsonProcessor(DataProcessor):
         """
         if isinstance(data, str):
             try:
-                return json.loads(data)
-            except json.JSONDecodeError:
+                return json_codec.loads(data)
+            except ValueError:
                 raise ValueError("Invalid JSON string")
         elif isinstance(data, (dict, list)):
             return data
@@ -230,9 +537,9 @@ class JsonProcessor(DataProcessor):
             return False
             
         try:
-            json.loads(data)
+            json_codec.loads(data)
             return True
-        except (json.JSONDecodeError, TypeError):
+        except (ValueError, TypeError):
             return False
     
     def to_json_string(self, data: Any) -> str:
@@ -245,15 +552,202 @@ class JsonProcessor(DataProcessor):
         Returns:
             String JSON formatada
         """
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return json_codec.dumps_str(data, indent=2)
+
+# Formatos aceitos por padrão (strptime)
+DATETIME_FORMATS = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+def _fast_format(value: str) -> Optional[str]:
+    """
+    Identifica sem exceções qual formato padrão a string tem, quando
+    datetime.fromisoformat pode convertê-la com o mesmo resultado de
+    strptime.
+    
+    Só reconhece AAAA-MM-DD, AAAA-MM-DDTHH:MM:SS e AAAA-MM-DD HH:MM:SS
+    com todos os dígitos: frações de segundo, fuso horário e as demais
+    variantes ISO-8601 seguem pelo strptime (e são recusadas pelos
+    formatos padrão, como antes).
+    
+    Args:
+        value: String de data/hora
+        
+    Returns:
+        Formato de DATETIME_FORMATS correspondente, ou None
+    """
+    size = len(value)
+    if size != 10 and size != 19:
+        return None
+    if not (value[4] == "-" and value[7] == "-" and value[:4].isdigit()
+            and value[5:7].isdigit() and value[8:10].isdigit()):
+        return None
+    if size == 10:
+        return "%Y-%m-%d"
+    if not (value[13] == ":" and value[16] == ":" and value[11:13].isdigit()
+            and value[14:16].isdigit() and value[17:19].isdigit()):
+        return None
+    separator = value[10]
+    if separator == "T":
+        return "%Y-%m-%dT%H:%M:%S"
+    if separator == " ":
+        return "%Y-%m-%d %H:%M:%S"
+    return None
+
+# Diretivas strptime que só consomem dígitos (o %d aceita também um espaço)
+_NUMERIC_DIRECTIVES = frozenset("YmdHMSyjfI")
+
+def _literal_signature(fmt: str) -> Optional[str]:
+    """
+    Obtém os literais não brancos de um formato só com diretivas numéricas.
+    
+    Uma string aceita por dois desses formatos tem, fora dígitos e
+    espaços, exatamente os literais de cada um; formatos com assinaturas
+    diferentes nunca aceitam a mesma string.
+    
+    Args:
+        fmt: Formato strptime
+        
+    Returns:
+        Literais em minúsculas (o strptime ignora maiúsculas), ou None se
+        o formato tiver diretivas não numéricas ou literais numéricos
+    """
+    literals = []
+    index = 0
+    while index < len(fmt):
+        char = fmt[index]
+        if char == "%":
+            directive = fmt[index + 1:index + 2]
+            if directive == "%":
+                literals.append("%")
+            elif not directive or directive not in _NUMERIC_DIRECTIVES:
+                return None
+            index += 2
+            continue
+        if char.isdigit():
+            return None
+        if not char.isspace():
+            literals.append(char.lower())
+        index += 1
+    return "".join(literals)
+
+def _parse_datetime(value: str, fmt: str) -> Optional[datetime]:
+    """
+    Converte uma string com um formato strptime, sem propagar exceções.
+    
+    Args:
+        value: String de data/hora
+        fmt: Formato strptime
+        
+    Returns:
+        Objeto datetime, ou None se a string não estiver no formato
+    """
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
 
 class DateTimeProcessor(DataProcessor):
     """
     Processador especializado para manipulação de datas e horas.
     
     Fornece métodos para validação e transformação de dados temporais.
+    O resultado é sempre o do primeiro formato, na ordem declarada, que
+    aceita a string. Strings exatamente em um dos formatos padrão são
+    convertidas com datetime.fromisoformat (resultado idêntico ao de
+    strptime, sem fuso horário) quando nenhum formato anterior pode
+    aceitá-las. O último formato bem-sucedido é tentado primeiro, como
+    palpite: se ele aceitar a string, só os formatos anteriores que
+    podem aceitar a mesma string são conferidos. O último valor
+    convertido também é memorizado, de forma que validate seguido de
+    process converte a string uma única vez.
     """
     
+    def __init__(self, formats: Optional[List[str]] = None):
+        """
+        Inicializa o processador.
+        
+        Args:
+            formats: Formatos strptime aceitos (padrão: DATETIME_FORMATS)
+        """
+        self.formats = list(DATETIME_FORMATS if formats is None else formats)
+        signatures = [_literal_signature(fmt) for fmt in self.formats]
+        # Para cada formato, os anteriores que podem aceitar a mesma string
+        self._overlaps: List[Tuple[int, ...]] = [
+            tuple(
+                earlier for earlier in range(index)
+                if signature is None or signatures[earlier] in (None, signature)
+            )
+            for index, signature in enumerate(signatures)
+        ]
+        self._fast_formats = frozenset(
+            fmt for index, fmt in enumerate(self.formats)
+            if fmt in DATETIME_FORMATS and not self._overlaps[index]
+        )
+        self._last_index = 0
+        self._last: Optional[tuple] = None
+    
+    def _parse(self, data: str) -> Optional[datetime]:
+        """
+        Converte uma string com o primeiro formato que a aceita.
+        
+        Args:
+            data: String de data/hora
+            
+        Returns:
+            Objeto datetime, ou None se nenhum formato se aplicar
+        """
+        last = self._last
+        if last is not None and last[0] == data:
+            return last[1]
+        result = None
+        if _fast_format(data) in self._fast_formats:
+            try:
+                result = datetime.fromisoformat(data)
+            except ValueError:
+                # Campos fora do intervalo (mês 13, dia 31/02) falham
+                # também no strptime; os demais formatos ainda são tentados
+                result = None
+        if result is None:
+            result = self._parse_formats(data)
+            if result is None:
+                return None
+        self._last = (data, result)
+        return result
+    
+    def _parse_formats(self, data: str) -> Optional[datetime]:
+        """
+        Converte uma string com os formatos strptime, na ordem declarada.
+        
+        O último formato bem-sucedido é tentado primeiro; se aceitar a
+        string, os formatos anteriores que podem aceitá-la também são
+        tentados e o primeiro deles prevalece.
+        
+        Args:
+            data: String de data/hora
+            
+        Returns:
+            Objeto datetime, ou None se nenhum formato se aplicar
+        """
+        formats = self.formats
+        if not formats:
+            return None
+        hint = self._last_index
+        result = _parse_datetime(data, formats[hint])
+        if result is not None:
+            for index in self._overlaps[hint]:
+                earlier = _parse_datetime(data, formats[index])
+                if earlier is not None:
+                    self._last_index = index
+                    return earlier
+            return result
+        for index, fmt in enumerate(formats):
+            if index == hint:
+                continue
+            result = _parse_datetime(data, fmt)
+            if result is not None:
+                self._last_index = index
+                return result
+        return None
+    
     def process(self, data: Union[str, datetime]) -> datetime:
         """
         Processa dados de data/hora para objeto datetime.
@@ -271,19 +765,45 @@ class DateTimeProcessor(DataProcessor):
             return data
             
         if isinstance(data, str):
-            try:
-                # Tenta vários formatos comuns
-                for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
-                    try:
-                        return datetime.strptime(data, fmt)
-                    except ValueError:
-                        continue
-                raise ValueError(f"Unsupported datetime format: {data}")
-            except ValueError:
+            result = self._parse(data)
+            if result is None:
                 raise ValueError(f"Invalid datetime string: {data}")
+            return result
                 
         raise ValueError("Data must be datetime object or string")
     
+    def process_many(self, items: Iterable[Union[str, datetime, None]], strict: bool = True) -> List[Optional[datetime]]:
+        """
+        Converte uma coluna de datas/horas em uma única passagem.
+        
+        O formato detectado no primeiro valor é reaproveitado nos demais;
+        os outros formatos só são tentados nos valores em que ele falha.
+        Valores repetidos em sequência são convertidos uma única vez.
+        
+        Args:
+            items: Strings de data/hora ou objetos datetime
+            strict: Se True, um valor inválido lança ValueError; se False,
+                valores inválidos (inclusive None) resultam em None
+            
+        Returns:
+            Lista de objetos datetime, na ordem recebida
+            
+        Raises:
+            ValueError: Se strict e algum valor não puder ser convertido
+        """
+        results: List[Optional[datetime]] = []
+        append = results.append
+        parse = self._parse
+        for item in items:
+            if isinstance(item, datetime):
+                append(item)
+                continue
+            result = parse(item) if isinstance(item, str) else None
+            if result is None and strict:
+                raise ValueError(f"Invalid datetime string: {item}")
+            append(result)
+        return results
+    
     def validate(self, data: Any) -> bool:
         """
         Valida se os dados representam uma data/hora válida.
@@ -300,11 +820,7 @@ class DateTimeProcessor(DataProcessor):
         if not isinstance(data, str):
             return False
             
-        try:
-            self.process(data)
-            return True
-        except ValueError:
-            return False
+        return self._parse(data) is not None
     
     def format_datetime(self, dt: Union[str, datetime], output_format: str = "%Y-%m-%dT%H:%M:%S") -> str:
         """
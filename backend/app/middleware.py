@@ -4,119 +4,283 @@ Middlewares personalizados para a aplicação FastAPI.
 Este módulo contém middlewares adicionais para lidar com requisições HTTP.
 """
 
+from datetime import datetime
+import json
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
-import traceback
+import os
+import random
+import socket
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .services.metrics import metrics
+from .services.rate_limit import WEBHOOK_RATE_LIMIT_TRUST_PROXY, WebhookRateLimiter, retry_after, webhook_rate_limiter
+from .services.query_stats import (
+    DB_QUERY_STATS,
+    current_query_stats,
+    finish_request_stats,
+    route_name,
+    start_request_stats,
+)
 
 # Configuração de logging
 logger = logging.getLogger("api.middleware")
 
-class InvalidRequestMiddleware(BaseHTTPMiddleware):
+# Logs detalhados ([DEBUG-404] / [DOCKER-DEBUG]) são opcionais e amostrados
+REQUEST_DEBUG_LOG = os.getenv("REQUEST_DEBUG_LOG", "false").lower() == "true"
+REQUEST_DEBUG_SAMPLE_RATE = float(os.getenv("REQUEST_DEBUG_SAMPLE_RATE", "1.0"))
+
+# Prefixos das rotas de documentação, que recebem diagnóstico de proxy
+DOCS_PATHS = ("/api/v1/docs", "/api/v1/redoc", "/api/v1/openapi.json")
+
+# Rotas de webhook sujeitas ao limite de taxa (as rotas administrativas ficam de fora)
+WEBHOOK_PATH = "/api/v1/webhooks"
+WEBHOOK_ADMIN_PATHS = ("/api/v1/webhooks/subscriptions", "/api/v1/webhooks/dead-letters")
+
+# Cabeçalhos mascarados nos logs de diagnóstico: credenciais, a assinatura
+# HMAC dos webhooks e as chaves de idempotência das entregas
+REDACTED_HEADERS = frozenset((
+    "authorization", "cookie", "x-hub-signature",
+    "idempotency-key", "x-webhook-delivery", "x-github-delivery"
+))
+
+def log_environment() -> None:
     """
-    Middleware para capturar e registrar detalhes sobre requisições HTTP inválidas.
+    Registra informações do ambiente de execução ([DOCKER-DEBUG]).
     
-    Este middleware tenta capturar requisições malformadas antes que elas causem
-    erros no processamento normal da aplicação.
+    Só produz saída quando REQUEST_DEBUG_LOG está ativo.
+    """
+    if not REQUEST_DEBUG_LOG:
+        return
+    try:
+        hostname = socket.gethostname()
+        logger.info("[DOCKER-DEBUG] Hostname: %s", hostname)
+        logger.info("[DOCKER-DEBUG] IP: %s", socket.gethostbyname(hostname))
+    except Exception as e:
+        logger.error("[DOCKER-DEBUG] Erro ao obter informações do sistema: %s", str(e))
+    logger.info("[DOCKER-DEBUG] Ambiente: %s", os.getenv("ENVIRONMENT", "development"))
+    logger.info("[DOCKER-DEBUG] APP_HOST: %s", os.getenv("APP_HOST", "127.0.0.1"))
+    logger.info("[DOCKER-DEBUG] APP_PORT: %s", os.getenv("APP_PORT", "8000"))
+
+def _client(scope: Scope) -> str:
+    """Formata o endereço do cliente de um escopo ASGI."""
+    client = scope.get("client")
+    return f"{client[0]}:{client[1]}" if client else "N/A"
+
+def _redacted_headers(scope: Scope) -> dict:
+    """Obtém os cabeçalhos da requisição sem credenciais."""
+    return {
+        key: ("***" if key in REDACTED_HEADERS else value)
+        for key, value in Headers(scope=scope).items()
+    }
+
+class RequestDiagnosticsMiddleware:
+    """
+    Middleware ASGI de diagnóstico de requisições.
+    
+    Mede o tempo de cada requisição e adiciona o cabeçalho X-Process-Time,
+    registra uma linha de conclusão, detecta respostas 404 e captura
+    exceções não tratadas. Nunca lê o corpo da requisição: as mensagens
+    http.request passam direto para a aplicação.
+    
+    Os logs detalhados ([DEBUG-404], cabeçalhos e diagnóstico de proxy das
+    rotas de documentação) só são emitidos com REQUEST_DEBUG_LOG=true e
+    para uma fração REQUEST_DEBUG_SAMPLE_RATE das requisições.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
-        logger.info(f"[DOCKER-DEBUG] Middleware InvalidRequestMiddleware inicializado")
-        # Registra informações do ambiente
-        import os
-        import socket
+    def __init__(
+        self,
+        app: ASGIApp,
+        debug: bool = REQUEST_DEBUG_LOG,
+        sample_rate: float = REQUEST_DEBUG_SAMPLE_RATE
+    ):
+        self.app = app
+        self.debug = debug
+        self.sample_rate = sample_rate
+    
+    def _sampled(self) -> bool:
+        """Decide se a requisição atual recebe logs detalhados."""
+        return self.debug and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        verbose = self._sampled()
+        status_code = 500
+        
+        if verbose:
+            self._log_request(scope)
+        
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter() - start_time) * 1000
+                MutableHeaders(scope=message)["X-Process-Time"] = f"{process_time:.2f}ms"
+            await send(message)
+        
         try:
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
-            logger.info(f"[DOCKER-DEBUG] Hostname: {hostname}")
-            logger.info(f"[DOCKER-DEBUG] IP: {ip_address}")
-            logger.info(f"[DOCKER-DEBUG] Ambiente: {os.getenv('ENVIRONMENT', 'development')}")
-            logger.info(f"[DOCKER-DEBUG] APP_HOST: {os.getenv('APP_HOST', '127.0.0.1')}")
-            logger.info(f"[DOCKER-DEBUG] APP_PORT: {os.getenv('APP_PORT', '8000')}")
+            await self.app(scope, receive, send_with_timing)
         except Exception as e:
-            logger.error(f"[DOCKER-DEBUG] Erro ao obter informações do sistema: {str(e)}")
+            metrics.counter("http.unhandled_errors").inc()
+            logger.error(
+                "[INVALID-REQUEST] Exceção em %s %s (cliente %s): %s",
+                method, path, _client(scope), str(e), exc_info=True
+            )
+            if verbose:
+                logger.error("[INVALID-REQUEST] Headers: %s", _redacted_headers(scope))
+            raise
+        
+        process_time = (time.perf_counter() - start_time) * 1000
+        metrics.histogram(f"http.route.{route_name(scope)}.duration_ms").observe(process_time)
+        logger.info("%s %s %d %.2fms", method, path, status_code, process_time)
+        
+        if status_code == 404:
+            metrics.counter("http.not_found").inc()
+            logger.warning("[DEBUG-404] ERRO 404 DETECTADO: %s %s", method, path)
+            if verbose:
+                logger.warning("[DEBUG-404] Headers: %s", _redacted_headers(scope))
     
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def _log_request(self, scope: Scope) -> None:
         """
-        Processa a requisição e captura detalhes sobre requisições inválidas.
+        Registra os detalhes de uma requisição amostrada.
         
         Args:
-            request: Objeto de requisição
-            call_next: Próxima função na cadeia de middleware
-            
-        Returns:
-            Resposta da requisição
+            scope: Escopo ASGI da requisição
         """
-        # Log adicional para ambiente Docker
-        if '/api/v1/docs' in request.url.path or '/api/v1/redoc' in request.url.path or '/api/v1/openapi.json' in request.url.path:
-            logger.info(f"[DOCKER-DEBUG] Tentativa de acesso à documentação via middleware: {request.url.path}")
-            logger.info(f"[DOCKER-DEBUG] URL completa: {request.url}")
-            logger.info(f"[DOCKER-DEBUG] Headers de proxy: {[h for h in request.headers.items() if 'forwarded' in h[0].lower() or 'proxy' in h[0].lower()]}")
-            
-            # Verifica se há cabeçalhos de proxy que podem estar afetando o roteamento
-            x_forwarded_host = request.headers.get('x-forwarded-host')
-            x_forwarded_proto = request.headers.get('x-forwarded-proto')
-            x_forwarded_prefix = request.headers.get('x-forwarded-prefix')
-            
-            if x_forwarded_host:
-                logger.info(f"[DOCKER-DEBUG] X-Forwarded-Host detectado: {x_forwarded_host}")
-            if x_forwarded_proto:
-                logger.info(f"[DOCKER-DEBUG] X-Forwarded-Proto detectado: {x_forwarded_proto}")
-            if x_forwarded_prefix:
-                logger.info(f"[DOCKER-DEBUG] X-Forwarded-Prefix detectado: {x_forwarded_prefix}")
-                logger.warning(f"[DOCKER-DEBUG] Prefixo encaminhado pode estar afetando o roteamento da documentação!")
-        try:
-            # Tenta processar a requisição normalmente
-            response = await call_next(request)
-            return response
-            
-        except Exception as e:
-            # Captura e registra detalhes sobre a exceção
-            logger.error(f"[INVALID-REQUEST] Exceção capturada: {str(e)}")
-
-            # Registra informações detalhadas sobre a requisição
-            try:
-                logger.error(f"[INVALID-REQUEST] Método: {request.method}")
-
-                logger.error(f"[INVALID-REQUEST] URL: {request.url}")
-
-                logger.error(f"[INVALID-REQUEST] Headers: {dict(request.headers)}")
-
-                logger.error(f"[INVALID-REQUEST] Client: {request.client.host}:{request.client.port if request.client else 'N/A'}")
-
-                
-                # Tenta capturar o corpo da requisição
-                try:
-                    body = await request.body()
-
-                    if body:
-
-                        try:
-
-                            body_text = body.decode('utf-8')
-
-                            logger.error(f"[INVALID-REQUEST] Corpo: {body_text[:1000]}" + 
-
-                                       ("..." if len(body_text) > 1000 else ""))
-
-                        except UnicodeDecodeError:
-
-                            logger.error(f"[INVALID-REQUEST] Corpo (binário): {len(body)} bytes")
-
-                except Exception as body_error:
-
-                    logger.error(f"[INVALID-REQUEST] Erro ao capturar corpo: {str(body_error)}")
+        query = scope.get("query_string", b"").decode("latin-1")
+        logger.info("[DEBUG-404] Requisição iniciada: %s %s%s", scope["method"], scope["path"], f"?{query}" if query else "")
+        logger.info("[DEBUG-404] Client: %s", _client(scope))
+        logger.info("[DEBUG-404] Headers: %s", _redacted_headers(scope))
+        
+        if scope["path"].startswith(DOCS_PATHS):
+            headers = Headers(scope=scope)
+            proxy_headers = [
+                (key, value) for key, value in headers.items()
+                if "forwarded" in key or "proxy" in key
+            ]
+            logger.info("[DOCKER-DEBUG] Acesso à documentação: %s", scope["path"])
+            logger.info("[DOCKER-DEBUG] Headers de proxy: %s", proxy_headers)
+            if headers.get("x-forwarded-prefix"):
+                logger.warning(
+                    "[DOCKER-DEBUG] X-Forwarded-Prefix %s pode estar afetando o roteamento da documentação!",
+                    headers["x-forwarded-prefix"]
+                )
 
-            except Exception as info_error:
 
-                logger.error(f"[INVALID-REQUEST] Erro ao capturar informações da requisição: {str(info_error)}")
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI que contabiliza os comandos SQL de cada requisição.
+    
+    Adiciona os cabeçalhos X-DB-Query-Count e X-DB-Time à resposta,
+    registra métricas por rota e avisa quando a rota excede o orçamento
+    de consultas (DB_QUERY_BUDGET) ou repete um mesmo comando (N+1).
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not DB_QUERY_STATS:
+            await self.app(scope, receive, send)
+            return
+        
+        token = start_request_stats(scope)
+        stats = current_query_stats()
+        
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time"] = f"{stats.total_ms:.2f}ms"
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            finish_request_stats(token)
 
-            
-            # Registra a stack trace completa
-            logger.error(f"[INVALID-REQUEST] Stack trace: {traceback.format_exc()}")
 
-            
-            # Propaga a exceção para ser tratada pelos manipuladores de erro da aplicação
-            raise e
\ No newline at end of file
+class WebhookRateLimitMiddleware:
+    """
+    Middleware ASGI que aplica o limite de taxa e de concorrência às
+    rotas de webhook (services/rate_limit.py).
+    
+    Requisições acima do limite recebem 429 com Retry-After antes de
+    chegar ao roteamento: o corpo não é lido e nenhuma sessão do banco é
+    aberta. A vaga de concorrência é liberada quando a resposta termina,
+    inclusive nas respostas em streaming.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: WebhookRateLimiter = webhook_rate_limiter,
+        trust_proxy: bool = WEBHOOK_RATE_LIMIT_TRUST_PROXY
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.trust_proxy = trust_proxy
+    
+    def _source(self, scope: Scope) -> str:
+        """Identifica a origem da requisição (endereço do cliente)."""
+        if self.trust_proxy:
+            forwarded = Headers(scope=scope).get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",", 1)[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not path.startswith(WEBHOOK_PATH)
+            or path.startswith(WEBHOOK_ADMIN_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        reason, wait = self.limiter.acquire(self._source(scope))
+        if reason is not None:
+            await self._reject(send, reason, wait)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+    
+    async def _reject(self, send: Send, reason: str, wait: float) -> None:
+        """
+        Envia a resposta 429 no formato de BaseAPIError.
+        
+        Args:
+            send: Canal de envio ASGI
+            reason: Motivo da rejeição (rate ou concurrency)
+            wait: Segundos sugeridos para nova tentativa
+        """
+        seconds = retry_after(wait)
+        body = json.dumps({
+            "error": {
+                "message": "Limite de requisições de webhook excedido",
+                "code": 429,
+                "timestamp": datetime.now().isoformat(),
+                "details": {"reason": reason, "retry_after": int(seconds)}
+            }
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", seconds.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
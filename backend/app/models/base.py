@@ -9,6 +9,8 @@ from sqlalchemy import Column, Integer, DateTime, func
 from datetime import datetime
 from typing import Dict, Any
 
+from ..helpers import model_serializer
+
 # Classe base para todos os modelos
 Base = declarative_base()
 
@@ -45,10 +47,13 @@ class ModelMixin:
         """
         Converte o modelo para um dicionário.
         
+        Usa a função de serialização compilada para a classe
+        (helpers.ModelSerializer).
+        
         Returns:
             Dicionário com os atributos do modelo
         """
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        return model_serializer.to_dict(self)
     
     def update_from_dict(self, data: Dict[str, Any]) -> None:
         """
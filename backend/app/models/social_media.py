@@ -4,12 +4,12 @@ Modelo para mídias sociais.
 Define a estrutura da tabela de mídias sociais no banco de dados
 e métodos relacionados.
 """
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import validates
 from typing import Dict, Any
 
 from .base import Base, TimestampMixin, ModelMixin
-from ..helpers import StringProcessor
+from ..helpers import model_serializer, string_processor
 from ..errors import ValidationError
 
 class SocialMedia(Base, TimestampMixin, ModelMixin):
@@ -21,6 +21,10 @@ class SocialMedia(Base, TimestampMixin, ModelMixin):
     ModelMixin para métodos utilitários comuns.
     """
     __tablename__ = "social_media"
+    __table_args__ = (
+        # Suporta paginação keyset ordenada por (updated_at, id)
+        Index("ix_social_media_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, unique=True,
@@ -48,9 +52,6 @@ class SocialMedia(Base, TimestampMixin, ModelMixin):
         Raises:
             ValidationError: Se o valor for inválido
         """
-        # Inicializa processadores
-        string_processor = StringProcessor()
-        
         # Validações específicas por campo
         if key == 'name':
             if not string_processor.validate(value) or len(value) > 100:
@@ -85,13 +86,11 @@ class SocialMedia(Base, TimestampMixin, ModelMixin):
         Raises:
             ValidationError: Se algum dado for inválido
         """
-        validator = StringProcessor()
-        
         # Valida cada campo
         validations = [
-            validator.validate(self.name),
-            validator.validate_url(self.url),
-            validator.validate(self.icon)
+            string_processor.validate(self.name),
+            string_processor.validate_url(self.url),
+            string_processor.validate(self.icon)
         ]
         
         if not all(validations):
@@ -110,16 +109,10 @@ class SocialMedia(Base, TimestampMixin, ModelMixin):
         """
         Converte o modelo para um dicionário.
         
-        Útil para serialização e APIs.
+        Útil para serialização e APIs. Datas saem em isoformat(), para
+        gravação em colunas JSON (ex: payload das entregas aos assinantes).
         
         Returns:
             Dicionário representando o modelo
         """
-        return {
-            "id": self.id,
-            "name": self.name,
-            "url": self.url,
-            "icon": self.icon,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        return model_serializer.to_dict(self, iso_datetimes=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Modelo para registros de mídias sociais removidas.
+
+Define a tabela social_media_tombstone: cada remoção de mídia social
+grava uma lápide com o ID e o momento da remoção, para que o feed de
+mudanças (services/changes_feed.py) informe remoções aos consumidores
+que sincronizam de forma incremental.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from .base import Base, ModelMixin
+
+class SocialMediaTombstone(Base, ModelMixin):
+    """
+    Modelo para armazenar remoções de mídias sociais.
+    
+    Lápides mais antigas que CHANGES_TOMBSTONE_RETENTION_DAYS são
+    removidas; cursores anteriores a esse horizonte exigem uma nova
+    sincronização completa.
+    """
+    __tablename__ = "social_media_tombstone"
+    __table_args__ = (
+        # Leitura incremental por (deleted_at, id), como ix_social_media_updated_at_id
+        Index("ix_social_media_tombstone_deleted_at_id", "deleted_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    social_media_id = Column(Integer, nullable=False, comment="ID da mídia social removida")
+    name = Column(String(100), nullable=False, comment="Nome da mídia social removida")
+    deleted_at = Column(DateTime, nullable=False, comment="Momento da remoção")
+
+    def __repr__(self) -> str:
+        return f"<SocialMediaTombstone(social_media_id={self.social_media_id}, deleted_at='{self.deleted_at}')>"
@@ -0,0 +1,43 @@
+"""
+Modelo para eventos de webhook que falharam (dead-letter).
+
+Define a tabela webhook_dead_letter: cada evento cujo processamento
+falhou (fila durável após todas as tentativas, itens de lote ou webhook
+síncrono com erro do servidor) é gravado com o payload original, o
+erro e o número de tentativas, para ser reprocessado em massa por
+services/dead_letters.py.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String, Text
+
+from .base import Base, TimestampMixin, ModelMixin
+
+class WebhookDeadLetter(Base, TimestampMixin, ModelMixin):
+    """
+    Modelo para armazenar eventos de webhook que falharam.
+    
+    Estados: dead (aguardando reprocessamento), replayed (reprocessado
+    com sucesso) e resolved (processado por outro caminho, ex: reenvio
+    do remetente, antes do reprocessamento).
+    """
+    __tablename__ = "webhook_dead_letter"
+    __table_args__ = (
+        # Seleção dos eventos a reprocessar, em ordem de chegada
+        Index("ix_webhook_dead_letter_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String(100), nullable=False, unique=True, comment="Identificador do evento")
+    source = Column(String(20), nullable=False, comment="Origem da falha (queue, batch, webhook)")
+    idempotency_key = Column(String(200), nullable=True, comment="Chave de idempotência da entrega original")
+    event_type = Column(String(100), nullable=False, comment="Tipo do evento")
+    payload = Column(JSON, nullable=False, comment="Dados originais do evento")
+    status = Column(String(20), nullable=False, default="dead", comment="Estado do evento")
+    attempts = Column(Integer, nullable=False, default=1, comment="Tentativas de processamento, incluindo reprocessamentos")
+    error = Column(Text, nullable=True, comment="Último erro de processamento")
+    status_code = Column(Integer, nullable=True, comment="Status HTTP do último erro")
+    last_failed_at = Column(DateTime, nullable=False, comment="Momento da última falha")
+    replayed_at = Column(DateTime, nullable=True, comment="Momento do reprocessamento bem-sucedido")
+    result = Column(JSON, nullable=True, comment="Resultado do reprocessamento")
+
+    def __repr__(self) -> str:
+        return f"<WebhookDeadLetter(id={self.id}, event_id='{self.event_id}', status='{self.status}')>"
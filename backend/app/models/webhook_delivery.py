@@ -0,0 +1,33 @@
+"""
+Modelo para entregas de webhook já recebidas.
+
+Define a tabela webhook_delivery, usada para idempotência: cada entrega
+é identificada pelo ID fornecido pelo remetente ou pelo hash do corpo,
+e a resposta original é devolvida quando a mesma entrega é reenviada.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String
+
+from .base import Base, TimestampMixin, ModelMixin
+
+class WebhookDelivery(Base, TimestampMixin, ModelMixin):
+    """
+    Modelo para registrar entregas de webhook e suas respostas.
+    
+    Uma linha sem resposta indica entrega em processamento desde
+    reserved_at; após WEBHOOK_DEDUP_LEASE_SECONDS a reserva é
+    considerada abandonada.
+    """
+    __tablename__ = "webhook_delivery"
+    __table_args__ = (
+        # Remoção das entregas expiradas
+        Index("ix_webhook_delivery_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(200), nullable=False, unique=True,
+                 comment="Chave de idempotência (ID de entrega ou hash do corpo)")
+    response = Column(JSON, nullable=True, comment="Resposta enviada na primeira entrega")
+    reserved_at = Column(DateTime, nullable=True, comment="Momento da reserva da entrega em processamento")
+
+    def __repr__(self) -> str:
+        return f"<WebhookDelivery(id={self.id}, key='{self.key}')>"
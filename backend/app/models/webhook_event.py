@@ -0,0 +1,40 @@
+"""
+Modelo para eventos de webhook recebidos.
+
+Define a tabela webhook_event, usada como fila durável: o webhook é
+gravado e confirmado imediatamente, e os workers de services/webhook_queue.py
+processam o evento e registram o resultado.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String, Text
+
+from .base import Base, TimestampMixin, ModelMixin
+
+class WebhookEvent(Base, TimestampMixin, ModelMixin):
+    """
+    Modelo para armazenar eventos de webhook e seu estado de processamento.
+    
+    Estados: pending (aguardando), processing (reservado por um worker),
+    done (processado) e failed (falhou após todas as tentativas).
+    """
+    __tablename__ = "webhook_event"
+    __table_args__ = (
+        # Busca dos próximos eventos disponíveis pelos workers
+        Index("ix_webhook_event_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String(64), nullable=False, unique=True,
+                      comment="Identificador do evento retornado ao remetente")
+    event_type = Column(String(100), nullable=False, comment="Tipo do evento")
+    payload = Column(JSON, nullable=False, comment="Dados do evento")
+    status = Column(String(20), nullable=False, default="pending", comment="Estado do processamento")
+    attempts = Column(Integer, nullable=False, default=0, comment="Número de tentativas de processamento")
+    available_at = Column(DateTime, nullable=False, comment="Momento a partir do qual o evento pode ser processado")
+    locked_at = Column(DateTime, nullable=True, comment="Momento em que um worker reservou o evento")
+    locked_by = Column(String(100), nullable=True, comment="Worker que reservou o evento")
+    processed_at = Column(DateTime, nullable=True, comment="Momento da conclusão do processamento")
+    result = Column(JSON, nullable=True, comment="Resultado do processamento")
+    error = Column(Text, nullable=True, comment="Último erro de processamento")
+
+    def __repr__(self) -> str:
+        return f"<WebhookEvent(id={self.id}, event_id='{self.event_id}', status='{self.status}')>"
@@ -0,0 +1,48 @@
+"""
+Modelo para entregas de webhooks enviadas aos assinantes.
+
+Define a tabela webhook_outbound_delivery, que é ao mesmo tempo a fila
+de envio (gravada na mesma transação da mudança que gerou o evento) e o
+registro das entregas: estado, tentativas, resposta e duração.
+"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text
+
+from .base import Base, TimestampMixin, ModelMixin
+
+class WebhookOutboundDelivery(Base, TimestampMixin, ModelMixin):
+    """
+    Modelo para armazenar entregas de webhooks a assinantes.
+    
+    Estados: pending (aguardando envio ou nova tentativa), delivering
+    (reservada pelo despachante), delivered e failed.
+    """
+    __tablename__ = "webhook_outbound_delivery"
+    __table_args__ = (
+        # Busca das próximas entregas disponíveis pelo despachante
+        Index("ix_webhook_outbound_delivery_status_available_at", "status", "available_at"),
+        # Registro de entregas de um assinante
+        Index("ix_webhook_outbound_delivery_subscription_id", "subscription_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    delivery_id = Column(String(64), nullable=False, unique=True,
+                         comment="Identificador enviado em X-Webhook-Delivery")
+    subscription_id = Column(Integer, ForeignKey("webhook_subscription.id", ondelete="CASCADE"),
+                             nullable=False, comment="Assinante de destino")
+    event_type = Column(String(100), nullable=False, comment="Tipo do evento")
+    payload = Column(JSON, nullable=False, comment="Dados do evento")
+    status = Column(String(20), nullable=False, default="pending", comment="Estado da entrega")
+    attempts = Column(Integer, nullable=False, default=0, comment="Número de tentativas de envio")
+    available_at = Column(DateTime, nullable=False, comment="Momento a partir do qual a entrega pode ser enviada")
+    locked_at = Column(DateTime, nullable=True, comment="Momento em que o despachante reservou a entrega")
+    response_status = Column(Integer, nullable=True, comment="Status HTTP da última tentativa")
+    response_body = Column(Text, nullable=True, comment="Início do corpo da última resposta")
+    duration_ms = Column(Float, nullable=True, comment="Duração da última tentativa em milissegundos")
+    error = Column(Text, nullable=True, comment="Último erro de envio")
+    delivered_at = Column(DateTime, nullable=True, comment="Momento da entrega bem-sucedida")
+
+    def __repr__(self) -> str:
+        return (
+            f"<WebhookOutboundDelivery(id={self.id}, delivery_id='{self.delivery_id}', "
+            f"status='{self.status}')>"
+        )
@@ -0,0 +1,35 @@
+"""
+Modelo para assinantes de webhooks enviados pela API.
+
+Define a tabela webhook_subscription: sistemas externos registram uma
+URL e os tipos de evento de interesse, e recebem as mudanças por push
+(services/outbound_webhooks.py) em vez de consultar GET /webhooks/data.
+"""
+from sqlalchemy import Boolean, Column, Index, Integer, JSON, String
+
+from .base import Base, TimestampMixin, ModelMixin
+
+class WebhookSubscription(Base, TimestampMixin, ModelMixin):
+    """
+    Modelo para armazenar assinantes de webhooks.
+    
+    O segredo assina cada entrega (X-Hub-Signature) e só é exibido na
+    criação da assinatura.
+    """
+    __tablename__ = "webhook_subscription"
+    __table_args__ = (
+        # Assinantes ativos, lidos na transação de cada evento publicado
+        Index("ix_webhook_subscription_active", "active"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), nullable=False, comment="URL que recebe as entregas")
+    secret = Column(String(200), nullable=False, comment="Segredo do HMAC das entregas")
+    event_types = Column(JSON, nullable=True, comment="Tipos de evento assinados (nulo para todos)")
+    max_concurrency = Column(Integer, nullable=False, default=4,
+                             comment="Entregas simultâneas para este assinante")
+    active = Column(Boolean, nullable=False, default=True, comment="Se o assinante recebe entregas")
+    description = Column(String(200), nullable=True, comment="Descrição do assinante")
+
+    def __repr__(self) -> str:
+        return f"<WebhookSubscription(id={self.id}, url='{self.url}', active={self.active})>"
@@ -4,20 +4,35 @@ Este módulo fornece endpoints para verificar a configuração do ambiente
 e ajudar na depuração de problemas em produção.
 """
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import os
 import socket
 import logging
 import platform
 import sys
 
+from ..services.database import get_pool_telemetry, get_async_db
+from ..services.metrics import metrics
+from ..services.cache import get_cache_stats
+from ..services.logging_setup import get_logging_stats
+from ..services.webhook_queue import webhook_workers, count_by_status
+from ..services.idempotency import idempotency_store
+from ..services.webhook_signature import signature_stats
+from ..services.event_registry import event_registry
+from ..services.dead_letters import count_dead_letters
+from ..services.rate_limit import webhook_rate_limiter
+from ..services.outbound_webhooks import outbound_dispatcher, count_deliveries_by_status
+from ..services.slow_queries import slow_query_log, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_EXPLAIN
+
 router = APIRouter()
 logger = logging.getLogger("api.diagnostics")
 
 @router.get("/")
 async def get_diagnostics(request: Request):
     """Retorna informações de diagnóstico sobre o ambiente."""
-    logger.info(f"[DOCKER-DEBUG] Acessando endpoint de diagnóstico")
+    logger.info("[DOCKER-DEBUG] Acessando endpoint de diagnóstico")
     
     # Informações do sistema
     system_info = {
@@ -103,7 +118,7 @@ async def get_routes_info(request: Request):
 @router.get("/traefik")
 async def get_traefik_info(request: Request):
     """Retorna informações específicas sobre a configuração do Traefik."""
-    logger.info(f"[DOCKER-DEBUG] Verificando configuração do Traefik")
+    logger.info("[DOCKER-DEBUG] Verificando configuração do Traefik")
     
     # Informações de cabeçalhos de proxy
     proxy_headers = {}
@@ -144,4 +159,135 @@ async def get_traefik_info(request: Request):
         "docs_urls": docs_urls,
         "request_url": str(request.url),
         "base_url": base_url,
-    }
\ No newline at end of file
+    }
+
+@router.get("/database/pool")
+async def get_database_pool_info():
+    """
+    Retorna a telemetria do pool de conexões com o banco de dados.
+    
+    Inclui histogramas de espera por conexão (checkout_wait_ms), tempo
+    de uso (hold_ms) e overflow em uso, além da contagem de timeouts.
+    Útil para dimensionar DB_POOL_SIZE e DB_MAX_OVERFLOW.
+    """
+    return get_pool_telemetry()
+
+@router.get("/metrics")
+async def get_metrics(prefix: Optional[str] = Query(None, description="Filtra métricas por prefixo (ex: db.route.)")):
+    """
+    Retorna as métricas em memória do processo.
+    
+    Inclui, entre outras, a contagem de comandos SQL e o tempo no banco
+    por rota (db.route.*), com avisos de orçamento excedido e N+1.
+    """
+    return metrics.snapshot(prefix=prefix)
+
+@router.get("/database/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500, description="Número máximo de registros"),
+    route: Optional[str] = Query(None, description="Filtra pela rota de origem (ex: GET /api/v1/social-media/)"),
+    min_duration_ms: Optional[float] = Query(None, description="Duração mínima em milissegundos")
+):
+    """
+    Retorna as consultas lentas mais recentes.
+    
+    Cada registro traz o SQL normalizado, o formato dos parâmetros,
+    a duração, a rota de origem e, se DB_SLOW_QUERY_EXPLAIN estiver
+    ativo, o plano de execução.
+    """
+    return {
+        "threshold_ms": DB_SLOW_QUERY_MS,
+        "explain": DB_SLOW_QUERY_EXPLAIN,
+        "queries": slow_query_log.entries(limit=limit, route=route, min_duration_ms=min_duration_ms),
+    }
+
+@router.get("/cache")
+async def get_cache_info():
+    """
+    Retorna estatísticas dos caches em memória.
+    
+    Inclui acertos, falhas, taxa de acerto, tamanho e descartes
+    de cada cache de leitura.
+    """
+    return get_cache_stats()
+
+@router.get("/logging")
+async def get_logging_info():
+    """
+    Retorna o estado do pipeline de logging.
+    
+    Inclui nível, formato, ocupação das filas de escrita e o número
+    de registros descartados por fila cheia.
+    """
+    return get_logging_stats()
+
+@router.get("/webhooks/queue")
+async def get_webhook_queue_info(db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna o estado da fila durável de webhooks.
+    
+    Inclui a configuração e os contadores do pool de workers deste
+    processo, o número de eventos por estado na tabela webhook_event e
+    no dead-letter (webhook_dead_letter).
+    """
+    return {
+        "workers": webhook_workers.stats(),
+        "events": await count_by_status(db),
+        "dead_letters": await count_dead_letters(db),
+    }
+
+@router.get("/webhooks/dedup")
+async def get_webhook_dedup_info():
+    """
+    Retorna estatísticas de deduplicação de webhooks.
+    
+    Inclui a taxa de reenvios reconhecidos (respondidos sem novo
+    processamento) e o estado do cache de entregas.
+    """
+    return idempotency_store.stats()
+
+@router.get("/webhooks/outbound")
+async def get_webhook_outbound_info(db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna o estado do envio de webhooks aos assinantes.
+    
+    Inclui entregas em andamento (total e por assinante), contadores
+    de entregas, novas tentativas e falhas, a duração das tentativas e
+    o número de entregas por estado.
+    """
+    return {
+        "dispatcher": outbound_dispatcher.stats(),
+        "deliveries": await count_deliveries_by_status(db),
+    }
+
+@router.get("/webhooks/signatures")
+async def get_webhook_signature_info():
+    """
+    Retorna contadores de verificação de assinatura de webhooks.
+    
+    Inclui o número de segredos ativos e as rejeições por motivo
+    (assinatura ausente, malformada ou que não confere).
+    """
+    return signature_stats()
+
+@router.get("/webhooks/handlers")
+async def get_webhook_handler_info():
+    """
+    Retorna o estado dos handlers de eventos de webhook.
+    
+    Para cada tipo de evento: limites de concorrência e de tempo,
+    execuções em andamento e aguardando vaga, contadores de
+    processados, erros, timeouts e rejeitados, e a latência.
+    """
+    return event_registry.stats()
+
+@router.get("/webhooks/rate-limit")
+async def get_webhook_rate_limit_info():
+    """
+    Retorna o estado do limite de taxa das rotas de webhook.
+    
+    Inclui os limites por origem e de concorrência, as requisições em
+    andamento, o número de origens acompanhadas e as rejeições (429)
+    por motivo.
+    """
+    return webhook_rate_limiter.stats()
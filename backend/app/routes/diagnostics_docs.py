@@ -14,7 +14,7 @@ logger = logging.getLogger("api.diagnostics.docs")
 @router.get("/docs")
 async def get_docs_diagnostics(request: Request):
     """Retorna informações de diagnóstico específicas para a documentação da API."""
-    logger.info(f"[DOCS-DEBUG] Acessando endpoint de diagnóstico de documentação")
+    logger.info("[DOCS-DEBUG] Acessando endpoint de diagnóstico de documentação")
     
     # Obtém a aplicação FastAPI
     app = request.app
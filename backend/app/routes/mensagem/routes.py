@@ -1,17 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from app.models.mensagem import Mensagem
 from app.schemas.mensagem import MensagemCreate
-from app.services.database import get_db
+from app.services.database import get_async_db
 
+# Configuração de logging
 logger = logging.getLogger("api.mensagem")
-if not logger.handlers:  # Evita adicionar múltiplos handlers
-    logger.setLevel(logging.INFO)
-    handler = logging.StreamHandler()
-    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    logger.addHandler(handler)
 
 router = APIRouter(
     prefix="/api/v1/mensagem",
@@ -21,7 +17,7 @@ router = APIRouter(
 @router.post("/", status_code=201, response_model=MensagemCreate)
 async def criar_mensagem(
     mensagem: MensagemCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint para criação de novas mensagens de clientes
@@ -34,7 +30,7 @@ async def criar_mensagem(
         Mensagem criada com ID
     """
     try:
-        logger.info(f"Recebendo mensagem - Nome: {mensagem.snome}, Email: {mensagem.semail[:3]}..., Assunto: {mensagem.sassunto}")
+        logger.info("Recebendo mensagem - Nome: %s, Email: %s..., Assunto: %s", mensagem.snome, mensagem.semail[:3], mensagem.sassunto)
         
         nova_mensagem = Mensagem(
             snome=mensagem.snome,
@@ -44,18 +40,18 @@ async def criar_mensagem(
             smensagem=mensagem.smensagem
         )
 
-        logger.debug(f"Objeto mensagem criado")
+        logger.debug("Objeto mensagem criado")
         
         db.add(nova_mensagem)
-        db.commit()
-        db.refresh(nova_mensagem)
+        await db.commit()
+        await db.refresh(nova_mensagem)
 
-        logger.info(f"Mensagem registrada - ID: {nova_mensagem.id}")
+        logger.info("Mensagem registrada - ID: %s", nova_mensagem.id)
         
         return nova_mensagem
         
     except Exception as e:
-        logger.error(f"Erro ao criar mensagem: {str(e)}")
+        logger.error("Erro ao criar mensagem: %s", e)
         raise HTTPException(
             status_code=400,
             detail="Falha ao registrar mensagem"
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.models.nossocontato import Nossocontato as NossocontatoModel
 from app.schemas.nossocontato import Nossocontato, NossocontatoCreate
-from app.services.database import get_db
+from app.services.database import get_db, get_async_read_db, read_staleness
+from app.services.cache import nossocontato_cache, MISSING
+from app.services.etag import make_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter(
     prefix="/api/v1/nossocontato",
@@ -12,8 +16,26 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[Nossocontato])
-def listar_contatos(db: Session = Depends(get_db)):
-    return db.query(NossocontatoModel).all()
+async def listar_contatos(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    cached = nossocontato_cache.get("all")
+    if cached is not MISSING:
+        contatos, etag = cached
+    else:
+        generation = nossocontato_cache.generation
+        result = await db.execute(select(NossocontatoModel))
+        contatos = [Nossocontato.model_validate(item) for item in result.scalars().all()]
+        # A tabela não possui updated_at: a ETag é derivada do conteúdo
+        etag = make_etag("nossocontato", [tuple(contato.model_dump().values()) for contato in contatos])
+        nossocontato_cache.set("all", (contatos, etag), generation, read_staleness(db))
+    
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return contatos
 
 @router.post("/", status_code=201, response_model=NossocontatoCreate)
 def criar_contato(
@@ -29,4 +51,5 @@ def criar_contato(
     db.add(db_contato)
     db.commit()
     db.refresh(db_contato)
+    nossocontato_cache.invalidate()
     return db_contato
\ No newline at end of file
@@ -4,65 +4,148 @@ Rotas para gerenciamento de mídias sociais.
 Este módulo implementa endpoints para gerenciar informações
 de mídias sociais exibidas no site.
 """
-from fastapi import APIRouter, Depends, Path, Query, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
 
 from ..models.social_media import SocialMedia
-from ..services.database import get_db
+from ..services.database import get_async_db, get_async_read_db, read_staleness
+from ..services.pagination import apply_keyset, split_page, order_columns
+from ..services.cache import social_media_cache, MISSING
+from ..services.etag import make_etag, etag_matches, not_modified, set_etag, table_version
+from ..services.changes_feed import purge_tombstones, record_tombstone
+from ..services.outbound_webhooks import (
+    EVENT_SOCIAL_MEDIA_CREATED, EVENT_SOCIAL_MEDIA_DELETED, EVENT_SOCIAL_MEDIA_UPDATED,
+    outbound_dispatcher, publish_event
+)
 from ..schemas.social_media import SocialMediaSchema, SocialMediaCreate, SocialMediaUpdate
 from ..errors import BaseAPIError, NotFoundError, ValidationError, DatabaseError
-from ..helpers import DataProcessor, StringProcessor
+from ..helpers import DataProcessor, string_processor
 
 # Configuração de logging
 logger = logging.getLogger("api.social_media")
 
 router = APIRouter()
 
+def pagination_headers(request: Request, next_cursor: Optional[str]) -> Dict[str, str]:
+    """
+    Monta os cabeçalhos da próxima página da paginação keyset.
+    
+    Args:
+        request: Objeto de requisição FastAPI
+        next_cursor: Cursor da próxima página (None na última página)
+        
+    Returns:
+        Cabeçalhos X-Next-Cursor e Link, ou vazio na última página
+    """
+    if not next_cursor:
+        return {}
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
 @router.get("/", response_model=List[SocialMediaSchema])
 async def get_social_media(
-    skip: int = Query(0, description="Número de registros para pular"),
-    limit: int = Query(100, description="Número máximo de registros para retornar"),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros para retornar"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor opaco para paginação keyset; envie vazio para a primeira página"
+    ),
+    order_by: str = Query("id", pattern="^(id|updated_at)$", description="Ordenação: id ou updated_at"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtém todas as mídias sociais.
     
-    Retorna uma lista paginada de links de mídias sociais.
+    Retorna uma lista paginada de links de mídias sociais. Por padrão
+    usa paginação por offset (skip/limit). Quando o parâmetro cursor é
+    informado, usa paginação keyset e devolve o cursor da próxima página
+    nos cabeçalhos X-Next-Cursor e Link (ausentes na última página).
+    
+    As páginas ficam em cache em memória até expirarem ou até uma
+    escrita em mídias sociais invalidar o cache. A resposta inclui uma
+    ETag derivada de max(updated_at) e da contagem de registros; com
+    If-None-Match correspondente, retorna 304 sem buscar as linhas.
     
     Args:
-        skip: Número de registros para pular (paginação)
+        request: Objeto de requisição FastAPI
+        response: Resposta, para os cabeçalhos de paginação e ETag
+        skip: Número de registros para pular (paginação por offset)
         limit: Número máximo de registros para retornar
+        cursor: Cursor da página anterior (paginação keyset)
+        order_by: Ordenação dos resultados
         db: Sessão do banco de dados
         
     Returns:
         Lista de objetos SocialMediaSchema
     """
     try:
-        # Busca dados com paginação
-        social_media = db.query(SocialMedia).offset(skip).limit(limit).all()
+        cache_key = ("list", skip, limit, cursor, order_by)
+        cached = social_media_cache.get(cache_key)
+        if cached is not MISSING:
+            social_media, next_cursor, etag = cached
+        else:
+            generation = social_media_cache.generation
+            
+            # Versão da tabela: permite responder 304 sem carregar as linhas
+            etag = make_etag(cache_key, *(await table_version(db, SocialMedia)))
+            if etag_matches(request, etag):
+                next_cursor = None
+                if cursor is not None:
+                    # O 304 leva os mesmos cabeçalhos de paginação do 200;
+                    # basta buscar as colunas da chave, não as linhas
+                    columns = order_columns(SocialMedia, order_by)
+                    stmt = apply_keyset(select(*columns), SocialMedia, order_by, cursor, limit)
+                    _, next_cursor = split_page((await db.execute(stmt)).all(), order_by, limit)
+                return not_modified(etag, pagination_headers(request, next_cursor))
+            
+            next_cursor = None
+            if cursor is not None:
+                # Paginação keyset: continua a partir da chave do cursor
+                stmt = apply_keyset(select(SocialMedia), SocialMedia, order_by, cursor, limit)
+                result = await db.execute(stmt)
+                rows, next_cursor = split_page(result.scalars().all(), order_by, limit)
+            else:
+                # Busca dados com paginação por offset
+                stmt = select(SocialMedia).order_by(*order_columns(SocialMedia, order_by))
+                result = await db.execute(stmt.offset(skip).limit(limit))
+                rows = result.scalars().all()
+            
+            # Valida as URLs da página de uma vez
+            for item, valid in zip(rows, string_processor.validate_urls(item.url for item in rows)):
+                if not valid:
+                    logger.warning("URL inválida encontrada: %s", item.url)
+            
+            social_media = [SocialMediaSchema.model_validate(item) for item in rows]
+            # Lido de uma réplica logo após uma escrita, não vai para o cache
+            social_media_cache.set(cache_key, (social_media, next_cursor, etag), generation, read_staleness(db))
         
-        # Processa e valida dados
-        string_processor = StringProcessor()
-        for item in social_media:
-            # Valida URLs
-            if not string_processor.validate_url(item.url):
-                logger.warning(f"URL inválida encontrada: {item.url}")
+        headers = pagination_headers(request, next_cursor)
+        if etag_matches(request, etag):
+            return not_modified(etag, headers)
+        set_etag(response, etag)
+        response.headers.update(headers)
                 
         return social_media
         
+    except ValidationError as e:
+        # Cursor inválido
+        raise e
     except SQLAlchemyError as e:
         # Erro específico de banco de dados
-        logger.error(f"Erro de banco de dados: {str(e)}")
+        logger.error("Erro de banco de dados: %s", e)
         raise DatabaseError(
             message="Falha ao buscar links de mídias sociais",
             details={"error": str(e)}
         )
     except Exception as e:
         # Outros erros
-        logger.error(f"Erro ao buscar mídias sociais: {str(e)}", exc_info=True)
+        logger.error("Erro ao buscar mídias sociais: %s", e, exc_info=True)
         raise BaseAPIError(
             message="Falha ao buscar links de mídias sociais",
             status_code=500,
@@ -72,7 +155,7 @@ async def get_social_media(
 @router.post("/", response_model=SocialMediaSchema, status_code=201)
 async def create_social_media(
     social_media: SocialMediaCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cria uma nova mídia social.
@@ -86,7 +169,6 @@ async def create_social_media(
     """
     try:
         # Valida dados de entrada
-        string_processor = StringProcessor()
         if not string_processor.validate_url(social_media.url):
             raise ValidationError(
                 message="URL de mídia social inválida",
@@ -94,7 +176,8 @@ async def create_social_media(
             )
             
         # Verifica se já existe com o mesmo nome
-        existing = db.query(SocialMedia).filter(SocialMedia.name == social_media.name).first()
+        result = await db.execute(select(SocialMedia).filter(SocialMedia.name == social_media.name))
+        existing = result.scalars().first()
         if existing:
             raise ValidationError(
                 message="Mídia social com este nome já existe",
@@ -109,10 +192,15 @@ async def create_social_media(
         )
         
         db.add(db_social_media)
-        db.commit()
-        db.refresh(db_social_media)
+        await db.flush()
+        # Entregas aos assinantes gravadas na mesma transação
+        await publish_event(db, EVENT_SOCIAL_MEDIA_CREATED, db_social_media.to_dict())
+        await db.commit()
+        await db.refresh(db_social_media)
+        social_media_cache.invalidate()
+        outbound_dispatcher.notify()
         
-        logger.info(f"Mídia social criada: {social_media.name}")
+        logger.info("Mídia social criada: %s", social_media.name)
         return db_social_media
         
     except ValidationError as e:
@@ -120,16 +208,16 @@ async def create_social_media(
         raise e
     except SQLAlchemyError as e:
         # Erro de banco de dados
-        db.rollback()
-        logger.error(f"Erro de banco de dados ao criar mídia social: {str(e)}")
+        await db.rollback()
+        logger.error("Erro de banco de dados ao criar mídia social: %s", e)
         raise DatabaseError(
             message="Falha ao criar mídia social",
             details={"error": str(e)}
         )
     except Exception as e:
         # Outros erros
-        db.rollback()
-        logger.error(f"Erro ao criar mídia social: {str(e)}", exc_info=True)
+        await db.rollback()
+        logger.error("Erro ao criar mídia social: %s", e, exc_info=True)
         raise BaseAPIError(
             message="Falha ao criar mídia social",
             status_code=500,
@@ -138,13 +226,20 @@ async def create_social_media(
 
 @router.get("/{social_media_id}", response_model=SocialMediaSchema)
 async def get_social_media_by_id(
+    request: Request,
+    response: Response,
     social_media_id: int = Path(..., description="ID da mídia social"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Obtém uma mídia social pelo ID.
     
+    A resposta inclui uma ETag derivada de id e updated_at; com
+    If-None-Match correspondente, retorna 304 sem corpo.
+    
     Args:
+        request: Objeto de requisição FastAPI
+        response: Resposta, para o cabeçalho ETag
         social_media_id: ID da mídia social a buscar
         db: Sessão do banco de dados
         
@@ -155,20 +250,33 @@ async def get_social_media_by_id(
         NotFoundError: Se a mídia social não for encontrada
     """
     try:
-        social_media = db.query(SocialMedia).filter(SocialMedia.id == social_media_id).first()
-        
-        if not social_media:
-            raise NotFoundError(
-                message=f"Mídia social com ID {social_media_id} não encontrada"
-            )
+        cache_key = ("id", social_media_id)
+        cached = social_media_cache.get(cache_key)
+        if cached is not MISSING:
+            item, etag = cached
+        else:
+            generation = social_media_cache.generation
+            social_media = await db.get(SocialMedia, social_media_id)
             
-        return social_media
+            if not social_media:
+                raise NotFoundError(
+                    message=f"Mídia social com ID {social_media_id} não encontrada"
+                )
+                
+            item = SocialMediaSchema.model_validate(social_media)
+            etag = make_etag("social_media", item.id, item.updated_at)
+            social_media_cache.set(cache_key, (item, etag), generation, read_staleness(db))
+        
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return item
         
     except NotFoundError as e:
         # Re-lança erro de não encontrado
         raise e
     except Exception as e:
-        logger.error(f"Erro ao buscar mídia social por ID: {str(e)}")
+        logger.error("Erro ao buscar mídia social por ID: %s", e)
         raise BaseAPIError(
             message="Falha ao buscar mídia social",
             status_code=500,
@@ -179,7 +287,7 @@ async def get_social_media_by_id(
 async def update_social_media(
     social_media_id: int = Path(..., description="ID da mídia social"),
     social_media: SocialMediaUpdate = ...,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Atualiza uma mídia social existente.
@@ -197,7 +305,7 @@ async def update_social_media(
     """
     try:
         # Busca registro existente
-        db_social_media = db.query(SocialMedia).filter(SocialMedia.id == social_media_id).first()
+        db_social_media = await db.get(SocialMedia, social_media_id)
         
         if not db_social_media:
             raise NotFoundError(
@@ -206,7 +314,6 @@ async def update_social_media(
             
         # Valida URL se fornecida
         if social_media.url:
-            string_processor = StringProcessor()
             if not string_processor.validate_url(social_media.url):
                 raise ValidationError(
                     message="URL de mídia social inválida",
@@ -221,10 +328,14 @@ async def update_social_media(
         if social_media.icon:
             db_social_media.icon = social_media.icon
             
-        db.commit()
-        db.refresh(db_social_media)
+        await db.flush()
+        await publish_event(db, EVENT_SOCIAL_MEDIA_UPDATED, db_social_media.to_dict())
+        await db.commit()
+        await db.refresh(db_social_media)
+        social_media_cache.invalidate()
+        outbound_dispatcher.notify()
         
-        logger.info(f"Mídia social atualizada: ID {social_media_id}")
+        logger.info("Mídia social atualizada: ID %s", social_media_id)
         return db_social_media
         
     except (NotFoundError, ValidationError) as e:
@@ -232,16 +343,16 @@ async def update_social_media(
         raise e
     except SQLAlchemyError as e:
         # Erro de banco de dados
-        db.rollback()
-        logger.error(f"Erro de banco de dados ao atualizar mídia social: {str(e)}")
+        await db.rollback()
+        logger.error("Erro de banco de dados ao atualizar mídia social: %s", e)
         raise DatabaseError(
             message="Falha ao atualizar mídia social",
             details={"error": str(e)}
         )
     except Exception as e:
         # Outros erros
-        db.rollback()
-        logger.error(f"Erro ao atualizar mídia social: {str(e)}", exc_info=True)
+        await db.rollback()
+        logger.error("Erro ao atualizar mídia social: %s", e, exc_info=True)
         raise BaseAPIError(
             message="Falha ao atualizar mídia social",
             status_code=500,
@@ -251,7 +362,7 @@ async def update_social_media(
 @router.delete("/{social_media_id}", status_code=204)
 async def delete_social_media(
     social_media_id: int = Path(..., description="ID da mídia social"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove uma mídia social.
@@ -268,18 +379,23 @@ async def delete_social_media(
     """
     try:
         # Busca registro existente
-        db_social_media = db.query(SocialMedia).filter(SocialMedia.id == social_media_id).first()
+        db_social_media = await db.get(SocialMedia, social_media_id)
         
         if not db_social_media:
             raise NotFoundError(
                 message=f"Mídia social com ID {social_media_id} não encontrada"
             )
             
-        # Remove registro
-        db.delete(db_social_media)
-        db.commit()
+        # Remove registro, com a lápide para o feed de mudanças
+        await publish_event(db, EVENT_SOCIAL_MEDIA_DELETED, {"id": db_social_media.id, "name": db_social_media.name})
+        record_tombstone(db, db_social_media)
+        await purge_tombstones(db)
+        await db.delete(db_social_media)
+        await db.commit()
+        social_media_cache.invalidate()
+        outbound_dispatcher.notify()
         
-        logger.info(f"Mídia social removida: ID {social_media_id}")
+        logger.info("Mídia social removida: ID %s", social_media_id)
         return None
         
     except NotFoundError as e:
@@ -287,16 +403,16 @@ async def delete_social_media(
         raise e
     except SQLAlchemyError as e:
         # Erro de banco de dados
-        db.rollback()
-        logger.error(f"Erro de banco de dados ao remover mídia social: {str(e)}")
+        await db.rollback()
+        logger.error("Erro de banco de dados ao remover mídia social: %s", e)
         raise DatabaseError(
             message="Falha ao remover mídia social",
             details={"error": str(e)}
         )
     except Exception as e:
         # Outros erros
-        db.rollback()
-        logger.error(f"Erro ao remover mídia social: {str(e)}", exc_info=True)
+        await db.rollback()
+        logger.error("Erro ao remover mídia social: %s", e, exc_info=True)
         raise BaseAPIError(
             message="Falha ao remover mídia social",
             status_code=500,
@@ -0,0 +1,79 @@
+"""
+Rotas para o dead-letter de webhooks.
+
+Este módulo implementa a consulta dos eventos de webhook que falharam
+e o reprocessamento em massa (services/dead_letters.py). As rotas
+exigem o token administrativo (services/admin_auth.py): os payloads
+guardados podem conter dados pessoais e o reprocessamento executa os
+handlers.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import logging
+
+from ..services.admin_auth import require_admin_token
+from ..schemas.webhook import WebhookDeadLetterSchema, WebhookReplayRequest, WebhookReplayResponse
+from ..services.database import get_async_read_db
+from ..services.dead_letters import dead_letter_replayer, list_dead_letters
+
+# Configuração de logging
+logger = logging.getLogger("api.webhook_dead_letters")
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+@router.get("/", response_model=List[WebhookDeadLetterSchema])
+async def get_dead_letters(
+    status: Optional[str] = Query(
+        "dead",
+        pattern="^(dead|replaying|replayed|resolved)$",
+        description="Estado dos eventos"
+    ),
+    event_type: Optional[str] = Query(None, description="Filtra pelo tipo do evento"),
+    source: Optional[str] = Query(
+        None,
+        pattern="^(queue|batch|webhook)$",
+        description="Filtra pela origem da falha"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de eventos"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Lista os eventos do dead-letter, dos mais antigos para os mais recentes.
+    
+    Args:
+        status: Estado dos eventos
+        event_type: Tipo do evento
+        source: Origem da falha
+        limit: Número máximo de eventos
+        db: Sessão do banco de dados
+        
+    Returns:
+        Eventos com payload original, erro e tentativas
+    """
+    return await list_dead_letters(db, status=status, event_type=event_type, source=source, limit=limit)
+
+@router.post("/replay", response_model=WebhookReplayResponse)
+async def replay_dead_letters(request: WebhookReplayRequest):
+    """
+    Reprocessa em massa os eventos do dead-letter.
+    
+    A resposta é enviada quando todos os eventos selecionados terminam;
+    para volumes grandes, use o script replay_dead_letters.py.
+    
+    Args:
+        request: Filtros, paralelismo e taxa do reprocessamento
+        
+    Returns:
+        Resumo com selecionados, reprocessados, resolvidos, ignorados e falhas
+    """
+    logger.info("Reprocessamento de dead-letter solicitado: %s", request.model_dump(exclude_none=True))
+    return await dead_letter_replayer.replay(
+        ids=request.ids,
+        event_type=request.event_type,
+        source=request.source,
+        limit=request.limit,
+        parallelism=request.parallelism,
+        rate=request.rate,
+        dry_run=request.dry_run
+    )
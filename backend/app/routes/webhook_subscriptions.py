@@ -0,0 +1,176 @@
+"""
+Rotas para assinantes de webhooks enviados pela API.
+
+Este módulo implementa o registro de assinantes, que recebem por push
+os eventos de mudança (services/outbound_webhooks.py), e a consulta do
+registro de entregas de cada assinante. Todas as rotas exigem o token
+administrativo (services/admin_auth.py).
+"""
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import logging
+import secrets
+
+from ..models.webhook_outbound_delivery import WebhookOutboundDelivery
+from ..models.webhook_subscription import WebhookSubscription
+from ..schemas.webhook import (
+    WebhookOutboundDeliverySchema, WebhookSubscriptionCreate, WebhookSubscriptionCreated, WebhookSubscriptionSchema
+)
+from ..services.admin_auth import require_admin_token
+from ..services.database import get_async_db, get_async_read_db
+from ..services.network_guard import UnsafeDestinationError, resolve_destination
+from ..services.outbound_webhooks import OUTBOUND_EVENT_TYPES, WEBHOOK_OUTBOUND_CONCURRENCY
+from ..errors import DatabaseError, NotFoundError, ValidationError
+
+# Configuração de logging
+logger = logging.getLogger("api.webhook_subscriptions")
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+@router.post("/", response_model=WebhookSubscriptionCreated, status_code=201)
+async def create_subscription(
+    subscription: WebhookSubscriptionCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Registra um assinante de webhooks.
+
+    Cada mudança em mídias sociais passa a ser enviada à URL informada
+    (POST assinado com X-Hub-Signature). O segredo é retornado apenas
+    nesta resposta.
+
+    Args:
+        subscription: Dados do assinante
+        db: Sessão do banco de dados
+
+    Returns:
+        Assinante criado, com o segredo
+
+    Raises:
+        ValidationError: Se algum tipo de evento não for suportado ou a
+            URL não resolver para um endereço público
+    """
+    unsupported = [event_type for event_type in subscription.event_types or [] if event_type not in OUTBOUND_EVENT_TYPES]
+    if unsupported:
+        raise ValidationError(
+            message="Tipos de evento não suportados",
+            details={"unsupported": unsupported, "supported": list(OUTBOUND_EVENT_TYPES)}
+        )
+
+    try:
+        await resolve_destination(subscription.url)
+    except UnsafeDestinationError as e:
+        raise ValidationError(message=str(e), details={"url": subscription.url})
+    except OSError as e:
+        raise ValidationError(
+            message="Host da URL não encontrado",
+            details={"url": subscription.url, "error": str(e)}
+        )
+
+    db_subscription = WebhookSubscription(
+        url=subscription.url,
+        secret=subscription.secret or secrets.token_hex(32),
+        event_types=subscription.event_types or None,
+        max_concurrency=subscription.max_concurrency or WEBHOOK_OUTBOUND_CONCURRENCY,
+        active=True,
+        description=subscription.description
+    )
+    try:
+        db.add(db_subscription)
+        await db.commit()
+        await db.refresh(db_subscription)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Erro de banco de dados ao criar assinante de webhooks: %s", e)
+        raise DatabaseError(
+            message="Falha ao criar assinante de webhooks",
+            details={"error": str(e)}
+        )
+
+    logger.info("Assinante de webhooks criado: %s", db_subscription.url)
+    return db_subscription
+
+@router.get("/", response_model=List[WebhookSubscriptionSchema])
+async def list_subscriptions(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Lista os assinantes de webhooks.
+
+    Args:
+        db: Sessão do banco de dados
+
+    Returns:
+        Lista de assinantes (sem os segredos)
+    """
+    result = await db.execute(select(WebhookSubscription).order_by(WebhookSubscription.id))
+    return result.scalars().all()
+
+@router.delete("/{subscription_id}", status_code=204)
+async def delete_subscription(
+    subscription_id: int = Path(..., description="ID do assinante"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Remove um assinante de webhooks e seu registro de entregas.
+
+    Args:
+        subscription_id: ID do assinante
+        db: Sessão do banco de dados
+
+    Returns:
+        Resposta vazia com status 204
+
+    Raises:
+        NotFoundError: Se o assinante não for encontrado
+    """
+    db_subscription = await db.get(WebhookSubscription, subscription_id)
+    if not db_subscription:
+        raise NotFoundError(
+            message=f"Assinante de webhooks com ID {subscription_id} não encontrado"
+        )
+    # Remove as entregas explicitamente (o SQLite não aplica ON DELETE CASCADE por padrão)
+    await db.execute(delete(WebhookOutboundDelivery).where(WebhookOutboundDelivery.subscription_id == subscription_id))
+    await db.delete(db_subscription)
+    await db.commit()
+
+    logger.info("Assinante de webhooks removido: ID %s", subscription_id)
+    return None
+
+@router.get("/{subscription_id}/deliveries", response_model=List[WebhookOutboundDeliverySchema])
+async def list_deliveries(
+    subscription_id: int = Path(..., description="ID do assinante"),
+    status: Optional[str] = Query(
+        None,
+        pattern="^(pending|delivering|delivered|failed)$",
+        description="Filtra pelo estado da entrega"
+    ),
+    limit: int = Query(50, ge=1, le=500, description="Número máximo de entregas"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Consulta o registro de entregas de um assinante, das mais recentes
+    para as mais antigas.
+
+    Args:
+        subscription_id: ID do assinante
+        status: Estado das entregas a retornar
+        limit: Número máximo de entregas
+        db: Sessão do banco de dados
+
+    Returns:
+        Entregas com estado, tentativas, status HTTP e duração
+
+    Raises:
+        NotFoundError: Se o assinante não for encontrado
+    """
+    if not await db.get(WebhookSubscription, subscription_id):
+        raise NotFoundError(
+            message=f"Assinante de webhooks com ID {subscription_id} não encontrado"
+        )
+    query = select(WebhookOutboundDelivery).where(WebhookOutboundDelivery.subscription_id == subscription_id)
+    if status:
+        query = query.where(WebhookOutboundDelivery.status == status)
+    result = await db.execute(query.order_by(WebhookOutboundDelivery.id.desc()).limit(limit))
+    return result.scalars().all()
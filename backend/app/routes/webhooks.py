@@ -5,38 +5,74 @@ Este módulo implementa endpoints para receber e processar webhooks
 de sistemas externos, com validação de segurança e processamento
 de diferentes tipos de eventos.
 """
-from fastapi import APIRouter, Depends, HTTPException, Header, Request, BackgroundTasks
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
+from starlette.background import BackgroundTask
+from typing import IO, AsyncIterator, Iterator, Optional, List, Dict, Any
+from collections import defaultdict
+from contextlib import nullcontext
 from datetime import datetime
+import asyncio
 import logging
-import hashlib
-import hmac
+import tempfile
+import time
 import uuid
 import os
-import json
 
 from ..models.social_media import SocialMedia
-from ..schemas.webhook import WebhookPayload, WebhookResponse, WebhookBatchResponse, WebhookEventType
-from ..services.database import get_db
-from ..errors import BaseAPIError, ValidationError
-from ..helpers import DataProcessor, JsonProcessor, StringProcessor
-from sqlalchemy.orm import Session
+from ..models.webhook_dead_letter import WebhookDeadLetter
+from ..schemas.webhook import (
+    WebhookPayload, WebhookResponse, WebhookBatchResponse, WebhookChangesResponse, WebhookEventType, WebhookEventStatus,
+    SocialMediaUpdateData, ContactFormData, PortfolioUpdateData
+)
+from ..services.database import AsyncSessionLocal, get_async_db, get_async_read_db
+from ..services.cache import social_media_cache
+from ..services.etag import make_etag, etag_matches, not_modified, set_etag, table_version
+from ..services.webhook_queue import enqueue_event, get_event, webhook_workers
+from ..services.changes_feed import fetch_changes
+from ..services.event_registry import event_registry
+from ..services.dead_letters import (
+    SOURCE_BATCH, SOURCE_WEBHOOK, dead_letter_entry, dead_letter_replayer, record_dead_letters
+)
+from ..services.bulk_upsert import supports_upsert, upsert_rows
+from ..services.json_codec import json_codec
+from ..services.responses import CodecJSONResponse
+from ..services.idempotency import IN_PROGRESS, delivery_key, idempotency_store
+from ..services.outbound_webhooks import (
+    EVENT_SOCIAL_MEDIA_CREATED, EVENT_SOCIAL_MEDIA_UPDATED, outbound_dispatcher, publish_event
+)
+from ..services.webhook_signature import VERIFY_SIGNATURES, SignatureVerifier, normalize_signature, reject, verify_signature
+from ..errors import BaseAPIError, ValidationError, NotFoundError
+from ..helpers import DataProcessor, JsonProcessor, model_serializer, string_processor
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Configuração de logging
 logger = logging.getLogger("api.webhooks")
 
 router = APIRouter()
 
-# Segurança de webhook
-WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "default-secret")
-VERIFY_SIGNATURES = os.getenv("VERIFY_SIGNATURES", "true").lower() == "true"
+# Modo streaming (NDJSON): eventos por lote gravado e tamanho máximo de uma linha
+WEBHOOK_STREAM_CHUNK_SIZE = int(os.getenv("WEBHOOK_STREAM_CHUNK_SIZE", "500"))
+WEBHOOK_STREAM_MAX_LINE_BYTES = int(os.getenv("WEBHOOK_STREAM_MAX_LINE_BYTES", str(1024 * 1024)))
+# Corpo gravado em arquivo temporário antes da verificação: limite total e parte mantida em memória
+WEBHOOK_STREAM_MAX_BYTES = int(os.getenv("WEBHOOK_STREAM_MAX_BYTES", str(256 * 1024 * 1024)))
+WEBHOOK_STREAM_SPOOL_MEMORY_BYTES = int(os.getenv("WEBHOOK_STREAM_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+# Duração máxima da transação do lote (deve ser menor que CHANGES_SETTLE_SECONDS)
+WEBHOOK_STREAM_MAX_SECONDS = float(os.getenv("WEBHOOK_STREAM_MAX_SECONDS", "60"))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Colunas de mídia social que um evento social_media_update pode gravar
+SOCIAL_MEDIA_FIELDS = ("name", "url", "icon")
 
 def verify_webhook(signature: str, payload: bytes) -> bool:
     """
     Verifica a assinatura do webhook para autenticidade.
     
-    Usa HMAC com SHA-256 para verificar se o webhook foi enviado
-    por uma fonte autorizada.
+    Usa HMAC com SHA-256 e os segredos ativos (services/webhook_signature.py)
+    para verificar se o webhook foi enviado por uma fonte autorizada.
     
     Args:
         signature: Assinatura fornecida no cabeçalho
@@ -45,30 +81,71 @@ def verify_webhook(signature: str, payload: bytes) -> bool:
     Returns:
         bool: True se a assinatura for válida, False caso contrário
     """
-    # Se a verificação estiver desativada, sempre retorna True
-    if not VERIFY_SIGNATURES:
-        logger.warning("Verificação de assinatura de webhook desativada")
-        return True
+    return verify_signature(signature, payload)
+
+async def verified_body(request: Request, x_hub_signature: Optional[str] = Header(None)) -> bytes:
+    """
+    Dependência que lê o corpo bruto e verifica a assinatura.
+    
+    Deve ser declarada antes das demais dependências da rota (ex: a
+    sessão do banco), que assim não são criadas para requisições
+    rejeitadas. Assinaturas ausentes ou malformadas são rejeitadas sem
+    ler o corpo, e nenhum JSON é interpretado antes da verificação.
+    
+    Args:
+        request: Objeto de requisição FastAPI
+        x_hub_signature: Assinatura fornecida no cabeçalho
         
-    # Se não houver assinatura, rejeita
-    if not signature:
-        logger.warning("Requisição de webhook sem assinatura")
-        return False
+    Returns:
+        Corpo da requisição em bytes
         
-    # Calcula o digest esperado
-    digest = hmac.new(
-        WEBHOOK_SECRET.encode(),
-        msg=payload,
-        digestmod=hashlib.sha256
-    ).hexdigest()
-    
-    # Compara de forma segura contra timing attacks
-    is_valid = hmac.compare_digest(digest, signature)
+    Raises:
+        BaseAPIError: Se a assinatura for inválida (401)
+    """
+    body = b""
+    if not VERIFY_SIGNATURES or normalize_signature(x_hub_signature) is not None:
+        body = await request.body()
+    if verify_signature(x_hub_signature, body):
+        return body
+    raise BaseAPIError(
+        message="Assinatura de webhook inválida",
+        status_code=401,
+        log_error=False
+    )
+
+def parse_body(adapter: TypeAdapter, body: bytes) -> Any:
+    """
+    Valida o corpo JSON uma única vez com o modelo informado.
     
-    if not is_valid:
-        logger.warning(f"Assinatura de webhook inválida: {signature}")
+    Args:
+        adapter: TypeAdapter do modelo esperado
+        body: Corpo da requisição já verificado
         
-    return is_valid
+    Returns:
+        Objeto validado
+        
+    Raises:
+        RequestValidationError: Se o corpo for inválido (422, mesmo
+            formato da validação automática do FastAPI)
+    """
+    try:
+        return adapter.validate_json(body)
+    except PydanticValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+            body=body
+        )
+
+# Validadores e esquemas OpenAPI dos corpos lidos manualmente
+PAYLOAD_ADAPTER = TypeAdapter(WebhookPayload)
+BATCH_ADAPTER = TypeAdapter(List[WebhookPayload])
+
+def _json_body_schema(adapter: TypeAdapter) -> Dict[str, Any]:
+    """Monta o requestBody OpenAPI de uma rota que lê o corpo bruto."""
+    return {"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": adapter.json_schema()}}
+    }}
 
 class WebhookProcessor(DataProcessor):
     """
@@ -81,7 +158,7 @@ class WebhookProcessor(DataProcessor):
     def __init__(self):
         """Inicializa o processador com utilitários necessários."""
         self.json_processor = JsonProcessor()
-        self.string_processor = StringProcessor()
+        self.string_processor = string_processor
     
     def process(self, data: dict) -> dict:
         """
@@ -116,101 +193,344 @@ class WebhookProcessor(DataProcessor):
         required_fields = ["event_type", "data"]
         return all(field in data for field in required_fields)
     
-    async def process_event(self, event_type: str, data: Dict[str, Any], db: Session) -> Dict[str, Any]:
+    async def process_event(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        db: AsyncSession,
+        commit: bool = True
+    ) -> Dict[str, Any]:
         """
-        Processa um evento de webhook com base no tipo.
+        Processa um evento de webhook com o handler registrado para o tipo.
         
-        Implementa lógica específica para cada tipo de evento suportado.
+        O despacho é feito pelo registro de handlers
+        (services/event_registry.py), que valida os dados com o esquema
+        do tipo e aplica seus limites de concorrência e de tempo.
         
         Args:
             event_type: Tipo do evento a ser processado
             data: Dados associados ao evento
             db: Sessão do banco de dados
+            commit: Se deve confirmar a transação; com False as alterações
+                são apenas enviadas ao banco (flush) e o chamador decide
             
         Returns:
             Resultado do processamento
             
         Raises:
             ValidationError: Se os dados forem inválidos para o tipo de evento
+            BaseAPIError: Se o tipo estiver sem capacidade (503) ou o
+                handler exceder o tempo limite (504)
         """
         # Registra o evento recebido
-        logger.info(f"Processando evento de webhook: {event_type}")
+        logger.info("Processando evento de webhook: %s", event_type)
+        return await event_registry.dispatch(event_type, data, db, commit=commit)
+
+    def validate_social_media(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valida os dados de um evento de atualização de mídia social.
         
-        # Processa com base no tipo de evento
-        if event_type == WebhookEventType.SOCIAL_MEDIA_UPDATE:
-            # Valida dados específicos para atualização de mídia social
-            required_fields = ["name", "url", "icon"]
-            if not all(field in data for field in required_fields):
-                raise ValidationError(
-                    message="Dados incompletos para atualização de mídia social",
-                    details={"required_fields": required_fields, "received": list(data.keys())}
-                )
-                
-            # Cria ou atualiza registro de mídia social
-            social_media = db.query(SocialMedia).filter_by(name=data["name"]).first()
-            if social_media:
-                # Atualiza registro existente
-                for key, value in data.items():
-                    setattr(social_media, key, value)
-            else:
-                # Cria novo registro
-                social_media = SocialMedia(**data)
-                db.add(social_media)
-                
-            db.commit()
-            return {"id": social_media.id, "name": social_media.name, "action": "updated" if social_media else "created"}
+        Aplica as mesmas regras do processamento individual (campos
+        obrigatórios e validadores do modelo) sem acessar o banco.
+        
+        Args:
+            data: Dados do evento
             
-        elif event_type == WebhookEventType.CONTACT_FORM:
-            # Exemplo: processar submissão de formulário de contato
-            logger.info(f"Formulário de contato recebido: {data.get('email')}")
-            # Aqui implementaríamos lógica para salvar contato ou enviar email
-            return {"contact_email": data.get("email"), "action": "processed"}
+        Returns:
+            Linha com as colunas name, url e icon
             
-        elif event_type == WebhookEventType.PORTFOLIO_UPDATE:
-            # Exemplo: processar atualização de portfólio
-            logger.info(f"Atualização de portfólio recebida: {data.get('title')}")
-            # Aqui implementaríamos lógica para atualizar portfólio
-            return {"portfolio_item": data.get("title"), "action": "updated"}
+        Raises:
+            ValidationError: Se os dados forem inválidos
+        """
+        required_fields = list(SOCIAL_MEDIA_FIELDS)
+        if not all(field in data for field in required_fields):
+            raise ValidationError(
+                message="Dados incompletos para atualização de mídia social",
+                details={"required_fields": required_fields, "received": list(data.keys())}
+            )
+        unsupported = [field for field in data if field not in required_fields]
+        if unsupported:
+            raise ValidationError(
+                message="Campos não suportados na atualização em lote de mídia social",
+                details={"unsupported_fields": unsupported}
+            )
+        row = {field: data[field] for field in required_fields}
+        # Executa os validadores do modelo (@validates) sem persistir
+        SocialMedia(**row)
+        return row
+    
+    async def process_batch(
+        self,
+        payloads: List[WebhookPayload],
+        db: AsyncSession,
+        commit: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa um lote de eventos agrupados por tipo.
+        
+        Todos os eventos são validados antes de qualquer escrita. As
+        atualizações de mídia social válidas são gravadas com um único
+        INSERT ... ON CONFLICT (name) DO UPDATE em uma transação; se
+        o mesmo nome aparecer mais de uma vez, prevalece o último. Os
+        demais tipos passam por process_event.
+        
+        Args:
+            payloads: Eventos do lote
+            db: Sessão do banco de dados
+            commit: Se deve confirmar a transação; com False as escritas
+                ficam pendentes na transação do chamador, e o upsert e cada
+                um dos demais eventos (ver EventHandlerSpec.run) rodam em
+                um SAVEPOINT, de forma que uma falha desfaz apenas a
+                própria parte
             
-        else:
-            # Tipo de evento desconhecido ou personalizado
-            logger.warning(f"Tipo de evento não implementado: {event_type}")
-            return {"event_type": event_type, "action": "logged"}
+        Returns:
+            Resultado de cada evento, na ordem recebida, com as chaves
+            status ("success"/"error"), message e result e, nas falhas,
+            error (a exceção)
+        """
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, payload in enumerate(payloads):
+            groups[payload.event_type].append(index)
+        
+        # Atualizações de mídia social: validação prévia e upsert único
+        rows: Dict[str, Dict[str, Any]] = {}
+        owners: Dict[int, str] = {}
+        indexes = groups.pop(WebhookEventType.SOCIAL_MEDIA_UPDATE, [])
+        # URLs do grupo validadas de uma vez; inválidas falham sem criar o modelo
+        valid_urls = self.string_processor.validate_urls(payloads[index].data.get("url") for index in indexes)
+        for index, valid_url in zip(indexes, valid_urls):
+            if not valid_url and "url" in payloads[index].data:
+                error = ValidationError(message="URL de mídia social inválida")
+                outcomes[index] = {
+                    "status": "error", "message": f"Falha: {error.message}", "result": None, "error": error
+                }
+                continue
+            try:
+                row = self.validate_social_media(payloads[index].data)
+            except ValidationError as e:
+                outcomes[index] = {"status": "error", "message": f"Falha: {e.message}", "result": None, "error": e}
+                continue
+            rows[row["name"]] = row
+            owners[index] = row["name"]
+        
+        if rows:
+            now = datetime.utcnow()
+            values = [{**row, "created_at": now, "updated_at": now} for row in rows.values()]
+            try:
+                async with nullcontext() if commit else db.begin_nested():
+                    returned = await upsert_rows(
+                        db, SocialMedia, values,
+                        conflict_columns=["name"],
+                        update_columns=["url", "icon", "updated_at"],
+                        returning=["id", "name", "url", "icon", "created_at", "updated_at"]
+                    )
+                    # Linhas novas mantêm created_at igual ao valor inserido
+                    for row in returned:
+                        await publish_event(
+                            db,
+                            EVENT_SOCIAL_MEDIA_CREATED if row.created_at == now else EVENT_SOCIAL_MEDIA_UPDATED,
+                            dict(row._mapping)
+                        )
+                if commit:
+                    await db.commit()
+                    social_media_cache.invalidate()
+                    outbound_dispatcher.notify()
+            except Exception as e:
+                if commit:
+                    await db.rollback()
+                logger.error("Falha no upsert em lote de mídias sociais: %s", e)
+                for index in owners:
+                    outcomes[index] = {"status": "error", "message": f"Falha: {str(e)}", "result": None, "error": e}
+            else:
+                ids = {row.name: row.id for row in returned}
+                for index, name in owners.items():
+                    outcomes[index] = {
+                        "status": "success",
+                        "message": "Processado com sucesso",
+                        "result": {"id": ids.get(name), "name": name, "action": "upserted"}
+                    }
+        
+        # Demais tipos de evento
+        for event_type, indexes in groups.items():
+            for index in indexes:
+                try:
+                    # Com commit=False o registro executa o handler em um SAVEPOINT
+                    result = await self.process_event(event_type, payloads[index].data, db, commit=commit)
+                    outcomes[index] = {"status": "success", "message": "Processado com sucesso", "result": result}
+                except Exception as e:
+                    if commit:
+                        await db.rollback()
+                    outcomes[index] = {"status": "error", "message": f"Falha: {str(e)}", "result": None, "error": e}
+        
+        return outcomes
 
-def process_webhook_async(payload: Dict[str, Any], db: Session):
+@event_registry.register(WebhookEventType.SOCIAL_MEDIA_UPDATE, schema=SocialMediaUpdateData)
+async def handle_social_media_update(data: Dict[str, Any], db: AsyncSession, commit: bool) -> Dict[str, Any]:
     """
-    Processa webhook de forma assíncrona em background.
+    Cria ou atualiza uma mídia social pelo nome.
     
     Args:
-        payload: Dados do webhook
+        data: Dados validados (SocialMediaUpdateData)
         db: Sessão do banco de dados
+        commit: Se deve confirmar a transação
+        
+    Returns:
+        ID, nome e ação realizada
     """
-    processor = WebhookProcessor()
-    try:
-        event_type = payload.get("event_type")
-        data = payload.get("data", {})
+    # Apenas as colunas editáveis: id e datas nunca vêm do payload
+    row = {field: data[field] for field in SOCIAL_MEDIA_FIELDS}
+    result = await db.execute(select(SocialMedia).filter_by(name=row["name"]))
+    social_media = result.scalars().first()
+    created = social_media is None
+    if social_media:
+        # Atualiza registro existente
+        for key, value in row.items():
+            setattr(social_media, key, value)
+    else:
+        # Cria novo registro
+        social_media = SocialMedia(**row)
+        db.add(social_media)
         
-        # Aqui processaríamos o evento de forma assíncrona
-        logger.info(f"Processando webhook assíncrono: {event_type}")
+    await db.flush()
+    # Entregas aos assinantes gravadas na mesma transação
+    await publish_event(
+        db,
+        EVENT_SOCIAL_MEDIA_CREATED if created else EVENT_SOCIAL_MEDIA_UPDATED,
+        social_media.to_dict()
+    )
+    if commit:
+        await db.commit()
+        social_media_cache.invalidate()
+        outbound_dispatcher.notify()
+    return {"id": social_media.id, "name": social_media.name, "action": "created" if created else "updated"}
+
+@event_registry.register(WebhookEventType.CONTACT_FORM, schema=ContactFormData, timeout=10)
+async def handle_contact_form(data: Dict[str, Any], db: AsyncSession, commit: bool) -> Dict[str, Any]:
+    """
+    Processa uma submissão de formulário de contato.
+    
+    Args:
+        data: Dados validados (ContactFormData)
+        db: Sessão do banco de dados
+        commit: Se deve confirmar a transação
         
-        # Exemplo: salvar no banco de dados
-        if event_type == WebhookEventType.SOCIAL_MEDIA_UPDATE.value:
-            social_media = SocialMedia(**data)
-            db.add(social_media)
-            db.commit()
-            
-    except Exception as e:
-        logger.error(f"Erro no processamento assíncrono: {str(e)}")
-        db.rollback()
+    Returns:
+        Email do contato e ação realizada
+    """
+    logger.info("Formulário de contato recebido: %s", data.get("email"))
+    # Aqui implementaríamos lógica para salvar contato ou enviar email
+    return {"contact_email": data.get("email"), "action": "processed"}
 
-@router.post("/", response_model=WebhookResponse)
+@event_registry.register(WebhookEventType.PORTFOLIO_UPDATE, schema=PortfolioUpdateData, max_concurrency=2, timeout=60)
+async def handle_portfolio_update(data: Dict[str, Any], db: AsyncSession, commit: bool) -> Dict[str, Any]:
+    """
+    Processa uma atualização de portfólio.
+    
+    Pode envolver operações lentas, por isso tem poucas vagas e tempo
+    limite maior; as vagas dos demais tipos não são afetadas.
+    
+    Args:
+        data: Dados validados (PortfolioUpdateData)
+        db: Sessão do banco de dados
+        commit: Se deve confirmar a transação
+        
+    Returns:
+        Título do item e ação realizada
+    """
+    logger.info("Atualização de portfólio recebida: %s", data.get("title"))
+    # Aqui implementaríamos lógica para atualizar portfólio
+    return {"portfolio_item": data.get("title"), "action": "updated"}
+
+@event_registry.register_fallback(max_concurrency=4, timeout=10)
+async def handle_unregistered_event(data: Dict[str, Any], db: AsyncSession, commit: bool) -> Dict[str, Any]:
+    """
+    Registra eventos de tipos sem handler próprio.
+    
+    Args:
+        data: Dados do evento
+        db: Sessão do banco de dados
+        commit: Se deve confirmar a transação
+        
+    Returns:
+        Ação realizada
+    """
+    logger.warning("Tipo de evento não implementado (%d campos)", len(data))
+    return {"action": "logged"}
+
+async def process_queued_event(event_type: str, data: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+    """
+    Processa um evento da fila durável (services/webhook_queue.py).
+    
+    Args:
+        event_type: Tipo do evento
+        data: Dados do evento
+        db: Sessão do banco de dados aberta pelo worker
+        
+    Returns:
+        Resultado do processamento
+    """
+    return await WebhookProcessor().process_event(event_type, data, db)
+
+# Os workers da fila processam os eventos com o mesmo WebhookProcessor e
+# só reservam eventos de tipos com vagas livres no registro de handlers
+webhook_workers.set_handler(process_queued_event, capacity=event_registry.available)
+
+async def replay_dead_letter(letter: WebhookDeadLetter, db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """
+    Reprocessa um evento do dead-letter (services/dead_letters.py).
+    
+    Eventos de webhooks síncronos guardam a chave de idempotência da
+    entrega original: se o remetente já reenviou o evento com sucesso,
+    ele não é processado de novo; se o reprocessamento for bem-sucedido,
+    reenvios posteriores recebem a resposta gravada.
+    
+    Args:
+        letter: Evento do dead-letter
+        db: Sessão do banco de dados aberta pelo reprocessador
+        
+    Returns:
+        Resultado do processamento, ou None se o evento já tiver sido
+        processado por um reenvio
+        
+    Raises:
+        BaseAPIError: Se a entrega original estiver em processamento (409)
+            ou o processamento falhar
+    """
+    key = letter.idempotency_key
+    if key:
+        replay = await idempotency_store.reserve(db, key)
+        if replay is IN_PROGRESS:
+            raise BaseAPIError(
+                message="Entrega de webhook já está em processamento",
+                status_code=409,
+                details={"event_id": letter.event_id}
+            )
+        if replay is not None:
+            return None
+    try:
+        result = await WebhookProcessor().process_event(letter.event_type, letter.payload, db)
+    except Exception:
+        if key:
+            await idempotency_store.release(db, key)
+        raise
+    if key:
+        await idempotency_store.complete(db, key, jsonable_encoder(WebhookResponse(
+            status="success",
+            message="Webhook processado com sucesso",
+            event_id=letter.event_id,
+            processed_at=datetime.now()
+        )))
+    return result
+
+dead_letter_replayer.set_handler(replay_dead_letter)
+
+@router.post("/", response_model=WebhookResponse, openapi_extra=_json_body_schema(PAYLOAD_ADAPTER))
 async def handle_webhook(
     request: Request,
-    payload: WebhookPayload,
-    background_tasks: BackgroundTasks,
-    x_hub_signature: Optional[str] = Header(None),
+    body: bytes = Depends(verified_body),
     process_async: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Manipula webhooks recebidos.
@@ -219,11 +539,21 @@ async def handle_webhook(
     verifica sua autenticidade e processa os dados conforme
     o tipo de evento.
     
+    Com process_async=true o evento é gravado na fila durável e
+    confirmado imediatamente (status "pending"); o estado pode ser
+    consultado em GET /events/{event_id}.
+    
+    Reenvios da mesma entrega (mesmo Idempotency-Key/X-Webhook-Delivery
+    ou, sem eles, mesmo corpo) recebem a resposta original com o
+    cabeçalho X-Idempotent-Replay, sem novo processamento. Eventos cujo
+    processamento síncrono falha são gravados no dead-letter.
+    
+    O corpo (WebhookPayload) é lido como bytes e a assinatura é
+    verificada antes do parse do JSON, que acontece uma única vez.
+    
     Args:
         request: Objeto de requisição FastAPI
-        payload: Dados do webhook
-        background_tasks: Gerenciador de tarefas em background
-        x_hub_signature: Assinatura para verificação
+        body: Corpo bruto com a assinatura (X-Hub-Signature) já verificada
         process_async: Se deve processar de forma assíncrona
         db: Sessão do banco de dados
         
@@ -231,62 +561,73 @@ async def handle_webhook(
         Resposta indicando o resultado do processamento
         
     Raises:
-        BaseAPIError: Se ocorrer algum erro no processamento
+        BaseAPIError: Se a assinatura for inválida ou ocorrer algum erro
+            no processamento
+        RequestValidationError: Se o corpo não for um WebhookPayload válido
     """
+    # A assinatura já foi verificada (verified_body); o JSON é lido uma vez
+    payload = parse_body(PAYLOAD_ADAPTER, body)
+    
     try:
         # Registra recebimento do webhook
-        logger.info(f"Webhook recebido: {payload.event_type}")
-        
-        # Verifica assinatura
-        body = await request.body()
-        if not verify_webhook(x_hub_signature, body):
+        logger.info("Webhook recebido: %s", payload.event_type)
+
+        # ID do evento: ID de entrega do remetente ou hash do corpo
+        key, event_id = delivery_key(request, body, "webhook")
+        replay = await idempotency_store.reserve(db, key)
+        if replay is IN_PROGRESS:
             raise BaseAPIError(
-                message="Assinatura de webhook inválida",
-                status_code=401
+                message="Entrega de webhook já está em processamento",
+                status_code=409,
+                details={"event_id": event_id}
             )
+        if replay is not None:
+            return CodecJSONResponse(content=replay, headers={"X-Idempotent-Replay": "true"})
 
-        # Processa dados
         processor = WebhookProcessor()
-        processed = processor.process(payload.dict())
-        
-        # Gera ID do evento
-        event_id = processed.get("event_id", hashlib.sha256(body).hexdigest())
+        try:
+            # Decide entre processamento síncrono ou assíncrono
+            if process_async:
+                # Grava na fila durável; os workers processam o evento
+                await enqueue_event(db, event_id, payload.event_type, payload.data)
+                response = WebhookResponse(
+                    status="pending",
+                    message="Webhook agendado para processamento",
+                    event_id=event_id,
+                    processed_at=datetime.now()
+                )
+            else:
+                # Processamento síncrono
+                result = await processor.process_event(
+                    payload.event_type,
+                    payload.data,
+                    db
+                )
+                
+                response = WebhookResponse(
+                    status="success",
+                    message="Webhook processado com sucesso",
+                    event_id=event_id,
+                    processed_at=datetime.now()
+                )
+        except Exception as e:
+            # Permite que o remetente reenvie após a falha
+            await idempotency_store.release(db, key)
+            if not process_async:
+                await record_dead_letters([dead_letter_entry(
+                    event_id, SOURCE_WEBHOOK, payload.event_type, payload.data, e, idempotency_key=key
+                )])
+            raise
 
-        # Decide entre processamento síncrono ou assíncrono
-        if process_async:
-            # Agenda processamento em background
-            background_tasks.add_task(
-                process_webhook_async,
-                payload.dict(),
-                db
-            )
-            return WebhookResponse(
-                status="pending",
-                message="Webhook agendado para processamento",
-                event_id=event_id,
-                processed_at=datetime.now()
-            )
-        else:
-            # Processamento síncrono
-            result = await processor.process_event(
-                payload.event_type,
-                payload.data,
-                db
-            )
-            
-            return WebhookResponse(
-                status="success",
-                message="Webhook processado com sucesso",
-                event_id=event_id,
-                processed_at=datetime.now()
-            )
+        await idempotency_store.complete(db, key, jsonable_encoder(response))
+        return response
 
-    except ValidationError as e:
-        # Erro de validação específico
+    except BaseAPIError as e:
+        # Erros da API (validação, assinatura, conflito) mantêm o status
         raise e
     except Exception as e:
         # Registra erro detalhado
-        logger.error(f"Falha no processamento de webhook: {str(e)}", exc_info=True)
+        logger.error("Falha no processamento de webhook: %s", e, exc_info=True)
         
         raise BaseAPIError(
             message="Falha no processamento do webhook",
@@ -294,116 +635,534 @@ async def handle_webhook(
             details={"error": str(e)}
         )
 
-@router.post("/batch", response_model=WebhookBatchResponse)
+@router.post("/batch", response_model=WebhookBatchResponse, openapi_extra=_json_body_schema(BATCH_ADAPTER))
 async def handle_webhook_batch(
     request: Request,
-    payloads: List[WebhookPayload],
-    x_hub_signature: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    body: bytes = Depends(verified_body),
+    bulk: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Processa múltiplos webhooks em uma única requisição.
     
     Útil para sistemas que precisam enviar vários eventos de uma vez.
+    Com bulk=true os eventos são validados antes de qualquer escrita e
+    as atualizações de mídia social são gravadas com um único upsert
+    em uma transação (WebhookProcessor.process_batch). Itens com erro
+    são gravados no dead-letter.
+    
+    O corpo (lista de WebhookPayload) só é validado depois que a
+    assinatura confere.
     
     Args:
         request: Objeto de requisição FastAPI
-        payloads: Lista de payloads de webhook
-        x_hub_signature: Assinatura para verificação
+        body: Corpo bruto com a assinatura (X-Hub-Signature) já verificada
+        bulk: Se deve usar o modo em lote (upsert único)
         db: Sessão do banco de dados
         
     Returns:
         Resumo do processamento em lote
     """
+    payloads = parse_body(BATCH_ADAPTER, body)
+    
     try:
-        # Verifica assinatura
-        body = await request.body()
-        if not verify_webhook(x_hub_signature, body):
+        # Reenvios do mesmo lote recebem a resposta original
+        key, batch_id = delivery_key(request, body, "batch")
+        replay = await idempotency_store.reserve(db, key)
+        if replay is IN_PROGRESS:
             raise BaseAPIError(
-                message="Assinatura de webhook inválida",
-                status_code=401
+                message="Lote de webhooks já está em processamento",
+                status_code=409,
+                details={"event_id": batch_id}
             )
-            
-        # Processa cada webhook
-        processor = WebhookProcessor()
-        results = []
-        successful = 0
-        failed = 0
+        if replay is not None:
+            return CodecJSONResponse(content=replay, headers={"X-Idempotent-Replay": "true"})
         
-        for payload in payloads:
-            try:
-                processed = processor.process(payload.dict())
-                await processor.process_event(
-                    payload.event_type,
-                    payload.data,
-                    db
-                )
-                
-                results.append(WebhookResponse(
-                    status="success",
-                    message="Processado com sucesso",
-                    event_id=processed.get("event_id", str(uuid.uuid4())),
-                    processed_at=datetime.now()
-                ))
-                successful += 1
-                
-            except Exception as e:
-                results.append(WebhookResponse(
-                    status="error",
-                    message=f"Falha: {str(e)}",
-                    event_id=str(uuid.uuid4()),
-                    processed_at=datetime.now()
-                ))
-                failed += 1
-                
+        try:
+            response = await _process_batch(payloads, batch_id, bulk, db)
+        except Exception:
+            await idempotency_store.release(db, key)
+            raise
+        
+        await idempotency_store.complete(db, key, jsonable_encoder(response))
+        return response
+    
+    except BaseAPIError as e:
+        raise e
+    except Exception as e:
+        raise BaseAPIError(
+            message="Falha no processamento em lote",
+            status_code=500,
+            details={"error": str(e)}
+        )
+
+async def _process_batch(
+    payloads: List[WebhookPayload],
+    batch_id: str,
+    bulk: bool,
+    db: AsyncSession
+) -> WebhookBatchResponse:
+    """
+    Processa os eventos de um lote.
+    
+    O ID de cada evento é derivado do ID do lote e da posição do item,
+    de forma que reenvios do lote produzem os mesmos IDs.
+    
+    Args:
+        payloads: Eventos do lote
+        batch_id: ID do lote (ID de entrega ou hash do corpo)
+        bulk: Se deve usar o modo em lote (upsert único)
+        db: Sessão do banco de dados
+        
+    Returns:
+        Resumo do processamento em lote
+    """
+    processor = WebhookProcessor()
+    results = []
+    successful = 0
+    failed = 0
+    
+    if bulk and supports_upsert(db):
+        outcomes = await processor.process_batch(payloads, db)
+        for index, outcome in enumerate(outcomes):
+            results.append(WebhookResponse(
+                status=outcome["status"],
+                message=outcome["message"],
+                event_id=f"{batch_id}-{index}",
+                processed_at=datetime.now()
+            ))
+        successful = sum(1 for outcome in outcomes if outcome["status"] == "success")
+        failed = len(outcomes) - successful
+        await record_dead_letters([
+            dead_letter_entry(f"{batch_id}-{index}", SOURCE_BATCH, payloads[index].event_type, payloads[index].data,
+                              outcome["error"])
+            for index, outcome in enumerate(outcomes) if outcome["status"] != "success"
+        ])
         return WebhookBatchResponse(
             total_processed=len(payloads),
             successful=successful,
             failed=failed,
             results=results
         )
+    
+    dead_letters = []
+    for index, payload in enumerate(payloads):
+        try:
+            await processor.process_event(
+                payload.event_type,
+                payload.data,
+                db
+            )
             
-    except Exception as e:
+            results.append(WebhookResponse(
+                status="success",
+                message="Processado com sucesso",
+                event_id=f"{batch_id}-{index}",
+                processed_at=datetime.now()
+            ))
+            successful += 1
+            
+        except Exception as e:
+            await db.rollback()
+            results.append(WebhookResponse(
+                status="error",
+                message=f"Falha: {str(e)}",
+                event_id=f"{batch_id}-{index}",
+                processed_at=datetime.now()
+            ))
+            dead_letters.append(dead_letter_entry(
+                f"{batch_id}-{index}", SOURCE_BATCH, payload.event_type, payload.data, e
+            ))
+            failed += 1
+    await record_dead_letters(dead_letters)
+            
+    return WebhookBatchResponse(
+        total_processed=len(payloads),
+        successful=successful,
+        failed=failed,
+        results=results
+    )
+
+@router.post("/batch/stream")
+async def handle_webhook_batch_stream(
+    request: Request,
+    x_hub_signature: Optional[str] = Header(None)
+):
+    """
+    Processa um lote de webhooks em NDJSON (um evento JSON por linha).
+    
+    O corpo é primeiro gravado em um arquivo temporário (em memória até
+    WEBHOOK_STREAM_SPOOL_MEMORY_BYTES, depois em disco, limitado a
+    WEBHOOK_STREAM_MAX_BYTES) enquanto o HMAC é calculado sobre os
+    pedaços recebidos. Nada é interpretado nem gravado no banco antes
+    de a assinatura conferir, e nenhuma sessão fica aberta durante o
+    envio do corpo.
+    
+    Depois da verificação, cada linha é validada e os eventos são
+    gravados em blocos de WEBHOOK_STREAM_CHUNK_SIZE. A resposta também é
+    NDJSON: uma linha por evento (com "index") à medida que os blocos
+    são processados e uma linha final com "summary". Todo o lote é
+    gravado em uma única transação, confirmada depois do último bloco;
+    até a linha de resumo os resultados por evento são provisórios (ver
+    summary.committed). A transação é desfeita se passar de
+    WEBHOOK_STREAM_MAX_SECONDS, para que o feed de mudanças (que espera
+    CHANGES_SETTLE_SECONDS) não pule os registros do lote. O uso de
+    memória não depende do tamanho do lote.
+    Reenvios não são deduplicados neste modo.
+    
+    Args:
+        request: Objeto de requisição FastAPI
+        x_hub_signature: Assinatura do corpo completo para verificação
+        
+    Returns:
+        Resposta NDJSON com o resultado de cada evento e o resumo
+        
+    Raises:
+        BaseAPIError: Se o Content-Type não for NDJSON (415), a assinatura
+            for inválida (401) ou o corpo exceder WEBHOOK_STREAM_MAX_BYTES (413)
+        ValidationError: Se uma linha exceder WEBHOOK_STREAM_MAX_LINE_BYTES
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type != NDJSON_MEDIA_TYPE:
         raise BaseAPIError(
-            message="Falha no processamento em lote",
-            status_code=500,
-            details={"error": str(e)}
+            message=f"Content-Type deve ser {NDJSON_MEDIA_TYPE}",
+            status_code=415,
+            details={"content_type": content_type}
+        )
+    if VERIFY_SIGNATURES and normalize_signature(x_hub_signature) is None:
+        reject("malformed" if x_hub_signature else "missing")
+        raise BaseAPIError(
+            message="Assinatura de webhook inválida",
+            status_code=401,
+            log_error=False
+        )
+    
+    verifier = SignatureVerifier() if VERIFY_SIGNATURES else None
+    spool = await _spool_body(request, verifier)
+    if verifier is not None and not verifier.verify(x_hub_signature):
+        spool.close()
+        raise BaseAPIError(
+            message="Assinatura de webhook inválida",
+            status_code=401,
+            log_error=False
+        )
+    
+    stream_id = next(
+        (request.headers[header] for header in ("idempotency-key", "x-webhook-delivery") if request.headers.get(header)),
+        uuid.uuid4().hex
+    )
+    return StreamingResponse(
+        _stream_batch(spool, stream_id[:64]),
+        media_type=NDJSON_MEDIA_TYPE,
+        background=BackgroundTask(spool.close)
+    )
+
+def _ndjson(data: Dict[str, Any]) -> bytes:
+    """Serializa um objeto como uma linha NDJSON."""
+    return json_codec.dumps(jsonable_encoder(data)) + b"\n"
+
+async def _spool_body(request: Request, verifier: Optional[SignatureVerifier]) -> IO[bytes]:
+    """
+    Grava o corpo da requisição em um arquivo temporário à medida que chega.
+    
+    Args:
+        request: Objeto de requisição FastAPI
+        verifier: Verificador atualizado com cada pedaço do corpo (None sem verificação)
+        
+    Returns:
+        Arquivo com o corpo completo, posicionado no início
+        
+    Raises:
+        BaseAPIError: Se o corpo exceder WEBHOOK_STREAM_MAX_BYTES (413)
+        ValidationError: Se uma linha exceder WEBHOOK_STREAM_MAX_LINE_BYTES
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=WEBHOOK_STREAM_SPOOL_MEMORY_BYTES)
+    size = line_size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > WEBHOOK_STREAM_MAX_BYTES:
+                raise BaseAPIError(
+                    message="Lote NDJSON excede o tamanho máximo",
+                    status_code=413,
+                    details={"max_bytes": WEBHOOK_STREAM_MAX_BYTES}
+                )
+            # A primeira parte do pedaço continua a linha anterior
+            first, *rest = chunk.split(b"\n")
+            line_size += len(first)
+            longest = max(line_size, *map(len, rest)) if rest else line_size
+            if rest:
+                line_size = len(rest[-1])
+            if longest > WEBHOOK_STREAM_MAX_LINE_BYTES:
+                raise ValidationError(
+                    message="Linha NDJSON excede o tamanho máximo",
+                    details={"max_line_bytes": WEBHOOK_STREAM_MAX_LINE_BYTES}
+                )
+            if verifier is not None:
+                verifier.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+def _iter_lines(spool: IO[bytes]) -> Iterator[bytes]:
+    """
+    Percorre as linhas do corpo já verificado.
+    
+    Args:
+        spool: Arquivo com o corpo (ver _spool_body)
+        
+    Yields:
+        Linhas não vazias, sem o separador
+    """
+    for line in spool:
+        line = line.rstrip(b"\n")
+        if line.strip():
+            yield line
+
+async def _process_stream_chunk(
+    processor: WebhookProcessor,
+    payloads: List[WebhookPayload],
+    db: AsyncSession
+) -> List[Dict[str, Any]]:
+    """
+    Grava um bloco de eventos do lote NDJSON sem confirmar a transação.
+    
+    Cada evento (ou o upsert das mídias sociais, com suporte a upsert)
+    roda em um SAVEPOINT para que a falha de um não invalide a transação
+    do lote.
+    
+    Args:
+        processor: Processador de webhooks
+        payloads: Eventos do bloco
+        db: Sessão do banco de dados do lote
+        
+    Returns:
+        Resultado de cada evento, no formato de process_batch
+    """
+    if supports_upsert(db):
+        return await processor.process_batch(payloads, db, commit=False)
+    outcomes = []
+    for payload in payloads:
+        try:
+            result = await processor.process_event(payload.event_type, payload.data, db, commit=False)
+            outcomes.append({"status": "success", "message": "Processado com sucesso", "result": result})
+        except Exception as e:
+            outcomes.append({"status": "error", "message": f"Falha: {str(e)}", "result": None})
+    return outcomes
+
+def _stream_timeout() -> BaseAPIError:
+    """Erro do lote NDJSON que excedeu WEBHOOK_STREAM_MAX_SECONDS."""
+    return BaseAPIError(
+        message="Lote NDJSON excedeu a duração máxima",
+        status_code=504,
+        details={"max_seconds": WEBHOOK_STREAM_MAX_SECONDS}
+    )
+
+async def _stream_batch(spool: IO[bytes], stream_id: str) -> AsyncIterator[bytes]:
+    """
+    Gera a resposta NDJSON do modo streaming a partir do corpo verificado.
+    
+    Usa uma sessão própria: dependências com yield são encerradas antes
+    de o corpo da resposta ser gerado.
+    
+    Args:
+        spool: Arquivo com o corpo, cuja assinatura já foi verificada
+        stream_id: Prefixo dos IDs dos eventos
+        
+    Yields:
+        Linhas NDJSON com os resultados e o resumo
+    """
+    processor = WebhookProcessor()
+    total = successful = 0
+    committed = False
+    error = None
+    
+    async with AsyncSessionLocal() as db:
+        chunk: List[Any] = []
+        
+        deadline = time.monotonic() + WEBHOOK_STREAM_MAX_SECONDS
+        
+        def remaining() -> float:
+            # O tempo de envio das linhas ao cliente também conta
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise _stream_timeout()
+            return left
+        
+        async def flush_chunk() -> List[bytes]:
+            nonlocal successful
+            valid = [(index, item) for index, item in chunk if isinstance(item, WebhookPayload)]
+            try:
+                outcomes = dict(zip(
+                    (index for index, _ in valid),
+                    await asyncio.wait_for(
+                        _process_stream_chunk(processor, [item for _, item in valid], db), remaining()
+                    )
+                )) if valid else {}
+            except asyncio.TimeoutError:
+                raise _stream_timeout()
+            lines = []
+            for index, item in chunk:
+                outcome = outcomes.get(index) or item
+                successful += outcome["status"] == "success"
+                lines.append(_ndjson({
+                    "index": index,
+                    "status": outcome["status"],
+                    "message": outcome["message"],
+                    "event_id": f"{stream_id}-{index}",
+                    "processed_at": datetime.now()
+                }))
+            chunk.clear()
+            # Objetos já gravados não precisam ficar no identity map
+            db.expunge_all()
+            return lines
+        
+        try:
+            for line in _iter_lines(spool):
+                try:
+                    item: Any = WebhookPayload.model_validate_json(line)
+                except PydanticValidationError as e:
+                    item = {"status": "error", "message": f"Falha: evento inválido ({e.error_count()} erro(s))"}
+                chunk.append((total, item))
+                total += 1
+                if len(chunk) >= WEBHOOK_STREAM_CHUNK_SIZE:
+                    for output in await flush_chunk():
+                        yield output
+            if chunk:
+                for output in await flush_chunk():
+                    yield output
+            
+            remaining()
+            await db.commit()
+            social_media_cache.invalidate()
+            outbound_dispatcher.notify()
+            committed = True
+        except BaseAPIError as e:
+            error = e.message
+        except Exception as e:
+            logger.error("Falha no processamento de lote NDJSON: %s", e, exc_info=True)
+            error = str(e)
+        finally:
+            if not committed:
+                await db.rollback()
+            spool.close()
+    
+    yield _ndjson({"summary": {
+        "total_processed": total,
+        "successful": successful if committed else 0,
+        "failed": total - successful if committed else total,
+        "committed": committed,
+        "signature_valid": True if VERIFY_SIGNATURES else None,
+        "error": error
+    }})
+
+@router.get("/events/{event_id}", response_model=WebhookEventStatus)
+async def get_webhook_event(
+    event_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Consulta o estado de um evento recebido com process_async=true.
+    
+    Args:
+        event_id: Identificador retornado no recebimento
+        db: Sessão do banco de dados
+        
+    Returns:
+        Estado, tentativas e resultado do processamento
+        
+    Raises:
+        NotFoundError: Se o evento não existir
+    """
+    event = await get_event(db, event_id)
+    if event is None:
+        raise NotFoundError(
+            message=f"Evento de webhook {event_id} não encontrado",
+            details={"event_id": event_id}
         )
+    return event
 
 @router.get("/data", response_model=List[Dict[str, Any]])
-async def get_webhook_data(db: Session = Depends(get_db)):
+async def get_webhook_data(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
     Obtém dados para consumidores de webhook.
     
     Retorna dados que podem ser consumidos por sistemas externos
-    via webhook.
+    via webhook. A resposta inclui uma ETag derivada de max(updated_at)
+    e da contagem de registros; consumidores que enviam If-None-Match
+    recebem 304 enquanto os dados não mudarem. Para obter apenas o que
+    mudou, use GET /webhooks/changes; para receber as mudanças sem
+    consultar, registre um assinante em POST /webhooks/subscriptions/.
     
     Args:
+        request: Objeto de requisição FastAPI
+        response: Resposta, para o cabeçalho ETag
         db: Sessão do banco de dados
         
     Returns:
         Lista de dados formatados para webhook
     """
     try:
+        etag = make_etag("webhook_data", *(await table_version(db, SocialMedia)))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        
         processor = WebhookProcessor()
-        data = db.query(SocialMedia).all()
-        
-        # Converte objetos do modelo para dicionários e processa
-        results = []
-        for item in data:
-            # Converte para dict excluindo atributos SQLAlchemy
-            item_dict = {c.name: getattr(item, c.name) for c in item.__table__.columns}
-            results.append(processor.process({
-                "event_type": "social_media_data",
-                "data": item_dict
-            }))
-            
-        return results
+        result = await db.execute(select(SocialMedia))
+        data = result.scalars().all()
+        
+        # Converte objetos do modelo para dicionários (serializador compilado) e processa
+        return [
+            processor.process({"event_type": "social_media_data", "data": item_dict})
+            for item_dict in model_serializer.to_dicts(data)
+        ]
         
     except Exception as e:
-        logger.error(f"Erro ao buscar dados de webhook: {str(e)}", exc_info=True)
+        logger.error("Erro ao buscar dados de webhook: %s", e, exc_info=True)
         raise BaseAPIError(
             message="Falha ao buscar dados de webhook",
             status_code=500,
             details={"error": str(e)}
-        )
\ No newline at end of file
+        )
+
+@router.get("/changes", response_model=WebhookChangesResponse)
+async def get_webhook_changes(
+    since: Optional[str] = Query(
+        None,
+        description="Cursor next_since da consulta anterior; vazio para a sincronização completa"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de mudanças"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtém as mudanças em mídias sociais desde a consulta anterior.
+    
+    Retorna registros criados ou alterados (op "upsert") e removidos
+    (op "delete") em ordem, com o cursor next_since para a próxima
+    consulta. Com has_more=true, o consumidor pode consultar de novo
+    imediatamente; caso contrário, no próximo intervalo de polling.
+    
+    Lê do banco primário: em uma réplica atrasada, mudanças anteriores
+    ao cursor já entregue poderiam aparecer depois e seriam puladas.
+    
+    Args:
+        since: Cursor da consulta anterior
+        limit: Número máximo de mudanças
+        db: Sessão do banco de dados
+        
+    Returns:
+        Mudanças, próximo cursor e se há mais mudanças
+        
+    Raises:
+        ValidationError: Se o cursor for inválido
+        BaseAPIError: (410) Se o cursor tiver expirado
+    """
+    return await fetch_changes(db, since, limit)
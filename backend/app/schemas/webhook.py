@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from enum import Enum
+import math
 
 class WebhookEventType(str, Enum):
     """
@@ -19,6 +20,16 @@ class WebhookEventType(str, Enum):
     PORTFOLIO_UPDATE = "portfolio_update"
     SYSTEM_NOTIFICATION = "system_notification"
 
+def _has_non_finite(value: Any) -> bool:
+    """Verifica se dados JSON contêm floats NaN ou Infinity."""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
 class WebhookPayload(BaseModel):
     """
     Modelo para dados de entrada de webhook.
@@ -42,6 +53,28 @@ class WebhookPayload(BaseModel):
         description="Assinatura para verificação de autenticidade"
     )
     
+    @validator('data')
+    def validate_data(cls, v):
+        """
+        Recusa NaN e Infinity, que não são JSON válido.
+        
+        O parse aceita esses literais, mas os dados são gravados em
+        colunas JSON e repassados aos assinantes; recusá-los na entrada
+        evita que cheguem à serialização.
+        
+        Args:
+            v: Dados do evento
+            
+        Returns:
+            Dados validados
+            
+        Raises:
+            ValueError: Se algum número for NaN ou Infinity
+        """
+        if _has_non_finite(v):
+            raise ValueError("Os dados não podem conter NaN ou Infinity")
+        return v
+    
     @validator('event_type')
     def validate_event_type(cls, v):
         """
@@ -65,6 +98,38 @@ class WebhookPayload(BaseModel):
                 print(f"Aviso: Tipo de evento não padrão recebido: {v}")
             return v
 
+class SocialMediaUpdateData(BaseModel):
+    """
+    Modelo para os dados de um evento social_media_update.
+
+    Campos além de name, url e icon são recusados, como no processamento
+    em lote: id e datas não podem ser definidos pelo remetente.
+    """
+    name: str = Field(..., description="Nome da plataforma de mídia social")
+    url: str = Field(..., description="URL do perfil na mídia social")
+    icon: str = Field(..., description="Nome do ícone para exibição")
+
+    class Config:
+        extra = "forbid"
+
+class ContactFormData(BaseModel):
+    """
+    Modelo para os dados de um evento contact_form.
+    """
+    email: Optional[str] = Field(None, description="Email de quem enviou o formulário")
+
+    class Config:
+        extra = "allow"
+
+class PortfolioUpdateData(BaseModel):
+    """
+    Modelo para os dados de um evento portfolio_update.
+    """
+    title: Optional[str] = Field(None, description="Título do item de portfólio")
+
+    class Config:
+        extra = "allow"
+
 class WebhookResponse(BaseModel):
     """
     Modelo para respostas de webhook.
@@ -107,6 +172,48 @@ class WebhookResponse(BaseModel):
             raise ValueError(f"Status deve ser um dos seguintes: {', '.join(valid_statuses)}")
         return v
 
+class WebhookEventStatus(BaseModel):
+    """
+    Modelo para o estado de um evento de webhook enfileirado.
+    
+    Retornado pela consulta de eventos recebidos com process_async=true.
+    """
+    event_id: str = Field(
+        ...,
+        description="Identificador do evento"
+    )
+    event_type: str = Field(
+        ...,
+        description="Tipo do evento"
+    )
+    status: str = Field(
+        ...,
+        description="Estado do processamento (pending/processing/done/failed)"
+    )
+    attempts: int = Field(
+        ...,
+        description="Número de tentativas de processamento"
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Resultado do processamento, quando concluído"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Último erro de processamento"
+    )
+    created_at: datetime = Field(
+        ...,
+        description="Momento em que o evento foi recebido"
+    )
+    processed_at: Optional[datetime] = Field(
+        None,
+        description="Momento em que o processamento terminou"
+    )
+    
+    class Config:
+        from_attributes = True
+
 class WebhookBatchResponse(BaseModel):
     """
     Modelo para respostas de processamento em lote de webhooks.
@@ -128,4 +235,226 @@ class WebhookBatchResponse(BaseModel):
     results: List[WebhookResponse] = Field(
         ...,
         description="Lista de resultados individuais"
-    )
\ No newline at end of file
+    )
+
+class WebhookSubscriptionCreate(BaseModel):
+    """
+    Modelo para registro de um assinante de webhooks.
+    
+    O assinante passa a receber por push os eventos de mudança em vez
+    de consultar GET /webhooks/data.
+    """
+    url: str = Field(
+        ...,
+        max_length=500,
+        description="URL (http/https) que recebe as entregas via POST"
+    )
+    event_types: Optional[List[str]] = Field(
+        None,
+        description="Tipos de evento assinados (ex: social_media.updated); vazio para todos"
+    )
+    secret: Optional[str] = Field(
+        None,
+        min_length=16,
+        max_length=200,
+        description="Segredo do HMAC das entregas; gerado se não informado"
+    )
+    max_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        le=100,
+        description="Entregas simultâneas para este assinante"
+    )
+    description: Optional[str] = Field(
+        None,
+        max_length=200,
+        description="Descrição do assinante"
+    )
+    
+    @validator('url')
+    def validate_url(cls, v):
+        """
+        Valida se a URL usa http ou https.
+        
+        Args:
+            v: URL informada
+            
+        Returns:
+            Valor validado
+            
+        Raises:
+            ValueError: Se o esquema não for http/https
+        """
+        if not v.startswith(("http://", "https://")):
+            raise ValueError("URL deve começar com http:// ou https://")
+        return v
+
+class WebhookSubscriptionSchema(BaseModel):
+    """
+    Modelo para resposta com os dados de um assinante.
+    
+    Não inclui o segredo, exibido apenas na criação.
+    """
+    id: int
+    url: str
+    event_types: Optional[List[str]] = None
+    max_concurrency: int
+    active: bool
+    description: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class WebhookSubscriptionCreated(WebhookSubscriptionSchema):
+    """
+    Modelo para resposta da criação de um assinante, com o segredo.
+    """
+    secret: str = Field(
+        ...,
+        description="Segredo do HMAC (X-Hub-Signature) das entregas"
+    )
+
+class WebhookOutboundDeliverySchema(BaseModel):
+    """
+    Modelo para uma entrada do registro de entregas de um assinante.
+    """
+    delivery_id: str
+    event_type: str
+    status: str = Field(
+        ...,
+        description="Estado da entrega (pending/delivering/delivered/failed)"
+    )
+    attempts: int
+    response_status: Optional[int] = None
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+    available_at: datetime
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class WebhookChange(BaseModel):
+    """
+    Modelo para uma mudança do feed de mudanças.
+    """
+    op: str = Field(
+        ...,
+        description="Tipo da mudança (upsert/delete)"
+    )
+    id: int = Field(
+        ...,
+        description="ID da mídia social"
+    )
+    changed_at: datetime = Field(
+        ...,
+        description="Momento da mudança (updated_at ou momento da remoção)"
+    )
+    data: Dict[str, Any] = Field(
+        ...,
+        description="Registro atual (upsert) ou ID e nome do registro removido (delete)"
+    )
+
+class WebhookChangesResponse(BaseModel):
+    """
+    Modelo para uma página do feed de mudanças.
+    """
+    changes: List[WebhookChange]
+    next_since: Optional[str] = Field(
+        None,
+        description="Cursor a enviar em since na próxima consulta"
+    )
+    has_more: bool = Field(
+        ...,
+        description="Se há mais mudanças disponíveis imediatamente"
+    )
+
+class WebhookDeadLetterSchema(BaseModel):
+    """
+    Modelo para um evento do dead-letter.
+    """
+    id: int
+    event_id: str
+    source: str = Field(
+        ...,
+        description="Origem da falha (queue/batch/webhook)"
+    )
+    event_type: str
+    payload: Dict[str, Any]
+    status: str = Field(
+        ...,
+        description="Estado do evento (dead/replaying/replayed/resolved)"
+    )
+    attempts: int
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    last_failed_at: datetime
+    replayed_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class WebhookReplayRequest(BaseModel):
+    """
+    Modelo para um pedido de reprocessamento do dead-letter.
+    
+    Sem filtros, reprocessa os eventos mais antigos no estado dead.
+    """
+    ids: Optional[List[int]] = Field(
+        None,
+        description="IDs dos eventos a reprocessar"
+    )
+    event_type: Optional[str] = Field(
+        None,
+        description="Reprocessa apenas eventos deste tipo"
+    )
+    source: Optional[str] = Field(
+        None,
+        description="Reprocessa apenas eventos desta origem (queue/batch/webhook)"
+    )
+    limit: int = Field(
+        1000,
+        ge=1,
+        le=10000,
+        description="Número máximo de eventos"
+    )
+    parallelism: int = Field(
+        4,
+        ge=1,
+        le=64,
+        description="Reprocessamentos simultâneos"
+    )
+    rate: float = Field(
+        0,
+        ge=0,
+        description="Reprocessamentos iniciados por segundo (0 sem limite)"
+    )
+    dry_run: bool = Field(
+        False,
+        description="Apenas conta os eventos selecionados"
+    )
+
+class WebhookReplayResponse(BaseModel):
+    """
+    Modelo para o resumo de um reprocessamento do dead-letter.
+    """
+    selected: int
+    replayed: int
+    resolved: int = Field(
+        ...,
+        description="Eventos já processados por um reenvio do remetente"
+    )
+    skipped: int = Field(
+        0,
+        description="Eventos reservados por outro reprocessamento em andamento"
+    )
+    failed: int
+    errors: List[Dict[str, Any]] = Field(
+        ...,
+        description="Primeiras falhas do reprocessamento"
+    )
+    duration_ms: float
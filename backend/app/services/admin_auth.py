@@ -0,0 +1,45 @@
+"""
+Autenticação das rotas administrativas.
+
+Rotas que alteram a configuração da API ou expõem dados de outros
+clientes (assinantes de webhooks, dead-letter) exigem o token
+administrativo no cabeçalho Authorization (Bearer). Sem
+WEBHOOK_ADMIN_TOKEN definido as rotas ficam indisponíveis: a ausência
+de configuração nunca as deixa abertas.
+"""
+from typing import Optional
+import hmac
+import logging
+import os
+
+from fastapi import Header
+
+from ..errors import AuthenticationError
+
+# Configuração de logging
+logger = logging.getLogger("api.admin_auth")
+
+# Token das rotas administrativas (vazio desativa as rotas)
+WEBHOOK_ADMIN_TOKEN = os.getenv("WEBHOOK_ADMIN_TOKEN", "")
+
+BEARER_PREFIX = "bearer "
+
+async def require_admin_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Dependência que exige o token administrativo.
+
+    Args:
+        authorization: Cabeçalho Authorization ("Bearer <token>")
+
+    Raises:
+        AuthenticationError: Se o token estiver ausente, for inválido ou
+            não houver token configurado
+    """
+    if not WEBHOOK_ADMIN_TOKEN:
+        logger.warning("Rota administrativa recusada: WEBHOOK_ADMIN_TOKEN não configurado")
+        raise AuthenticationError(message="Rotas administrativas desativadas")
+    if not authorization or not authorization.lower().startswith(BEARER_PREFIX):
+        raise AuthenticationError(message="Token administrativo ausente")
+    token = authorization[len(BEARER_PREFIX):].strip()
+    if not hmac.compare_digest(token.encode(), WEBHOOK_ADMIN_TOKEN.encode()):
+        raise AuthenticationError(message="Token administrativo inválido")
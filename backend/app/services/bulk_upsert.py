@@ -0,0 +1,81 @@
+"""
+Inserção/atualização em lote (upsert).
+
+Este módulo gera um único INSERT ... ON CONFLICT (...) DO UPDATE com
+várias linhas em VALUES, de forma que um lote inteiro é gravado em uma
+ida ao banco em vez de um SELECT e um commit por item. Suporta os
+dialetos com ON CONFLICT (PostgreSQL e SQLite).
+"""
+from typing import Any, Dict, List, Sequence
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Limite de parâmetros por comando (asyncpg aceita até 32767)
+DB_BULK_MAX_PARAMS = int(os.getenv("DB_BULK_MAX_PARAMS", "30000"))
+
+# Dialetos com suporte a INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = ("postgresql", "sqlite")
+
+def supports_upsert(db: AsyncSession) -> bool:
+    """
+    Verifica se o banco da sessão suporta upsert em lote.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+
+    Returns:
+        bool: True para PostgreSQL e SQLite
+    """
+    return db.bind.dialect.name in UPSERT_DIALECTS
+
+def _insert_for(dialect_name: str) -> Any:
+    """Obtém a construção insert() do dialeto, que possui on_conflict_do_update."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+async def upsert_rows(
+    db: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+    update_columns: Sequence[str],
+    returning: Sequence[str] = ("id",)
+) -> List[Any]:
+    """
+    Insere ou atualiza linhas com um comando por lote.
+
+    Não faz commit: o chamador controla a transação. As linhas não
+    passam pelos validadores do ORM, devem ser validadas antes, e
+    não podem repetir a chave de conflito (o PostgreSQL rejeita
+    atualizar a mesma linha duas vezes no mesmo comando).
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        model: Modelo SQLAlchemy da tabela
+        rows: Linhas a gravar, todas com as mesmas colunas
+        conflict_columns: Colunas da restrição única usada no ON CONFLICT
+        update_columns: Colunas atualizadas quando a linha já existe
+        returning: Colunas retornadas para cada linha gravada
+
+    Returns:
+        Linhas retornadas pelo banco (ordem não garantida)
+    """
+    if not rows:
+        return []
+    insert = _insert_for(db.bind.dialect.name)
+    table = model.__table__
+    chunk_size = max(1, DB_BULK_MAX_PARAMS // len(rows[0]))
+    returned = []
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(table).values(rows[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_={column: stmt.excluded[column] for column in update_columns}
+        ).returning(*(table.c[column] for column in returning))
+        result = await db.execute(stmt)
+        returned.extend(result.all())
+    return returned
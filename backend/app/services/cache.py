@@ -0,0 +1,162 @@
+"""
+Cache em memória para leituras frequentes.
+
+Este módulo fornece um cache com tempo de expiração (TTL), tamanho
+máximo e descarte LRU, usado na frente de consultas que mudam pouco,
+como as mídias sociais e os contatos exibidos no site. As rotas de
+escrita invalidam o cache correspondente após o commit.
+
+O cache é local ao processo: com vários workers, uma escrita invalida
+apenas o worker que a recebeu, e os demais convergem em até TTL segundos.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import logging
+import os
+import threading
+import time
+
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.cache")
+
+# Configuração padrão do cache
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+
+# Sentinela para diferenciar ausência de um valor None armazenado
+MISSING = object()
+
+class TTLCache:
+    """
+    Cache LRU com expiração por tempo.
+
+    Cada invalidação incrementa a geração do cache. Leitores capturam
+    a geração antes de consultar o banco e a informam em set(); se uma
+    escrita invalidou o cache nesse intervalo, o valor (possivelmente
+    antigo) é descartado em vez de armazenado. Valores lidos de uma
+    réplica informam também o atraso máximo dela (settle): logo após
+    uma invalidação a réplica pode ainda não ter a escrita, e o valor
+    não é armazenado.
+    """
+
+    def __init__(self, name: str, maxsize: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        """
+        Inicializa o cache.
+
+        Args:
+            name: Nome usado em métricas e diagnósticos
+            maxsize: Número máximo de entradas
+            ttl: Tempo de vida das entradas em segundos
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._invalidated_at = float("-inf")
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Obtém um valor do cache.
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Valor armazenado ou MISSING se ausente ou expirado
+        """
+        if not CACHE_ENABLED:
+            return MISSING
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    metrics.counter(f"cache.{self.name}.hits").inc()
+                    return value
+                del self._data[key]
+        metrics.counter(f"cache.{self.name}.misses").inc()
+        return MISSING
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: Optional[int] = None,
+        settle: float = 0.0
+    ) -> None:
+        """
+        Armazena um valor no cache.
+
+        Args:
+            key: Chave da entrada
+            value: Valor a ser armazenado
+            generation: Geração capturada antes de carregar o valor; se o
+                cache foi invalidado desde então, o valor é descartado
+            settle: Atraso máximo da origem do valor em segundos (ex:
+                réplica de leitura); o valor é descartado se a última
+                invalidação ocorreu há menos tempo que isso
+        """
+        if not CACHE_ENABLED:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if settle > 0 and time.monotonic() - self._invalidated_at < settle:
+                metrics.counter(f"cache.{self.name}.unsettled").inc()
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                metrics.counter(f"cache.{self.name}.evictions").inc()
+
+    def invalidate(self) -> None:
+        """Remove todas as entradas e avança a geração do cache."""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+            self._invalidated_at = time.monotonic()
+        metrics.counter(f"cache.{self.name}.invalidations").inc()
+        logger.debug("Cache %s invalidado", self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém estatísticas do cache.
+
+        Returns:
+            Dicionário com tamanho, configuração e contadores
+        """
+        hits = metrics.counter(f"cache.{self.name}.hits").value
+        misses = metrics.counter(f"cache.{self.name}.misses").value
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "generation": self.generation,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "evictions": metrics.counter(f"cache.{self.name}.evictions").value,
+        }
+
+# Caches da aplicação
+social_media_cache = TTLCache("social_media")
+nossocontato_cache = TTLCache("nossocontato")
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Obtém estatísticas de todos os caches da aplicação.
+
+    Returns:
+        Dicionário com as estatísticas de cada cache
+    """
+    return {
+        "enabled": CACHE_ENABLED,
+        "caches": {cache.name: cache.stats() for cache in (social_media_cache, nossocontato_cache)},
+    }
@@ -0,0 +1,189 @@
+"""
+Feed de mudanças de mídias sociais.
+
+Consumidores que mantêm uma cópia das mídias sociais consultam
+GET /webhooks/changes?since=<cursor> e recebem apenas o que mudou desde
+a consulta anterior: registros criados ou alterados (op "upsert", pela
+chave (updated_at, id), coberta por ix_social_media_updated_at_id) e
+registros removidos (op "delete", pelas lápides gravadas na remoção,
+tabela social_media_tombstone). O custo de cada consulta depende do
+número de mudanças, não do tamanho da tabela.
+
+As duas fontes são intercaladas na ordem total (momento, tipo, id), e
+o cursor guarda a posição nessa ordem. Só são retornadas mudanças com
+pelo menos CHANGES_SETTLE_SECONDS: updated_at é definido antes do
+commit, e uma transação mais lenta pode confirmar uma mudança com
+momento anterior ao da última mudança já lida. Por isso o intervalo
+precisa ser maior que a transação mais longa que grava mídias sociais:
+o lote NDJSON (limitado por WEBHOOK_STREAM_MAX_SECONDS) e os handlers
+de eventos (WEBHOOK_HANDLER_TIMEOUT). O feed é lido do primário; se a
+sessão for de uma réplica, o atraso máximo da réplica é somado ao
+intervalo. Quando o consumidor alcança o fim do feed, o cursor avança
+até esse horizonte, mesmo sem mudanças, para que cursores de
+consumidores em dia não expirem.
+
+Lápides mais antigas que CHANGES_TOMBSTONE_RETENTION_DAYS são removidas
+a cada nova remoção; cursores anteriores a esse horizonte recebem 410 e
+o consumidor deve refazer a sincronização completa (since vazio).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..errors import BaseAPIError, ValidationError
+from ..models.social_media import SocialMedia
+from ..models.social_media_tombstone import SocialMediaTombstone
+from .database import read_staleness
+from .pagination import coerce_cursor_value, decode_cursor_values, encode_cursor
+
+# Configuração de logging
+logger = logging.getLogger("api.changes_feed")
+
+# Configuração do feed; o intervalo cobre o lote NDJSON (60s) e os handlers (30s)
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", "90"))
+CHANGES_TOMBSTONE_RETENTION_DAYS = int(os.getenv("CHANGES_TOMBSTONE_RETENTION_DAYS", "30"))
+
+CHANGES_CURSOR_ORDER = "changes"
+
+# Tipos na ordem total do feed; CHECKPOINT marca que tudo até o momento foi lido
+KIND_UPSERT = 0
+KIND_DELETE = 1
+KIND_CHECKPOINT = 2
+
+def record_tombstone(db: AsyncSession, social_media: SocialMedia) -> None:
+    """
+    Grava a lápide de uma mídia social removida, sem confirmar a transação.
+
+    Deve ser chamada na mesma transação da remoção, para que a lápide
+    exista se e somente se a remoção for confirmada.
+
+    Args:
+        db: Sessão do banco de dados
+        social_media: Registro sendo removido
+    """
+    db.add(SocialMediaTombstone(
+        social_media_id=social_media.id,
+        name=social_media.name,
+        deleted_at=datetime.utcnow()
+    ))
+
+async def purge_tombstones(db: AsyncSession) -> None:
+    """
+    Remove lápides anteriores ao horizonte de retenção, sem confirmar a transação.
+
+    Args:
+        db: Sessão do banco de dados
+    """
+    cutoff = datetime.utcnow() - timedelta(days=CHANGES_TOMBSTONE_RETENTION_DAYS)
+    await db.execute(delete(SocialMediaTombstone).where(SocialMediaTombstone.deleted_at < cutoff))
+
+def decode_since(since: str) -> Tuple[datetime, int, int]:
+    """
+    Decodifica o cursor do feed.
+
+    Args:
+        since: Cursor recebido do consumidor
+
+    Returns:
+        Tupla (momento, tipo, id)
+
+    Raises:
+        ValidationError: Se o cursor for inválido
+        BaseAPIError: (410) Se o cursor for anterior à retenção das lápides
+    """
+    values = decode_cursor_values(since, CHANGES_CURSOR_ORDER, 3)
+    try:
+        changed_at, kind, key = (
+            coerce_cursor_value(value, python_type) for value, python_type in zip(values, (datetime, int, int))
+        )
+    except (TypeError, ValueError):
+        raise ValidationError(message="Cursor de paginação inválido", details={"cursor": since})
+    if kind not in (KIND_UPSERT, KIND_DELETE, KIND_CHECKPOINT):
+        raise ValidationError(message="Cursor de paginação inválido", details={"cursor": since})
+
+    if changed_at < datetime.utcnow() - timedelta(days=CHANGES_TOMBSTONE_RETENTION_DAYS):
+        raise BaseAPIError(
+            message="Cursor expirado; refaça a sincronização completa com since vazio",
+            status_code=410,
+            details={"retention_days": CHANGES_TOMBSTONE_RETENTION_DAYS},
+            log_error=False
+        )
+    return changed_at, kind, key
+
+async def fetch_changes(db: AsyncSession, since: Optional[str], limit: int) -> Dict[str, Any]:
+    """
+    Obtém uma página do feed de mudanças.
+
+    Sem since, retorna os registros atuais (sincronização completa, sem
+    remoções) e o cursor para continuar a partir deles.
+
+    Args:
+        db: Sessão do banco de dados
+        since: Cursor retornado pela consulta anterior
+        limit: Número máximo de mudanças
+
+    Returns:
+        Dicionário com changes, next_since e has_more
+
+    Raises:
+        ValidationError: Se o cursor for inválido
+        BaseAPIError: (410) Se o cursor tiver expirado
+    """
+    horizon = datetime.utcnow() - timedelta(seconds=CHANGES_SETTLE_SECONDS + read_staleness(db))
+    cursor = decode_since(since) if since else None
+
+    upserts = select(SocialMedia).where(SocialMedia.updated_at <= horizon)
+    tombstones = None
+    if cursor is not None:
+        changed_at, kind, key = cursor
+        if kind == KIND_UPSERT:
+            upserts = upserts.where(tuple_(SocialMedia.updated_at, SocialMedia.id) > tuple_(changed_at, key))
+        else:
+            upserts = upserts.where(SocialMedia.updated_at > changed_at)
+
+        tombstones = select(SocialMediaTombstone).where(SocialMediaTombstone.deleted_at <= horizon)
+        if kind == KIND_UPSERT:
+            tombstones = tombstones.where(SocialMediaTombstone.deleted_at >= changed_at)
+        elif kind == KIND_DELETE:
+            tombstones = tombstones.where(
+                tuple_(SocialMediaTombstone.deleted_at, SocialMediaTombstone.id) > tuple_(changed_at, key)
+            )
+        else:
+            tombstones = tombstones.where(SocialMediaTombstone.deleted_at > changed_at)
+
+    # Cada fonte contribui no máximo limit + 1 linhas, lidas em ordem pelo índice
+    entries: List[Tuple[Tuple[datetime, int, int], Dict[str, Any]]] = []
+    result = await db.execute(upserts.order_by(SocialMedia.updated_at, SocialMedia.id).limit(limit + 1))
+    for row in result.scalars():
+        entries.append(((row.updated_at, KIND_UPSERT, row.id), {
+            "op": "upsert", "id": row.id, "changed_at": row.updated_at, "data": row.to_dict()
+        }))
+    if tombstones is not None:
+        result = await db.execute(
+            tombstones.order_by(SocialMediaTombstone.deleted_at, SocialMediaTombstone.id).limit(limit + 1)
+        )
+        for row in result.scalars():
+            entries.append(((row.deleted_at, KIND_DELETE, row.id), {
+                "op": "delete", "id": row.social_media_id, "changed_at": row.deleted_at,
+                "data": {"id": row.social_media_id, "name": row.name}
+            }))
+    entries.sort(key=lambda entry: entry[0])
+
+    has_more = len(entries) > limit
+    page = entries[:limit]
+    if has_more:
+        next_key = page[-1][0]
+    else:
+        # Tudo até o horizonte foi lido; o cursor avança mesmo sem mudanças
+        checkpoint = max(horizon, cursor[0]) if cursor is not None else horizon
+        next_key = (checkpoint, KIND_CHECKPOINT, 0)
+
+    return {
+        "changes": [change for _, change in page],
+        "next_since": encode_cursor(CHANGES_CURSOR_ORDER, list(next_key)),
+        "has_more": has_more,
+    }
@@ -5,19 +5,26 @@ Este módulo fornece funcionalidades para conexão e interação
 com o banco de dados, incluindo configuração, validação e
 gerenciamento de sessões.
 """
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 from dotenv import load_dotenv
+import asyncio
+import itertools
 import os
 import logging
 import time
-from typing import Generator, Dict, Any
+from typing import AsyncGenerator, Generator, Dict, Any, List, Optional
 
 from ..errors import BaseAPIError, DatabaseError
-from ..helpers import DataProcessor, StringProcessor
+from ..helpers import DataProcessor, string_processor
+from .metrics import metrics
+from .query_stats import current_query_stats
+from .slow_queries import maybe_record_slow_query
 
 # Configuração de logging
 logger = logging.getLogger("api.database")
@@ -32,25 +39,118 @@ if not DATABASE_URL:
 DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
 DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+
+# Réplicas de leitura (lista separada por vírgulas, opcional)
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+DB_REPLICA_CHECK_TIMEOUT = float(os.getenv("DB_REPLICA_CHECK_TIMEOUT", "2"))
+DB_REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", "30"))
+
+# Drivers assíncronos usados para cada dialeto suportado
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+def build_async_database_url(url: str) -> URL:
+    """
+    Converte a URL síncrona do banco de dados para o driver assíncrono.
+    
+    Args:
+        url: URL de conexão síncrona (ex: postgresql://...)
+        
+    Returns:
+        URL com o driver assíncrono correspondente (ex: postgresql+asyncpg://...)
+        
+    Raises:
+        ValueError: Se o dialeto não possuir driver assíncrono conhecido
+    """
+    parsed = make_url(url)
+    dialect = parsed.get_backend_name()
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"Dialeto sem driver assíncrono suportado: {dialect}")
+    return parsed.set(drivername=ASYNC_DRIVERS[dialect])
+
+# URL assíncrona pode ser sobrescrita explicitamente
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or build_async_database_url(DATABASE_URL)
+
+class InstrumentedPoolMixin:
+    """
+    Mixin que mede o tempo de espera por conexões do pool.
+    
+    O SQLAlchemy não emite evento antes da retirada de uma conexão,
+    então a espera é medida em torno de _do_get. Registra também o
+    uso de overflow e os timeouts do pool.
+    """
+    telemetry_label = "sync"
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            metrics.counter(f"db.pool.{self.telemetry_label}.timeouts").inc()
+            logger.warning("Timeout ao obter conexão do pool (%s)", self.telemetry_label)
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        metrics.histogram(f"db.pool.{self.telemetry_label}.checkout_wait_ms").observe(wait_ms)
+        metrics.histogram(f"db.pool.{self.telemetry_label}.overflow_in_use").observe(max(0, self.overflow()))
+        record.info['pool_label'] = self.telemetry_label
+        return record
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """QueuePool com telemetria para o engine síncrono."""
+    telemetry_label = "sync"
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool com telemetria para o engine assíncrono."""
+    telemetry_label = "async"
 
 # Configuração do engine SQLAlchemy
 engine = create_engine(
     DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_size=DB_POOL_SIZE,
     max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=DB_POOL_TIMEOUT,
     pool_pre_ping=True,  # Verifica conexões antes de usá-las
     pool_recycle=3600,   # Recicla conexões após 1 hora
-    echo=os.getenv("SQL_ECHO", "false").lower() == "true"  # Log de SQL
+    echo=SQL_ECHO  # Log de SQL
+)
+
+# Engine assíncrono com as mesmas configurações de pool; o poolclass é
+# explícito porque alguns drivers (ex: aiosqlite) usam NullPool por padrão
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=SQL_ECHO
 )
 
 # Configuração da sessão
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessão assíncrona; expire_on_commit=False evita lazy loads implícitos
+# ao serializar objetos após o commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Classe base para modelos
 Base = declarative_base()
 
 # Eventos de conexão para monitoramento
+@event.listens_for(async_engine.sync_engine, "connect")
 @event.listens_for(engine, "connect")
 def receive_connect(dbapi_connection, connection_record):
     """
@@ -62,6 +162,39 @@ def receive_connect(dbapi_connection, connection_record):
     """
     logger.info("Conexão de banco de dados estabelecida")
 
+def receive_sqlite_connect(dbapi_connection, connection_record):
+    """
+    Desativa o controle de transações do driver sqlite3.
+    
+    O driver só abre a transação antes de INSERT/UPDATE/DELETE; um
+    SAVEPOINT emitido antes disso (ex: session.begin_nested()) abriria
+    a transação por conta própria e o RELEASE a confirmaria. Com o
+    driver em autocommit, o BEGIN é emitido por receive_sqlite_begin.
+    
+    Args:
+        dbapi_connection: Conexão DBAPI
+        connection_record: Registro da conexão
+    """
+    dbapi_connection.isolation_level = None
+
+def receive_sqlite_begin(conn):
+    """
+    Inicia explicitamente a transação no SQLite.
+    
+    O BEGIN vai direto ao driver para não ser contado nas estatísticas
+    de comandos da requisição.
+    
+    Args:
+        conn: Conexão SQLAlchemy
+    """
+    conn.connection.cursor().execute("BEGIN")
+
+for sqlite_engine in (engine, async_engine.sync_engine):
+    if sqlite_engine.dialect.name == "sqlite":
+        event.listen(sqlite_engine, "connect", receive_sqlite_connect)
+        event.listen(sqlite_engine, "begin", receive_sqlite_begin)
+
+@event.listens_for(async_engine.sync_engine, "checkout")
 @event.listens_for(engine, "checkout")
 def receive_checkout(dbapi_connection, connection_record, connection_proxy):
     """
@@ -73,8 +206,9 @@ def receive_checkout(dbapi_connection, connection_record, connection_proxy):
         connection_proxy: Proxy da conexão
     """
     logger.debug("Conexão retirada do pool")
-    connection_record.info['checkout_time'] = time.time()
+    connection_record.info['checkout_time'] = time.perf_counter()
 
+@event.listens_for(async_engine.sync_engine, "checkin")
 @event.listens_for(engine, "checkin")
 def receive_checkin(dbapi_connection, connection_record):
     """
@@ -87,8 +221,234 @@ def receive_checkin(dbapi_connection, connection_record):
     checkout_time = connection_record.info.get('checkout_time')
     if checkout_time is not None:
         connection_record.info['checkout_time'] = None
-        elapsed = time.time() - checkout_time
-        logger.debug(f"Conexão devolvida ao pool (tempo de uso: {elapsed:.2f}s)")
+        elapsed = time.perf_counter() - checkout_time
+        label = connection_record.info.get('pool_label', 'sync')
+        metrics.histogram(f"db.pool.{label}.hold_ms").observe(elapsed * 1000)
+        logger.debug("Conexão devolvida ao pool (tempo de uso: %.2fs)", elapsed)
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+@event.listens_for(engine, "before_cursor_execute")
+def receive_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Marca o início da execução de um comando SQL.
+    
+    Args:
+        conn: Conexão SQLAlchemy
+        cursor: Cursor DBAPI
+        statement: Texto SQL
+        parameters: Parâmetros do comando
+        context: Contexto de execução
+        executemany: Se o comando é executado em lote
+    """
+    conn.info['query_start_time'] = time.perf_counter()
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+@event.listens_for(engine, "after_cursor_execute")
+def receive_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Contabiliza o comando SQL nas estatísticas da requisição atual
+    e registra consultas lentas.
+    
+    Args:
+        conn: Conexão SQLAlchemy
+        cursor: Cursor DBAPI
+        statement: Texto SQL
+        parameters: Parâmetros do comando
+        context: Contexto de execução
+        executemany: Se o comando é executado em lote
+    """
+    start_time = conn.info.pop('query_start_time', None)
+    if start_time is None:
+        return
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    maybe_record_slow_query(conn, statement, parameters, executemany, elapsed_ms)
+
+class Replica:
+    """
+    Réplica de leitura com engine e estado de saúde próprios.
+    
+    O estado de saúde é atualizado por verificações periódicas de
+    conectividade e atraso de replicação feitas pelo ReplicaRouter.
+    """
+    
+    def __init__(self, name: str, url: str):
+        """
+        Cria o engine assíncrono da réplica.
+        
+        Args:
+            name: Nome da réplica usado em logs e métricas
+            url: URL de conexão síncrona da réplica
+        """
+        self.name = name
+        pool_class = type(
+            f"ReplicaQueuePool_{name}",
+            (InstrumentedAsyncQueuePool,),
+            {"telemetry_label": name}
+        )
+        self.engine = create_async_engine(
+            build_async_database_url(url),
+            poolclass=pool_class,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            echo=SQL_ECHO
+        )
+        for event_name, listener in (
+            ("connect", receive_connect),
+            ("checkout", receive_checkout),
+            ("checkin", receive_checkin),
+            ("before_cursor_execute", receive_before_cursor_execute),
+            ("after_cursor_execute", receive_after_cursor_execute),
+        ):
+            event.listen(self.engine.sync_engine, event_name, listener)
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte o estado da réplica para dicionário.
+        
+        Returns:
+            Dicionário com estado de saúde e atraso de replicação
+        """
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+        }
+
+class ReplicaRouter:
+    """
+    Distribui leituras entre réplicas saudáveis.
+    
+    As réplicas são escolhidas em rodízio. Uma réplica fora do ar
+    ou com atraso acima de DB_REPLICA_MAX_LAG_SECONDS é ignorada até
+    a próxima verificação; sem réplicas disponíveis, as leituras
+    voltam para o banco primário.
+    """
+    
+    def __init__(self, urls: List[str]):
+        """
+        Inicializa o roteador.
+        
+        Args:
+            urls: URLs de conexão das réplicas
+        """
+        self.replicas = [Replica(f"replica{index}", url) for index, url in enumerate(urls)]
+        self._rotation = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+    
+    async def choose(self) -> Optional[Replica]:
+        """
+        Escolhe a próxima réplica disponível.
+        
+        Returns:
+            Réplica disponível ou None se todas estiverem indisponíveis
+        """
+        if not self.replicas:
+            return None
+        start = next(self._rotation)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if await self._is_available(replica):
+                return replica
+        return None
+    
+    async def _is_available(self, replica: Replica) -> bool:
+        """
+        Verifica a disponibilidade de uma réplica, usando o último
+        resultado enquanto ele estiver dentro do intervalo de verificação.
+        
+        Args:
+            replica: Réplica a ser verificada
+            
+        Returns:
+            bool: True se a réplica pode receber leituras
+        """
+        now = time.monotonic()
+        if now < replica.down_until:
+            return False
+        if now - replica.checked_at < DB_REPLICA_CHECK_INTERVAL:
+            return replica.healthy
+        # Marca antes de aguardar para que requisições concorrentes
+        # reutilizem o estado atual em vez de repetir a verificação
+        replica.checked_at = now
+        await self.check(replica)
+        return replica.healthy
+    
+    async def check(self, replica: Replica) -> None:
+        """
+        Verifica conectividade e atraso de replicação de uma réplica.
+        
+        Args:
+            replica: Réplica a ser verificada
+        """
+        try:
+            lag = await asyncio.wait_for(self._replication_lag(replica), DB_REPLICA_CHECK_TIMEOUT)
+        except Exception as e:
+            replica.healthy = False
+            replica.last_error = str(e) or type(e).__name__
+            replica.down_until = time.monotonic() + DB_REPLICA_RETRY_AFTER
+            metrics.counter(f"db.replicas.{replica.name}.failures").inc()
+            logger.warning("Réplica %s indisponível: %s", replica.name, replica.last_error)
+            return
+        
+        replica.lag_seconds = lag
+        replica.last_error = None
+        replica.healthy = lag is None or lag <= DB_REPLICA_MAX_LAG_SECONDS
+        if not replica.healthy:
+            logger.warning("Réplica %s com atraso de %.1fs, usando primário", replica.name, lag)
+    
+    async def _replication_lag(self, replica: Replica) -> Optional[float]:
+        """
+        Consulta o atraso de replicação em segundos.
+        
+        Em PostgreSQL, o atraso é zero quando todo o WAL recebido já foi
+        aplicado (evita falsos positivos com o primário ocioso). Em outros
+        dialetos apenas a conectividade é verificada.
+        
+        Args:
+            replica: Réplica a ser consultada
+            
+        Returns:
+            Atraso em segundos ou None se não puder ser medido
+        """
+        async with replica.engine.connect() as conn:
+            if replica.engine.dialect.name != "postgresql":
+                await conn.execute(text("SELECT 1"))
+                return None
+            result = await conn.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            ))
+            lag = result.scalar()
+            return float(lag) if lag is not None else None
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Obtém o estado de todas as réplicas.
+        
+        Returns:
+            Lista com o estado de cada réplica
+        """
+        return [replica.to_dict() for replica in self.replicas]
+
+# Roteador de leituras (sem réplicas configuradas, todas as leituras vão ao primário)
+replica_router = ReplicaRouter(DB_REPLICA_URLS)
 
 class DatabaseValidator(DataProcessor):
     """
@@ -100,7 +460,7 @@ class DatabaseValidator(DataProcessor):
     
     def __init__(self):
         """Inicializa o validador com processador de strings."""
-        self.string_processor = StringProcessor()
+        self.string_processor = string_processor
     
     def process(self, data: str) -> str:
         """
@@ -161,7 +521,7 @@ def get_db() -> Generator[Session, None, None]:
         # Valida string de conexão
         validator = DatabaseValidator()
         if not validator.validate(DATABASE_URL):
-            logger.error(f"String de conexão inválida: {DATABASE_URL}")
+            logger.error("String de conexão inválida: %s", DATABASE_URL)
             raise ValueError("String de conexão com banco de dados inválida")
             
         # Obtém sessão do pool
@@ -177,33 +537,113 @@ def get_db() -> Generator[Session, None, None]:
             
     except SQLAlchemyError as e:
         # Erro específico de SQLAlchemy
-        logger.error(f"Erro SQLAlchemy: {str(e)}")
+        logger.error("Erro SQLAlchemy: %s", e)
         raise DatabaseError(
             message="Falha na conexão com o banco de dados",
             details={"error": str(e)}
         )
     except Exception as e:
         # Outros erros
-        logger.error(f"Erro ao obter sessão de banco de dados: {str(e)}", exc_info=True)
+        logger.error("Erro ao obter sessão de banco de dados: %s", e, exc_info=True)
         raise BaseAPIError(
             message="Falha na conexão com o banco de dados",
             status_code=500,
             details={"error": str(e)}
         )
 
-def get_engine_stats() -> Dict[str, Any]:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Obtém estatísticas do pool de conexões.
+    Obtém uma sessão assíncrona de banco de dados do pool.
+    
+    Equivalente assíncrono de get_db, para endpoints declarados
+    com async def. As consultas são aguardadas sem bloquear o
+    event loop enquanto o banco de dados responde.
+    
+    Exceções lançadas pelo endpoint são propagadas sem alteração,
+    para que os manipuladores de erro recebam o erro original.
+    
+    Yields:
+        Sessão assíncrona de banco de dados
+        
+    Raises:
+        BaseAPIError: Se a string de conexão for inválida
+    """
+    _ensure_valid_database_url()
+    
+    async with AsyncSessionLocal() as db:
+        logger.debug("Sessão assíncrona de banco de dados obtida")
+        try:
+            yield db
+        finally:
+            logger.debug("Sessão assíncrona de banco de dados fechada")
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Obtém uma sessão assíncrona para endpoints somente leitura.
+    
+    Usa uma réplica de leitura saudável quando DB_REPLICA_URLS estiver
+    configurada, caindo para o primário se nenhuma réplica estiver
+    disponível ou dentro do atraso permitido. Endpoints que escrevem
+    devem continuar usando get_async_db.
+    
+    Yields:
+        Sessão assíncrona de banco de dados (réplica ou primário)
+        
+    Raises:
+        BaseAPIError: Se a string de conexão for inválida
+    """
+    _ensure_valid_database_url()
     
-    Útil para monitoramento e diagnóstico.
+    replica = await replica_router.choose()
+    if replica is not None:
+        sessionmaker = replica.sessionmaker
+        metrics.counter(f"db.reads.{replica.name}").inc()
+    else:
+        sessionmaker = AsyncSessionLocal
+        metrics.counter("db.reads.primary").inc()
+    
+    async with sessionmaker() as db:
+        db.info["target"] = replica.name if replica else "primary"
+        yield db
+
+def read_staleness(db: AsyncSession) -> float:
+    """
+    Obtém o atraso máximo dos dados lidos por uma sessão.
     
+    Args:
+        db: Sessão obtida de get_async_read_db ou get_async_db
+        
     Returns:
-        Dicionário com estatísticas do pool
+        0 no primário; DB_REPLICA_MAX_LAG_SECONDS em uma réplica
     """
-    if not hasattr(engine, 'pool'):
-        return {"error": "Pool não disponível"}
+    return 0.0 if db.info.get("target", "primary") == "primary" else DB_REPLICA_MAX_LAG_SECONDS
+
+def _ensure_valid_database_url() -> None:
+    """
+    Verifica se a string de conexão configurada é válida.
+    
+    Raises:
+        BaseAPIError: Se a string de conexão for inválida
+    """
+    validator = DatabaseValidator()
+    if not validator.validate(DATABASE_URL):
+        logger.error("String de conexão inválida: %s", DATABASE_URL)
+        raise BaseAPIError(
+            message="Falha na conexão com o banco de dados",
+            status_code=500,
+            details={"error": "String de conexão com banco de dados inválida"}
+        )
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    """
+    Extrai os contadores instantâneos de um pool de conexões.
+    
+    Args:
+        pool: Pool de conexões do SQLAlchemy
         
-    pool = engine.pool
+    Returns:
+        Dicionário com contadores do pool
+    """
     if isinstance(pool, QueuePool):
         return {
             "size": pool.size(),
@@ -211,4 +651,44 @@ def get_engine_stats() -> Dict[str, Any]:
             "overflow": pool.overflow(),
             "checkedout": pool.checkedout(),
         }
-    return {"error": "Não é um QueuePool"}
\ No newline at end of file
+    return {"error": "Não é um QueuePool"}
+
+def get_engine_stats() -> Dict[str, Any]:
+    """
+    Obtém estatísticas do pool de conexões.
+    
+    Útil para monitoramento e diagnóstico. Os contadores do engine
+    síncrono ficam no nível superior; os do engine assíncrono em "async".
+    
+    Returns:
+        Dicionário com estatísticas do pool
+    """
+    if not hasattr(engine, 'pool'):
+        return {"error": "Pool não disponível"}
+        
+    stats = _pool_stats(engine.pool)
+    stats["async"] = _pool_stats(async_engine.pool)
+    return stats
+
+def get_pool_telemetry() -> Dict[str, Any]:
+    """
+    Obtém a telemetria acumulada dos pools de conexões.
+    
+    Inclui histogramas de espera por conexão, tempo de uso e
+    overflow em uso, além da contagem de timeouts, junto com
+    os parâmetros de configuração atuais do pool.
+    
+    Returns:
+        Dicionário com configuração, contadores instantâneos e histogramas
+    """
+    return {
+        "config": {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        },
+        "current": get_engine_stats(),
+        "replicas": replica_router.stats(),
+        "reads": metrics.snapshot(prefix="db.reads.")["counters"],
+        "telemetry": metrics.snapshot(prefix="db.pool."),
+    }
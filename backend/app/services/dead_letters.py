@@ -0,0 +1,434 @@
+"""
+Dead-letter de eventos de webhook.
+
+Eventos cujo processamento falhou são gravados na tabela
+webhook_dead_letter com o payload original, o erro e o número de
+tentativas: eventos da fila durável que esgotaram as tentativas (ou
+falharam de forma permanente), itens com erro de lotes e webhooks
+síncronos que falharam. A gravação usa uma sessão própria, já que a
+transação do processamento foi desfeita.
+
+Falhas determinísticas do cliente (4xx, exceto 408, 409, 425 e 429,
+ex: dados inválidos) não são gravadas: falhariam de novo em qualquer
+reprocessamento.
+
+Depois de corrigir a causa (ex: um deploy com defeito), os eventos
+são reprocessados em massa com dead_letter_replayer.replay(), pela API
+(POST /webhooks/dead-letters/replay) ou pela linha de comando
+(replay_dead_letters.py), com paralelismo e taxa configuráveis, sem
+pedir aos remetentes que reenviem. Cada evento é reservado (estado
+replaying) com um UPDATE condicional antes de ser reprocessado, de
+forma que reprocessamentos simultâneos não processam o mesmo evento.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..errors import BaseAPIError
+from ..models.webhook_dead_letter import WebhookDeadLetter
+from ..models.webhook_event import WebhookEvent
+from .database import AsyncSessionLocal
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.dead_letters")
+
+# Configuração padrão do reprocessamento
+WEBHOOK_REPLAY_PARALLELISM = int(os.getenv("WEBHOOK_REPLAY_PARALLELISM", "4"))
+WEBHOOK_REPLAY_RATE = float(os.getenv("WEBHOOK_REPLAY_RATE", "0"))
+WEBHOOK_REPLAY_LIMIT = int(os.getenv("WEBHOOK_REPLAY_LIMIT", "1000"))
+WEBHOOK_REPLAY_LOCK_TIMEOUT = float(os.getenv("WEBHOOK_REPLAY_LOCK_TIMEOUT", "300"))
+
+# Estados de um evento no dead-letter
+STATUS_DEAD = "dead"
+STATUS_REPLAYING = "replaying"
+STATUS_REPLAYED = "replayed"
+STATUS_RESOLVED = "resolved"
+
+# Origens das falhas
+SOURCE_QUEUE = "queue"
+SOURCE_BATCH = "batch"
+SOURCE_WEBHOOK = "webhook"
+
+# Erros do cliente que podem não se repetir em um novo processamento
+TRANSIENT_CLIENT_STATUS = frozenset({408, 409, 425, 429})
+
+# Função que reprocessa um evento: (evento, db) -> resultado, ou None se
+# o evento já tiver sido processado por outro caminho
+ReplayHandler = Callable[[WebhookDeadLetter, AsyncSession], Awaitable[Optional[Dict[str, Any]]]]
+
+def _json_safe(value: Any) -> Any:
+    """Converte um valor para tipos aceitos por colunas JSON."""
+    return json.loads(json.dumps(value, default=str))
+
+def is_permanent_failure(status_code: Optional[int]) -> bool:
+    """
+    Verifica se uma falha se repetiria em qualquer reprocessamento.
+
+    Args:
+        status_code: Status HTTP do erro (None para erros inesperados)
+
+    Returns:
+        bool: True para erros 4xx determinísticos do cliente
+    """
+    return status_code is not None and 400 <= status_code < 500 and status_code not in TRANSIENT_CLIENT_STATUS
+
+def dead_letter_entry(
+    event_id: str,
+    source: str,
+    event_type: Any,
+    payload: Dict[str, Any],
+    error: Any,
+    attempts: int = 1,
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Monta o registro de um evento que falhou.
+
+    Args:
+        event_id: Identificador do evento
+        source: Origem da falha (SOURCE_*)
+        event_type: Tipo do evento
+        payload: Dados originais do evento
+        error: Exceção ou mensagem de erro
+        attempts: Tentativas de processamento já feitas
+        idempotency_key: Chave de idempotência da entrega, se houver
+
+    Returns:
+        Dicionário para record_dead_letters
+    """
+    return {
+        "event_id": event_id,
+        "source": source,
+        "event_type": str(getattr(event_type, "value", event_type)),
+        "payload": _json_safe(payload),
+        "error": getattr(error, "message", None) or str(error),
+        "status_code": error.status_code if isinstance(error, BaseAPIError) else None,
+        "attempts": attempts,
+        "idempotency_key": idempotency_key,
+    }
+
+async def record_dead_letters(entries: Sequence[Dict[str, Any]]) -> None:
+    """
+    Grava eventos que falharam, em uma transação própria.
+
+    Um evento já presente (mesmo event_id) volta ao estado dead com o
+    novo erro e as tentativas somadas. Falhas permanentes do cliente
+    (is_permanent_failure) são descartadas. Erros ao gravar são
+    registrados no log e não propagados, para não mascarar o erro
+    original.
+
+    Args:
+        entries: Registros montados com dead_letter_entry
+    """
+    discarded = [entry for entry in entries if is_permanent_failure(entry["status_code"])]
+    if discarded:
+        metrics.counter("webhook.dead_letter.discarded").inc(len(discarded))
+        entries = [entry for entry in entries if not is_permanent_failure(entry["status_code"])]
+    if not entries:
+        return
+    now = datetime.utcnow()
+    try:
+        async with AsyncSessionLocal() as db:
+            by_id = {entry["event_id"]: entry for entry in entries}
+            result = await db.execute(
+                select(WebhookDeadLetter).where(WebhookDeadLetter.event_id.in_(list(by_id)))
+            )
+            for letter in result.scalars():
+                entry = by_id.pop(letter.event_id)
+                letter.status = STATUS_DEAD
+                letter.attempts += entry["attempts"]
+                letter.error = entry["error"]
+                letter.status_code = entry["status_code"]
+                letter.last_failed_at = now
+            for entry in by_id.values():
+                db.add(WebhookDeadLetter(status=STATUS_DEAD, last_failed_at=now, **entry))
+            await db.commit()
+    except Exception as e:
+        logger.error("Erro ao gravar %d evento(s) no dead-letter: %s", len(entries), e)
+        return
+    metrics.counter("webhook.dead_letter.recorded").inc(len(entries))
+    logger.warning("%d evento(s) de webhook gravado(s) no dead-letter", len(entries))
+
+def _replayable(now: datetime) -> Any:
+    """
+    Condição dos eventos que podem ser reservados para reprocessamento.
+
+    Inclui eventos no estado dead e eventos reservados há mais de
+    WEBHOOK_REPLAY_LOCK_TIMEOUT segundos (reprocessamento interrompido).
+    """
+    stale = now - timedelta(seconds=WEBHOOK_REPLAY_LOCK_TIMEOUT)
+    return or_(
+        WebhookDeadLetter.status == STATUS_DEAD,
+        and_(WebhookDeadLetter.status == STATUS_REPLAYING, WebhookDeadLetter.updated_at < stale),
+    )
+
+def _filtered(
+    query: Any,
+    ids: Optional[Sequence[int]],
+    event_type: Optional[str],
+    source: Optional[str]
+) -> Any:
+    """Aplica os filtros de seleção a uma consulta de dead-letters."""
+    if ids:
+        query = query.where(WebhookDeadLetter.id.in_(list(ids)))
+    if event_type:
+        query = query.where(WebhookDeadLetter.event_type == event_type)
+    if source:
+        query = query.where(WebhookDeadLetter.source == source)
+    return query
+
+async def list_dead_letters(
+    db: AsyncSession,
+    status: Optional[str] = STATUS_DEAD,
+    event_type: Optional[str] = None,
+    source: Optional[str] = None,
+    limit: int = 100
+) -> List[WebhookDeadLetter]:
+    """
+    Lista eventos do dead-letter em ordem de chegada.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        status: Estado dos eventos (None para todos)
+        event_type: Filtra pelo tipo do evento
+        source: Filtra pela origem da falha
+        limit: Número máximo de eventos
+
+    Returns:
+        Eventos encontrados
+    """
+    query = _filtered(select(WebhookDeadLetter), None, event_type, source)
+    if status:
+        query = query.where(WebhookDeadLetter.status == status)
+    result = await db.execute(query.order_by(WebhookDeadLetter.id).limit(limit))
+    return list(result.scalars().all())
+
+async def count_dead_letters(db: AsyncSession) -> Dict[str, int]:
+    """
+    Conta os eventos do dead-letter por estado.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+
+    Returns:
+        Dicionário de estado para número de eventos
+    """
+    result = await db.execute(
+        select(WebhookDeadLetter.status, func.count()).group_by(WebhookDeadLetter.status)
+    )
+    return {status: count for status, count in result.all()}
+
+class _Pacer:
+    """Espaça o início dos reprocessamentos para respeitar uma taxa máxima."""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Reprocessamentos por segundo (0 sem limite)
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        """Aguarda a próxima vaga."""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class DeadLetterReplayer:
+    """
+    Reprocessamento em massa dos eventos do dead-letter.
+
+    Cada evento é reprocessado com o handler definido em set_handler
+    (o mesmo WebhookProcessor dos webhooks recebidos), em uma sessão
+    própria, com no máximo parallelism eventos simultâneos e no máximo
+    rate inícios por segundo. Um evento só é reprocessado depois de
+    reservado (_claim); eventos reservados por outro reprocessamento
+    são contados como skipped.
+    """
+
+    def __init__(self):
+        """Inicializa o reprocessador sem handler."""
+        self.handler: Optional[ReplayHandler] = None
+
+    def set_handler(self, handler: ReplayHandler) -> None:
+        """
+        Define a função que reprocessa os eventos.
+
+        Args:
+            handler: Função (evento, db) -> resultado
+        """
+        self.handler = handler
+
+    async def replay(
+        self,
+        ids: Optional[Sequence[int]] = None,
+        event_type: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = WEBHOOK_REPLAY_LIMIT,
+        parallelism: int = WEBHOOK_REPLAY_PARALLELISM,
+        rate: float = WEBHOOK_REPLAY_RATE,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Reprocessa os eventos no estado dead que atendem aos filtros.
+
+        Eventos reprocessados com sucesso passam a replayed (e, se vieram
+        da fila durável, o evento da fila passa a done); eventos que
+        falham de novo continuam dead, com o novo erro e as tentativas
+        somadas, e podem ser reprocessados depois.
+
+        Args:
+            ids: IDs dos registros do dead-letter
+            event_type: Filtra pelo tipo do evento
+            source: Filtra pela origem da falha
+            limit: Número máximo de eventos
+            parallelism: Reprocessamentos simultâneos
+            rate: Reprocessamentos iniciados por segundo (0 sem limite)
+            dry_run: Apenas conta os eventos selecionados
+
+        Returns:
+            Resumo com selecionados, reprocessados, resolvidos, ignorados,
+            falhas e duração
+        """
+        if self.handler is None:
+            raise BaseAPIError(message="Reprocessamento de webhooks sem handler definido", status_code=500)
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            query = _filtered(select(WebhookDeadLetter), ids, event_type, source)
+            result = await db.execute(
+                query.where(_replayable(datetime.utcnow())).order_by(WebhookDeadLetter.id).limit(limit)
+            )
+            letters = list(result.scalars().all())
+
+        summary = {"selected": len(letters), "replayed": 0, "resolved": 0, "skipped": 0, "failed": 0, "errors": []}
+        if dry_run or not letters:
+            summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return summary
+
+        semaphore = asyncio.Semaphore(max(1, parallelism))
+        pacer = _Pacer(rate)
+
+        async def replay_one(letter: WebhookDeadLetter) -> None:
+            async with semaphore:
+                await pacer.wait()
+                outcome = await self._replay_one(letter) if await self._claim(letter) else "skipped"
+            summary[outcome] += 1
+            if outcome == "failed" and len(summary["errors"]) < 20:
+                summary["errors"].append({"id": letter.id, "event_id": letter.event_id, "error": letter.error})
+
+        await asyncio.gather(*(replay_one(letter) for letter in letters))
+        summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(
+            "Reprocessamento de dead-letter: %d selecionado(s), %d reprocessado(s), %d resolvido(s), "
+            "%d ignorado(s), %d falha(s)",
+            summary["selected"], summary["replayed"], summary["resolved"], summary["skipped"], summary["failed"]
+        )
+        return summary
+
+    async def _claim(self, letter: WebhookDeadLetter) -> bool:
+        """
+        Reserva um evento para reprocessamento.
+
+        O UPDATE ... RETURNING é condicional ao evento continuar
+        disponível, de forma que só um de vários reprocessamentos
+        simultâneos o reserva.
+
+        Args:
+            letter: Evento selecionado
+
+        Returns:
+            bool: True se o evento foi reservado
+        """
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(WebhookDeadLetter)
+                .where(WebhookDeadLetter.id == letter.id, _replayable(now))
+                .values(status=STATUS_REPLAYING, updated_at=now)
+                .returning(WebhookDeadLetter.id)
+            )
+            claimed = result.scalar() is not None
+            await db.commit()
+        return claimed
+
+    async def _replay_one(self, letter: WebhookDeadLetter) -> str:
+        """
+        Reprocessa um evento e grava o novo estado.
+
+        Args:
+            letter: Evento do dead-letter
+
+        Returns:
+            "replayed", "resolved" ou "failed"
+        """
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await self.handler(letter, db)
+        except Exception as e:
+            metrics.counter("webhook.dead_letter.replay_failed").inc()
+            letter.error = getattr(e, "message", None) or str(e)
+            await self._update(
+                letter,
+                status=STATUS_DEAD,
+                attempts=WebhookDeadLetter.attempts + 1,
+                error=letter.error,
+                status_code=e.status_code if isinstance(e, BaseAPIError) else None,
+                last_failed_at=now
+            )
+            return "failed"
+
+        if result is None:
+            metrics.counter("webhook.dead_letter.resolved").inc()
+            await self._update(letter, status=STATUS_RESOLVED)
+            return "resolved"
+
+        result = _json_safe(result)
+        metrics.counter("webhook.dead_letter.replayed").inc()
+        await self._update(letter, status=STATUS_REPLAYED, replayed_at=now, result=result)
+        return "replayed"
+
+    async def _update(self, letter: WebhookDeadLetter, **values: Any) -> None:
+        """
+        Grava o novo estado de um evento reservado e libera a reserva.
+
+        Eventos da fila durável reprocessados com sucesso também são
+        marcados como done na tabela webhook_event.
+
+        Args:
+            letter: Evento do dead-letter
+            values: Colunas a serem alteradas
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(WebhookDeadLetter)
+                    .where(WebhookDeadLetter.id == letter.id, WebhookDeadLetter.status == STATUS_REPLAYING)
+                    .values(**values)
+                )
+                if letter.source == SOURCE_QUEUE and values.get("status") == STATUS_REPLAYED:
+                    # "done" é o STATUS_DONE de webhook_queue (que importa este módulo)
+                    await db.execute(
+                        update(WebhookEvent)
+                        .where(WebhookEvent.event_id == letter.event_id)
+                        .values(status="done", result=values["result"], error=None, processed_at=values["replayed_at"])
+                    )
+                await db.commit()
+        except Exception as e:
+            logger.error("Erro ao registrar reprocessamento do evento %s: %s", letter.event_id, e)
+
+# Reprocessador global (o handler é definido em app/routes/webhooks.py)
+dead_letter_replayer = DeadLetterReplayer()
@@ -0,0 +1,102 @@
+"""
+Suporte a requisições condicionais (ETag / If-None-Match).
+
+Este módulo gera ETags fracas a partir da versão dos dados (por
+exemplo updated_at de uma linha, ou max(updated_at) e contagem de uma
+tabela) e responde 304 Not Modified quando o cliente já possui a
+representação atual, sem consultar as linhas nem serializar o corpo.
+"""
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+
+# Política de cache enviada com as respostas que possuem ETag: o cliente
+# pode guardar a resposta, mas deve revalidá-la a cada uso
+CACHE_CONTROL = "no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """
+    Gera uma ETag fraca a partir das partes que identificam a versão.
+
+    Args:
+        parts: Valores que mudam sempre que a representação muda
+
+    Returns:
+        ETag fraca no formato W/"..."
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Verifica se o cabeçalho If-None-Match corresponde à ETag.
+
+    Usa comparação fraca, como definido para If-None-Match (RFC 9110).
+
+    Args:
+        request: Objeto de requisição
+        etag: ETag atual do recurso
+
+    Returns:
+        bool: True se o cliente já possui a representação atual
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Cria uma resposta 304 Not Modified.
+
+    Args:
+        etag: ETag atual do recurso
+        headers: Cabeçalhos adicionais que a resposta 200 também teria
+
+    Returns:
+        Resposta 304 sem corpo
+    """
+    return Response(
+        status_code=304,
+        headers={**(headers or {}), "ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+def set_etag(response: Response, etag: str) -> None:
+    """
+    Adiciona a ETag e a política de cache a uma resposta.
+
+    Args:
+        response: Resposta a ser enviada
+        etag: ETag da representação
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+async def table_version(db: AsyncSession, model: Any) -> Tuple[Any, int]:
+    """
+    Obtém a versão de uma tabela com TimestampMixin.
+
+    A combinação de max(updated_at) e contagem muda em inserções,
+    atualizações e remoções.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        model: Modelo SQLAlchemy com coluna updated_at
+
+    Returns:
+        Tupla (maior updated_at, número de linhas)
+    """
+    result = await db.execute(select(func.max(model.updated_at), func.count()).select_from(model))
+    max_updated_at, count = result.one()
+    return max_updated_at, count
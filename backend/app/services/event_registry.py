@@ -0,0 +1,360 @@
+"""
+Registro de handlers de eventos de webhook.
+
+Cada tipo de evento registra um handler com o esquema dos dados, o
+número máximo de execuções simultâneas e o tempo limite de execução.
+O despacho é uma consulta a um dicionário pelo tipo do evento, e cada
+tipo tem o próprio limite de concorrência: handlers lentos de um tipo
+(ex: portfolio_update) ocupam apenas as vagas desse tipo e não atrasam
+os demais.
+
+Os limites registrados podem ser sobrescritos por variáveis de ambiente
+com o nome do tipo em maiúsculas, por exemplo
+WEBHOOK_HANDLER_PORTFOLIO_UPDATE_CONCURRENCY e
+WEBHOOK_HANDLER_PORTFOLIO_UPDATE_TIMEOUT.
+
+Cada tipo registra métricas próprias (webhook.handler.<tipo>.*):
+latência, processados, erros, timeouts e rejeitados por falta de vaga.
+Tipos sem handler são agregados em webhook.handler.unregistered.
+
+Handlers devem ser seguros para cancelamento: ao exceder o tempo limite
+o handler é cancelado no await em que estiver. As escritas pendentes no
+banco são desfeitas (rollback da sessão com commit=True; com
+commit=False o handler roda em um SAVEPOINT, desfeito sem afetar a
+transação do chamador), mas efeitos externos (chamadas HTTP, e-mails)
+não são: faça-os depois das escritas, de forma idempotente.
+"""
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+import asyncio
+import logging
+import os
+import time
+
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..errors import BaseAPIError, ValidationError
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.event_registry")
+
+# Limites padrão dos handlers
+WEBHOOK_HANDLER_CONCURRENCY = int(os.getenv("WEBHOOK_HANDLER_CONCURRENCY", "8"))
+WEBHOOK_HANDLER_TIMEOUT = float(os.getenv("WEBHOOK_HANDLER_TIMEOUT", "30"))
+
+UNREGISTERED = "unregistered"
+
+# Função que processa os dados de um evento: (data, db, commit) -> resultado
+Handler = Callable[[Dict[str, Any], AsyncSession, bool], Awaitable[Dict[str, Any]]]
+
+def _event_name(event_type: Any) -> str:
+    """Normaliza o tipo do evento (Enum ou str) para a chave do registro."""
+    return str(getattr(event_type, "value", event_type))
+
+def _env_override(name: str, setting: str, default: Any) -> Any:
+    """Lê WEBHOOK_HANDLER_<TIPO>_<SETTING>, se definida."""
+    value = os.getenv(f"WEBHOOK_HANDLER_{name.upper()}_{setting}")
+    return type(default)(value) if value else default
+
+class EventHandlerSpec:
+    """
+    Handler registrado para um tipo de evento, com seus limites.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        schema: Optional[Type[BaseModel]],
+        max_concurrency: int,
+        timeout: float
+    ):
+        """
+        Inicializa o registro do handler.
+
+        Args:
+            name: Tipo do evento
+            handler: Função que processa os dados
+            schema: Modelo pydantic dos dados (None não valida)
+            max_concurrency: Execuções simultâneas permitidas
+            timeout: Tempo limite de execução em segundos (também usado
+                como espera máxima por uma vaga)
+        """
+        self.name = name
+        self.handler = handler
+        self.schema = schema
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._latency = metrics.histogram(f"webhook.handler.{name}.latency_ms")
+        self._processed = metrics.counter(f"webhook.handler.{name}.processed")
+        self._errors = metrics.counter(f"webhook.handler.{name}.errors")
+        self._timeouts = metrics.counter(f"webhook.handler.{name}.timeouts")
+        self._rejected = metrics.counter(f"webhook.handler.{name}.rejected")
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Obtém o semáforo do tipo no event loop atual.
+
+        O semáforo é criado no primeiro uso (no Python 3.9 ele fica
+        associado ao loop em que foi criado, que pode não ser o da
+        aplicação no momento do import).
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    @property
+    def available(self) -> int:
+        """Vagas livres neste processo."""
+        return max(0, self.max_concurrency - self.in_flight - self.waiting)
+
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valida os dados com o esquema do tipo.
+
+        Args:
+            data: Dados do evento
+
+        Returns:
+            Dados validados (campos extras são mantidos)
+
+        Raises:
+            ValidationError: Se os dados não corresponderem ao esquema
+        """
+        if self.schema is None:
+            return data
+        try:
+            return self.schema.model_validate(data).model_dump()
+        except PydanticValidationError as e:
+            raise ValidationError(
+                message=f"Dados inválidos para o evento {self.name}",
+                details={"errors": e.errors(include_url=False, include_context=False, include_input=False)}
+            )
+
+    async def run(self, data: Dict[str, Any], db: AsyncSession, commit: bool) -> Dict[str, Any]:
+        """
+        Valida os dados e executa o handler dentro dos limites do tipo.
+
+        Com commit=False o handler roda em um SAVEPOINT: se falhar ou
+        exceder o tempo limite, apenas as escritas dele são desfeitas.
+        Com commit=True, um handler interrompido pelo tempo limite tem a
+        transação da sessão desfeita.
+
+        Args:
+            data: Dados do evento
+            db: Sessão do banco de dados
+            commit: Repassado ao handler
+
+        Returns:
+            Resultado do handler
+
+        Raises:
+            ValidationError: Se os dados não corresponderem ao esquema
+            BaseAPIError: (503) se não houver vaga dentro do tempo limite,
+                (504) se o handler exceder o tempo limite
+        """
+        data = self.validate(data)
+
+        semaphore = self.semaphore()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._rejected.inc()
+            raise BaseAPIError(
+                message=f"Capacidade de processamento do evento {self.name} esgotada",
+                status_code=503,
+                details={"max_concurrency": self.max_concurrency}
+            )
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            async with nullcontext() if commit else db.begin_nested():
+                result = await asyncio.wait_for(self.handler(data, db, commit), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts.inc()
+            logger.warning("Handler do evento %s excedeu %.1fs", self.name, self.timeout)
+            if commit:
+                # Descarta as escritas pendentes do handler cancelado
+                await db.rollback()
+            raise BaseAPIError(
+                message=f"Tempo limite de processamento do evento {self.name} excedido",
+                status_code=504,
+                details={"timeout": self.timeout}
+            )
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            self._latency.observe((time.perf_counter() - started) * 1000)
+            self.in_flight -= 1
+            semaphore.release()
+        self._processed.inc()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém limites, ocupação e métricas do tipo.
+
+        Returns:
+            Dicionário com a configuração e os contadores
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "processed": self._processed.value,
+            "errors": self._errors.value,
+            "timeouts": self._timeouts.value,
+            "rejected": self._rejected.value,
+            "latency_ms": self._latency.snapshot(),
+        }
+
+class EventHandlerRegistry:
+    """
+    Registro de handlers por tipo de evento.
+    """
+
+    def __init__(self):
+        """Inicializa o registro vazio."""
+        self._handlers: Dict[str, EventHandlerSpec] = {}
+        self._fallback: Optional[EventHandlerSpec] = None
+
+    def register(
+        self,
+        event_type: Any,
+        schema: Optional[Type[BaseModel]] = None,
+        max_concurrency: int = WEBHOOK_HANDLER_CONCURRENCY,
+        timeout: float = WEBHOOK_HANDLER_TIMEOUT
+    ) -> Callable[[Handler], Handler]:
+        """
+        Decorador que registra o handler de um tipo de evento.
+
+        Args:
+            event_type: Tipo do evento (WebhookEventType ou str)
+            schema: Modelo pydantic dos dados do evento
+            max_concurrency: Execuções simultâneas permitidas
+            timeout: Tempo limite de execução em segundos
+
+        Returns:
+            Decorador que mantém a função original
+        """
+        name = _event_name(event_type)
+
+        def decorator(handler: Handler) -> Handler:
+            self._handlers[name] = EventHandlerSpec(
+                name,
+                handler,
+                schema,
+                _env_override(name, "CONCURRENCY", max_concurrency),
+                _env_override(name, "TIMEOUT", float(timeout))
+            )
+            return handler
+
+        return decorator
+
+    def register_fallback(
+        self,
+        max_concurrency: int = WEBHOOK_HANDLER_CONCURRENCY,
+        timeout: float = WEBHOOK_HANDLER_TIMEOUT
+    ) -> Callable[[Handler], Handler]:
+        """
+        Decorador que registra o handler dos tipos sem handler próprio.
+
+        Args:
+            max_concurrency: Execuções simultâneas permitidas (compartilhadas
+                por todos os tipos não registrados)
+            timeout: Tempo limite de execução em segundos
+
+        Returns:
+            Decorador que mantém a função original
+        """
+        def decorator(handler: Handler) -> Handler:
+            self._fallback = EventHandlerSpec(UNREGISTERED, handler, None, max_concurrency, float(timeout))
+            return handler
+
+        return decorator
+
+    def get(self, event_type: Any) -> Optional[EventHandlerSpec]:
+        """
+        Obtém o handler de um tipo de evento.
+
+        Args:
+            event_type: Tipo do evento
+
+        Returns:
+            Handler registrado, o handler padrão ou None
+        """
+        return self._handlers.get(_event_name(event_type), self._fallback)
+
+    def available(self, event_type: Any) -> int:
+        """
+        Vagas livres para um tipo de evento neste processo.
+
+        Args:
+            event_type: Tipo do evento
+
+        Returns:
+            Número de execuções que podem começar sem espera
+        """
+        spec = self.get(event_type)
+        return spec.available if spec is not None else 0
+
+    async def dispatch(
+        self,
+        event_type: Any,
+        data: Dict[str, Any],
+        db: AsyncSession,
+        commit: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Valida e processa um evento com o handler do tipo.
+
+        Args:
+            event_type: Tipo do evento
+            data: Dados do evento
+            db: Sessão do banco de dados
+            commit: Repassado ao handler (ver WebhookProcessor.process_event)
+
+        Returns:
+            Resultado do handler
+
+        Raises:
+            ValidationError: Se os dados não corresponderem ao esquema
+            BaseAPIError: (503) se não houver vaga dentro do tempo limite,
+                (504) se o handler exceder o tempo limite
+        """
+        spec = self.get(event_type)
+        if spec is None:
+            raise BaseAPIError(
+                message=f"Nenhum handler registrado para o evento {_event_name(event_type)}",
+                status_code=500
+            )
+        return await spec.run(data, db, commit)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém o estado de todos os handlers.
+
+        Returns:
+            Dicionário de tipo de evento para limites e métricas
+        """
+        handlers = {name: spec.stats() for name, spec in self._handlers.items()}
+        if self._fallback is not None:
+            handlers[UNREGISTERED] = self._fallback.stats()
+        return handlers
+
+# Registro global (os handlers são registrados em app/routes/webhooks.py)
+event_registry = EventHandlerRegistry()
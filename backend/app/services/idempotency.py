@@ -0,0 +1,296 @@
+"""
+Idempotência de webhooks.
+
+Remetentes reenviam webhooks quando não recebem confirmação a tempo.
+Este módulo identifica cada entrega pelo ID fornecido pelo remetente
+(cabeçalhos Idempotency-Key, X-Webhook-Delivery ou X-GitHub-Delivery)
+ou, na ausência dele, pelo SHA-256 do corpo, e guarda a resposta da
+primeira entrega. Reenvios são respondidos com a resposta guardada,
+sem processar o evento novamente.
+
+As respostas ficam em um cache LRU com TTL (services/cache.py) na
+frente da tabela webhook_delivery, que preserva o registro entre
+reinícios e entre processos.
+
+Uma reserva sem resposta vale por WEBHOOK_DEDUP_LEASE_SECONDS: se o
+processo que a fez parar antes de complete() ou release(), o próximo
+reenvio após esse prazo assume a reserva e processa a entrega, em vez
+de receber 409 até o fim do TTL. O prazo deve ser maior que o tempo
+limite dos handlers (services/event_registry.py).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Tuple
+import hashlib
+import logging
+import os
+import time
+
+from fastapi import Request
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.webhook_delivery import WebhookDelivery
+from .cache import MISSING, TTLCache
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.idempotency")
+
+# Configuração da idempotência
+WEBHOOK_DEDUP_TTL_SECONDS = float(os.getenv("WEBHOOK_DEDUP_TTL_SECONDS", "86400"))
+WEBHOOK_DEDUP_CACHE_SIZE = int(os.getenv("WEBHOOK_DEDUP_CACHE_SIZE", "10000"))
+WEBHOOK_DEDUP_PURGE_INTERVAL = float(os.getenv("WEBHOOK_DEDUP_PURGE_INTERVAL", "300"))
+WEBHOOK_DEDUP_LEASE_SECONDS = float(os.getenv("WEBHOOK_DEDUP_LEASE_SECONDS", "300"))
+
+# Cabeçalhos com o ID de entrega fornecido pelo remetente, em ordem de preferência
+DELIVERY_ID_HEADERS = ("idempotency-key", "x-webhook-delivery", "x-github-delivery")
+
+# Estado de uma entrega registrada mas ainda sem resposta
+IN_PROGRESS = object()
+
+# Reserva sem resposta cujo prazo (WEBHOOK_DEDUP_LEASE_SECONDS) expirou
+LEASE_EXPIRED = object()
+
+def delivery_key(request: Request, body: bytes, scope: str) -> Tuple[str, str]:
+    """
+    Calcula a chave de idempotência de uma entrega.
+
+    Args:
+        request: Objeto de requisição
+        body: Corpo da requisição em bytes
+        scope: Escopo da chave (ex: "webhook", "batch"), para que o mesmo
+            ID de entrega em endpoints diferentes não colida
+
+    Returns:
+        Tupla (chave de idempotência, ID do evento derivado da chave)
+    """
+    for header in DELIVERY_ID_HEADERS:
+        delivery_id = request.headers.get(header)
+        if delivery_id:
+            event_id = delivery_id if len(delivery_id) <= 64 else hashlib.sha256(delivery_id.encode()).hexdigest()
+            return f"{scope}:id:{event_id}", event_id
+    digest = hashlib.sha256(body).hexdigest()
+    return f"{scope}:sha256:{digest}", digest
+
+class IdempotencyStore:
+    """
+    Registro de entregas de webhook com cache em memória.
+
+    Fluxo: reserve() registra a chave antes do processamento (a
+    restrição única garante que só uma entrega concorrente prossiga),
+    complete() guarda a resposta e release() desfaz a reserva quando o
+    processamento falha, permitindo que o remetente tente de novo.
+    Reservas abandonadas (sem resposta após lease segundos) são
+    assumidas pelo próximo reenvio.
+    """
+
+    def __init__(
+        self,
+        ttl: float = WEBHOOK_DEDUP_TTL_SECONDS,
+        maxsize: int = WEBHOOK_DEDUP_CACHE_SIZE,
+        lease: float = WEBHOOK_DEDUP_LEASE_SECONDS
+    ):
+        """
+        Inicializa o registro.
+
+        Args:
+            ttl: Tempo em segundos durante o qual reenvios são reconhecidos
+            maxsize: Número máximo de respostas mantidas em memória
+            lease: Tempo em segundos após o qual uma reserva sem resposta
+                é considerada abandonada
+        """
+        self.ttl = ttl
+        self.lease = lease
+        self.cache = TTLCache("webhook_dedup", maxsize=maxsize, ttl=ttl)
+        self._last_purge = 0.0
+        # Momento das reservas feitas por este processo, para que release()
+        # não remova uma reserva assumida por outro reenvio
+        self._reservations: Dict[str, datetime] = {}
+
+    async def reserve(self, db: AsyncSession, key: str) -> Any:
+        """
+        Reserva uma chave ou obtém a resposta de uma entrega anterior.
+
+        Args:
+            db: Sessão assíncrona de banco de dados
+            key: Chave de idempotência
+
+        Returns:
+            None se a chave foi reservada (primeira entrega, ou reenvio de
+            uma entrega cuja reserva expirou), a resposta guardada se for
+            um reenvio, ou IN_PROGRESS se a primeira entrega ainda está
+            sendo processada
+        """
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            metrics.counter("webhook.dedup.hits").inc()
+            return cached
+
+        stored = await self._load(db, key)
+        if stored is LEASE_EXPIRED:
+            return await self._take_over(db, key)
+        if stored is not MISSING:
+            return stored
+
+        now = datetime.utcnow()
+        db.add(WebhookDelivery(key=key, reserved_at=now))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Outra entrega com a mesma chave foi registrada em paralelo
+            await db.rollback()
+            stored = await self._load(db, key)
+            return IN_PROGRESS if stored is MISSING or stored is LEASE_EXPIRED else stored
+
+        self._reservations[key] = now
+        metrics.counter("webhook.dedup.misses").inc()
+        await self._maybe_purge(db)
+        return None
+
+    async def _take_over(self, db: AsyncSession, key: str) -> Any:
+        """
+        Assume uma reserva abandonada.
+
+        O UPDATE é condicional à reserva continuar expirada, de forma que
+        apenas um de vários reenvios simultâneos a assume.
+
+        Args:
+            db: Sessão assíncrona de banco de dados
+            key: Chave de idempotência
+
+        Returns:
+            None se a reserva foi assumida, ou IN_PROGRESS se outro
+            reenvio a assumiu antes
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.lease)
+        result = await db.execute(
+            update(WebhookDelivery)
+            .where(
+                WebhookDelivery.key == key,
+                WebhookDelivery.response.is_(None),
+                or_(
+                    WebhookDelivery.reserved_at < cutoff,
+                    and_(WebhookDelivery.reserved_at.is_(None), WebhookDelivery.created_at < cutoff),
+                ),
+            )
+            .values(reserved_at=now)
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            metrics.counter("webhook.dedup.hits").inc()
+            return IN_PROGRESS
+        self._reservations[key] = now
+        metrics.counter("webhook.dedup.lease_expired").inc()
+        logger.warning("Reserva de idempotência %s expirou sem resposta; entrega será reprocessada", key)
+        return None
+
+    async def _load(self, db: AsyncSession, key: str) -> Any:
+        """
+        Busca uma entrega registrada e ainda válida no banco.
+
+        Um registro expirado é removido para que a chave possa ser
+        reservada novamente.
+
+        Returns:
+            Resposta guardada, IN_PROGRESS, LEASE_EXPIRED se a reserva
+            está sem resposta há mais de lease segundos, ou MISSING se
+            não houver registro
+        """
+        result = await db.execute(
+            select(WebhookDelivery.response, WebhookDelivery.created_at, WebhookDelivery.reserved_at)
+            .where(WebhookDelivery.key == key)
+        )
+        row = result.first()
+        if row is None:
+            return MISSING
+        now = datetime.utcnow()
+        if row.created_at < now - timedelta(seconds=self.ttl):
+            await db.execute(delete(WebhookDelivery).where(WebhookDelivery.key == key))
+            await db.commit()
+            return MISSING
+        if row.response is None:
+            # Registros anteriores à coluna reserved_at usam created_at
+            if (row.reserved_at or row.created_at) < now - timedelta(seconds=self.lease):
+                return LEASE_EXPIRED
+            metrics.counter("webhook.dedup.hits").inc()
+            return IN_PROGRESS
+        metrics.counter("webhook.dedup.hits").inc()
+        self.cache.set(key, row.response)
+        return row.response
+
+    async def complete(self, db: AsyncSession, key: str, response: Dict[str, Any]) -> None:
+        """
+        Guarda a resposta de uma entrega reservada.
+
+        Args:
+            db: Sessão assíncrona de banco de dados
+            key: Chave de idempotência
+            response: Resposta enviada ao remetente (serializável em JSON)
+        """
+        result = await db.execute(select(WebhookDelivery).where(WebhookDelivery.key == key))
+        delivery = result.scalars().first()
+        if delivery is None:
+            delivery = WebhookDelivery(key=key)
+            db.add(delivery)
+        delivery.response = response
+        await db.commit()
+        self._reservations.pop(key, None)
+        self.cache.set(key, response)
+
+    async def release(self, db: AsyncSession, key: str) -> None:
+        """
+        Desfaz a reserva de uma entrega cujo processamento falhou.
+
+        Args:
+            db: Sessão assíncrona de banco de dados
+            key: Chave de idempotência
+        """
+        reserved_at = self._reservations.pop(key, None)
+        conditions = [WebhookDelivery.key == key, WebhookDelivery.response.is_(None)]
+        if reserved_at is not None:
+            # Não remove a reserva se outro reenvio a assumiu depois desta
+            conditions.append(WebhookDelivery.reserved_at == reserved_at)
+        try:
+            await db.rollback()
+            await db.execute(delete(WebhookDelivery).where(*conditions))
+            await db.commit()
+        except Exception as e:
+            logger.error("Erro ao liberar chave de idempotência %s: %s", key, e)
+
+    async def _maybe_purge(self, db: AsyncSession) -> None:
+        """Remove entregas expiradas, no máximo uma vez por WEBHOOK_DEDUP_PURGE_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_purge < WEBHOOK_DEDUP_PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        try:
+            await db.execute(delete(WebhookDelivery).where(WebhookDelivery.created_at < cutoff))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning("Erro ao remover entregas de webhook expiradas: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém estatísticas de deduplicação.
+
+        Returns:
+            Dicionário com acertos, falhas, taxa de acerto e estado do cache
+        """
+        hits = metrics.counter("webhook.dedup.hits").value
+        misses = metrics.counter("webhook.dedup.misses").value
+        return {
+            "ttl": self.ttl,
+            "lease": self.lease,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "lease_expired": metrics.counter("webhook.dedup.lease_expired").value,
+            "cache": self.cache.stats(),
+        }
+
+# Registro global de entregas de webhook
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,169 @@
+"""
+Codec JSON com backend plugável.
+
+Usa orjson ou ujson quando instalados e o json da biblioteca padrão
+caso contrário; JSON_BACKEND (auto, orjson, ujson ou json) força um
+backend. A saída é a mesma em todos os backends: JSON compacto em
+UTF-8 (sem escapar caracteres não ASCII) e os tipos que o JSON não
+tem convertidos pela mesma função default(): datetime/date/time em
+isoformat(), UUID e Decimal como string, Enum (ex: WebhookEventType)
+pelo valor, dataclasses por asdict() e modelos Pydantic por
+model_dump(). Chaves de dicionário seguem as regras do json padrão:
+str, int, float, bool e None (as demais lançam TypeError).
+
+O orjson recebe OPT_PASSTHROUGH_DATETIME para que data/hora passe por
+default(). O ujson converte Decimal em número antes de consultar
+default(), então é usado apenas no parse e a serialização fica com o
+json padrão. Valores que o orjson não aceita (ex: inteiros maiores que
+64 bits e chaves que não são str) são serializados pelo json padrão.
+
+NaN e Infinity não são JSON válido e são recusados na entrada
+(WebhookPayload em schemas/webhook.py). Se ainda assim chegarem à
+serialização, o json padrão lança ValueError, como o JSONResponse do
+Starlette, e o orjson os escreve como null.
+
+É usado por JsonProcessor (app/helpers) e, por meio de
+CodecJSONResponse (services/responses.py), pelas respostas da
+aplicação e pelos manipuladores de erro.
+"""
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Optional, Union
+from uuid import UUID
+import json
+import logging
+import os
+
+# Configuração de logging
+logger = logging.getLogger("api.json_codec")
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+def default(value: Any) -> Any:
+    """
+    Converte tipos não suportados nativamente pelo JSON.
+
+    Args:
+        value: Valor a ser convertido
+
+    Returns:
+        Valor serializável
+
+    Raises:
+        TypeError: Se o tipo não for suportado
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _std_dumps(value: Any, indent: Optional[int] = None) -> bytes:
+    """Serializa com o json da biblioteca padrão."""
+    separators = (",", ": ") if indent else (",", ":")
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=indent,
+        separators=separators, default=default
+    ).encode("utf-8")
+
+class JsonCodec:
+    """
+    Serialização e parse de JSON com o backend selecionado.
+    """
+
+    def __init__(self, backend: str = JSON_BACKEND):
+        """
+        Inicializa o codec.
+
+        Args:
+            backend: "auto", "orjson", "ujson" ou "json"; backends não
+                instalados caem no próximo disponível (o ujson é usado
+                apenas no parse)
+        """
+        self.name = "json"
+        self._module: Any = None
+        candidates = ("orjson", "ujson") if backend == "auto" else (backend,)
+        for name in candidates:
+            if name == "json":
+                break
+            try:
+                self._module = __import__(name)
+                self.name = name
+                break
+            except ImportError:
+                logger.debug("Backend JSON %s não instalado", name)
+        if backend not in ("auto", "json", self.name):
+            logger.warning("Backend JSON %s indisponível; usando %s", backend, self.name)
+
+    def dumps(self, value: Any, indent: Optional[int] = None) -> bytes:
+        """
+        Serializa um valor para JSON em UTF-8.
+
+        Args:
+            value: Valor a ser serializado
+            indent: Indentação (None para JSON compacto; o orjson só
+                indenta com 2 espaços)
+
+        Returns:
+            JSON em bytes
+
+        Raises:
+            TypeError: Se algum valor não for serializável
+            ValueError: Se algum float for NaN ou Infinity (apenas no json
+                padrão; o orjson escreve null)
+        """
+        if self.name == "orjson":
+            module = self._module
+            option = module.OPT_PASSTHROUGH_DATACLASS | module.OPT_PASSTHROUGH_DATETIME
+            if indent:
+                option |= module.OPT_INDENT_2
+            try:
+                return module.dumps(value, default=default, option=option)
+            except TypeError:
+                pass
+        return _std_dumps(value, indent)
+
+    def dumps_str(self, value: Any, indent: Optional[int] = None) -> str:
+        """
+        Serializa um valor para uma string JSON.
+
+        Args:
+            value: Valor a ser serializado
+            indent: Indentação (None para JSON compacto)
+
+        Returns:
+            String JSON
+        """
+        return self.dumps(value, indent).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes, bytearray]) -> Any:
+        """
+        Interpreta um documento JSON.
+
+        Args:
+            data: JSON em texto ou bytes
+
+        Returns:
+            Valor Python
+
+        Raises:
+            ValueError: Se o documento for inválido (json.JSONDecodeError
+                no backend padrão; todos os backends derivam de ValueError)
+        """
+        if self._module is not None:
+            return self._module.loads(data)
+        return json.loads(data)
+
+# Codec global
+json_codec = JsonCodec()
@@ -0,0 +1,172 @@
+"""
+Configuração centralizada de logging.
+
+Este módulo configura o logging da aplicação para não bloquear o
+caminho das requisições: os loggers apenas enfileiram os registros
+(QueueHandler) e uma thread de escrita (QueueListener) os formata e
+grava. A fila é limitada; quando está cheia o registro é descartado e
+contabilizado em logging.dropped, em vez de bloquear a requisição.
+
+A saída padrão é uma linha JSON por registro. Use mensagens no estilo
+%-format (logger.info("Processando %s", valor)) para que a formatação
+também aconteça na thread de escrita.
+"""
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Tuple
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+
+from .metrics import metrics
+
+# Configuração de logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+
+# Formato de texto usado historicamente pela aplicação (LOG_FORMAT=text)
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Loggers do uvicorn que passam a usar a mesma fila e formato
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# Atributos padrão de LogRecord; os demais vêm de extra= e vão para o JSON
+_RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata registros como uma linha JSON.
+
+    Inclui os campos passados em extra= (ex: details, request_info).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler que descarta registros quando a fila está cheia.
+
+    O registro é enfileirado sem formatação; a mensagem é montada pelo
+    formatter na thread de escrita.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.counter("logging.dropped").inc()
+
+_lock = threading.Lock()
+_configured = False
+_listeners: List[Tuple[str, "queue.Queue[Any]", QueueListener]] = []
+
+def build_formatter() -> logging.Formatter:
+    """
+    Cria o formatter configurado em LOG_FORMAT.
+
+    Returns:
+        JsonFormatter ou formatter de texto
+    """
+    if LOG_FORMAT == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    return JsonFormatter()
+
+def queued_handler(name: str, handler: logging.Handler) -> logging.Handler:
+    """
+    Coloca um handler atrás de uma fila com thread de escrita própria.
+
+    Args:
+        name: Nome da fila, usado em get_logging_stats
+        handler: Handler que efetivamente grava os registros
+
+    Returns:
+        Handler a ser adicionado ao logger (o próprio handler se LOG_ASYNC=false)
+    """
+    if not LOG_ASYNC:
+        return handler
+    log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    with _lock:
+        _listeners.append((name, log_queue, listener))
+    return DroppingQueueHandler(log_queue)
+
+def configure_logging() -> None:
+    """
+    Configura o logger raiz da aplicação.
+
+    Substitui os handlers do logger raiz por um handler de saída padrão
+    atrás da fila e faz os loggers do uvicorn propagarem para ele.
+    Chamadas repetidas não têm efeito.
+    """
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(build_formatter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queued_handler("root", stream_handler))
+    root.setLevel(LOG_LEVEL)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Esvazia as filas e encerra as threads de escrita."""
+    with _lock:
+        listeners = list(_listeners)
+        _listeners.clear()
+    for _, _, listener in listeners:
+        listener.stop()
+
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    Obtém o estado do pipeline de logging.
+
+    Returns:
+        Dicionário com configuração, ocupação das filas e descartes
+    """
+    with _lock:
+        listeners = list(_listeners)
+    return {
+        "level": LOG_LEVEL,
+        "format": LOG_FORMAT,
+        "async": LOG_ASYNC,
+        "queues": {
+            name: {"size": log_queue.qsize(), "capacity": log_queue.maxsize}
+            for name, log_queue, _ in listeners
+        },
+        "dropped": metrics.counter("logging.dropped").value,
+    }
@@ -0,0 +1,217 @@
+"""
+Métricas em memória do processo.
+
+Este módulo fornece contadores e histogramas com janela deslizante
+para instrumentação leve da aplicação, sem dependências externas.
+Os valores são expostos pelos endpoints de diagnóstico.
+"""
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import math
+import os
+import threading
+import time
+
+# Configuração padrão das janelas de observação
+METRICS_WINDOW_SECONDS = float(os.getenv("METRICS_WINDOW_SECONDS", "300"))
+METRICS_MAX_SAMPLES = int(os.getenv("METRICS_MAX_SAMPLES", "2048"))
+
+class Counter:
+    """
+    Contador monotônico seguro para uso entre threads.
+    """
+
+    def __init__(self):
+        """Inicializa o contador em zero."""
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """
+        Incrementa o contador.
+
+        Args:
+            amount: Valor a ser somado
+        """
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        """Valor atual do contador."""
+        return self._value
+
+    def reset(self) -> None:
+        """Zera o contador."""
+        with self._lock:
+            self._value = 0
+
+class RollingHistogram:
+    """
+    Histograma com janela deslizante de observações.
+
+    Mantém no máximo max_samples observações e descarta as mais
+    antigas que window_seconds ao calcular o resumo, de forma que
+    os percentis refletem o comportamento recente.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = METRICS_WINDOW_SECONDS,
+        max_samples: int = METRICS_MAX_SAMPLES
+    ):
+        """
+        Inicializa o histograma.
+
+        Args:
+            window_seconds: Idade máxima das observações consideradas
+            max_samples: Número máximo de observações armazenadas
+        """
+        self.window_seconds = window_seconds
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Registra uma observação.
+
+        Args:
+            value: Valor observado
+        """
+        with self._lock:
+            self._samples.append((time.monotonic(), value))
+            self._total += 1
+
+    def values(self) -> List[float]:
+        """
+        Retorna as observações dentro da janela.
+
+        Returns:
+            Lista de valores observados recentemente
+        """
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            return [value for ts, value in self._samples if ts >= cutoff]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Calcula o resumo estatístico da janela atual.
+
+        Returns:
+            Dicionário com contagem, mínimo, máximo, média e percentis
+        """
+        values = sorted(self.values())
+        summary: Dict[str, Any] = {"count": len(values), "total": self._total}
+        if not values:
+            return summary
+        summary.update({
+            "min": round(values[0], 3),
+            "max": round(values[-1], 3),
+            "mean": round(sum(values) / len(values), 3),
+            "p50": round(_percentile(values, 50), 3),
+            "p90": round(_percentile(values, 90), 3),
+            "p99": round(_percentile(values, 99), 3),
+        })
+        return summary
+
+    def reset(self) -> None:
+        """Descarta todas as observações."""
+        with self._lock:
+            self._samples.clear()
+            self._total = 0
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    Calcula um percentil pelo método nearest-rank.
+
+    Args:
+        sorted_values: Valores já ordenados
+        percent: Percentil desejado (0-100)
+
+    Returns:
+        Valor correspondente ao percentil
+    """
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class MetricsRegistry:
+    """
+    Registro central de métricas nomeadas.
+
+    As métricas são criadas sob demanda no primeiro acesso e
+    identificadas por nomes hierárquicos separados por ponto
+    (ex: "db.pool.sync.checkout_wait_ms").
+    """
+
+    def __init__(self):
+        """Inicializa o registro vazio."""
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        """
+        Obtém (ou cria) um contador.
+
+        Args:
+            name: Nome da métrica
+
+        Returns:
+            Contador associado ao nome
+        """
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+        return counter
+
+    def histogram(self, name: str) -> RollingHistogram:
+        """
+        Obtém (ou cria) um histograma.
+
+        Args:
+            name: Nome da métrica
+
+        Returns:
+            Histograma associado ao nome
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, RollingHistogram())
+        return histogram
+
+    def snapshot(self, prefix: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Gera um resumo de todas as métricas registradas.
+
+        Args:
+            prefix: Se informado, inclui apenas métricas com este prefixo
+
+        Returns:
+            Dicionário com contadores e histogramas
+        """
+        def selected(name: str) -> bool:
+            return prefix is None or name.startswith(prefix)
+
+        return {
+            "counters": {
+                name: counter.value
+                for name, counter in sorted(self._counters.items()) if selected(name)
+            },
+            "histograms": {
+                name: histogram.snapshot()
+                for name, histogram in sorted(self._histograms.items()) if selected(name)
+            },
+        }
+
+    def reset(self) -> None:
+        """Zera todas as métricas registradas."""
+        for counter in list(self._counters.values()):
+            counter.reset()
+        for histogram in list(self._histograms.values()):
+            histogram.reset()
+
+# Registro global da aplicação
+metrics = MetricsRegistry()
@@ -0,0 +1,119 @@
+"""
+Proteção contra SSRF nos webhooks enviados.
+
+As URLs dos assinantes são informadas por clientes da API; sem
+verificação, o despachante poderia ser usado para alcançar serviços
+internos (localhost, rede privada, metadados da nuvem em
+169.254.169.254). resolve_destination() resolve o host e recusa a URL
+se algum endereço não for público (privado, loopback, link-local,
+reservado ou multicast). O envio usa o endereço verificado
+(pinned_request), de forma que uma nova resolução de DNS entre a
+verificação e a conexão não muda o destino.
+
+WEBHOOK_OUTBOUND_ALLOW_PRIVATE=true desativa a verificação de endereços
+(ex: receptor de teste em localhost); a resolução e a fixação do
+endereço continuam.
+"""
+from typing import Any, Dict, List, Tuple
+import asyncio
+import ipaddress
+import os
+import socket
+
+import httpx
+
+# Permite destinos em endereços não públicos (apenas desenvolvimento)
+WEBHOOK_OUTBOUND_ALLOW_PRIVATE = os.getenv("WEBHOOK_OUTBOUND_ALLOW_PRIVATE", "false").lower() == "true"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+class UnsafeDestinationError(ValueError):
+    """URL de webhook que não pode ser usada como destino."""
+
+def is_public_address(address: str) -> bool:
+    """
+    Verifica se um endereço IP é público.
+
+    Args:
+        address: Endereço IPv4 ou IPv6
+
+    Returns:
+        bool: False para endereços privados, loopback, link-local,
+        reservados, multicast ou não especificados
+    """
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+async def resolve_addresses(host: str, port: int) -> List[str]:
+    """
+    Resolve um host sem bloquear o event loop.
+
+    Args:
+        host: Nome ou endereço do host
+        port: Porta de destino
+
+    Returns:
+        Endereços IP, na ordem retornada pelo resolvedor
+
+    Raises:
+        OSError: Se o host não puder ser resolvido
+    """
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+async def resolve_destination(url: str) -> Tuple[httpx.URL, str]:
+    """
+    Valida a URL de um assinante e escolhe o endereço de conexão.
+
+    Args:
+        url: URL do assinante
+
+    Returns:
+        Tupla (URL interpretada, endereço IP verificado)
+
+    Raises:
+        UnsafeDestinationError: Se a URL for inválida ou o host resolver
+            para um endereço não público
+        OSError: Se o host não puder ser resolvido
+    """
+    try:
+        parsed = httpx.URL(url)
+    except httpx.InvalidURL as e:
+        raise UnsafeDestinationError(f"URL inválida: {e}")
+    if parsed.scheme not in DEFAULT_PORTS or not parsed.host:
+        raise UnsafeDestinationError("URL deve ser http ou https e conter o host")
+
+    host = parsed.raw_host.decode("ascii")
+    addresses = await resolve_addresses(host, parsed.port or DEFAULT_PORTS[parsed.scheme])
+    if not addresses:
+        raise OSError(f"Host {host} sem endereços")
+    if not WEBHOOK_OUTBOUND_ALLOW_PRIVATE:
+        blocked = [address for address in addresses if not is_public_address(address)]
+        if blocked:
+            raise UnsafeDestinationError(
+                f"Host {host} resolve para endereço não público ({blocked[0]})"
+            )
+    return parsed, addresses[0]
+
+def pinned_request(url: httpx.URL, address: str) -> Dict[str, Any]:
+    """
+    Monta os argumentos de uma requisição ao endereço já verificado.
+
+    A conexão vai ao IP, enquanto o cabeçalho Host e o SNI/verificação
+    do certificado TLS continuam usando o nome original.
+
+    Args:
+        url: URL interpretada por resolve_destination
+        address: Endereço IP verificado
+
+    Returns:
+        Dicionário com url, headers e extensions para httpx
+    """
+    extensions = {"sni_hostname": url.raw_host.decode("ascii")} if url.scheme == "https" else {}
+    return {
+        "url": url.copy_with(host=address),
+        "headers": {"Host": url.netloc.decode("ascii")},
+        "extensions": extensions,
+    }
@@ -0,0 +1,589 @@
+"""
+Envio de webhooks aos assinantes.
+
+Consumidores que consultavam GET /webhooks/data periodicamente podem
+registrar uma assinatura (tabela webhook_subscription) e receber as
+mudanças por push. As mudanças publicam eventos com publish_event(),
+que grava uma entrega por assinante na tabela webhook_outbound_delivery
+dentro da mesma transação da mudança: o evento só existe se a mudança
+for confirmada, e não se perde se o processo reiniciar antes do envio.
+Os assinantes são lidos na própria transação da mudança, de forma que
+um assinante recém-criado recebe os eventos de todos os processos.
+
+Um despachante em background (iniciado no lifespan da aplicação)
+reserva as entregas pendentes e as envia com um httpx.AsyncClient
+compartilhado, que mantém as conexões abertas (keep-alive) entre
+entregas. Cada assinante tem um limite de entregas simultâneas, somando
+todos os processos (contado pelas entregas em "delivering"), de forma
+que um destino lento não ocupa todas as conexões. Falhas de rede,
+408, 425, 429 e 5xx são repetidas com backoff exponencial; as demais
+respostas de erro encerram a entrega como failed.
+
+Cada entrega é um POST com o corpo {"event_type", "data", "timestamp"}
+(o mesmo formato de WebhookPayload) assinado como em verify_webhook:
+X-Hub-Signature com o HMAC-SHA256 do corpo em hexadecimal, usando o
+segredo do assinante. X-Webhook-Delivery identifica a entrega e se
+repete nas novas tentativas, para que o assinante descarte duplicatas.
+
+Antes de cada tentativa o host do assinante é resolvido e verificado
+(services/network_guard.py): destinos em endereços não públicos
+encerram a entrega como failed, e a conexão usa o endereço verificado.
+Redirecionamentos não são seguidos.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import time
+import uuid
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.webhook_outbound_delivery import WebhookOutboundDelivery
+from ..models.webhook_subscription import WebhookSubscription
+from .database import AsyncSessionLocal
+from .metrics import metrics
+from .network_guard import UnsafeDestinationError, pinned_request, resolve_destination
+
+# Configuração de logging
+logger = logging.getLogger("api.outbound_webhooks")
+
+# Configuração do envio
+WEBHOOK_OUTBOUND_ENABLED = os.getenv("WEBHOOK_OUTBOUND_ENABLED", "true").lower() == "true"
+WEBHOOK_OUTBOUND_TIMEOUT = float(os.getenv("WEBHOOK_OUTBOUND_TIMEOUT", "10"))
+WEBHOOK_OUTBOUND_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_OUTBOUND_MAX_CONNECTIONS", "100"))
+WEBHOOK_OUTBOUND_MAX_KEEPALIVE = int(os.getenv("WEBHOOK_OUTBOUND_MAX_KEEPALIVE", "20"))
+WEBHOOK_OUTBOUND_CONCURRENCY = int(os.getenv("WEBHOOK_OUTBOUND_CONCURRENCY", "4"))
+WEBHOOK_OUTBOUND_BATCH = int(os.getenv("WEBHOOK_OUTBOUND_BATCH", "50"))
+WEBHOOK_OUTBOUND_POLL_INTERVAL = float(os.getenv("WEBHOOK_OUTBOUND_POLL_INTERVAL", "1.0"))
+WEBHOOK_OUTBOUND_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_OUTBOUND_MAX_ATTEMPTS", "8"))
+WEBHOOK_OUTBOUND_RETRY_BASE_SECONDS = float(os.getenv("WEBHOOK_OUTBOUND_RETRY_BASE_SECONDS", "2"))
+WEBHOOK_OUTBOUND_RETRY_MAX_SECONDS = float(os.getenv("WEBHOOK_OUTBOUND_RETRY_MAX_SECONDS", "3600"))
+WEBHOOK_OUTBOUND_LOCK_TIMEOUT = float(os.getenv("WEBHOOK_OUTBOUND_LOCK_TIMEOUT", "300"))
+
+# Estados de uma entrega
+STATUS_PENDING = "pending"
+STATUS_DELIVERING = "delivering"
+STATUS_DELIVERED = "delivered"
+STATUS_FAILED = "failed"
+
+# Eventos publicados pela API
+EVENT_SOCIAL_MEDIA_CREATED = "social_media.created"
+EVENT_SOCIAL_MEDIA_UPDATED = "social_media.updated"
+EVENT_SOCIAL_MEDIA_DELETED = "social_media.deleted"
+OUTBOUND_EVENT_TYPES = (EVENT_SOCIAL_MEDIA_CREATED, EVENT_SOCIAL_MEDIA_UPDATED, EVENT_SOCIAL_MEDIA_DELETED)
+
+# Respostas repetidas com backoff (além de 5xx e falhas de rede)
+RETRYABLE_STATUS = frozenset({408, 425, 429})
+
+# Caracteres da resposta guardados no registro de entregas
+RESPONSE_BODY_LIMIT = 1000
+
+USER_AGENT = "MibiTech-Webhooks/1.0"
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """
+    Assina o corpo de uma entrega.
+
+    Args:
+        secret: Segredo do assinante
+        body: Corpo enviado
+
+    Returns:
+        HMAC-SHA256 do corpo em hexadecimal (valor de X-Hub-Signature)
+    """
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def delivery_body(delivery: WebhookOutboundDelivery) -> bytes:
+    """
+    Monta o corpo de uma entrega no formato de WebhookPayload.
+
+    Args:
+        delivery: Entrega a ser enviada
+
+    Returns:
+        Corpo JSON em bytes
+    """
+    return json.dumps(
+        {
+            "event_type": delivery.event_type,
+            "data": delivery.payload,
+            "timestamp": delivery.created_at.isoformat(),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+async def active_subscriptions(db: AsyncSession) -> List[Tuple[int, Optional[frozenset]]]:
+    """
+    Obtém os assinantes ativos e os tipos de evento de cada um.
+
+    A consulta (coberta por ix_webhook_subscription_active) roda na
+    transação recebida, sem cache por processo: um assinante criado em
+    qualquer processo recebe os eventos publicados depois do seu commit.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+
+    Returns:
+        Lista de (ID do assinante, tipos assinados ou None para todos)
+    """
+    result = await db.execute(
+        select(WebhookSubscription.id, WebhookSubscription.event_types)
+        .where(WebhookSubscription.active.is_(True))
+    )
+    return [
+        (subscription_id, frozenset(event_types) if event_types else None)
+        for subscription_id, event_types in result.all()
+    ]
+
+async def publish_event(db: AsyncSession, event_type: str, data: Dict[str, Any]) -> int:
+    """
+    Registra a entrega de um evento para cada assinante interessado.
+
+    Não faz commit: deve ser chamada antes do commit da mudança que
+    gerou o evento, para que evento e mudança sejam gravados juntos.
+    Após o commit, chame outbound_dispatcher.notify() para enviar sem
+    esperar o próximo ciclo do despachante.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        event_type: Tipo do evento (ex: social_media.updated)
+        data: Dados do evento
+
+    Returns:
+        Número de entregas registradas
+    """
+    subscriptions = await active_subscriptions(db)
+    if not subscriptions:
+        return 0
+    payload = jsonable_encoder(data)
+    now = datetime.utcnow()
+    count = 0
+    for subscription_id, event_types in subscriptions:
+        if event_types is not None and event_type not in event_types:
+            continue
+        db.add(WebhookOutboundDelivery(
+            delivery_id=uuid.uuid4().hex,
+            subscription_id=subscription_id,
+            event_type=event_type,
+            payload=payload,
+            status=STATUS_PENDING,
+            attempts=0,
+            available_at=now,
+        ))
+        count += 1
+    if count:
+        metrics.counter("webhook.outbound.published").inc(count)
+    return count
+
+def _claimable(now: datetime) -> Any:
+    """
+    Condição das entregas que podem ser reservadas.
+
+    Inclui entregas pendentes já disponíveis e entregas reservadas há
+    mais de WEBHOOK_OUTBOUND_LOCK_TIMEOUT segundos (processo que parou).
+    """
+    stale = now - timedelta(seconds=WEBHOOK_OUTBOUND_LOCK_TIMEOUT)
+    return or_(
+        and_(WebhookOutboundDelivery.status == STATUS_PENDING, WebhookOutboundDelivery.available_at <= now),
+        and_(WebhookOutboundDelivery.status == STATUS_DELIVERING, WebhookOutboundDelivery.locked_at < stale),
+    )
+
+async def claim_deliveries(
+    db: AsyncSession,
+    limit: int
+) -> List[Tuple[WebhookOutboundDelivery, WebhookSubscription]]:
+    """
+    Reserva entregas respeitando o limite de concorrência de cada assinante.
+
+    As candidatas são escolhidas em ordem de criação, no máximo
+    max_concurrency menos as entregas em andamento por assinante, e
+    reservadas com um UPDATE ... RETURNING condicional ao estado atual,
+    que só tem efeito para um dos processos concorrentes.
+
+    As entregas em andamento são as linhas em "delivering" com reserva
+    dentro de WEBHOOK_OUTBOUND_LOCK_TIMEOUT, de todos os processos. No
+    PostgreSQL, as linhas dos assinantes ficam bloqueadas (FOR UPDATE)
+    da contagem até o commit da reserva, para que dois processos não
+    usem a mesma vaga.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        limit: Número máximo de entregas
+
+    Returns:
+        Lista de (entrega reservada, assinante)
+    """
+    now = datetime.utcnow()
+    candidates = (await db.execute(
+        select(WebhookOutboundDelivery.id, WebhookOutboundDelivery.subscription_id, WebhookSubscription.max_concurrency)
+        .join(WebhookSubscription, WebhookSubscription.id == WebhookOutboundDelivery.subscription_id)
+        .where(_claimable(now), WebhookSubscription.active.is_(True))
+        .order_by(WebhookOutboundDelivery.id)
+        .limit(limit * 4)
+    )).all()
+    if not candidates:
+        return []
+
+    subscription_ids = sorted({subscription_id for _, subscription_id, _ in candidates})
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(
+            select(WebhookSubscription.id)
+            .where(WebhookSubscription.id.in_(subscription_ids))
+            .order_by(WebhookSubscription.id)
+            .with_for_update()
+        )
+    stale = now - timedelta(seconds=WEBHOOK_OUTBOUND_LOCK_TIMEOUT)
+    inflight = dict((await db.execute(
+        select(WebhookOutboundDelivery.subscription_id, func.count())
+        .where(
+            WebhookOutboundDelivery.status == STATUS_DELIVERING,
+            WebhookOutboundDelivery.locked_at >= stale,
+            WebhookOutboundDelivery.subscription_id.in_(subscription_ids),
+        )
+        .group_by(WebhookOutboundDelivery.subscription_id)
+    )).all())
+
+    picked = []
+    taken: Dict[int, int] = {}
+    for delivery_id, subscription_id, max_concurrency in candidates:
+        in_use = inflight.get(subscription_id, 0) + taken.get(subscription_id, 0)
+        if in_use < max(1, max_concurrency):
+            taken[subscription_id] = taken.get(subscription_id, 0) + 1
+            picked.append(delivery_id)
+            if len(picked) >= limit:
+                break
+    if not picked:
+        await db.rollback()
+        return []
+
+    result = await db.execute(
+        update(WebhookOutboundDelivery)
+        .where(WebhookOutboundDelivery.id.in_(picked), _claimable(now))
+        .values(
+            status=STATUS_DELIVERING,
+            locked_at=now,
+            attempts=WebhookOutboundDelivery.attempts + 1,
+        )
+        .returning(WebhookOutboundDelivery.id)
+    )
+    claimed = result.scalars().all()
+    await db.commit()
+    if not claimed:
+        return []
+    result = await db.execute(
+        select(WebhookOutboundDelivery, WebhookSubscription)
+        .join(WebhookSubscription, WebhookSubscription.id == WebhookOutboundDelivery.subscription_id)
+        .where(WebhookOutboundDelivery.id.in_(claimed))
+        .order_by(WebhookOutboundDelivery.id)
+    )
+    return [(delivery, subscription) for delivery, subscription in result.all()]
+
+async def count_deliveries_by_status(db: AsyncSession) -> Dict[str, int]:
+    """
+    Conta as entregas por estado.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+
+    Returns:
+        Dicionário de estado para número de entregas
+    """
+    result = await db.execute(
+        select(WebhookOutboundDelivery.status, func.count()).group_by(WebhookOutboundDelivery.status)
+    )
+    return {status: count for status, count in result.all()}
+
+def retry_delay(attempts: int, retry_after: Optional[str] = None) -> float:
+    """
+    Calcula a espera até a próxima tentativa.
+
+    Backoff exponencial com jitter (entre metade e o valor cheio), para
+    que entregas que falharam juntas não voltem juntas; um Retry-After
+    em segundos enviado pelo assinante é respeitado.
+
+    Args:
+        attempts: Tentativas já feitas
+        retry_after: Valor do cabeçalho Retry-After da resposta
+
+    Returns:
+        Espera em segundos, no máximo WEBHOOK_OUTBOUND_RETRY_MAX_SECONDS
+    """
+    delay = WEBHOOK_OUTBOUND_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    delay = min(delay, WEBHOOK_OUTBOUND_RETRY_MAX_SECONDS) * random.uniform(0.5, 1.0)
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return min(delay, WEBHOOK_OUTBOUND_RETRY_MAX_SECONDS)
+
+class OutboundWebhookDispatcher:
+    """
+    Despachante de entregas de webhooks aos assinantes.
+
+    Um laço reserva as entregas disponíveis enquanto houver conexões
+    livres e cria uma tarefa por entrega; as tarefas compartilham o
+    mesmo httpx.AsyncClient. O número de entregas em andamento por
+    assinante, somando todos os processos, não passa de max_concurrency
+    (ver claim_deliveries).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = WEBHOOK_OUTBOUND_ENABLED,
+        batch_size: int = WEBHOOK_OUTBOUND_BATCH,
+        poll_interval: float = WEBHOOK_OUTBOUND_POLL_INTERVAL,
+        max_connections: int = WEBHOOK_OUTBOUND_MAX_CONNECTIONS
+    ):
+        """
+        Inicializa o despachante (o envio só começa após start()).
+
+        Args:
+            enabled: Se este processo envia entregas
+            batch_size: Entregas reservadas por vez
+            poll_interval: Intervalo máximo entre consultas, em segundos
+            max_connections: Entregas simultâneas no total (tamanho do pool)
+        """
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_connections = max_connections
+        self.client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def start(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """
+        Cria o cliente HTTP e inicia o laço no event loop atual.
+
+        Args:
+            transport: Transporte do httpx (ex: httpx.ASGITransport com um
+                receptor de teste); por padrão, conexões HTTP reais
+        """
+        if self._task or not self.enabled:
+            return
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(WEBHOOK_OUTBOUND_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=WEBHOOK_OUTBOUND_MAX_KEEPALIVE,
+            ),
+            headers={"User-Agent": USER_AGENT, "Content-Type": "application/json"},
+        )
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Despachante de webhooks iniciado (%d conexões)", self.max_connections)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Encerra o laço, aguarda as entregas em andamento e fecha o cliente.
+
+        Entregas interrompidas voltam à fila após WEBHOOK_OUTBOUND_LOCK_TIMEOUT.
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+        """
+        if not self._task:
+            return
+        self._stopping = True
+        self.notify()
+        tasks = [self._task, *self._inflight]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.client.aclose()
+        self._task = None
+        self.client = None
+        logger.info("Despachante de webhooks encerrado")
+
+    def notify(self) -> None:
+        """Acorda o laço (novas entregas ou conexão liberada)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait(self) -> None:
+        """Aguarda notificação ou o intervalo de consulta."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self) -> None:
+        """Laço de reserva e despacho das entregas."""
+        while not self._stopping:
+            capacity = self.max_connections - len(self._inflight)
+            deliveries = []
+            if capacity > 0:
+                try:
+                    async with AsyncSessionLocal() as db:
+                        deliveries = await claim_deliveries(db, min(self.batch_size, capacity))
+                except Exception as e:
+                    logger.error("Erro ao reservar entregas de webhook: %s", e)
+
+            if not deliveries:
+                await self._wait()
+                continue
+
+            for delivery, subscription in deliveries:
+                task = asyncio.create_task(self.deliver(delivery, subscription))
+                self._inflight.add(task)
+                task.add_done_callback(self._release)
+
+    def _release(self, task: asyncio.Task) -> None:
+        """Libera a conexão ao fim da entrega (a vaga do assinante é liberada no banco)."""
+        self._inflight.discard(task)
+        self.notify()
+
+    async def deliver(self, delivery: WebhookOutboundDelivery, subscription: WebhookSubscription) -> None:
+        """
+        Envia uma entrega reservada e registra o resultado.
+
+        Args:
+            delivery: Entrega reservada por claim_deliveries
+            subscription: Assinante de destino
+        """
+        body = delivery_body(delivery)
+        headers = {
+            "X-Hub-Signature": sign_payload(subscription.secret, body),
+            "X-Webhook-Delivery": delivery.delivery_id,
+            "X-Webhook-Event": delivery.event_type,
+        }
+        status_code = None
+        response_body = None
+        retry_after = None
+        error = None
+        blocked = False
+        started = time.perf_counter()
+        try:
+            url, address = await resolve_destination(subscription.url)
+            request = pinned_request(url, address)
+            response = await self.client.post(
+                request["url"],
+                content=body,
+                headers={**headers, **request["headers"]},
+                extensions=request["extensions"]
+            )
+            status_code = response.status_code
+            response_body = response.text[:RESPONSE_BODY_LIMIT]
+            retry_after = response.headers.get("retry-after")
+        except UnsafeDestinationError as e:
+            metrics.counter("webhook.outbound.blocked").inc()
+            error = str(e)
+            blocked = True
+        except (httpx.HTTPError, OSError) as e:
+            error = f"{type(e).__name__}: {e}"
+        duration_ms = (time.perf_counter() - started) * 1000
+        metrics.histogram("webhook.outbound.duration_ms").observe(duration_ms)
+
+        values: Dict[str, Any] = {
+            "response_status": status_code,
+            "response_body": response_body,
+            "duration_ms": round(duration_ms, 2),
+        }
+        if status_code is not None and 200 <= status_code < 300:
+            metrics.counter("webhook.outbound.delivered").inc()
+            await self._update(delivery, status=STATUS_DELIVERED, error=None,
+                               delivered_at=datetime.utcnow(), **values)
+            return
+
+        error = error or f"HTTP {status_code}"
+        retryable = not blocked and (status_code is None or status_code >= 500 or status_code in RETRYABLE_STATUS)
+        if not retryable or delivery.attempts >= WEBHOOK_OUTBOUND_MAX_ATTEMPTS:
+            metrics.counter("webhook.outbound.failed").inc()
+            logger.error(
+                "Entrega de webhook %s para %s falhou após %d tentativa(s): %s",
+                delivery.delivery_id, subscription.url, delivery.attempts, error
+            )
+            await self._update(delivery, status=STATUS_FAILED, error=error, **values)
+            return
+
+        delay = retry_delay(delivery.attempts, retry_after)
+        metrics.counter("webhook.outbound.retried").inc()
+        logger.warning(
+            "Entrega de webhook %s para %s falhou (tentativa %d), nova tentativa em %.1fs: %s",
+            delivery.delivery_id, subscription.url, delivery.attempts, delay, error
+        )
+        await self._update(
+            delivery,
+            status=STATUS_PENDING,
+            error=error,
+            available_at=datetime.utcnow() + timedelta(seconds=delay),
+            **values
+        )
+
+    async def _update(self, delivery: WebhookOutboundDelivery, **values: Any) -> bool:
+        """
+        Grava o resultado de uma tentativa e libera a reserva.
+
+        O locked_at gravado na reserva identifica a tentativa: se a
+        reserva expirou (WEBHOOK_OUTBOUND_LOCK_TIMEOUT) e a entrega foi
+        reservada de novo, o resultado desta tentativa é descartado.
+
+        Args:
+            delivery: Entrega enviada
+            values: Colunas a serem alteradas
+
+        Returns:
+            bool: True se o resultado foi gravado
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(WebhookOutboundDelivery)
+                    .where(
+                        WebhookOutboundDelivery.id == delivery.id,
+                        WebhookOutboundDelivery.locked_at == delivery.locked_at,
+                    )
+                    .values(locked_at=None, **values)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error("Erro ao registrar entrega de webhook %s: %s", delivery.delivery_id, e)
+            return False
+        if result.rowcount == 0:
+            metrics.counter("webhook.outbound.lock_lost").inc()
+            logger.warning(
+                "Reserva da entrega de webhook %s expirou antes do fim do envio; resultado descartado",
+                delivery.delivery_id
+            )
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém o estado do despachante.
+
+        Returns:
+            Dicionário com configuração, entregas em andamento e contadores
+        """
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "max_connections": self.max_connections,
+            "inflight": len(self._inflight),
+            "max_attempts": WEBHOOK_OUTBOUND_MAX_ATTEMPTS,
+            "published": metrics.counter("webhook.outbound.published").value,
+            "delivered": metrics.counter("webhook.outbound.delivered").value,
+            "retried": metrics.counter("webhook.outbound.retried").value,
+            "failed": metrics.counter("webhook.outbound.failed").value,
+            "lock_lost": metrics.counter("webhook.outbound.lock_lost").value,
+            "blocked": metrics.counter("webhook.outbound.blocked").value,
+            "duration_ms": metrics.histogram("webhook.outbound.duration_ms").snapshot(),
+        }
+
+# Despachante global de webhooks enviados
+outbound_dispatcher = OutboundWebhookDispatcher()
@@ -0,0 +1,178 @@
+"""
+Serviços de paginação.
+
+Este módulo implementa paginação por cursor (keyset), em que cada
+página continua a partir da última chave da página anterior em vez
+de pular registros com OFFSET. O custo de uma página profunda é o
+mesmo da primeira, desde que exista índice para a ordenação usada.
+"""
+from sqlalchemy import Select, tuple_
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+
+from ..errors import ValidationError
+
+# Ordenações suportadas e as colunas que compõem a chave de cada uma.
+# A última coluna deve ser única para que a ordem seja total.
+KEYSET_ORDERINGS: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "updated_at": ("updated_at", "id"),
+}
+
+def encode_cursor(order: str, values: Sequence[Any]) -> str:
+    """
+    Codifica a chave de uma linha em um cursor opaco.
+
+    Args:
+        order: Nome da ordenação usada
+        values: Valores das colunas da chave
+
+    Returns:
+        Cursor em base64 url-safe
+    """
+    payload = {
+        "o": order,
+        "v": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor_values(cursor: str, order: str, size: int) -> List[Any]:
+    """
+    Decodifica um cursor opaco nos valores brutos da chave.
+
+    Args:
+        cursor: Cursor recebido do cliente
+        order: Ordenação esperada para o cursor
+        size: Número de valores da chave
+
+    Returns:
+        Valores da chave como gravados no cursor (datas em ISO 8601)
+
+    Raises:
+        ValidationError: Se o cursor for inválido ou de outra ordenação
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+        cursor_order = payload["o"]
+    except Exception:
+        raise ValidationError(message="Cursor de paginação inválido", details={"cursor": cursor})
+
+    if cursor_order != order or not isinstance(values, list) or len(values) != size:
+        raise ValidationError(
+            message="Cursor de paginação não corresponde à ordenação solicitada",
+            details={"cursor": cursor, "order_by": order}
+        )
+    return values
+
+def coerce_cursor_value(value: Any, python_type: type) -> Any:
+    """
+    Converte um valor do cursor para o tipo da coluna.
+
+    Args:
+        value: Valor como gravado no cursor
+        python_type: Tipo Python da coluna (ex: int, datetime)
+
+    Returns:
+        Valor convertido
+
+    Raises:
+        TypeError: Se o valor não for do tipo da coluna
+        ValueError: Se uma data não estiver em ISO 8601
+    """
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise TypeError("data do cursor deve ser uma string ISO 8601")
+        return datetime.fromisoformat(value)
+    # bool é subclasse de int, mas não é uma chave válida
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        raise TypeError(f"valor do cursor deve ser {python_type.__name__}")
+    return value
+
+def decode_cursor(cursor: str, order: str, model: Any) -> List[Any]:
+    """
+    Decodifica um cursor opaco na chave correspondente.
+
+    Cada valor é validado contra o tipo da coluna (inteiro para id,
+    data ISO 8601 para updated_at), de forma que um cursor adulterado
+    resulta em 400 em vez de uma comparação inválida no banco.
+
+    Args:
+        cursor: Cursor recebido do cliente
+        order: Ordenação esperada para o cursor
+        model: Modelo SQLAlchemy paginado
+
+    Returns:
+        Valores das colunas da chave, convertidos para os tipos do modelo
+
+    Raises:
+        ValidationError: Se o cursor for inválido, de outra ordenação ou
+            tiver valores de tipo diferente das colunas
+    """
+    columns = KEYSET_ORDERINGS[order]
+    values = decode_cursor_values(cursor, order, len(columns))
+    try:
+        return [
+            coerce_cursor_value(value, model.__table__.c[name].type.python_type)
+            for name, value in zip(columns, values)
+        ]
+    except (TypeError, ValueError):
+        raise ValidationError(message="Cursor de paginação inválido", details={"cursor": cursor})
+
+def order_columns(model: Any, order: str) -> List[Any]:
+    """
+    Obtém as colunas do modelo usadas por uma ordenação.
+
+    Args:
+        model: Modelo SQLAlchemy paginado
+        order: Nome da ordenação
+
+    Returns:
+        Lista de atributos de coluna do modelo
+    """
+    return [getattr(model, name) for name in KEYSET_ORDERINGS[order]]
+
+def apply_keyset(stmt: Select, model: Any, order: str, cursor: Optional[str], limit: int) -> Select:
+    """
+    Aplica ordenação, filtro de cursor e limite a uma consulta.
+
+    Busca um registro a mais que o limite para que next_cursor
+    saiba se existe próxima página sem uma consulta extra.
+
+    Args:
+        stmt: Consulta base
+        model: Modelo SQLAlchemy paginado
+        order: Nome da ordenação
+        cursor: Cursor da página anterior (vazio ou None para a primeira)
+        limit: Tamanho da página
+
+    Returns:
+        Consulta paginada
+    """
+    columns = order_columns(model, order)
+    if cursor:
+        values = decode_cursor(cursor, order, model)
+        stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+    return stmt.order_by(*columns).limit(limit + 1)
+
+def split_page(rows: Sequence[Any], order: str, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Separa a página dos resultados e calcula o próximo cursor.
+
+    Args:
+        rows: Linhas retornadas por uma consulta de apply_keyset
+        order: Nome da ordenação
+        limit: Tamanho da página
+
+    Returns:
+        Tupla (linhas da página, próximo cursor ou None na última página)
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(order, [getattr(last, name) for name in KEYSET_ORDERINGS[order]])
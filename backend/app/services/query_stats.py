@@ -0,0 +1,148 @@
+"""
+Estatísticas de consultas SQL por requisição.
+
+Este módulo mantém, em uma variável de contexto, a contagem de
+comandos SQL e o tempo acumulado no banco de dados durante cada
+requisição. Os eventos de cursor dos engines (services/database.py)
+alimentam as estatísticas e o middleware QueryStatsMiddleware as
+publica em cabeçalhos de resposta e métricas.
+"""
+from contextvars import ContextVar
+from collections import Counter as StatementCounter
+from typing import Any, Dict, Optional
+import logging
+import os
+
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.query_stats")
+
+# Configuração do orçamento de consultas
+DB_QUERY_STATS = os.getenv("DB_QUERY_STATS", "true").lower() == "true"
+DB_QUERY_BUDGET = int(os.getenv("DB_QUERY_BUDGET", "10"))
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+
+class QueryStats:
+    """
+    Estatísticas de consultas de uma única requisição.
+    """
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa as estatísticas zeradas.
+
+        Args:
+            scope: Escopo ASGI da requisição, usado para identificar a rota
+        """
+        self.scope = scope or {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: StatementCounter = StatementCounter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        """
+        Registra a execução de um comando SQL.
+
+        Args:
+            statement: Texto SQL parametrizado
+            elapsed_ms: Duração da execução em milissegundos
+        """
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    @property
+    def route(self) -> str:
+        """Rota da requisição (disponível após o roteamento)."""
+        return route_name(self.scope)
+
+    def repeated_statements(self, threshold: int = DB_N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """
+        Obtém comandos repetidos acima do limite (suspeitas de N+1).
+
+        Args:
+            threshold: Número de repetições a partir do qual o comando é suspeito
+
+        Returns:
+            Dicionário de comando SQL para número de execuções
+        """
+        return {sql: count for sql, count in self.statements.items() if count >= threshold}
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    """
+    Obtém as estatísticas da requisição atual.
+
+    Returns:
+        Estatísticas da requisição ou None fora de uma requisição
+    """
+    return _current_stats.get()
+
+def route_name(scope: Dict[str, Any]) -> str:
+    """
+    Identifica a rota de uma requisição para uso em métricas.
+
+    Usa o caminho do template da rota (ex: /api/v1/social-media/{social_media_id})
+    para manter baixa a cardinalidade das métricas.
+
+    Args:
+        scope: Escopo ASGI da requisição
+
+    Returns:
+        Método e caminho do template, ou "unmatched" se nenhuma rota correspondeu
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return f"{scope.get('method', '-')} unmatched"
+    return f"{scope.get('method', '-')} {path}"
+
+def start_request_stats(scope: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Inicia a coleta de estatísticas para a requisição atual.
+
+    Args:
+        scope: Escopo ASGI da requisição
+
+    Returns:
+        Token para restaurar o contexto anterior em finish_request_stats
+    """
+    return _current_stats.set(QueryStats(scope))
+
+def finish_request_stats(token: Any) -> Optional[QueryStats]:
+    """
+    Encerra a coleta, registra métricas e avisa sobre excessos.
+
+    Args:
+        token: Token retornado por start_request_stats
+
+    Returns:
+        Estatísticas coletadas na requisição
+    """
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    if stats is None:
+        return None
+
+    route = stats.route
+
+    metrics.histogram(f"db.route.{route}.query_count").observe(stats.count)
+    metrics.histogram(f"db.route.{route}.query_time_ms").observe(stats.total_ms)
+
+    if stats.count > DB_QUERY_BUDGET:
+        metrics.counter(f"db.route.{route}.budget_exceeded").inc()
+        logger.warning(
+            "Orçamento de consultas excedido em %s: %d comandos (limite %d, %.2fms no banco)",
+            route, stats.count, DB_QUERY_BUDGET, stats.total_ms
+        )
+
+    for sql, count in stats.repeated_statements().items():
+        metrics.counter(f"db.route.{route}.n_plus_one").inc()
+        logger.warning(
+            "Possível N+1 em %s: comando executado %d vezes: %s",
+            route, count, " ".join(sql.split())[:200]
+        )
+
+    return stats
@@ -0,0 +1,171 @@
+"""
+Limite de taxa e de concorrência dos endpoints de webhook.
+
+Cada origem (endereço do cliente) tem um token bucket: recebe
+WEBHOOK_RATE_LIMIT_RPS fichas por segundo, acumula no máximo
+WEBHOOK_RATE_LIMIT_BURST e cada requisição consome uma. Além disso, o
+número de requisições de webhook em andamento no processo é limitado
+por WEBHOOK_MAX_CONCURRENCY. Requisições acima dos limites recebem 429
+com Retry-After antes de ler o corpo ou abrir uma sessão do banco, de
+forma que um remetente com defeito não esgota os workers e as conexões
+usados pelo tráfego do site.
+
+O estado fica no event loop: buckets são listas [fichas, último
+acesso] em um dicionário e o contador de concorrência é um inteiro,
+alterados sem await entre leitura e escrita, portanto sem locks. O
+dicionário é limitado por WEBHOOK_RATE_LIMIT_MAX_SOURCES; ao exceder o
+limite, os buckets já cheios (origens ociosas) são descartados, o que
+não altera o resultado para nenhuma origem.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import math
+import os
+import time
+
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.rate_limit")
+
+# Configuração dos limites (0 desativa o limite correspondente)
+WEBHOOK_RATE_LIMIT_RPS = float(os.getenv("WEBHOOK_RATE_LIMIT_RPS", "20"))
+WEBHOOK_RATE_LIMIT_BURST = float(os.getenv("WEBHOOK_RATE_LIMIT_BURST", "40"))
+WEBHOOK_RATE_LIMIT_MAX_SOURCES = int(os.getenv("WEBHOOK_RATE_LIMIT_MAX_SOURCES", "10000"))
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "64"))
+# Usa o primeiro endereço de X-Forwarded-For (apenas atrás de um proxy confiável)
+WEBHOOK_RATE_LIMIT_TRUST_PROXY = os.getenv("WEBHOOK_RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+# Motivos de rejeição
+REASON_RATE = "rate"
+REASON_CONCURRENCY = "concurrency"
+
+class WebhookRateLimiter:
+    """
+    Token buckets por origem e limite global de requisições simultâneas.
+    """
+
+    def __init__(
+        self,
+        rate: float = WEBHOOK_RATE_LIMIT_RPS,
+        burst: float = WEBHOOK_RATE_LIMIT_BURST,
+        max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+        max_sources: int = WEBHOOK_RATE_LIMIT_MAX_SOURCES
+    ):
+        """
+        Inicializa o limitador.
+
+        Args:
+            rate: Fichas por segundo de cada origem (0 sem limite)
+            burst: Capacidade do bucket (rajada máxima)
+            max_concurrency: Requisições simultâneas (0 sem limite)
+            max_sources: Número máximo de buckets mantidos
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_concurrency = max_concurrency
+        self.max_sources = max_sources
+        self.in_flight = 0
+        self._buckets: Dict[str, List[float]] = {}
+
+    def take(self, source: str) -> Optional[float]:
+        """
+        Consome uma ficha do bucket da origem.
+
+        Args:
+            source: Identificador da origem
+
+        Returns:
+            None se a requisição for aceita, ou os segundos até a
+            próxima ficha
+        """
+        if self.rate <= 0:
+            return None
+        now = time.monotonic()
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            if len(self._buckets) >= self.max_sources:
+                self._evict(now)
+            self._buckets[source] = [self.burst - 1.0, now]
+            return None
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1.0:
+            bucket[0] = tokens - 1.0
+            return None
+        bucket[0] = tokens
+        return (1.0 - tokens) / self.rate
+
+    def _evict(self, now: float) -> None:
+        """
+        Descarta os buckets cheios (origens ociosas).
+
+        Se nenhum estiver cheio, descarta os mais antigos até liberar
+        metade do espaço.
+
+        Args:
+            now: Momento de referência
+        """
+        idle = self.burst / self.rate
+        expired = [source for source, (_, last) in self._buckets.items() if now - last >= idle]
+        if not expired:
+            expired = list(self._buckets)[:max(1, self.max_sources // 2)]
+        for source in expired:
+            del self._buckets[source]
+        metrics.counter("webhook.rate_limit.evicted").inc(len(expired))
+
+    def acquire(self, source: str) -> Tuple[Optional[str], float]:
+        """
+        Admite uma requisição da origem.
+
+        Requisições admitidas devem chamar release() ao terminar.
+
+        Args:
+            source: Identificador da origem
+
+        Returns:
+            (None, 0) se a requisição for aceita, ou (motivo, segundos
+            sugeridos para Retry-After)
+        """
+        if self.max_concurrency > 0 and self.in_flight >= self.max_concurrency:
+            metrics.counter(f"webhook.rate_limit.rejected.{REASON_CONCURRENCY}").inc()
+            return REASON_CONCURRENCY, 1.0
+        wait = self.take(source)
+        if wait is not None:
+            metrics.counter(f"webhook.rate_limit.rejected.{REASON_RATE}").inc()
+            logger.debug("Webhook de %s acima do limite de taxa", source)
+            return REASON_RATE, wait
+        self.in_flight += 1
+        return None, 0.0
+
+    def release(self) -> None:
+        """Libera a vaga de uma requisição admitida."""
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém a configuração e os contadores do limitador.
+
+        Returns:
+            Dicionário com limites, requisições em andamento e rejeições
+        """
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "sources": len(self._buckets),
+            "max_sources": self.max_sources,
+            "rejected": {
+                reason: metrics.counter(f"webhook.rate_limit.rejected.{reason}").value
+                for reason in (REASON_RATE, REASON_CONCURRENCY)
+            },
+            "evicted": metrics.counter("webhook.rate_limit.evicted").value,
+        }
+
+def retry_after(seconds: float) -> str:
+    """Formata o cabeçalho Retry-After (segundos inteiros, no mínimo 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+# Limitador global (aplicado por WebhookRateLimitMiddleware em app/middleware.py)
+webhook_rate_limiter = WebhookRateLimiter()
@@ -0,0 +1,20 @@
+"""
+Classes de resposta da aplicação.
+
+CodecJSONResponse serializa o conteúdo com o codec de
+services/json_codec.py (orjson, quando instalado) e é a classe de
+resposta padrão da aplicação e dos manipuladores de erro.
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from .json_codec import json_codec
+
+class CodecJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com o codec global.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
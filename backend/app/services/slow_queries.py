@@ -0,0 +1,266 @@
+"""
+Registro de consultas lentas.
+
+Este módulo captura comandos SQL que excedem DB_SLOW_QUERY_MS,
+registrando o SQL normalizado, o formato dos parâmetros (nunca os
+valores), a duração e a rota de origem. Opcionalmente executa
+EXPLAIN para o comando, isolado em um savepoint. Os registros ficam
+em um buffer circular em memória e são anexados a um arquivo JSONL.
+"""
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from .logging_setup import queued_handler
+from .metrics import metrics
+from .query_stats import current_query_stats
+
+# Configuração de logging
+logger = logging.getLogger("api.slow_queries")
+
+# Configuração do registro de consultas lentas
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+DB_SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "false").lower() == "true"
+DB_SLOW_QUERY_RING_SIZE = int(os.getenv("DB_SLOW_QUERY_RING_SIZE", "200"))
+DB_SLOW_QUERY_LOG_FILE = os.getenv("DB_SLOW_QUERY_LOG_FILE", "logs/slow_queries.jsonl")
+
+# Comandos para os quais EXPLAIN é seguro (não executa o comando)
+EXPLAINABLE_PREFIXES = ("select", "insert", "update", "delete", "with")
+# Savepoint que isola o EXPLAIN da transação da requisição
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\([^()]*\)", re.IGNORECASE)
+
+def normalize_sql(statement: str) -> str:
+    """
+    Normaliza um comando SQL para agrupamento.
+
+    Remove espaços redundantes, substitui literais por ? e reduz
+    listas IN (...) a um único marcador, de forma que comandos que
+    diferem apenas nos valores tenham o mesmo texto.
+
+    Args:
+        statement: Texto SQL original
+
+    Returns:
+        Texto SQL normalizado
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _IN_LIST.sub("IN (...)", normalized)
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Descreve os parâmetros de um comando sem expor os valores.
+
+    Args:
+        parameters: Parâmetros passados ao cursor
+        executemany: Se o comando foi executado em lote
+
+    Returns:
+        Estrutura com os nomes dos tipos de cada parâmetro
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "row": parameter_shape(first)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    if parameters is None:
+        return None
+    return type(parameters).__name__
+
+class SlowQueryLog:
+    """
+    Buffer circular de consultas lentas com persistência em JSONL.
+    """
+
+    def __init__(self, ring_size: int = DB_SLOW_QUERY_RING_SIZE, log_file: Optional[str] = DB_SLOW_QUERY_LOG_FILE):
+        """
+        Inicializa o registro.
+
+        Args:
+            ring_size: Número máximo de registros mantidos em memória
+            log_file: Caminho do arquivo JSONL (vazio para não persistir)
+        """
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self._lock = threading.Lock()
+        self._file_logger = self._build_file_logger(log_file) if log_file else None
+
+    @staticmethod
+    def _build_file_logger(log_file: str) -> Optional[logging.Logger]:
+        """
+        Cria um logger dedicado que grava uma linha JSON por registro.
+
+        A gravação acontece na thread de escrita de uma fila própria
+        (services/logging_setup.py), fora do caminho da requisição.
+
+        Args:
+            log_file: Caminho do arquivo JSONL
+
+        Returns:
+            Logger configurado ou None se o arquivo não puder ser aberto
+        """
+        file_logger = logging.getLogger("api.slow_queries.file")
+        file_logger.propagate = False
+        file_logger.setLevel(logging.INFO)
+        if not file_logger.handlers:
+            try:
+                directory = os.path.dirname(log_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+            except OSError as e:
+                logger.warning("Não foi possível abrir o arquivo de consultas lentas %s: %s", log_file, e)
+                return None
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            file_logger.addHandler(queued_handler("slow_queries", handler))
+        return file_logger
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration_ms: float,
+        plan: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Registra uma consulta lenta.
+
+        Args:
+            statement: Texto SQL executado
+            parameters: Parâmetros do comando
+            executemany: Se o comando foi executado em lote
+            duration_ms: Duração em milissegundos
+            plan: Plano de execução (EXPLAIN), se capturado
+
+        Returns:
+            Registro criado
+        """
+        normalized = normalize_sql(statement)
+        stats = current_query_stats()
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "fingerprint": hashlib.sha1(normalized.encode()).hexdigest()[:16],
+            "sql": normalized,
+            "parameters": parameter_shape(parameters, executemany),
+            "duration_ms": round(duration_ms, 3),
+            "route": stats.route if stats is not None else None,
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        metrics.counter("db.slow_queries").inc()
+        logger.warning("Consulta lenta (%.1fms) em %s: %s", duration_ms, entry['route'], normalized[:200])
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+        return entry
+
+    def entries(
+        self,
+        limit: int = 50,
+        route: Optional[str] = None,
+        min_duration_ms: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Consulta os registros mais recentes.
+
+        Args:
+            limit: Número máximo de registros retornados
+            route: Filtra pela rota de origem
+            min_duration_ms: Filtra por duração mínima
+
+        Returns:
+            Registros do mais recente para o mais antigo
+        """
+        with self._lock:
+            entries = list(self._entries)
+        selected = [
+            entry for entry in reversed(entries)
+            if (route is None or entry["route"] == route)
+            and (min_duration_ms is None or entry["duration_ms"] >= min_duration_ms)
+        ]
+        return selected[:limit]
+
+    def clear(self) -> None:
+        """Descarta os registros em memória."""
+        with self._lock:
+            self._entries.clear()
+
+def explain(connection: Any, statement: str, parameters: Any) -> Optional[List[str]]:
+    """
+    Obtém o plano de execução de um comando.
+
+    Usa um cursor DBAPI direto, fora dos eventos do SQLAlchemy, para
+    que o EXPLAIN não seja contabilizado nem registrado novamente. O
+    EXPLAIN roda na transação da requisição, dentro de um savepoint: se
+    falhar, apenas o savepoint é desfeito e a transação continua válida
+    (no PostgreSQL um erro sem savepoint abortaria a transação inteira).
+
+    Args:
+        connection: Conexão SQLAlchemy em que o comando foi executado
+        statement: Texto SQL executado
+        parameters: Parâmetros do comando
+
+    Returns:
+        Linhas do plano ou None se o comando não puder ser explicado
+    """
+    if not statement.lstrip().lower().startswith(EXPLAINABLE_PREFIXES):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+        except Exception as e:
+            # Erros ao desfazer o savepoint não são ignorados: indicam que a
+            # transação da requisição não está mais utilizável
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            metrics.counter("db.slow_queries.explain_failed").inc()
+            logger.warning("Falha ao executar EXPLAIN: %s", e)
+            plan = None
+        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    finally:
+        cursor.close()
+
+def maybe_record_slow_query(
+    connection: Any,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    duration_ms: float
+) -> None:
+    """
+    Registra o comando se a duração exceder DB_SLOW_QUERY_MS.
+
+    Args:
+        connection: Conexão SQLAlchemy em que o comando foi executado
+        statement: Texto SQL executado
+        parameters: Parâmetros do comando
+        executemany: Se o comando foi executado em lote
+        duration_ms: Duração em milissegundos
+    """
+    if DB_SLOW_QUERY_MS <= 0 or duration_ms < DB_SLOW_QUERY_MS:
+        return
+    plan = None
+    if DB_SLOW_QUERY_EXPLAIN and not executemany:
+        plan = explain(connection, statement, parameters)
+    slow_query_log.record(statement, parameters, executemany, duration_ms, plan)
+
+# Registro global de consultas lentas
+slow_query_log = SlowQueryLog()
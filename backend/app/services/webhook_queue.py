@@ -0,0 +1,460 @@
+"""
+Fila durável de webhooks.
+
+Este módulo grava os webhooks recebidos na tabela webhook_event para
+que sejam confirmados imediatamente ao remetente, e mantém um pool de
+workers assíncronos que reservam os eventos pendentes, os processam e
+registram o resultado. O tempo de processamento deixa de afetar a
+vazão de recebimento, e eventos não se perdem se o processo reiniciar.
+
+A reserva usa SELECT ... FOR UPDATE SKIP LOCKED no PostgreSQL, o que
+permite vários processos consumindo a mesma tabela. Em bancos sem
+SKIP LOCKED (SQLite) cada evento é reservado com um UPDATE condicional
+ao estado atual, que só tem efeito para um dos workers concorrentes.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..errors import BaseAPIError
+from ..models.webhook_event import WebhookEvent
+from .database import AsyncSessionLocal
+from .dead_letters import SOURCE_QUEUE, dead_letter_entry, record_dead_letters
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.webhook_queue")
+
+# Configuração do pool de workers
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+WEBHOOK_WORKER_BATCH = int(os.getenv("WEBHOOK_WORKER_BATCH", "10"))
+WEBHOOK_POLL_INTERVAL = float(os.getenv("WEBHOOK_POLL_INTERVAL", "1.0"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+WEBHOOK_RETRY_BASE_SECONDS = float(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "2"))
+WEBHOOK_LOCK_TIMEOUT = float(os.getenv("WEBHOOK_LOCK_TIMEOUT", "300"))
+
+# Estados de um evento
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Função que processa um evento: (event_type, data, db) -> resultado
+EventHandler = Callable[[str, Dict[str, Any], AsyncSession], Awaitable[Dict[str, Any]]]
+
+# Função que informa as vagas livres de um tipo de evento
+Capacity = Callable[[str], int]
+
+def _claimable(now: datetime) -> Any:
+    """
+    Condição dos eventos que podem ser reservados.
+
+    Inclui eventos pendentes já disponíveis e eventos reservados há mais
+    de WEBHOOK_LOCK_TIMEOUT segundos (worker que parou no meio).
+
+    Args:
+        now: Momento de referência
+
+    Returns:
+        Expressão SQLAlchemy
+    """
+    stale = now - timedelta(seconds=WEBHOOK_LOCK_TIMEOUT)
+    return or_(
+        and_(WebhookEvent.status == STATUS_PENDING, WebhookEvent.available_at <= now),
+        and_(WebhookEvent.status == STATUS_PROCESSING, WebhookEvent.locked_at < stale),
+    )
+
+def _json_safe(value: Any) -> Any:
+    """Converte um resultado para tipos aceitos por colunas JSON."""
+    return json.loads(json.dumps(value, default=str))
+
+async def enqueue_event(db: AsyncSession, event_id: str, event_type: str, data: Dict[str, Any]) -> WebhookEvent:
+    """
+    Grava um evento na fila e acorda os workers.
+
+    Se já existir um evento com o mesmo event_id (reenvio recebido após
+    a expiração do registro de idempotência), o evento existente é
+    retornado e nada é enfileirado.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        event_id: Identificador do evento retornado ao remetente
+        event_type: Tipo do evento
+        data: Dados do evento
+
+    Returns:
+        Evento gravado
+    """
+    event = WebhookEvent(
+        event_id=event_id,
+        event_type=str(getattr(event_type, "value", event_type)),
+        payload=_json_safe(data),
+        status=STATUS_PENDING,
+        attempts=0,
+        available_at=datetime.utcnow(),
+    )
+    db.add(event)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        existing = await get_event(db, event_id)
+        if existing is None:
+            raise
+        return existing
+    metrics.counter("webhook.queue.enqueued").inc()
+    webhook_workers.notify()
+    return event
+
+async def claim_events(
+    db: AsyncSession,
+    limit: int,
+    worker: str,
+    capacity: Optional[Capacity] = None
+) -> List[WebhookEvent]:
+    """
+    Reserva até limit eventos para um worker.
+
+    Com capacity, cada tipo de evento recebe no máximo o número de vagas
+    livres informado, e eventos de tipos sem vaga ficam na fila para os
+    workers seguintes: um tipo lento não ocupa os workers de todos.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        limit: Número máximo de eventos
+        worker: Nome do worker, gravado em locked_by
+        capacity: Função que retorna as vagas livres de um tipo de evento
+
+    Returns:
+        Eventos reservados, em ordem de chegada
+    """
+    now = datetime.utcnow()
+    candidates = (
+        select(WebhookEvent.id, WebhookEvent.event_type)
+        .where(_claimable(now))
+        .order_by(WebhookEvent.id)
+        .limit(limit * 4 if capacity is not None else limit)
+    )
+    postgres = db.bind.dialect.name == "postgresql"
+    if postgres:
+        candidates = candidates.with_for_update(skip_locked=True)
+    rows = (await db.execute(candidates)).all()
+
+    ids = []
+    taken: Dict[str, int] = {}
+    for event_id, event_type in rows:
+        if capacity is not None:
+            if taken.get(event_type, 0) >= capacity(event_type):
+                continue
+            taken[event_type] = taken.get(event_type, 0) + 1
+        ids.append(event_id)
+        if len(ids) >= limit:
+            break
+
+    claim = update(WebhookEvent).values(
+        status=STATUS_PROCESSING,
+        locked_at=now,
+        locked_by=worker,
+        attempts=WebhookEvent.attempts + 1,
+    )
+    if postgres:
+        # Linhas já bloqueadas pelo SELECT ... FOR UPDATE SKIP LOCKED
+        if ids:
+            await db.execute(claim.where(WebhookEvent.id.in_(ids)))
+        claimed = ids
+    else:
+        # Sem SKIP LOCKED: UPDATE condicional por evento; só um worker obtém rowcount 1
+        claimed = []
+        for event_id in ids:
+            result = await db.execute(claim.where(WebhookEvent.id == event_id, _claimable(now)))
+            if result.rowcount == 1:
+                claimed.append(event_id)
+    await db.commit()
+    if not claimed:
+        return []
+    result = await db.execute(
+        select(WebhookEvent).where(WebhookEvent.id.in_(claimed)).order_by(WebhookEvent.id)
+    )
+    return list(result.scalars().all())
+
+async def get_event(db: AsyncSession, event_id: str) -> Optional[WebhookEvent]:
+    """
+    Obtém um evento pelo identificador retornado ao remetente.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+        event_id: Identificador do evento
+
+    Returns:
+        Evento ou None se não existir
+    """
+    result = await db.execute(select(WebhookEvent).where(WebhookEvent.event_id == event_id))
+    return result.scalars().first()
+
+async def count_by_status(db: AsyncSession) -> Dict[str, int]:
+    """
+    Conta os eventos da fila por estado.
+
+    Args:
+        db: Sessão assíncrona de banco de dados
+
+    Returns:
+        Dicionário de estado para número de eventos
+    """
+    result = await db.execute(
+        select(WebhookEvent.status, func.count()).group_by(WebhookEvent.status)
+    )
+    return {status: count for status, count in result.all()}
+
+class WebhookWorkerPool:
+    """
+    Pool de workers assíncronos que consomem a tabela webhook_event.
+
+    Cada worker reserva um lote de eventos, processa os eventos do lote
+    ao mesmo tempo, cada um com uma sessão própria, e registra done, uma
+    nova tentativa com backoff exponencial ou failed após
+    WEBHOOK_MAX_ATTEMPTS. O resultado só é gravado enquanto o evento
+    estiver reservado pelo worker (locked_by). Erros de validação
+    (BaseAPIError com status 4xx) não são repetidos. Eventos failed são
+    gravados no dead-letter (services/dead_letters.py).
+    """
+
+    def __init__(
+        self,
+        workers: int = WEBHOOK_WORKERS,
+        batch_size: int = WEBHOOK_WORKER_BATCH,
+        poll_interval: float = WEBHOOK_POLL_INTERVAL
+    ):
+        """
+        Inicializa o pool (os workers só rodam após start()).
+
+        Args:
+            workers: Número de workers (0 desativa o consumo neste processo)
+            batch_size: Eventos reservados por vez por worker
+            poll_interval: Intervalo máximo entre consultas à fila, em segundos
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.handler: Optional[EventHandler] = None
+        self.capacity: Optional[Capacity] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    def set_handler(self, handler: EventHandler, capacity: Optional[Capacity] = None) -> None:
+        """
+        Define a função que processa os eventos.
+
+        Args:
+            handler: Função (event_type, data, db) -> resultado
+            capacity: Função que retorna as vagas livres de um tipo de
+                evento; sem ela os eventos são reservados sem limite por tipo
+        """
+        self.handler = handler
+        self.capacity = capacity
+
+    async def start(self) -> None:
+        """Inicia os workers no event loop atual."""
+        if self._tasks or self.workers <= 0:
+            return
+        if self.handler is None:
+            logger.warning("Pool de webhooks sem handler definido; workers não iniciados")
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self._name}/{index}"))
+            for index in range(self.workers)
+        ]
+        logger.info("Pool de webhooks iniciado com %d workers", self.workers)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Encerra os workers.
+
+        Aguarda o evento em andamento de cada worker por até timeout
+        segundos; eventos interrompidos voltam à fila após
+        WEBHOOK_LOCK_TIMEOUT.
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self.notify()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("Pool de webhooks encerrado")
+
+    def notify(self) -> None:
+        """Acorda os workers ociosos (novo evento na fila)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait(self) -> None:
+        """Aguarda notificação ou o intervalo de consulta."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self, worker: str) -> None:
+        """
+        Laço de um worker.
+
+        Args:
+            worker: Nome do worker
+        """
+        while not self._stopping:
+            try:
+                async with AsyncSessionLocal() as db:
+                    events = await claim_events(db, self.batch_size, worker, self.capacity)
+            except Exception as e:
+                logger.error("Erro ao reservar eventos de webhook: %s", e)
+                events = []
+
+            if not events:
+                await self._wait()
+                continue
+
+            # Eventos do lote em paralelo: um handler lento não atrasa os demais
+            await asyncio.gather(*(self.process(event) for event in events))
+
+    async def process(self, event: WebhookEvent) -> None:
+        """
+        Processa um evento reservado e registra o resultado.
+
+        Args:
+            event: Evento reservado por claim_events
+        """
+        started = time.perf_counter()
+        metrics.histogram("webhook.queue.lag_ms").observe(
+            (datetime.utcnow() - event.created_at).total_seconds() * 1000
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await self.handler(event.event_type, event.payload, db)
+        except Exception as e:
+            metrics.histogram("webhook.queue.processing_ms").observe((time.perf_counter() - started) * 1000)
+            await self._record_failure(event, e)
+            return
+
+        metrics.histogram("webhook.queue.processing_ms").observe((time.perf_counter() - started) * 1000)
+        metrics.counter("webhook.queue.processed").inc()
+        await self._update(
+            event,
+            status=STATUS_DONE,
+            result=_json_safe(result),
+            error=None,
+            processed_at=datetime.utcnow(),
+        )
+
+    async def _record_failure(self, event: WebhookEvent, error: Exception) -> None:
+        """
+        Registra a falha de um evento, agendando nova tentativa se possível.
+
+        Args:
+            event: Evento que falhou
+            error: Exceção lançada pelo handler
+        """
+        permanent = isinstance(error, BaseAPIError) and error.status_code < 500
+        if permanent or event.attempts >= WEBHOOK_MAX_ATTEMPTS:
+            metrics.counter("webhook.queue.failed").inc()
+            logger.error(
+                "Evento de webhook %s falhou após %d tentativa(s): %s",
+                event.event_id, event.attempts, error
+            )
+            if not await self._update(event, status=STATUS_FAILED, error=str(error), processed_at=datetime.utcnow()):
+                return
+            await record_dead_letters([
+                dead_letter_entry(event.event_id, SOURCE_QUEUE, event.event_type, event.payload, error, event.attempts)
+            ])
+            return
+
+        delay = WEBHOOK_RETRY_BASE_SECONDS * (2 ** (event.attempts - 1))
+        metrics.counter("webhook.queue.retried").inc()
+        logger.warning(
+            "Evento de webhook %s falhou (tentativa %d), nova tentativa em %.1fs: %s",
+            event.event_id, event.attempts, delay, error
+        )
+        await self._update(
+            event,
+            status=STATUS_PENDING,
+            error=str(error),
+            available_at=datetime.utcnow() + timedelta(seconds=delay),
+        )
+
+    async def _update(self, event: WebhookEvent, **values: Any) -> bool:
+        """
+        Grava o novo estado de um evento e libera a reserva.
+
+        A gravação só tem efeito se o evento ainda estiver reservado por
+        este worker: se a reserva expirou (WEBHOOK_LOCK_TIMEOUT) e outro
+        worker reservou o evento, o resultado deste é descartado.
+
+        Args:
+            event: Evento a ser atualizado
+            values: Colunas a serem alteradas
+
+        Returns:
+            bool: True se o estado foi gravado
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(WebhookEvent)
+                    .where(WebhookEvent.id == event.id, WebhookEvent.locked_by == event.locked_by)
+                    .values(locked_at=None, locked_by=None, **values)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error("Erro ao registrar estado do evento de webhook %s: %s", event.event_id, e)
+            return False
+        if result.rowcount == 0:
+            metrics.counter("webhook.queue.lock_lost").inc()
+            logger.warning(
+                "Reserva do evento de webhook %s expirou antes do fim do processamento (%s); resultado descartado",
+                event.event_id, event.locked_by
+            )
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtém o estado do pool.
+
+        Returns:
+            Dicionário com configuração, workers ativos e contadores
+        """
+        return {
+            "workers": self.workers,
+            "running": sum(1 for task in self._tasks if not task.done()),
+            "batch_size": self.batch_size,
+            "poll_interval": self.poll_interval,
+            "max_attempts": WEBHOOK_MAX_ATTEMPTS,
+            "enqueued": metrics.counter("webhook.queue.enqueued").value,
+            "processed": metrics.counter("webhook.queue.processed").value,
+            "retried": metrics.counter("webhook.queue.retried").value,
+            "failed": metrics.counter("webhook.queue.failed").value,
+            "lock_lost": metrics.counter("webhook.queue.lock_lost").value,
+        }
+
+# Pool global de workers (iniciado no lifespan da aplicação)
+webhook_workers = WebhookWorkerPool()
@@ -0,0 +1,147 @@
+"""
+Verificação de assinaturas de webhook.
+
+A assinatura (X-Hub-Signature) é o HMAC-SHA256 do corpo bruto da
+requisição em hexadecimal, opcionalmente com o prefixo "sha256=". Ela
+é verificada antes de qualquer parse de JSON, de forma que requisições
+sem assinatura ou com assinatura forjada são rejeitadas pelo menor
+custo possível.
+
+Vários segredos podem estar ativos ao mesmo tempo (WEBHOOK_SECRETS,
+separados por vírgula), o que permite trocar o segredo sem janela de
+rejeição: adiciona-se o novo, atualizam-se os remetentes e remove-se o
+antigo. Sem WEBHOOK_SECRETS vale o segredo único WEBHOOK_SECRET.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import hmac
+import logging
+import os
+import string
+
+from .metrics import metrics
+
+# Configuração de logging
+logger = logging.getLogger("api.webhook_signature")
+
+# Configuração da verificação
+VERIFY_SIGNATURES = os.getenv("VERIFY_SIGNATURES", "true").lower() == "true"
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "default-secret")
+WEBHOOK_SECRETS = [
+    secret.strip()
+    for secret in os.getenv("WEBHOOK_SECRETS", WEBHOOK_SECRET).split(",")
+    if secret.strip()
+]
+
+SIGNATURE_PREFIX = "sha256="
+_HEX_DIGITS = frozenset(string.hexdigits)
+_DIGEST_LENGTH = hashlib.sha256().digest_size * 2
+
+# HMACs com a chave já processada; cada verificação usa uma cópia
+_BASE_MACS = [hmac.new(secret.encode(), digestmod=hashlib.sha256) for secret in WEBHOOK_SECRETS]
+
+def normalize_signature(signature: Optional[str]) -> Optional[str]:
+    """
+    Normaliza a assinatura recebida sem calcular nenhum HMAC.
+
+    Args:
+        signature: Valor do cabeçalho de assinatura
+
+    Returns:
+        Digest em hexadecimal minúsculo, ou None se a assinatura estiver
+        ausente ou não tiver o formato de um SHA-256
+    """
+    if not signature:
+        return None
+    if signature.startswith(SIGNATURE_PREFIX):
+        signature = signature[len(SIGNATURE_PREFIX):]
+    if len(signature) != _DIGEST_LENGTH or not _HEX_DIGITS.issuperset(signature):
+        return None
+    return signature.lower()
+
+def reject(reason: str) -> bool:
+    """Contabiliza uma assinatura rejeitada e retorna False."""
+    metrics.counter(f"webhook.signature.rejected.{reason}").inc()
+    logger.debug("Assinatura de webhook rejeitada: %s", reason)
+    return False
+
+class SignatureVerifier:
+    """
+    Verificação incremental da assinatura de um corpo.
+
+    Calcula o HMAC de todos os segredos ativos à medida que os pedaços
+    do corpo chegam (update) e compara ao final (verify).
+    """
+
+    def __init__(self):
+        """Inicializa um HMAC por segredo ativo."""
+        self._macs = [mac.copy() for mac in _BASE_MACS]
+
+    def update(self, chunk: bytes) -> None:
+        """
+        Acrescenta um pedaço do corpo.
+
+        Args:
+            chunk: Bytes recebidos
+        """
+        for mac in self._macs:
+            mac.update(chunk)
+
+    def verify(self, signature: Optional[str]) -> bool:
+        """
+        Compara a assinatura com o HMAC de cada segredo ativo.
+
+        Args:
+            signature: Valor do cabeçalho de assinatura
+
+        Returns:
+            bool: True se algum segredo produzir a assinatura
+        """
+        expected = normalize_signature(signature)
+        if expected is None:
+            return reject("malformed" if signature else "missing")
+        # Compara todos os segredos para que o tempo não indique qual confere
+        matched = False
+        for mac in self._macs:
+            matched |= hmac.compare_digest(mac.hexdigest(), expected)
+        if not matched:
+            return reject("mismatch")
+        metrics.counter("webhook.signature.accepted").inc()
+        return True
+
+def verify_signature(signature: Optional[str], body: bytes) -> bool:
+    """
+    Verifica a assinatura de um corpo completo.
+
+    Args:
+        signature: Valor do cabeçalho de assinatura
+        body: Corpo bruto da requisição
+
+    Returns:
+        bool: True se a assinatura for válida ou a verificação estiver
+        desativada (VERIFY_SIGNATURES=false)
+    """
+    if not VERIFY_SIGNATURES:
+        return True
+    if normalize_signature(signature) is None:
+        return reject("malformed" if signature else "missing")
+    verifier = SignatureVerifier()
+    verifier.update(body)
+    return verifier.verify(signature)
+
+def signature_stats() -> Dict[str, Any]:
+    """
+    Obtém contadores de verificação de assinatura.
+
+    Returns:
+        Dicionário com aceitas, rejeitadas por motivo e segredos ativos
+    """
+    return {
+        "enabled": VERIFY_SIGNATURES,
+        "active_secrets": len(WEBHOOK_SECRETS),
+        "accepted": metrics.counter("webhook.signature.accepted").value,
+        "rejected": {
+            reason: metrics.counter(f"webhook.signature.rejected.{reason}").value
+            for reason in ("missing", "malformed", "mismatch")
+        },
+    }
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Benchmark dos backends JSON do codec (services/json_codec.py).
+
+Compara json (biblioteca padrão), ujson e orjson, os que estiverem
+instalados, na serialização e no parse de payloads com o formato real
+da API:
+
+- listagem de mídias sociais (SocialMediaSchema, com datetimes);
+- lote de webhooks (WebhookPayload com WebhookEventType, datetime e
+  UUID, como recebido por JsonProcessor);
+- resumo de lote (WebhookBatchResponse) e resposta de erro
+  (BaseAPIError.to_dict).
+
+A coluna "starlette" reproduz o JSONResponse padrão (json.dumps com
+separadores compactos), usado antes de CodecJSONResponse. Antes de
+medir, verifica que todos os backends produzem os mesmos bytes.
+
+Uso:
+    python benchmarks/json_backends.py [--items 500] [--rounds 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.webhook import WebhookEventType
+from app.services.json_codec import JsonCodec
+
+def build_payloads(items: int) -> dict:
+    """
+    Monta os payloads medidos.
+
+    Args:
+        items: Registros por payload
+
+    Returns:
+        Dicionário de nome para payload
+    """
+    now = datetime(2026, 10, 17, 12, 30, 15, 123456)
+    social_media = [
+        {
+            "id": i,
+            "name": f"Plataforma {i}",
+            "url": f"https://plataforma{i}.example.com/mibitech",
+            "icon": f"icon-{i}",
+            "created_at": now - timedelta(days=i),
+            "updated_at": now - timedelta(minutes=i),
+        }
+        for i in range(items)
+    ]
+    webhooks = [
+        {
+            "event_type": WebhookEventType.SOCIAL_MEDIA_UPDATE if i % 2 else WebhookEventType.CONTACT_FORM,
+            "data": {
+                "name": f"Plataforma {i}",
+                "url": f"https://plataforma{i}.example.com/mibitech",
+                "icon": f"icon-{i}",
+                "mensagem": "Olá, gostaria de um orçamento para integração via webhook.",
+            },
+            "timestamp": now + timedelta(seconds=i),
+            "event_id": uuid.UUID(int=i),
+        }
+        for i in range(items)
+    ]
+    batch = {
+        "total_processed": items,
+        "successful": items - 3,
+        "failed": 3,
+        "results": [
+            {
+                "status": "success",
+                "message": "Webhook processado com sucesso",
+                "event_id": f"batch-{i}",
+                "processed_at": now,
+            }
+            for i in range(items)
+        ],
+    }
+    error = {
+        "error": {
+            "message": "Assinatura de webhook inválida",
+            "code": 401,
+            "timestamp": now.isoformat(),
+            "details": {},
+        }
+    }
+    return {"social_media": social_media, "webhooks": webhooks, "batch": batch, "error": error}
+
+def starlette_dumps(value) -> bytes:
+    """Reprodução do JSONResponse.render padrão (sobre conteúdo já codificado)."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def measure(function, rounds: int) -> float:
+    """
+    Mede o tempo médio de uma chamada em microssegundos (mediana de 5 rodadas).
+    """
+    function()
+    results = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            function()
+        results.append((time.perf_counter() - start) / rounds * 1e6)
+    return statistics.median(results)
+
+def main(items: int, rounds: int) -> None:
+    payloads = build_payloads(items)
+    codecs = [JsonCodec(name) for name in ("json", "ujson", "orjson")]
+    codecs = [codec for index, codec in enumerate(codecs) if index == 0 or codec.name != "json"]
+    reference = codecs[0]
+    for codec in codecs[1:]:
+        for name, payload in payloads.items():
+            assert codec.dumps(payload) == reference.dumps(payload), f"{codec.name} difere em {name}"
+
+    names = ["starlette"] + [codec.name for codec in codecs]
+    print(f"backends: {', '.join(codec.name for codec in codecs)} (itens por payload: {items})")
+    print(f"{'payload':<24}" + "".join(f"{name:>12}" for name in names))
+    for name, payload in payloads.items():
+        # Respostas: o FastAPI entrega à classe de resposta o conteúdo já codificado
+        encoded = json.loads(reference.dumps(payload))
+        row = [measure(lambda: starlette_dumps(encoded), rounds)]
+        row += [measure(lambda codec=codec: codec.dumps(encoded), rounds) for codec in codecs]
+        print(f"{name + ' resposta':<24}" + "".join(f"{value:>10.1f}us" for value in row))
+
+        # JsonProcessor: objetos com datetime, UUID e Enum
+        row = [measure(lambda codec=codec: codec.dumps(payload), rounds) for codec in codecs]
+        print(f"{name + ' objetos':<24}{'-':>12}" + "".join(f"{value:>10.1f}us" for value in row))
+
+        raw = reference.dumps(payload)
+        row = [measure(lambda: json.loads(raw), rounds)]
+        row += [measure(lambda codec=codec: codec.loads(raw), rounds) for codec in codecs]
+        print(f"{name + ' parse':<24}" + "".join(f"{value:>10.1f}us" for value in row))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=500, help="Registros por payload")
+    parser.add_argument("--rounds", type=int, default=200, help="Chamadas por rodada")
+    args = parser.parse_args()
+    main(args.items, args.rounds)
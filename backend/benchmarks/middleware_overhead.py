@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Benchmark do custo por requisição dos middlewares de diagnóstico.
+
+Compara, em uma aplicação mínima, três pilhas de middleware:
+
+- sem middleware (referência);
+- antes: log_requests (@app.middleware("http")) + InvalidRequestMiddleware
+  (BaseHTTPMiddleware), reproduzidos aqui como estavam em app/main.py e
+  app/middleware.py;
+- depois: RequestDiagnosticsMiddleware (ASGI puro).
+
+As requisições são enviadas diretamente à aplicação ASGI, sem servidor
+nem rede, e os logs vão para os.devnull, de forma que a diferença medida
+é o custo dos próprios middlewares (incluindo a formatação de logs).
+
+Uso:
+    python benchmarks/middleware_overhead.py [--requests 5000] [--body-size 2048]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import RequestDiagnosticsMiddleware
+
+logger = logging.getLogger("api.middleware")
+
+class LegacyInvalidRequestMiddleware(BaseHTTPMiddleware):
+    """Reprodução do InvalidRequestMiddleware anterior (caminho sem erro)."""
+
+    async def dispatch(self, request, call_next):
+        if '/api/v1/docs' in request.url.path or '/api/v1/redoc' in request.url.path:
+            logger.info(f"[DOCKER-DEBUG] Tentativa de acesso à documentação via middleware: {request.url.path}")
+        return await call_next(request)
+
+async def legacy_log_requests(request: Request, call_next):
+    """Reprodução do log_requests anterior (caminho sem erro)."""
+    start_time = time.time()
+    logger.info(f"[DEBUG-404] Requisição iniciada: {request.method} {request.url.path}")
+    logger.info(f"[DEBUG-404] URL completa: {request.url}")
+    logger.info(f"[DEBUG-404] Base URL: {request.base_url}")
+    logger.info(f"[DEBUG-404] Headers: {dict(request.headers)}")
+    logger.info(f"[DEBUG-404] Client host: {request.client.host if request.client else 'N/A'}")
+    logger.info(f"[DEBUG-404] Client port: {request.client.port if request.client else 'N/A'}")
+    if request.method != "GET":
+        body_bytes = await request.body()
+        if body_bytes:
+            body_str = body_bytes.decode('utf-8')
+            logger.info(f"[DEBUG-404] Corpo da requisição: {body_str[:500]}" + ("..." if len(body_str) > 500 else ""))
+    response = await call_next(request)
+    process_time = (time.time() - start_time) * 1000
+    response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
+    logger.info(
+        f"[DEBUG-404] Requisição concluída: {request.method} {request.url.path} "
+        f"(Status: {response.status_code}, Tempo: {process_time:.2f}ms)"
+    )
+    return response
+
+def build_app(stack: str) -> FastAPI:
+    """
+    Cria a aplicação de teste com a pilha de middleware indicada.
+
+    Args:
+        stack: "none", "before" ou "after"
+
+    Returns:
+        Aplicação FastAPI
+    """
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        body = await request.body()
+        return {"size": len(body)}
+
+    if stack == "before":
+        app.add_middleware(LegacyInvalidRequestMiddleware)
+        app.middleware("http")(legacy_log_requests)
+    elif stack == "after":
+        app.add_middleware(RequestDiagnosticsMiddleware)
+    return app
+
+async def call(app, method: str, path: str, body: bytes) -> int:
+    """
+    Envia uma requisição diretamente à aplicação ASGI.
+
+    Returns:
+        Código de status da resposta
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"user-agent", b"benchmark"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+async def measure(app, method: str, path: str, body: bytes, requests: int, rounds: int = 5) -> float:
+    """
+    Mede o tempo médio por requisição em microssegundos (mediana das rodadas).
+    """
+    for _ in range(200):
+        await call(app, method, path, body)
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(app, method, path, body)
+        results.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(results)
+
+async def main(requests: int, body_size: int) -> None:
+    body = b'{"data": "' + b"x" * body_size + b'"}'
+    apps = {stack: build_app(stack) for stack in ("none", "before", "after")}
+    print(f"{'requisição':<16}{'sem middleware':>16}{'antes':>12}{'depois':>12}{'overhead antes':>16}{'overhead depois':>17}")
+    for method, path, payload in (("GET", "/ping", b""), ("POST", "/echo", body)):
+        timings = {stack: await measure(app, method, path, payload, requests) for stack, app in apps.items()}
+        base = timings["none"]
+        print(
+            f"{method + ' ' + path:<16}{base:>14.1f}us{timings['before']:>10.1f}us{timings['after']:>10.1f}us"
+            f"{timings['before'] - base:>14.1f}us{timings['after'] - base:>15.1f}us"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000, help="Requisições por rodada")
+    parser.add_argument("--body-size", type=int, default=2048, help="Tamanho do corpo do POST em bytes")
+    args = parser.parse_args()
+
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+    asyncio.run(main(args.requests, args.body_size))
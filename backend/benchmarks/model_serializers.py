@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Benchmark da serialização de modelos (helpers.ModelSerializer).
+
+Compara, em --rows instâncias de SocialMedia (sem banco de dados):
+
+- antes: o laço por __table__.columns com getattr, como estava em
+  ModelMixin.to_dict e em GET /api/v1/webhooks/data, e o
+  SocialMedia.to_dict escrito à mão, reproduzidos aqui;
+- depois: model_serializer.to_dicts, com e sem isoformat() nas datas,
+  e model_serializer.to_json (linhas direto para JSON em bytes).
+
+Uso:
+    python benchmarks/model_serializers.py [--rows 100000]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.helpers import model_serializer
+from app.models.social_media import SocialMedia
+from app.services.json_codec import json_codec
+
+def legacy_to_dict(row) -> dict:
+    """Reprodução do ModelMixin.to_dict anterior."""
+    return {c.name: getattr(row, c.name) for c in row.__table__.columns}
+
+def legacy_social_media_to_dict(row) -> dict:
+    """Reprodução do SocialMedia.to_dict anterior."""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "url": row.url,
+        "icon": row.icon,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None
+    }
+
+def build_rows(count: int) -> list:
+    """
+    Cria instâncias de SocialMedia em memória.
+
+    Args:
+        count: Número de linhas
+
+    Returns:
+        Lista de instâncias
+    """
+    now = datetime(2026, 10, 17, 12, 0, 0)
+    rows = []
+    for i in range(count):
+        row = SocialMedia(name=f"Plataforma {i}", url=f"https://plataforma{i}.example.com/mibitech", icon=f"icon-{i}")
+        row.id = i + 1
+        row.created_at = now - timedelta(days=i % 365)
+        row.updated_at = now - timedelta(minutes=i)
+        rows.append(row)
+    return rows
+
+def measure(function, rounds: int = 5) -> float:
+    """
+    Mede o tempo de uma função em milissegundos (mediana das rodadas).
+    """
+    function()
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        results.append((time.perf_counter() - start) * 1000)
+    return statistics.median(results)
+
+def main(count: int) -> None:
+    rows = build_rows(count)
+    assert model_serializer.to_dicts(rows) == [legacy_to_dict(row) for row in rows]
+    assert model_serializer.to_dicts(rows, iso_datetimes=True) == [legacy_social_media_to_dict(row) for row in rows]
+    assert json.loads(model_serializer.to_json(rows)) == json.loads(json_codec.dumps([legacy_to_dict(row) for row in rows]))
+
+    scenarios = (
+        ("dict: getattr por coluna", lambda: [legacy_to_dict(row) for row in rows]),
+        ("dict: compilado", lambda: model_serializer.to_dicts(rows)),
+        ("iso: to_dict à mão", lambda: [legacy_social_media_to_dict(row) for row in rows]),
+        ("iso: compilado", lambda: model_serializer.to_dicts(rows, iso_datetimes=True)),
+        ("json: getattr + codec", lambda: json_codec.dumps([legacy_to_dict(row) for row in rows])),
+        ("json: to_json", lambda: model_serializer.to_json(rows)),
+    )
+    print(f"linhas: {count}, backend JSON: {json_codec.name}")
+    print(f"{'cenário':<28}{'total':>12}{'linhas/s':>14}")
+    for name, function in scenarios:
+        elapsed = measure(function)
+        print(f"{name:<28}{elapsed:>10.1f}ms{count / elapsed * 1000:>14,.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="Número de linhas")
+    args = parser.parse_args()
+    main(args.rows)
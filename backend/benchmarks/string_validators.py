@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark dos validadores de StringProcessor.
+
+Compara a validação de URLs e emails em:
+
+- antes: um StringProcessor novo por chamada e re.match com o padrão
+  em texto (consulta ao cache de padrões do módulo re a cada chamada),
+  reproduzidos aqui como estavam em app/helpers/__init__.py;
+- depois: a instância compartilhada string_processor, com os padrões
+  compilados no módulo, chamada item a item;
+- lote: string_processor.validate_urls / validate_emails.
+
+Mede uma validação isolada e um lote de --items valores (metade
+válidos), como na listagem de mídias sociais e nos lotes de webhooks.
+
+Uso:
+    python benchmarks/string_validators.py [--items 100000] [--single 200000]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.helpers import StringProcessor, string_processor
+
+class LegacyStringProcessor(StringProcessor):
+    """Reprodução dos validadores anteriores."""
+
+    def validate_email(self, email: str) -> bool:
+        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        return bool(re.match(pattern, email))
+
+    def validate_url(self, url: str) -> bool:
+        pattern = r'^(http|https)://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?$'
+        return bool(re.match(pattern, url))
+
+def measure(function, rounds: int = 5) -> float:
+    """
+    Mede o tempo de uma função em milissegundos (mediana das rodadas).
+    """
+    function()
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        results.append((time.perf_counter() - start) * 1000)
+    return statistics.median(results)
+
+def main(items: int, single: int) -> None:
+    urls = [
+        f"https://site{i}.example.com/perfil/{i}" if i % 2 else f"site{i} sem esquema"
+        for i in range(items)
+    ]
+    emails = [
+        f"usuario{i}@example.com" if i % 2 else f"usuario{i}.example.com"
+        for i in range(items)
+    ]
+    url, email = urls[1], emails[1]
+
+    scenarios = (
+        (
+            "url isolada",
+            single,
+            lambda: [LegacyStringProcessor().validate_url(url) for _ in range(single)],
+            lambda: [string_processor.validate_url(url) for _ in range(single)],
+            None,
+        ),
+        (
+            "email isolado",
+            single,
+            lambda: [LegacyStringProcessor().validate_email(email) for _ in range(single)],
+            lambda: [string_processor.validate_email(email) for _ in range(single)],
+            None,
+        ),
+        (
+            f"{items} urls",
+            items,
+            lambda: [LegacyStringProcessor().validate_url(value) for value in urls],
+            lambda: [string_processor.validate_url(value) for value in urls],
+            lambda: string_processor.validate_urls(urls),
+        ),
+        (
+            f"{items} emails",
+            items,
+            lambda: [LegacyStringProcessor().validate_email(value) for value in emails],
+            lambda: [string_processor.validate_email(value) for value in emails],
+            lambda: string_processor.validate_emails(emails),
+        ),
+    )
+
+    assert string_processor.validate_urls(urls) == [LegacyStringProcessor().validate_url(value) for value in urls]
+    assert string_processor.validate_emails(emails) == [LegacyStringProcessor().validate_email(value) for value in emails]
+
+    print(f"{'cenário':<18}{'antes':>12}{'depois':>12}{'lote':>12}{'redução':>10}")
+    for name, count, before, after, batch in scenarios:
+        timings = [measure(before), measure(after)]
+        if batch is not None:
+            timings.append(measure(batch))
+        per_item = [timing / count * 1e6 for timing in timings]
+        columns = "".join(f"{value:>10.0f}ns" for value in per_item)
+        if batch is None:
+            columns += f"{'-':>12}"
+        print(f"{name:<18}{columns}{timings[0] / min(timings):>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100000, help="Valores no lote")
+    parser.add_argument("--single", type=int, default=200000, help="Repetições da validação isolada")
+    args = parser.parse_args()
+    main(args.items, args.single)
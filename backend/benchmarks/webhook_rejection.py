@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Benchmark do custo por requisição de webhooks rejeitados.
+
+Compara o tratamento de requisições sem assinatura, com assinatura
+malformada e com assinatura forjada (formato válido, HMAC errado) em:
+
+- antes: rota com o corpo declarado como WebhookPayload, de forma que o
+  FastAPI faz o parse do JSON e valida o modelo antes de verify_webhook,
+  e manipuladores de erro síncronos, reproduzidos aqui como estavam em
+  app/routes/webhooks.py e app/errors/__init__.py;
+- depois: a rota atual (POST /api/v1/webhooks/), que verifica o HMAC
+  sobre o corpo bruto antes de qualquer parse e da sessão do banco.
+
+As requisições são enviadas diretamente à aplicação ASGI, sem servidor
+nem rede, e os logs vão para os.devnull. Nenhum caminho medido acessa o
+banco de dados.
+
+Uso:
+    python benchmarks/webhook_rejection.py [--requests 3000] [--fields 200]
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+os.environ["VERIFY_SIGNATURES"] = "true"
+
+from fastapi import FastAPI, Header, HTTPException, Request
+
+from app.errors import APIErrorHandler, BaseAPIError, register_error_handlers
+from app.routes import webhooks
+from app.schemas.webhook import WebhookPayload
+from app.services.webhook_signature import WEBHOOK_SECRETS
+
+logger = logging.getLogger("api.webhooks")
+
+def legacy_verify_webhook(signature: str, payload: bytes) -> bool:
+    """Reprodução do verify_webhook anterior."""
+    if not signature:
+        logger.warning("Requisição de webhook sem assinatura")
+        return False
+    digest = hmac.new(WEBHOOK_SECRETS[0].encode(), msg=payload, digestmod=hashlib.sha256).hexdigest()
+    is_valid = hmac.compare_digest(digest, signature)
+    if not is_valid:
+        logger.warning("Assinatura de webhook inválida: %s", signature)
+    return is_valid
+
+def build_app(pipeline: str) -> FastAPI:
+    """
+    Cria a aplicação de teste com o pipeline indicado.
+
+    Args:
+        pipeline: "before" ou "after"
+
+    Returns:
+        Aplicação FastAPI
+    """
+    app = FastAPI()
+    if pipeline == "after":
+        register_error_handlers(app)
+        app.include_router(webhooks.router, prefix="/api/v1/webhooks")
+        return app
+
+    for exc_class in (BaseAPIError, HTTPException, Exception):
+        app.add_exception_handler(exc_class, lambda request, exc: APIErrorHandler.handle_exception(exc))
+
+    @app.post("/api/v1/webhooks/")
+    async def handle_webhook(request: Request, payload: WebhookPayload, x_hub_signature: str = Header(None)):
+        logger.info("Webhook recebido: %s", payload.event_type)
+        body = await request.body()
+        if not legacy_verify_webhook(x_hub_signature, body):
+            raise BaseAPIError(message="Assinatura de webhook inválida", status_code=401)
+        return {"status": "success"}
+
+    return app
+
+async def call(app, body: bytes, signature: str) -> int:
+    """
+    Envia um webhook diretamente à aplicação ASGI.
+
+    Returns:
+        Código de status da resposta
+    """
+    headers = [
+        (b"host", b"bench"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    if signature:
+        headers.append((b"x-hub-signature", signature.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/webhooks/",
+        "raw_path": b"/api/v1/webhooks/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+async def measure(app, body: bytes, signature: str, requests: int, rounds: int = 5) -> float:
+    """
+    Mede o tempo médio por requisição em microssegundos (mediana das rodadas).
+    """
+    assert await call(app, body, signature) == 401
+    for _ in range(200):
+        await call(app, body, signature)
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(app, body, signature)
+        results.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(results)
+
+async def main(requests: int, fields: int) -> None:
+    body = json.dumps({
+        "event_type": "social_media_update",
+        "data": {f"field_{i}": f"value {i} " * 4 for i in range(fields)},
+    }).encode()
+    scenarios = (
+        ("sem assinatura", ""),
+        ("malformada", "not-a-signature"),
+        ("forjada", hmac.new(b"wrong-secret", body, hashlib.sha256).hexdigest()),
+    )
+    apps = {pipeline: build_app(pipeline) for pipeline in ("before", "after")}
+    print(f"corpo: {len(body)} bytes, segredos ativos: {len(WEBHOOK_SECRETS)}")
+    print(f"{'assinatura':<16}{'antes':>12}{'depois':>12}{'redução':>10}")
+    for name, signature in scenarios:
+        timings = {pipeline: await measure(app, body, signature, requests) for pipeline, app in apps.items()}
+        print(
+            f"{name:<16}{timings['before']:>10.1f}us{timings['after']:>10.1f}us"
+            f"{timings['before'] / timings['after']:>9.1f}x"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000, help="Requisições por rodada")
+    parser.add_argument("--fields", type=int, default=200, help="Campos em data (tamanho do corpo)")
+    args = parser.parse_args()
+
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
+    asyncio.run(main(args.requests, args.fields))
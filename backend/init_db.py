@@ -10,7 +10,7 @@ from alembic.config import Config
 from alembic import command
 from app.models.social_media import SocialMedia
 from app.services.database import SessionLocal
-from app.helpers import StringProcessor
+from app.helpers import string_processor
 
 # Configuração de logging
 logging.basicConfig(
@@ -59,9 +59,6 @@ def seed_data():
         if not db.query(SocialMedia).first():
             logger.info("Inserindo dados iniciais de mídias sociais...")
             
-            # Validador para URLs
-            string_processor = StringProcessor()
-            
             # Dados iniciais
             social_media = [
                 SocialMedia(
@@ -87,8 +84,8 @@ def seed_data():
             ]
             
             # Valida URLs antes de inserir
-            for sm in social_media:
-                if not string_processor.validate_url(sm.url):
+            for sm, valid in zip(social_media, string_processor.validate_urls(sm.url for sm in social_media)):
+                if not valid:
                     logger.warning(f"URL inválida ignorada: {sm.url}")
                     continue
                     
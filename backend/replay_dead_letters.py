@@ -0,0 +1,70 @@
+"""
+Script de reprocessamento do dead-letter de webhooks.
+
+Reprocessa em massa os eventos de webhook que falharam (tabela
+webhook_dead_letter), com o mesmo processamento dos webhooks recebidos.
+Depois de corrigir um deploy com defeito, um único comando recupera os
+eventos sem pedir aos remetentes que reenviem:
+
+    python replay_dead_letters.py --parallelism 8 --rate 50
+
+Use --dry-run para apenas contar os eventos selecionados. O código de
+saída é 1 se algum evento falhar de novo (ele continua no dead-letter).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.routes import webhooks  # noqa: F401 (registra os handlers de eventos e de reprocessamento)
+from app.services.dead_letters import (
+    WEBHOOK_REPLAY_LIMIT, WEBHOOK_REPLAY_PARALLELISM, WEBHOOK_REPLAY_RATE, dead_letter_replayer
+)
+
+# Configuração de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("replay_dead_letters")
+
+def parse_args() -> argparse.Namespace:
+    """
+    Lê os argumentos da linha de comando.
+
+    Returns:
+        Argumentos com filtros, paralelismo e taxa
+    """
+    parser = argparse.ArgumentParser(description="Reprocessa os eventos do dead-letter de webhooks")
+    parser.add_argument("--id", dest="ids", type=int, action="append", help="ID do evento (pode repetir)")
+    parser.add_argument("--event-type", help="Reprocessa apenas eventos deste tipo")
+    parser.add_argument("--source", choices=["queue", "batch", "webhook"], help="Reprocessa apenas eventos desta origem")
+    parser.add_argument("--limit", type=int, default=WEBHOOK_REPLAY_LIMIT, help="Número máximo de eventos")
+    parser.add_argument("--parallelism", type=int, default=WEBHOOK_REPLAY_PARALLELISM, help="Reprocessamentos simultâneos")
+    parser.add_argument("--rate", type=float, default=WEBHOOK_REPLAY_RATE, help="Reprocessamentos por segundo (0 sem limite)")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas conta os eventos selecionados")
+    return parser.parse_args()
+
+def main() -> int:
+    """
+    Executa o reprocessamento e imprime o resumo.
+
+    Returns:
+        Código de saída
+    """
+    args = parse_args()
+    summary = asyncio.run(dead_letter_replayer.replay(
+        ids=args.ids,
+        event_type=args.event_type,
+        source=args.source,
+        limit=args.limit,
+        parallelism=args.parallelism,
+        rate=args.rate,
+        dry_run=args.dry_run
+    ))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Configuração compartilhada dos testes unitários.
+
+Os testes rodam contra um banco SQLite temporário: DATABASE_URL é
+definida aqui, antes de qualquer importação da aplicação, para que os
+engines de services/database.py nunca apontem para o banco configurado
+no ambiente. As corrotinas são executadas com asyncio.run, sem plugins
+além do pytest.
+
+Uso (a partir de backend/):
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+from fastapi import APIRouter, FastAPI
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+_DB_DIR = tempfile.mkdtemp(prefix="mibitech-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+for name in ("ASYNC_DATABASE_URL", "DB_REPLICA_URLS"):
+    os.environ.pop(name, None)
+os.environ.setdefault("WEBHOOK_WORKERS", "0")
+os.environ.setdefault("WEBHOOK_OUTBOUND_ENABLED", "false")
+
+from app.models.base import Base  # noqa: E402
+from app.models import (  # noqa: E402,F401
+    social_media, social_media_tombstone, webhook_dead_letter, webhook_delivery,
+    webhook_event, webhook_outbound_delivery, webhook_subscription
+)
+from app.errors import register_error_handlers  # noqa: E402
+from app.services.database import engine, async_engine  # noqa: E402
+from app.services.responses import CodecJSONResponse  # noqa: E402
+from app.services.metrics import metrics  # noqa: E402
+
+def run(coroutine):
+    """
+    Executa uma corrotina em um event loop novo.
+
+    O pool do engine assíncrono é descartado ao final para que nenhuma
+    conexão fique presa ao loop encerrado.
+    """
+    async def wrapper():
+        try:
+            return await coroutine
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(wrapper())
+
+def make_app(router: APIRouter, prefix: str = "") -> FastAPI:
+    """
+    Cria uma aplicação mínima com um roteador e os manipuladores de erro.
+
+    Args:
+        router: Roteador testado
+        prefix: Prefixo com que o roteador é montado em app/main.py
+
+    Returns:
+        Aplicação FastAPI (use com TestClient como gerenciador de contexto,
+        para que todas as requisições compartilhem o mesmo event loop)
+    """
+    app = FastAPI(default_response_class=CodecJSONResponse)
+    register_error_handlers(app)
+    app.include_router(router, prefix=prefix)
+    return app
+
+@pytest.fixture
+def db():
+    """
+    Cria as tabelas no banco de teste e as remove ao final do teste.
+
+    Yields:
+        Engine síncrono do banco de teste
+    """
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        asyncio.run(async_engine.dispose())
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """Descarta as métricas acumuladas entre os testes."""
+    metrics.reset()
+    yield
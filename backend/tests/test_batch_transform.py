@@ -0,0 +1,69 @@
+"""
+Testes dos modos de DataTransformer.batch_transform (helpers).
+"""
+import threading
+
+import pytest
+
+from app.helpers import MODE_PROCESS, MODE_SERIAL, MODE_THREAD, DataTransformer
+
+class Square(DataTransformer):
+    """Eleva ao quadrado; falha no item 13 (definida no módulo para o pickle)."""
+
+    def process(self, data):
+        if data == 13:
+            raise ArithmeticError("item 13")
+        return data * data
+
+    def validate(self, data):
+        return isinstance(data, int)
+
+def counted(items, consumed):
+    """Gera os itens registrando quantos já foram lidos."""
+    for item in items:
+        consumed.append(item)
+        yield item
+
+@pytest.mark.parametrize("mode", [MODE_SERIAL, MODE_THREAD, MODE_PROCESS])
+def test_modes_return_results_in_order(mode):
+    items = [i for i in range(40) if i != 13]
+
+    result = Square().batch_transform(iter(items), mode=mode, workers=2, chunk_size=3)
+
+    assert result == [i * i for i in items]
+
+@pytest.mark.parametrize("mode", [MODE_SERIAL, MODE_THREAD, MODE_PROCESS])
+def test_failure_delivers_previous_items_then_raises(mode):
+    results = Square().batch_transform(range(20), mode=mode, lazy=True, workers=2, chunk_size=4)
+    received = []
+
+    with pytest.raises(ArithmeticError, match="item 13"):
+        for value in results:
+            received.append(value)
+
+    assert received == [i * i for i in range(13)]
+
+def test_lazy_thread_mode_reads_input_on_demand():
+    consumed = []
+    results = Square().batch_transform(
+        counted(range(14, 1000), consumed), mode=MODE_THREAD, lazy=True, workers=2, chunk_size=5
+    )
+    assert consumed == []
+
+    assert next(results) == 14 * 14
+    # No máximo 2 blocos por worker em andamento, mais o bloco reposto
+    assert len(consumed) <= 5 * 2 * 2 + 5
+    results.close()
+
+def test_interrupted_consumption_shuts_the_pool_down():
+    before = threading.active_count()
+    results = Square().batch_transform(range(14, 10000), mode=MODE_THREAD, lazy=True, workers=4)
+
+    next(results)
+    results.close()
+
+    assert threading.active_count() == before
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Square().batch_transform([1], mode="gpu")
@@ -0,0 +1,103 @@
+"""
+Testes do upsert em lote (services/bulk_upsert.py) e do modo bulk de
+WebhookProcessor.process_batch.
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.errors import ValidationError
+from app.models.social_media import SocialMedia
+from app.routes.webhooks import WebhookProcessor
+from app.schemas.webhook import WebhookEventType, WebhookPayload
+from app.services import bulk_upsert
+from app.services.bulk_upsert import supports_upsert, upsert_rows
+from app.services.database import AsyncSessionLocal
+
+from conftest import run
+
+def rows(*names: str, url: str = "https://site.example.com") -> list:
+    """Monta linhas de mídia social com os nomes informados."""
+    now = datetime(2026, 10, 17, 12, 0, 0)
+    return [{"name": name, "url": url, "icon": "icon", "created_at": now, "updated_at": now} for name in names]
+
+async def all_social_media() -> dict:
+    """Lê as mídias sociais gravadas (nome para URL)."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(SocialMedia))
+        return {item.name: item.url for item in result.scalars()}
+
+def test_upsert_inserts_then_updates_on_conflict(db, monkeypatch):
+    # Um comando por duas linhas: exercita a divisão em blocos
+    monkeypatch.setattr(bulk_upsert, "DB_BULK_MAX_PARAMS", 10)
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            assert supports_upsert(session)
+            inserted = await upsert_rows(session, SocialMedia, rows("a", "b", "c"), ["name"], ["url", "updated_at"])
+            updated = await upsert_rows(
+                session, SocialMedia, rows("b", "d", url="https://novo.example.com"),
+                ["name"], ["url", "updated_at"], returning=["id", "name"]
+            )
+            await session.commit()
+        return inserted, updated, await all_social_media()
+
+    inserted, updated, stored = run(scenario())
+    assert len(inserted) == 3
+    assert sorted(row.name for row in updated) == ["b", "d"]
+    assert stored == {
+        "a": "https://site.example.com",
+        "b": "https://novo.example.com",
+        "c": "https://site.example.com",
+        "d": "https://novo.example.com",
+    }
+
+def test_upsert_without_rows_does_nothing(db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            return await upsert_rows(session, SocialMedia, [], ["name"], ["url"])
+
+    assert run(scenario()) == []
+
+def test_process_batch_validates_before_writing(db):
+    payloads = [
+        WebhookPayload(event_type=WebhookEventType.SOCIAL_MEDIA_UPDATE,
+                       data={"name": "x", "url": "https://x.example.com", "icon": "i"}),
+        WebhookPayload(event_type=WebhookEventType.SOCIAL_MEDIA_UPDATE,
+                       data={"name": "y", "url": "sem esquema", "icon": "i"}),
+        WebhookPayload(event_type=WebhookEventType.SOCIAL_MEDIA_UPDATE, data={"name": "z"}),
+        WebhookPayload(event_type=WebhookEventType.SOCIAL_MEDIA_UPDATE,
+                       data={"name": "x", "url": "https://x2.example.com", "icon": "i"}),
+        WebhookPayload(event_type=WebhookEventType.CONTACT_FORM,
+                       data={"name": "Ana", "email": "ana@example.com", "message": "Olá"}),
+    ]
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            outcomes = await WebhookProcessor().process_batch(payloads, session)
+        return outcomes, await all_social_media()
+
+    outcomes, stored = run(scenario())
+    assert [outcome["status"] for outcome in outcomes] == ["success", "error", "error", "success", "success"]
+    assert outcomes[0]["result"]["id"] == outcomes[3]["result"]["id"]
+    # O último evento com o mesmo nome prevalece
+    assert stored == {"x": "https://x2.example.com"}
+
+def test_extra_fields_are_rejected_in_both_paths(db):
+    data = {"name": "x", "url": "https://x.example.com", "icon": "i", "id": 99, "created_at": "2020-01-01"}
+    payload = WebhookPayload(event_type=WebhookEventType.SOCIAL_MEDIA_UPDATE, data=data)
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            [bulk] = await WebhookProcessor().process_batch([payload], session)
+            try:
+                await WebhookProcessor().process_event(payload.event_type, data, session)
+            except Exception as e:
+                single = e
+        return bulk, single, await all_social_media()
+
+    bulk, single, stored = run(scenario())
+    # Mesmo resultado no lote e no evento individual: erro de validação (4xx)
+    assert isinstance(bulk["error"], ValidationError)
+    assert isinstance(single, ValidationError)
+    assert stored == {}
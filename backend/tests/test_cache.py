@@ -0,0 +1,64 @@
+"""
+Testes do cache de leituras (services/cache.py).
+"""
+from app.services import cache
+from app.services.cache import MISSING, TTLCache
+
+def test_get_returns_stored_value_until_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    store = TTLCache("teste", ttl=10)
+
+    store.set("chave", None)
+    assert store.get("chave") is None
+    now[0] += 10
+    assert store.get("chave") is MISSING
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    store = TTLCache("teste", maxsize=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+
+    assert store.get("b") is MISSING
+    assert (store.get("a"), store.get("c")) == (1, 3)
+    assert store.stats()["evictions"] == 1
+
+def test_value_loaded_before_invalidation_is_discarded():
+    store = TTLCache("teste")
+    generation = store.generation
+
+    # Uma escrita invalida o cache enquanto o leitor consultava o banco
+    store.invalidate()
+    store.set("lista", ["antigo"], generation)
+    assert store.get("lista") is MISSING
+
+    store.set("lista", ["novo"], store.generation)
+    assert store.get("lista") == ["novo"]
+
+def test_disabled_cache_never_stores(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_ENABLED", False)
+    store = TTLCache("teste")
+
+    store.set("chave", 1)
+    assert store.get("chave") is MISSING
+
+def test_value_read_from_a_lagging_source_waits_for_the_settle_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    store = TTLCache("teste")
+    store.set("antes", 1, settle=10)
+    assert store.get("antes") == 1
+
+    store.invalidate()
+    # A réplica pode ainda não ter a escrita que invalidou o cache
+    store.set("lista", ["antigo"], store.generation, settle=10)
+    assert store.get("lista") is MISSING
+    store.set("lista", ["primario"], store.generation)
+    assert store.get("lista") == ["primario"]
+
+    now[0] += 10
+    store.set("outra", ["replica"], store.generation, settle=10)
+    assert store.get("outra") == ["replica"]
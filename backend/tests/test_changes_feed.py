@@ -0,0 +1,127 @@
+"""
+Testes do feed de mudanças (services/changes_feed.py e
+GET /api/webhooks/changes).
+"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.models.social_media import SocialMedia
+from app.models.social_media_tombstone import SocialMediaTombstone
+from app.routes import webhooks
+from app.services import changes_feed
+from app.services.changes_feed import CHANGES_CURSOR_ORDER, KIND_CHECKPOINT, decode_since, fetch_changes
+from app.services.database import DB_REPLICA_MAX_LAG_SECONDS, AsyncSessionLocal, SessionLocal, get_async_read_db
+from app.services.pagination import encode_cursor
+
+from conftest import make_app, run
+
+CHANGED_AT = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+
+@pytest.fixture
+def client(db):
+    with SessionLocal() as session:
+        session.add_all([
+            SocialMedia(name="a", url="https://a.example.com", icon="i", created_at=CHANGED_AT, updated_at=CHANGED_AT),
+            SocialMedia(name="b", url="https://b.example.com", icon="i", created_at=CHANGED_AT, updated_at=CHANGED_AT),
+            # Remoção no mesmo instante das alterações acima
+            SocialMediaTombstone(social_media_id=99, name="removida", deleted_at=CHANGED_AT),
+        ])
+        session.commit()
+    with TestClient(make_app(webhooks.router, "/api/webhooks")) as client:
+        yield client
+
+def changes(client: TestClient, since=None, limit: int = 100) -> dict:
+    """Consulta o feed e devolve o corpo da resposta."""
+    params = {"limit": limit} if since is None else {"since": since, "limit": limit}
+    response = client.get("/api/webhooks/changes", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_tombstone_at_equal_timestamp_is_read_once_in_order(client):
+    # Cursor anterior a todas as mudanças: o feed lê upserts e remoções
+    since = encode_cursor(CHANGES_CURSOR_ORDER, [CHANGED_AT - timedelta(seconds=1), KIND_CHECKPOINT, 0])
+    seen = []
+    while True:
+        page = changes(client, since, limit=1)
+        seen += [(change["op"], change["id"]) for change in page["changes"]]
+        since = page["next_since"]
+        if not page["has_more"]:
+            break
+
+    # Ordem total (momento, tipo, id): upserts antes da remoção do mesmo instante
+    assert seen == [("upsert", 1), ("upsert", 2), ("delete", 99)]
+    assert changes(client, since)["changes"] == []
+
+def test_full_sync_ends_with_a_checkpoint_cursor(client, monkeypatch):
+    monkeypatch.setattr(changes_feed, "CHANGES_SETTLE_SECONDS", 0)
+    page = changes(client)
+
+    assert [(change["op"], change["id"]) for change in page["changes"]] == [("upsert", 1), ("upsert", 2)]
+    assert page["has_more"] is False
+    checkpoint, kind, key = decode_since(page["next_since"])
+    assert (kind, key) == (KIND_CHECKPOINT, 0)
+    assert checkpoint > CHANGED_AT
+
+    # Mudanças anteriores ao checkpoint não são repetidas; as novas aparecem
+    with SessionLocal() as session:
+        session.get(SocialMedia, 1).updated_at = datetime.utcnow()
+        session.commit()
+    following = changes(client, page["next_since"])
+    assert [(change["op"], change["id"]) for change in following["changes"]] == [("upsert", 1)]
+
+def test_checkpoint_never_moves_backwards(client):
+    future = datetime.utcnow() + timedelta(minutes=5)
+    since = encode_cursor(CHANGES_CURSOR_ORDER, [future, KIND_CHECKPOINT, 0])
+
+    page = changes(client, since)
+
+    assert page["changes"] == []
+    assert decode_since(page["next_since"])[0] == future
+
+def test_expired_cursor_returns_gone(client):
+    expired = datetime.utcnow() - timedelta(days=changes_feed.CHANGES_TOMBSTONE_RETENTION_DAYS + 1)
+    since = encode_cursor(CHANGES_CURSOR_ORDER, [expired, KIND_CHECKPOINT, 0])
+
+    response = client.get("/api/webhooks/changes", params={"since": since})
+
+    assert response.status_code == 410
+    assert response.json()["error"]["details"]["retention_days"] == changes_feed.CHANGES_TOMBSTONE_RETENTION_DAYS
+
+@pytest.mark.parametrize("values", [
+    [CHANGED_AT, "1", 0],
+    [CHANGED_AT, 0, 1.5],
+    [CHANGED_AT, True, 0],
+    [CHANGED_AT, 7, 0],
+    [1234567890, 0, 0],
+    ["ontem", 0, 0],
+])
+def test_tampered_cursor_is_rejected(client, values):
+    response = client.get("/api/webhooks/changes", params={"since": encode_cursor(CHANGES_CURSOR_ORDER, values)})
+
+    assert response.status_code == 400
+
+def test_settle_window_covers_transactions_and_replica_lag(client):
+    # Gravado pouco antes do horizonte: visível no primário, não em uma réplica
+    recent = datetime.utcnow() - timedelta(seconds=changes_feed.CHANGES_SETTLE_SECONDS + DB_REPLICA_MAX_LAG_SECONDS / 2)
+    with SessionLocal() as session:
+        session.get(SocialMedia, 1).updated_at = recent
+        session.commit()
+    since = encode_cursor(CHANGES_CURSOR_ORDER, [CHANGED_AT, KIND_CHECKPOINT, 0])
+
+    async def fetch(target):
+        async with AsyncSessionLocal() as db:
+            db.info["target"] = target
+            return await fetch_changes(db, since, 100)
+
+    assert [change["id"] for change in run(fetch("primary"))["changes"]] == [1]
+    replica = run(fetch("replica-1"))
+    assert replica["changes"] == []
+    assert decode_since(replica["next_since"])[0] < recent
+    assert changes_feed.CHANGES_SETTLE_SECONDS > webhooks.WEBHOOK_STREAM_MAX_SECONDS
+
+def test_feed_reads_from_the_primary(client):
+    client.app.dependency_overrides[get_async_read_db] = lambda: pytest.fail("feed lido de uma réplica")
+
+    assert changes(client)["has_more"] is False
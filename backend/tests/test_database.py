@@ -0,0 +1,38 @@
+"""
+Testes do engine assíncrono e das dependências de sessão
+(services/database.py).
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import pytest
+
+from app.models.social_media import SocialMedia
+from app.services.database import build_async_database_url, get_async_db, get_async_read_db
+
+from conftest import run
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://u:p@db:5432/mibitech", "postgresql+asyncpg://u:p@db:5432/mibitech"),
+    ("sqlite:///./local.db", "sqlite+aiosqlite:///./local.db"),
+    ("mysql://u:p@db/mibitech", "mysql+aiomysql://u:p@db/mibitech"),
+])
+def test_async_url_uses_async_driver(url, expected):
+    assert build_async_database_url(url).render_as_string(hide_password=False) == expected
+
+def test_unsupported_dialect_is_rejected():
+    with pytest.raises(ValueError):
+        build_async_database_url("oracle://u:p@db/mibitech")
+
+@pytest.mark.parametrize("dependency", [get_async_db, get_async_read_db])
+def test_dependency_yields_working_async_session(db, dependency):
+    async def scenario():
+        generator = dependency()
+        session = await generator.__anext__()
+        assert isinstance(session, AsyncSession)
+        session.add(SocialMedia(name="Site", url="https://site.example.com", icon="icon"))
+        await session.commit()
+        count = (await session.execute(text("SELECT COUNT(*) FROM social_media"))).scalar()
+        await generator.aclose()
+        return count
+
+    assert run(scenario()) == 1
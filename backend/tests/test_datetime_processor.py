@@ -0,0 +1,83 @@
+"""
+Testes da conversão de datas (helpers.DateTimeProcessor).
+"""
+from datetime import datetime
+
+import pytest
+
+import app.helpers as helpers
+from app.helpers import DATETIME_FORMATS, DateTimeProcessor
+
+def legacy_parse(value: str):
+    """Conversão original: os formatos padrão tentados com strptime."""
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+VALUES = [
+    "2026-10-17", "2026-10-17T12:30:45", "2026-10-17 12:30:45", "2026-1-7",
+    "2026-10-17T12:30:45.123456", "2026-10-17T12:30:45+00:00", "2026-10-17T12:30:45Z",
+    "2026-10-17T12:30", "2026-10-17T12", "20261017", "2026-13-01", "2026-02-30",
+    "2026-10-17x12:30:45", "", "hoje",
+]
+
+@pytest.mark.parametrize("value", VALUES)
+def test_fast_path_matches_strptime(value):
+    processor = DateTimeProcessor()
+
+    assert processor.validate(value) is (legacy_parse(value) is not None)
+    if legacy_parse(value) is None:
+        with pytest.raises(ValueError):
+            processor.process(value)
+    else:
+        result = processor.process(value)
+        assert result == legacy_parse(value)
+        assert result.tzinfo is None
+
+def test_fast_path_respects_configured_formats():
+    processor = DateTimeProcessor(formats=["%d/%m/%Y"])
+
+    assert processor.process("17/10/2026") == datetime(2026, 10, 17)
+    assert processor.validate("2026-10-17") is False
+
+def test_process_many_tries_each_format_once(monkeypatch):
+    calls = []
+    parse = helpers._parse_datetime
+    monkeypatch.setattr(helpers, "_parse_datetime", lambda value, fmt: calls.append(fmt) or parse(value, fmt))
+    processor = DateTimeProcessor(formats=["%Y-%m-%d", "%d/%m/%Y"])
+
+    result = processor.process_many(["17/10/2026", "18/10/2026", "19/10/2026"])
+
+    assert result == [datetime(2026, 10, day) for day in (17, 18, 19)]
+    # O primeiro valor descobre o formato; os demais acertam na primeira tentativa
+    assert calls == ["%Y-%m-%d", "%d/%m/%Y", "%d/%m/%Y", "%d/%m/%Y"]
+
+def test_process_many_without_strict_keeps_invalid_as_none():
+    processor = DateTimeProcessor()
+    now = datetime(2026, 10, 17)
+
+    assert processor.process_many(["2026-10-17 08:00:00", None, "x", now], strict=False) == [
+        datetime(2026, 10, 17, 8), None, None, now
+    ]
+    with pytest.raises(ValueError):
+        processor.process_many(["2026-10-17", "x"])
+
+def test_ambiguous_formats_keep_declared_order():
+    processor = DateTimeProcessor(formats=["%d/%m/%Y", "%m/%d/%Y"])
+
+    assert processor.process("05/06/2026") == datetime(2026, 6, 5)
+    # Só o segundo formato aceita: vira o palpite, mas não muda a ordem
+    assert processor.process("01/13/2026") == datetime(2026, 1, 13)
+    assert processor.process("05/06/2026") == datetime(2026, 6, 5)
+    assert processor.process_many(["07/06/2026", "01/14/2026", "08/06/2026"]) == [
+        datetime(2026, 6, 7), datetime(2026, 1, 14), datetime(2026, 6, 8)
+    ]
+
+def test_fast_path_is_skipped_when_an_earlier_format_overlaps():
+    processor = DateTimeProcessor(formats=["%Y-%d-%m", "%Y-%m-%d"])
+
+    assert processor.process("2026-05-06") == datetime(2026, 6, 5)
+    assert processor.process("2026-01-13") == datetime(2026, 1, 13)
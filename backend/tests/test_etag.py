@@ -0,0 +1,122 @@
+"""
+Testes das requisições condicionais (services/etag.py) na listagem de
+mídias sociais.
+"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+import pytest
+
+from app.models.social_media import SocialMedia
+from app.routes import social_media
+from app.services.cache import social_media_cache
+from app.services.database import AsyncSessionLocal, SessionLocal, get_async_read_db
+from app.services.etag import etag_matches, make_etag
+from app.services.metrics import metrics
+
+from conftest import make_app
+
+def request_with(if_none_match: str) -> Request:
+    """Cria uma requisição com o cabeçalho If-None-Match."""
+    return Request({"type": "http", "headers": [(b"if-none-match", if_none_match.encode())]})
+
+def test_etag_matching_uses_weak_comparison():
+    etag = make_etag("lista", 3)
+
+    assert etag.startswith('W/"')
+    assert etag_matches(request_with(etag[2:]), etag)
+    assert etag_matches(request_with(f'W/"outra", {etag}'), etag)
+    assert etag_matches(request_with("*"), etag)
+    assert not etag_matches(request_with('W/"outra"'), etag)
+
+@pytest.fixture
+def client(db):
+    now = datetime(2026, 10, 17, 12, 0, 0)
+    with SessionLocal() as session:
+        session.add_all([
+            SocialMedia(
+                name=f"Plataforma {i}", url=f"https://p{i}.example.com", icon="icon",
+                created_at=now, updated_at=now + timedelta(minutes=i)
+            )
+            for i in range(5)
+        ])
+        session.commit()
+    social_media_cache.invalidate()
+    with TestClient(make_app(social_media.router, "/api/v1/social-media")) as client:
+        yield client
+    social_media_cache.invalidate()
+
+def test_list_returns_etag_and_pagination_headers(client):
+    response = client.get("/api/v1/social-media/", params={"cursor": "", "limit": 2})
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [1, 2]
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert "rel=\"next\"" in response.headers["Link"]
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_not_modified_keeps_pagination_headers(client, cached):
+    params = {"cursor": "", "limit": 2}
+    first = client.get("/api/v1/social-media/", params=params)
+    if not cached:
+        # Sem cache a resposta 304 sai da verificação de versão da tabela
+        social_media_cache.invalidate()
+
+    response = client.get(
+        "/api/v1/social-media/", params=params, headers={"If-None-Match": first.headers["ETag"]}
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert response.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert response.headers["Link"] == first.headers["Link"]
+
+def test_not_modified_on_last_page_has_no_next_cursor(client):
+    first = client.get("/api/v1/social-media/", params={"cursor": "", "limit": 10})
+    social_media_cache.invalidate()
+
+    response = client.get(
+        "/api/v1/social-media/", params={"cursor": "", "limit": 10},
+        headers={"If-None-Match": first.headers["ETag"]}
+    )
+
+    assert response.status_code == 304
+    assert "X-Next-Cursor" not in response.headers
+
+def test_write_changes_the_etag(client):
+    first = client.get("/api/v1/social-media/")
+    with SessionLocal() as session:
+        session.get(SocialMedia, 1).updated_at = datetime(2027, 1, 1)
+        session.commit()
+    social_media_cache.invalidate()
+
+    response = client.get("/api/v1/social-media/", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "", "limit": 0}, {"limit": -1}, {"limit": 1001}, {"skip": -1}
+])
+def test_out_of_range_paging_is_rejected(client, params):
+    response = client.get("/api/v1/social-media/", params=params)
+
+    assert response.status_code == 422
+
+def test_replica_read_after_a_write_is_not_cached(client):
+    async def replica_session():
+        async with AsyncSessionLocal() as session:
+            session.info["target"] = "replica0"
+            yield session
+
+    client.app.dependency_overrides[get_async_read_db] = replica_session
+    social_media_cache.invalidate()
+    client.get("/api/v1/social-media/")
+    client.get("/api/v1/social-media/")
+
+    # Logo após a invalidação a réplica pode estar atrasada: as duas leituras vão ao banco
+    assert social_media_cache.stats()["misses"] == 2
+    assert metrics.counter("cache.social_media.unsettled").value == 2
@@ -0,0 +1,96 @@
+"""
+Testes do registro de handlers de eventos (services/event_registry.py).
+"""
+import asyncio
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+import pytest
+
+from app.errors import BaseAPIError, ValidationError
+from app.models.social_media import SocialMedia
+from app.services.database import AsyncSessionLocal
+from app.services.event_registry import EventHandlerRegistry
+
+from conftest import run
+
+class Item(BaseModel):
+    name: str
+
+def social_media(name: str) -> SocialMedia:
+    """Mídia social de teste."""
+    return SocialMedia(name=name, url=f"https://{name}.example.com", icon="i")
+
+async def count_social_media() -> int:
+    """Conta as mídias sociais gravadas."""
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(func.count()).select_from(SocialMedia))).scalar()
+
+@pytest.fixture
+def registry():
+    registry = EventHandlerRegistry()
+
+    @registry.register("slow", schema=Item, max_concurrency=1, timeout=0.05)
+    async def slow(data, db, commit):
+        # Escreve e fica preso até ser cancelado pelo tempo limite
+        db.add(social_media(data["name"]))
+        await db.flush()
+        await asyncio.sleep(10)
+
+    @registry.register("fast", schema=Item)
+    async def fast(data, db, commit):
+        db.add(social_media(data["name"]))
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+        return {"name": data["name"]}
+
+    return registry
+
+def test_invalid_data_is_rejected_before_the_handler(registry):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            await registry.dispatch("fast", {"nome": "x"}, session)
+
+    with pytest.raises(ValidationError):
+        run(scenario())
+
+def test_timeout_rolls_back_the_handler_writes(db, registry):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            with pytest.raises(BaseAPIError) as error:
+                await registry.dispatch("slow", {"name": "lento"}, session)
+            # A sessão continua utilizável depois do cancelamento
+            await registry.dispatch("fast", {"name": "rapido"}, session)
+        return error.value.status_code, await count_social_media()
+
+    assert run(scenario()) == (504, 1)
+    assert registry.get("slow").stats()["timeouts"] == 1
+
+def test_timeout_without_commit_keeps_the_caller_transaction(db, registry):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            await registry.dispatch("fast", {"name": "antes"}, session, commit=False)
+            with pytest.raises(BaseAPIError):
+                await registry.dispatch("slow", {"name": "lento"}, session, commit=False)
+            await registry.dispatch("fast", {"name": "depois"}, session, commit=False)
+            await session.commit()
+        async with AsyncSessionLocal() as session:
+            return sorted((await session.execute(select(SocialMedia.name))).scalars())
+
+    assert run(scenario()) == ["antes", "depois"]
+
+def test_busy_event_type_is_rejected_after_waiting(db, registry):
+    async def scenario():
+        async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+            results = await asyncio.gather(
+                registry.dispatch("slow", {"name": "a"}, first),
+                registry.dispatch("slow", {"name": "b"}, second),
+                return_exceptions=True
+            )
+        return sorted(result.status_code for result in results)
+
+    # A segunda execução não consegue vaga; a primeira excede o tempo limite
+    assert run(scenario()) == [503, 504]
+    assert registry.get("slow").stats()["rejected"] == 1
@@ -0,0 +1,97 @@
+"""
+Testes da idempotência de webhooks (services/idempotency.py).
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.models.webhook_delivery import WebhookDelivery
+from app.services.database import AsyncSessionLocal
+from app.services.idempotency import IN_PROGRESS, IdempotencyStore
+from app.services.metrics import metrics
+
+from conftest import run
+
+async def reserve(store: IdempotencyStore, key: str):
+    """Reserva uma chave em uma sessão própria, como uma requisição."""
+    async with AsyncSessionLocal() as db:
+        return await store.reserve(db, key)
+
+async def age(key: str, seconds: float) -> None:
+    """Recua o momento da reserva, simulando o passar do tempo."""
+    async with AsyncSessionLocal() as db:
+        reserved_at = datetime.utcnow() - timedelta(seconds=seconds)
+        await db.execute(
+            update(WebhookDelivery).where(WebhookDelivery.key == key).values(reserved_at=reserved_at)
+        )
+        await db.commit()
+
+def test_replay_returns_stored_response(db):
+    store = IdempotencyStore()
+
+    async def scenario():
+        first = await reserve(store, "k")
+        concurrent = await reserve(store, "k")
+        async with AsyncSessionLocal() as session:
+            await store.complete(session, "k", {"status": "ok"})
+        # Outro processo, sem o cache em memória, lê a resposta do banco
+        return first, concurrent, await reserve(store, "k"), await reserve(IdempotencyStore(), "k")
+
+    first, concurrent, replay, other_process = run(scenario())
+    assert first is None
+    assert concurrent is IN_PROGRESS
+    assert replay == other_process == {"status": "ok"}
+
+def test_released_key_can_be_reserved_again(db):
+    store = IdempotencyStore()
+
+    async def scenario():
+        await reserve(store, "k")
+        async with AsyncSessionLocal() as session:
+            await store.release(session, "k")
+        return await reserve(store, "k")
+
+    assert run(scenario()) is None
+
+def test_abandoned_reservation_expires_after_lease(db):
+    crashed = IdempotencyStore(lease=60)
+    retry = IdempotencyStore(lease=60)
+
+    async def scenario():
+        # O primeiro processo reserva a chave e para antes de complete()
+        await reserve(crashed, "k")
+        within_lease = await reserve(retry, "k")
+        await age("k", 61)
+        taken_over = await reserve(retry, "k")
+        concurrent = await reserve(IdempotencyStore(lease=60), "k")
+
+        # O release() atrasado do primeiro processo não apaga a nova reserva
+        async with AsyncSessionLocal() as session:
+            await crashed.release(session, "k")
+            remaining = (await session.execute(select(WebhookDelivery.key))).scalars().all()
+            await retry.complete(session, "k", {"status": "ok"})
+        return within_lease, taken_over, concurrent, remaining, await reserve(crashed, "k")
+
+    within_lease, taken_over, concurrent, remaining, replay = run(scenario())
+    assert within_lease is IN_PROGRESS
+    assert taken_over is None
+    assert concurrent is IN_PROGRESS
+    assert remaining == ["k"]
+    assert replay == {"status": "ok"}
+    assert metrics.counter("webhook.dedup.lease_expired").value == 1
+
+def test_expired_delivery_is_processed_again(db):
+    store = IdempotencyStore(ttl=60)
+
+    async def scenario():
+        await reserve(store, "k")
+        async with AsyncSessionLocal() as session:
+            await store.complete(session, "k", {"status": "ok"})
+            await session.execute(
+                update(WebhookDelivery).values(created_at=datetime.utcnow() - timedelta(seconds=61))
+            )
+            await session.commit()
+        # Sem o cache em memória, o registro expirado é descartado
+        return await reserve(IdempotencyStore(ttl=60), "k")
+
+    assert run(scenario()) is None
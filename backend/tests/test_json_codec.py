@@ -0,0 +1,63 @@
+"""
+Testes do codec JSON (services/json_codec.py) em todos os backends
+instalados.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import ValidationError as PydanticValidationError
+import pytest
+
+from app.schemas.webhook import WebhookEventType, WebhookPayload
+from app.services.json_codec import JsonCodec
+
+@pytest.fixture(params=["json", "ujson", "orjson"])
+def codec(request):
+    pytest.importorskip(request.param)
+    return JsonCodec(request.param)
+
+@dataclass
+class Item:
+    name: str
+    price: Decimal
+
+PAYLOAD = {
+    "price": Decimal("10.50"),
+    "at": datetime(2026, 10, 17, 12, 30, 15, 123),
+    "utc": datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc),
+    "day": date(2026, 10, 17),
+    "id": UUID(int=1),
+    "type": WebhookEventType.CONTACT_FORM,
+    "item": Item("ção", Decimal("1")),
+    "none": None,
+    1: [1.5, True],
+}
+
+EXPECTED = (
+    '{"price":"10.50","at":"2026-10-17T12:30:15.000123","utc":"2026-10-17T12:30:00+00:00",'
+    '"day":"2026-10-17","id":"00000000-0000-0000-0000-000000000001","type":"contact_form",'
+    '"item":{"name":"ção","price":"1"},"none":null,"1":[1.5,true]}'
+)
+
+def test_all_backends_produce_the_same_bytes(codec):
+    assert codec.dumps(PAYLOAD) == EXPECTED.encode("utf-8")
+    assert codec.loads(codec.dumps(PAYLOAD))["price"] == "10.50"
+
+@pytest.mark.parametrize("key", [datetime(2026, 10, 17), UUID(int=1), date(2026, 10, 17)])
+def test_non_string_keys_follow_the_standard_library(codec, key):
+    with pytest.raises(TypeError):
+        codec.dumps({key: 1})
+
+@pytest.mark.parametrize("literal", ["NaN", "Infinity", "-Infinity"])
+def test_non_finite_numbers_are_rejected_on_input(literal):
+    body = '{"event_type": "contact_form", "data": {"rows": [{"value": %s}]}}' % literal
+
+    with pytest.raises(PydanticValidationError):
+        WebhookPayload.model_validate_json(body)
+    with pytest.raises(PydanticValidationError):
+        WebhookPayload(event_type="contact_form", data={"value": float(literal)})
+
+def test_null_and_large_integers_still_serialize(codec):
+    assert codec.dumps({"a": None, "b": 2 ** 70}) == b'{"a":null,"b":1180591620717411303424}'
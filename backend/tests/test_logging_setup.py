@@ -0,0 +1,62 @@
+"""
+Testes do pipeline de logging em fila (services/logging_setup.py).
+"""
+import json
+import logging
+import queue
+
+from app.services import logging_setup
+from app.services.logging_setup import DroppingQueueHandler, JsonFormatter, get_logging_stats, queued_handler
+from app.services.metrics import metrics
+
+class ListHandler(logging.Handler):
+    """Handler que guarda as mensagens formatadas."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+def make_record(message, *args, **extra) -> logging.LogRecord:
+    """Cria um registro com campos extras."""
+    record = logging.makeLogRecord({"name": "api.teste", "levelname": "INFO", "levelno": logging.INFO, "msg": message, "args": args})
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record("Processando %s", "evento", details={"id": 1}))
+
+    entry = json.loads(line)
+    assert entry["message"] == "Processando evento"
+    assert entry["logger"] == "api.teste"
+    assert entry["details"] == {"id": 1}
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(make_record("primeiro"))
+    handler.handle(make_record("segundo"))
+
+    assert handler.queue.qsize() == 1
+    assert metrics.counter("logging.dropped").value == 1
+
+def test_queued_handler_formats_on_writer_thread(monkeypatch):
+    monkeypatch.setattr(logging_setup, "LOG_ASYNC", True)
+    target = ListHandler()
+    target.setFormatter(JsonFormatter())
+    handler = queued_handler("teste", target)
+    assert isinstance(handler, DroppingQueueHandler)
+    assert "teste" in get_logging_stats()["queues"]
+
+    handler.handle(make_record("Valor %d", 42))
+    logging_setup.shutdown_logging()
+
+    assert [json.loads(line)["message"] for line in target.lines] == ["Valor 42"]
+
+def test_synchronous_mode_returns_the_handler(monkeypatch):
+    monkeypatch.setattr(logging_setup, "LOG_ASYNC", False)
+    target = ListHandler()
+
+    assert queued_handler("teste", target) is target
@@ -0,0 +1,96 @@
+"""
+Testes da serialização de modelos (helpers.ModelSerializer), comparada
+com o to_dict anterior (getattr por coluna).
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Column, Date, DateTime, Integer, MetaData, Numeric, String, Table
+from sqlalchemy.orm import registry
+
+from app.helpers import DataNormalizer, ModelSerializer, model_serializer
+from app.models.social_media import SocialMedia
+
+class Invoice:
+    """Modelo mapeado sem declarative, com colunas de nomes arbitrários."""
+
+invoices = Table(
+    "invoices", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("total", Numeric(10, 2)),
+    Column("issued_at", DateTime),
+    Column("due", Date),
+    Column("class", String),
+    Column("valor total", Numeric(10, 2)),
+    Column("a.b", String),
+)
+registry().map_imperatively(Invoice, invoices)
+
+class Tag:
+    """Modelo de uma única coluna."""
+
+registry().map_imperatively(Tag, Table("tags", MetaData(), Column("name", String, primary_key=True)))
+
+def legacy_to_dict(row) -> dict:
+    """ModelMixin.to_dict anterior."""
+    return {c.name: getattr(row, c.name) for c in row.__table__.columns}
+
+def legacy_iso_to_dict(row) -> dict:
+    """Conversão anterior com datas em isoformat() (como SocialMedia.to_dict)."""
+    return {
+        name: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for name, value in legacy_to_dict(row).items()
+    }
+
+def invoice(**values) -> Invoice:
+    row = Invoice()
+    for name, value in values.items():
+        setattr(row, name, value)
+    return row
+
+ROWS = [
+    invoice(**{
+        "id": 1, "total": Decimal("10.50"), "issued_at": datetime(2026, 10, 17, 12, 30, 15, 7),
+        "due": date(2026, 11, 1), "class": "a", "valor total": Decimal("0.01"), "a.b": "x",
+    }),
+    invoice(id=2),
+]
+
+def test_matches_legacy_to_dict():
+    serializer = ModelSerializer()
+
+    for row in ROWS:
+        assert serializer.to_dict(row) == legacy_to_dict(row)
+        assert serializer.to_dict(row, iso_datetimes=True) == legacy_iso_to_dict(row)
+    assert serializer.to_dicts(ROWS) == [legacy_to_dict(row) for row in ROWS]
+    assert serializer.to_dict(ROWS[0])["total"] == Decimal("10.50")
+    assert serializer.to_dict(ROWS[1], iso_datetimes=True)["issued_at"] is None
+
+def test_single_column_and_mixed_models():
+    tag = Tag()
+    tag.name = "webhook"
+    media = SocialMedia(name="Site", url="https://example.com", icon="icon")
+    media.created_at = datetime(2026, 10, 17)
+
+    assert model_serializer.to_dict(tag) == {"name": "webhook"}
+    assert model_serializer.to_dicts([tag, media, tag]) == [
+        {"name": "webhook"}, legacy_to_dict(media), {"name": "webhook"}
+    ]
+    assert media.to_dict() == legacy_iso_to_dict(media)
+
+def test_serializer_is_compiled_once_per_model():
+    serializer = ModelSerializer()
+
+    assert serializer.compile(Invoice) is serializer.compile(Invoice)
+    assert serializer.compile(Invoice) is not serializer.compile(Invoice, iso_datetimes=True)
+
+def test_normalizer_and_json_use_the_serializer():
+    class Normalizer(DataNormalizer):
+        def process(self, data):
+            return data
+
+        def validate(self, data):
+            return True
+
+    assert Normalizer().normalize(ROWS[0]) == legacy_to_dict(ROWS[0])
+    assert model_serializer.to_json(ROWS[0]).startswith(b'{"id":1,"total":"10.50","issued_at":"2026-10-17T12:30:15.000007"')
@@ -0,0 +1,82 @@
+"""
+Testes da paginação keyset (services/pagination.py).
+"""
+from datetime import datetime, timedelta
+import base64
+import json
+
+from sqlalchemy import select
+import pytest
+
+from app.errors import ValidationError
+from app.models.social_media import SocialMedia
+from app.services.database import AsyncSessionLocal
+from app.services.pagination import apply_keyset, decode_cursor, encode_cursor, split_page
+
+from conftest import run
+
+def raw_cursor(payload) -> str:
+    """Monta um cursor com conteúdo arbitrário."""
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def test_cursor_round_trip_converts_datetimes():
+    moment = datetime(2026, 10, 17, 12, 30, 15, 123456)
+    cursor = encode_cursor("updated_at", [moment, 42])
+
+    assert decode_cursor(cursor, "updated_at", SocialMedia) == [moment, 42]
+
+@pytest.mark.parametrize("cursor, order", [
+    ("não é base64!", "id"),
+    (raw_cursor({"o": "id"}), "id"),
+    (raw_cursor({"o": "updated_at", "v": [1]}), "id"),
+    (raw_cursor({"o": "id", "v": [1, 2]}), "id"),
+    (raw_cursor({"o": "id", "v": ["1"]}), "id"),
+    (raw_cursor({"o": "id", "v": [1.5]}), "id"),
+    (raw_cursor({"o": "id", "v": [True]}), "id"),
+    (raw_cursor({"o": "id", "v": [[1]]}), "id"),
+    (raw_cursor({"o": "updated_at", "v": ["ontem", 1]}), "updated_at"),
+    (raw_cursor({"o": "updated_at", "v": [1700000000, 1]}), "updated_at"),
+    (raw_cursor({"o": "updated_at", "v": ["2026-10-17T12:00:00", "1"]}), "updated_at"),
+])
+def test_invalid_cursor_is_rejected_with_400(cursor, order):
+    with pytest.raises(ValidationError) as error:
+        decode_cursor(cursor, order, SocialMedia)
+
+    assert error.value.status_code == 400
+
+def test_split_page_returns_cursor_only_when_more_rows():
+    rows = [SocialMedia(id=i, name=f"n{i}", url="https://a.example.com", icon="i") for i in range(1, 4)]
+
+    page, next_cursor = split_page(rows, "id", 2)
+    assert [row.id for row in page] == [1, 2]
+    assert decode_cursor(next_cursor, "id", SocialMedia) == [2]
+
+    page, next_cursor = split_page(rows, "id", 3)
+    assert len(page) == 3 and next_cursor is None
+
+def test_keyset_walks_all_rows_without_gaps(db):
+    now = datetime(2026, 10, 17, 12, 0, 0)
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            # Datas repetidas: o id desempata a ordem
+            session.add_all([
+                SocialMedia(
+                    name=f"Plataforma {i}", url=f"https://p{i}.example.com", icon="icon",
+                    created_at=now, updated_at=now + timedelta(minutes=i // 2)
+                )
+                for i in range(7)
+            ])
+            await session.commit()
+
+            seen, cursor = [], None
+            while True:
+                stmt = apply_keyset(select(SocialMedia), SocialMedia, "updated_at", cursor, 3)
+                rows = (await session.execute(stmt)).scalars().all()
+                page, cursor = split_page(rows, "updated_at", 3)
+                seen.extend(row.id for row in page)
+                if cursor is None:
+                    return seen
+
+    assert run(scenario()) == list(range(1, 8))
@@ -0,0 +1,56 @@
+"""
+Testes da telemetria dos pools de conexões (services/database.py).
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+import pytest
+
+from app.services.database import (
+    InstrumentedQueuePool, async_engine, engine, get_pool_telemetry
+)
+from app.services.metrics import metrics
+
+from conftest import run
+
+def test_sync_checkout_records_wait_and_hold(db):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    telemetry = get_pool_telemetry()["telemetry"]["histograms"]
+    assert telemetry["db.pool.sync.checkout_wait_ms"]["count"] >= 1
+    assert telemetry["db.pool.sync.overflow_in_use"]["count"] >= 1
+    assert telemetry["db.pool.sync.hold_ms"]["count"] >= 1
+
+def test_async_checkout_uses_async_label(db):
+    async def scenario():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    run(scenario())
+
+    assert metrics.histogram("db.pool.async.checkout_wait_ms").snapshot()["count"] >= 1
+    assert metrics.histogram("db.pool.async.hold_ms").snapshot()["count"] >= 1
+
+def test_pool_timeout_is_counted(tmp_path):
+    limited = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    try:
+        with limited.connect():
+            with pytest.raises(PoolTimeoutError):
+                limited.connect()
+    finally:
+        limited.dispose()
+
+    assert metrics.counter("db.pool.sync.timeouts").value == 1
+
+def test_pool_telemetry_reports_configuration():
+    telemetry = get_pool_telemetry()
+
+    assert set(telemetry["config"]) == {"pool_size", "max_overflow", "pool_timeout"}
+    assert "async" in telemetry["current"]
+    assert telemetry["replicas"] == []
@@ -0,0 +1,55 @@
+"""
+Testes da contagem de comandos SQL por requisição (services/query_stats.py
+e QueryStatsMiddleware).
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.middleware import QueryStatsMiddleware
+from app.services.database import engine
+from app.services.metrics import metrics
+from app.services.query_stats import (
+    DB_N_PLUS_ONE_THRESHOLD, current_query_stats, finish_request_stats, start_request_stats
+)
+
+def test_statements_are_counted_only_inside_a_request(db):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert current_query_stats() is None
+
+        token = start_request_stats({"method": "GET"})
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+        stats = finish_request_stats(token)
+
+    assert stats.count == 2
+    assert stats.total_ms >= 0
+    assert current_query_stats() is None
+    assert metrics.histogram("db.route.GET unmatched.query_count").values() == [2]
+
+def test_repeated_statement_is_flagged_as_n_plus_one(db):
+    token = start_request_stats({"method": "GET"})
+    with engine.connect() as connection:
+        for key in range(DB_N_PLUS_ONE_THRESHOLD):
+            connection.execute(text("SELECT :key"), {"key": key})
+    stats = finish_request_stats(token)
+
+    assert list(stats.repeated_statements().values()) == [DB_N_PLUS_ONE_THRESHOLD]
+    assert metrics.counter("db.route.GET unmatched.n_plus_one").value == 1
+
+def test_middleware_adds_headers_per_route(db):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as connection:
+            return {"value": connection.execute(text("SELECT :id"), {"id": item_id}).scalar()}
+
+    response = TestClient(app).get("/items/7")
+
+    assert response.json() == {"value": 7}
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert response.headers["X-DB-Time"].endswith("ms")
+    assert metrics.histogram("db.route.GET /items/{item_id}.query_count").values() == [1]
@@ -0,0 +1,124 @@
+"""
+Testes do limite de taxa dos webhooks (services/rate_limit.py e
+WebhookRateLimitMiddleware).
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from app.middleware import WebhookRateLimitMiddleware
+from app.services import rate_limit
+from app.services.metrics import metrics
+from app.services.rate_limit import (
+    REASON_CONCURRENCY, REASON_RATE, WebhookRateLimiter, retry_after
+)
+
+def test_bucket_allows_burst_then_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    limiter = WebhookRateLimiter(rate=2, burst=2, max_concurrency=0)
+
+    assert limiter.take("a") is None
+    assert limiter.take("a") is None
+    assert limiter.take("a") == 0.5
+    # Outra origem tem o próprio bucket
+    assert limiter.take("b") is None
+
+    now[0] += 0.5
+    assert limiter.take("a") is None
+
+def test_concurrency_limit_is_released():
+    limiter = WebhookRateLimiter(rate=0, max_concurrency=1)
+
+    assert limiter.acquire("a") == (None, 0.0)
+    assert limiter.acquire("b") == (REASON_CONCURRENCY, 1.0)
+    limiter.release()
+    assert limiter.acquire("b") == (None, 0.0)
+    assert metrics.counter(f"webhook.rate_limit.rejected.{REASON_CONCURRENCY}").value == 1
+
+def test_idle_buckets_are_evicted_first(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    limiter = WebhookRateLimiter(rate=1, burst=1, max_concurrency=0, max_sources=2)
+
+    limiter.take("ociosa")
+    now[0] += 5
+    limiter.take("ativa")
+    limiter.take("nova")
+
+    assert set(limiter._buckets) == {"ativa", "nova"}
+    assert limiter.stats()["evicted"] == 1
+
+def test_retry_after_is_at_least_one_second():
+    assert retry_after(0.01) == "1"
+    assert retry_after(2.5) == "3"
+
+def make_client(limiter: WebhookRateLimiter) -> TestClient:
+    """Cria um cliente com o middleware sobre uma aplicação ASGI mínima."""
+    async def endpoint(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+    return TestClient(WebhookRateLimitMiddleware(endpoint, limiter=limiter))
+
+def test_middleware_rejects_with_retry_after():
+    limiter = WebhookRateLimiter(rate=1, burst=1, max_concurrency=0)
+    client = make_client(limiter)
+
+    assert client.post("/api/v1/webhooks/").status_code == 200
+    response = client.post("/api/v1/webhooks/")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["error"]["details"] == {"reason": REASON_RATE, "retry_after": 1}
+    assert limiter.in_flight == 0
+
+def test_middleware_ignores_admin_and_other_paths():
+    limiter = WebhookRateLimiter(rate=1, burst=1, max_concurrency=0)
+    client = make_client(limiter)
+
+    for path in ("/api/v1/webhooks/subscriptions", "/api/v1/webhooks/dead-letters", "/api/v1/social-media/"):
+        assert client.get(path).status_code == 200
+        assert client.get(path).status_code == 200
+    assert limiter._buckets == {}
+
+def test_concurrency_slot_is_held_until_response_ends():
+    limiter = WebhookRateLimiter(rate=0, max_concurrency=1)
+    seen = []
+
+    async def endpoint(scope, receive, send):
+        seen.append(limiter.in_flight)
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    middleware = WebhookRateLimitMiddleware(endpoint, limiter=limiter)
+
+    async def scenario():
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware({"type": "http", "path": "/api/v1/webhooks/", "client": ("1.2.3.4", 1)}, receive, send)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert seen == [1] and limiter.in_flight == 0
+    assert sent[0]["status"] == 200
+
+def test_rejected_response_keeps_cors_headers(monkeypatch):
+    from app.main import app
+
+    limiter = rate_limit.webhook_rate_limiter
+    monkeypatch.setattr(limiter, "rate", 1.0)
+    monkeypatch.setattr(limiter, "burst", 1.0)
+    monkeypatch.setattr(limiter, "_buckets", {"testclient": [0.0, rate_limit.time.monotonic()]})
+
+    response = TestClient(app).post(
+        "/api/v1/webhooks/", json={}, headers={"Origin": "http://localhost:3000"}
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+    assert "Retry-After" in response.headers["Access-Control-Expose-Headers"]
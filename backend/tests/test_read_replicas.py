@@ -0,0 +1,61 @@
+"""
+Testes do roteamento de leituras para réplicas (services/database.py).
+"""
+from sqlalchemy import select
+
+from app.models.social_media import SocialMedia
+from app.services import database
+from app.services.database import ReplicaRouter, get_async_read_db
+from app.services.metrics import metrics
+
+from conftest import run
+
+def test_healthy_replicas_are_used_in_rotation(tmp_path):
+    router = ReplicaRouter([f"sqlite:///{tmp_path / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"])
+
+    async def scenario():
+        chosen = [(await router.choose()).name for _ in range(4)]
+        for replica in router.replicas:
+            await replica.engine.dispose()
+        return chosen
+
+    assert run(scenario()) == ["replica0", "replica1", "replica0", "replica1"]
+    assert all(replica["healthy"] for replica in router.stats())
+
+def test_unreachable_replica_is_skipped_until_retry(tmp_path):
+    router = ReplicaRouter([
+        f"sqlite:///{tmp_path / 'inexistente' / 'a.db'}",
+        f"sqlite:///{tmp_path / 'b.db'}",
+    ])
+
+    async def scenario():
+        chosen = [(await router.choose()).name for _ in range(3)]
+        for replica in router.replicas:
+            await replica.engine.dispose()
+        return chosen
+
+    assert run(scenario()) == ["replica1", "replica1", "replica1"]
+    down = router.stats()[0]
+    assert not down["healthy"] and down["last_error"]
+
+def test_lagging_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    router = ReplicaRouter([f"sqlite:///{tmp_path / 'a.db'}"])
+
+    async def lagging(replica):
+        return database.DB_REPLICA_MAX_LAG_SECONDS + 1
+
+    monkeypatch.setattr(router, "_replication_lag", lagging)
+    assert run(router.choose()) is None
+    assert router.stats()[0]["lag_seconds"] == database.DB_REPLICA_MAX_LAG_SECONDS + 1
+
+def test_read_dependency_without_replicas_uses_primary(db):
+    async def scenario():
+        generator = get_async_read_db()
+        session = await generator.__anext__()
+        rows = (await session.execute(select(SocialMedia))).scalars().all()
+        target = session.info["target"]
+        await generator.aclose()
+        return rows, target
+
+    assert run(scenario()) == ([], "primary")
+    assert metrics.counter("db.reads.primary").value == 1
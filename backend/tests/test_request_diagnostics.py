@@ -0,0 +1,61 @@
+"""
+Testes do middleware ASGI de diagnóstico de requisições
+(RequestDiagnosticsMiddleware em app/middleware.py).
+"""
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+import logging
+import pytest
+
+from app.middleware import RequestDiagnosticsMiddleware
+from app.services.metrics import metrics
+
+def build_app(**options) -> FastAPI:
+    """Cria uma aplicação com o middleware e rotas de exemplo."""
+    app = FastAPI()
+    app.add_middleware(RequestDiagnosticsMiddleware, **options)
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.get("/falha")
+    async def fail():
+        raise RuntimeError("erro de teste")
+
+    return app
+
+def test_body_reaches_the_route_and_timing_header_is_added():
+    response = TestClient(build_app()).post("/echo", content=b"x" * 100000)
+
+    assert response.json() == {"size": 100000}
+    assert response.headers["X-Process-Time"].endswith("ms")
+    assert metrics.histogram("http.route.POST /echo.duration_ms").snapshot()["count"] == 1
+
+def test_not_found_is_counted():
+    response = TestClient(build_app()).get("/inexistente")
+
+    assert response.status_code == 404
+    assert metrics.counter("http.not_found").value == 1
+
+def test_unhandled_exception_is_counted_and_reraised():
+    client = TestClient(build_app())
+
+    with pytest.raises(RuntimeError):
+        client.get("/falha")
+    assert metrics.counter("http.unhandled_errors").value == 1
+
+def test_debug_log_redacts_credentials(caplog):
+    client = TestClient(build_app(debug=True, sample_rate=1.0))
+
+    with caplog.at_level(logging.INFO, logger="api.middleware"):
+        client.get("/inexistente", headers={
+            "Authorization": "Bearer segredo",
+            "X-Hub-Signature": "sha256=assinatura",
+            "Idempotency-Key": "chave-entrega",
+            "X-Webhook-Delivery": "entrega-1",
+        })
+
+    for secret in ("segredo", "assinatura", "chave-entrega", "entrega-1"):
+        assert secret not in caplog.text
+    assert "[DEBUG-404] Requisição iniciada: GET /inexistente" in caplog.text
@@ -0,0 +1,58 @@
+"""
+Testes do registro de consultas lentas (services/slow_queries.py).
+"""
+from sqlalchemy import text
+
+from app.services import slow_queries
+from app.services.database import engine
+from app.services.metrics import metrics
+from app.services.slow_queries import (
+    SlowQueryLog, explain, maybe_record_slow_query, normalize_sql, parameter_shape
+)
+
+def test_normalize_sql_groups_statements_by_shape():
+    first = normalize_sql("SELECT *  FROM t WHERE a = 'x' AND b IN (1, 2, 3)")
+    second = normalize_sql("SELECT * FROM t\n WHERE a = 'y''z' AND b IN (4)")
+
+    assert first == second == "SELECT * FROM t WHERE a = ? AND b IN (...)"
+
+def test_parameter_shape_never_exposes_values():
+    assert parameter_shape({"email": "a@b.com", "id": 1}) == {"email": "str", "id": "int"}
+    assert parameter_shape([("a", 1), ("b", 2)], executemany=True) == {"rows": 2, "row": ["str", "int"]}
+    assert parameter_shape(None) is None
+
+def test_slow_query_is_recorded_with_plan(db, monkeypatch):
+    log = SlowQueryLog(log_file=None)
+    monkeypatch.setattr(slow_queries, "slow_query_log", log)
+    monkeypatch.setattr(slow_queries, "DB_SLOW_QUERY_EXPLAIN", True)
+
+    with engine.connect() as connection:
+        maybe_record_slow_query(connection, "SELECT * FROM social_media WHERE id = ?", (1,), False, 500.0)
+        maybe_record_slow_query(connection, "SELECT 1", (), False, 1.0)
+
+    [entry] = log.entries()
+    assert entry["sql"] == "SELECT * FROM social_media WHERE id = ?"
+    assert entry["parameters"] == ["int"]
+    assert entry["plan"]
+    assert log.entries(min_duration_ms=600) == []
+
+def test_failed_explain_keeps_request_transaction_usable(db):
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        connection.execute(text(
+            "INSERT INTO social_media (name, url, icon, created_at, updated_at) "
+            "VALUES ('n', 'https://n.example.com', 'i', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+
+        assert explain(connection, "SELECT * FROM tabela_inexistente", ()) is None
+
+        # O INSERT anterior continua na transação e ela ainda aceita comandos
+        assert connection.execute(text("SELECT COUNT(*) FROM social_media")).scalar() == 1
+        transaction.commit()
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM social_media")).scalar() == 1
+    assert metrics.counter("db.slow_queries.explain_failed").value == 1
+
+def test_explain_skips_statements_that_would_run():
+    assert explain(None, "CREATE TABLE t (id INTEGER)", ()) is None
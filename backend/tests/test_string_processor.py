@@ -0,0 +1,34 @@
+"""
+Testes dos validadores de strings (helpers.StringProcessor).
+"""
+import pytest
+
+from app.errors import ValidationError
+from app.helpers import StringProcessor, string_processor
+from app.models.social_media import SocialMedia
+
+EMAILS = ["ana@example.com", "a.b+c@sub.example.com.br", "sem-arroba.com", "a@b", "", " ana@example.com"]
+URLS = ["https://example.com", "http://sub.example.com.br/a?b=1", "ftp://example.com", "https://localhost", "example.com", ""]
+
+def test_batch_validators_match_single_validators():
+    assert string_processor.validate_emails(EMAILS) == [string_processor.validate_email(e) for e in EMAILS]
+    assert string_processor.validate_urls(URLS) == [string_processor.validate_url(u) for u in URLS]
+    assert string_processor.validate_emails(EMAILS) == [True, True, False, False, False, False]
+    assert string_processor.validate_urls(URLS) == [True, True, False, False, False, False]
+
+def test_batch_validators_accept_generators_and_reject_non_strings():
+    assert string_processor.validate_urls(url for url in ["https://example.com", None, 42]) == [True, False, False]
+    assert string_processor.validate_emails([None, b"ana@example.com"]) == [False, False]
+    assert string_processor.validate_urls([]) == []
+
+def test_processor_is_stateless():
+    # Instâncias novas e a compartilhada dão o mesmo resultado
+    assert StringProcessor().validate_urls(URLS) == string_processor.validate_urls(URLS)
+    assert string_processor.process("  texto  ") == "texto"
+    assert string_processor.process(10) == "10"
+    assert string_processor.validate("   ") is False
+
+def test_model_uses_shared_validators():
+    with pytest.raises(ValidationError):
+        SocialMedia(name="Site", url="notaurl", icon="icon")
+    assert SocialMedia(name="Site", url="https://example.com", icon="icon").url == "https://example.com"
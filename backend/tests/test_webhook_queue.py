@@ -0,0 +1,173 @@
+"""
+Testes da fila durável de webhooks (services/webhook_queue.py).
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.errors import ValidationError
+from app.models.webhook_dead_letter import WebhookDeadLetter
+from app.models.webhook_event import WebhookEvent
+from app.services import webhook_queue
+from app.services.database import AsyncSessionLocal
+from app.services.metrics import metrics
+from app.services.webhook_queue import (
+    STATUS_DONE, STATUS_FAILED, STATUS_PENDING, STATUS_PROCESSING,
+    WebhookWorkerPool, claim_events, enqueue_event
+)
+
+from conftest import run
+
+async def enqueue(*event_types: str) -> None:
+    """Enfileira um evento de cada tipo informado."""
+    async with AsyncSessionLocal() as db:
+        for index, event_type in enumerate(event_types):
+            await enqueue_event(db, f"evt-{index}", event_type, {"index": index})
+
+async def claim(worker: str, limit: int = 10, capacity=None):
+    """Reserva eventos em uma sessão própria."""
+    async with AsyncSessionLocal() as db:
+        return await claim_events(db, limit, worker, capacity)
+
+async def load(event_id: str) -> WebhookEvent:
+    """Lê o estado atual de um evento."""
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(WebhookEvent).where(WebhookEvent.event_id == event_id))).scalar_one()
+
+def test_enqueue_is_idempotent_per_event_id(db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            first = await enqueue_event(session, "evt-1", "contact_form", {"a": 1})
+            second = await enqueue_event(session, "evt-1", "contact_form", {"a": 2})
+            return first.id, second.id, second.payload
+
+    first_id, second_id, payload = run(scenario())
+    assert first_id == second_id and payload == {"a": 1}
+
+def test_claim_reserves_each_event_once(db):
+    async def scenario():
+        await enqueue("contact_form", "contact_form", "contact_form")
+        first = await claim("w1", limit=2)
+        second = await claim("w2", limit=2)
+        third = await claim("w3", limit=2)
+        return first, second, third
+
+    first, second, third = run(scenario())
+    assert [event.event_id for event in first] == ["evt-0", "evt-1"]
+    assert [event.event_id for event in second] == ["evt-2"]
+    assert third == []
+    assert {event.locked_by for event in first} == {"w1"}
+    assert all(event.status == STATUS_PROCESSING and event.attempts == 1 for event in first + second)
+
+def test_claim_respects_capacity_per_event_type(db):
+    async def scenario():
+        await enqueue("portfolio_update", "portfolio_update", "contact_form")
+        return await claim("w1", capacity=lambda event_type: 1)
+
+    claimed = run(scenario())
+    assert [(event.event_id, event.event_type) for event in claimed] == [
+        ("evt-0", "portfolio_update"), ("evt-2", "contact_form")
+    ]
+
+def test_stale_lock_is_reclaimed_and_old_worker_result_discarded(db):
+    pool = WebhookWorkerPool(workers=0)
+
+    async def scenario():
+        await enqueue("contact_form")
+        [stale] = await claim("w1")
+        # O worker w1 parou: a reserva passa do WEBHOOK_LOCK_TIMEOUT
+        async with AsyncSessionLocal() as session:
+            expired = datetime.utcnow() - timedelta(seconds=webhook_queue.WEBHOOK_LOCK_TIMEOUT + 1)
+            await session.execute(update(WebhookEvent).values(locked_at=expired))
+            await session.commit()
+        [reclaimed] = await claim("w2")
+
+        # w1 termina depois: o resultado não sobrescreve a reserva de w2
+        written = await pool._update(stale, status=STATUS_DONE, result={"worker": "w1"})
+        after_stale = await load("evt-0")
+        await pool._update(reclaimed, status=STATUS_DONE, result={"worker": "w2"})
+        return reclaimed, written, after_stale, await load("evt-0")
+
+    reclaimed, written, after_stale, final = run(scenario())
+    assert reclaimed.locked_by == "w2" and reclaimed.attempts == 2
+    assert written is False
+    assert (after_stale.status, after_stale.locked_by) == (STATUS_PROCESSING, "w2")
+    assert (final.status, final.result, final.locked_by) == (STATUS_DONE, {"worker": "w2"}, None)
+    assert metrics.counter("webhook.queue.lock_lost").value == 1
+
+def test_process_records_result(db):
+    pool = WebhookWorkerPool(workers=0)
+
+    async def handler(event_type, data, session):
+        return {"event_type": event_type, "index": data["index"], "at": datetime(2026, 10, 17)}
+
+    pool.set_handler(handler)
+
+    async def scenario():
+        await enqueue("contact_form")
+        [event] = await claim("w1")
+        await pool.process(event)
+        return await load("evt-0")
+
+    event = run(scenario())
+    assert event.status == STATUS_DONE
+    assert event.result == {"event_type": "contact_form", "index": 0, "at": "2026-10-17 00:00:00"}
+    assert event.processed_at is not None
+
+def test_transient_failure_is_retried_with_backoff(db, monkeypatch):
+    monkeypatch.setattr(webhook_queue, "WEBHOOK_MAX_ATTEMPTS", 2)
+    pool = WebhookWorkerPool(workers=0)
+    calls = []
+
+    async def handler(event_type, data, session):
+        calls.append(event_type)
+        raise RuntimeError("banco indisponível")
+
+    pool.set_handler(handler)
+
+    async def scenario():
+        await enqueue("contact_form")
+        [event] = await claim("w1")
+        await pool.process(event)
+        retried = await load("evt-0")
+
+        # Disponível de novo só após o backoff
+        early = await claim("w1")
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(WebhookEvent).values(available_at=datetime.utcnow()))
+            await session.commit()
+        [event] = await claim("w1")
+        await pool.process(event)
+        return retried, early, await load("evt-0")
+
+    retried, early, final = run(scenario())
+    assert retried.status == STATUS_PENDING and retried.locked_by is None
+    assert retried.available_at > datetime.utcnow()
+    assert retried.error == "banco indisponível"
+    assert early == []
+    assert (final.status, final.attempts) == (STATUS_FAILED, 2)
+    assert len(calls) == 2
+    assert metrics.counter("webhook.queue.retried").value == 1
+    assert metrics.counter("webhook.queue.failed").value == 1
+
+def test_validation_error_is_not_retried(db):
+    pool = WebhookWorkerPool(workers=0)
+
+    async def handler(event_type, data, session):
+        raise ValidationError(message="Dados inválidos")
+
+    pool.set_handler(handler)
+
+    async def scenario():
+        await enqueue("contact_form")
+        [event] = await claim("w1")
+        await pool.process(event)
+        async with AsyncSessionLocal() as session:
+            dead = (await session.execute(select(WebhookDeadLetter))).scalars().all()
+        return await load("evt-0"), dead
+
+    event, dead = run(scenario())
+    assert (event.status, event.attempts) == (STATUS_FAILED, 1)
+    assert metrics.counter("webhook.queue.retried").value == 0
+    # Dados inválidos falhariam de novo: não vão para o dead-letter
+    assert dead == []
@@ -0,0 +1,63 @@
+"""
+Testes da verificação de assinaturas de webhook (services/webhook_signature.py).
+"""
+import hashlib
+import hmac
+
+import pytest
+
+from app.services import webhook_signature
+from app.services.metrics import metrics
+from app.services.webhook_signature import SignatureVerifier, normalize_signature, verify_signature
+
+BODY = b'{"event_type": "contact_form", "data": {}}'
+
+def sign(secret: str, body: bytes = BODY) -> str:
+    """Assina o corpo como um remetente."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+@pytest.fixture(autouse=True)
+def secrets(monkeypatch):
+    # Rotação em andamento: o segredo antigo e o novo são aceitos
+    monkeypatch.setattr(webhook_signature, "VERIFY_SIGNATURES", True)
+    monkeypatch.setattr(webhook_signature, "_BASE_MACS", [
+        hmac.new(secret.encode(), digestmod=hashlib.sha256) for secret in ("antigo", "novo")
+    ])
+
+def test_normalize_signature_accepts_only_sha256_hex():
+    digest = "A" * 64
+
+    assert normalize_signature(f"sha256={digest}") == "a" * 64
+    assert normalize_signature(digest) == "a" * 64
+    assert normalize_signature(None) is None
+    assert normalize_signature("sha1=" + "a" * 40) is None
+    assert normalize_signature("g" * 64) is None
+
+@pytest.mark.parametrize("secret", ["antigo", "novo"])
+def test_any_active_secret_is_accepted(secret):
+    assert verify_signature(sign(secret), BODY)
+    assert verify_signature(sign(secret)[len("sha256="):].upper(), BODY)
+    assert metrics.counter("webhook.signature.accepted").value == 2
+
+@pytest.mark.parametrize("signature, reason", [
+    (None, "missing"),
+    ("", "missing"),
+    ("sha256=abc", "malformed"),
+    (sign("outro"), "mismatch"),
+])
+def test_rejections_are_counted_by_reason(signature, reason):
+    assert not verify_signature(signature, BODY)
+    assert metrics.counter(f"webhook.signature.rejected.{reason}").value == 1
+
+def test_incremental_verification_matches_full_body():
+    verifier = SignatureVerifier()
+    for start in range(0, len(BODY), 7):
+        verifier.update(BODY[start:start + 7])
+
+    assert verifier.verify(sign("novo"))
+    assert not SignatureVerifier().verify(sign("novo"))
+
+def test_verification_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(webhook_signature, "VERIFY_SIGNATURES", False)
+
+    assert verify_signature(None, BODY)
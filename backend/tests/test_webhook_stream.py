@@ -0,0 +1,140 @@
+"""
+Testes do lote de webhooks em NDJSON (POST /api/webhooks/batch/stream).
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+import pytest
+
+from app.models.social_media import SocialMedia
+from app.routes import webhooks
+from app.services.database import SessionLocal
+from app.services.event_registry import event_registry
+from app.services.webhook_signature import WEBHOOK_SECRETS
+
+from conftest import make_app
+
+CONTACT = {"name": "Ana", "email": "ana@example.com", "message": "Olá"}
+
+def social_media(name: str) -> dict:
+    """Evento de atualização de mídia social."""
+    return {"event_type": "social_media_update", "data": {"name": name, "url": f"https://{name}.example.com", "icon": "i"}}
+
+def ndjson(*events) -> bytes:
+    """Monta o corpo NDJSON do lote."""
+    return b"".join(
+        (event if isinstance(event, bytes) else json.dumps(event).encode()) + b"\n" for event in events
+    )
+
+def stored_names() -> list:
+    """Nomes das mídias sociais gravadas."""
+    with SessionLocal() as session:
+        return sorted(session.execute(select(SocialMedia.name)).scalars())
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(webhooks, "VERIFY_SIGNATURES", False)
+    monkeypatch.setattr(webhooks, "WEBHOOK_STREAM_CHUNK_SIZE", 3)
+    with TestClient(make_app(webhooks.router, "/api/webhooks")) as client:
+        yield client
+
+def post(client: TestClient, body: bytes, **headers) -> list:
+    """Envia o lote e devolve as linhas da resposta."""
+    response = client.post(
+        "/api/webhooks/batch/stream", content=body,
+        headers={"Content-Type": "application/x-ndjson", **headers}
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.content.splitlines()]
+
+def test_failed_event_only_undoes_its_own_writes(client, monkeypatch):
+    spec = event_registry.get("contact_form")
+
+    async def failing_handler(data, db, commit):
+        # Grava antes de falhar: a escrita não pode chegar ao commit do lote
+        db.add(SocialMedia(name="parcial", url="https://parcial.example.com", icon="i"))
+        await db.flush()
+        raise RuntimeError("falha no handler")
+
+    monkeypatch.setattr(spec, "handler", failing_handler)
+
+    lines = post(client, ndjson(
+        social_media("a"), {"event_type": "contact_form", "data": CONTACT}, b"{invalido",
+        social_media("b")
+    ))
+
+    *results, summary = lines
+    assert [line["status"] for line in results] == ["success", "error", "error", "success"]
+    assert results[1]["message"] == "Falha: falha no handler"
+    assert summary["summary"]["committed"] is True
+    assert summary["summary"]["successful"] == 2
+    assert stored_names() == ["a", "b"]
+
+def sign(body: bytes) -> str:
+    """Assinatura do corpo com o segredo ativo."""
+    return "sha256=" + hmac.new(WEBHOOK_SECRETS[0].encode(), body, hashlib.sha256).hexdigest()
+
+def test_signed_batch_is_processed(client, monkeypatch):
+    monkeypatch.setattr(webhooks, "VERIFY_SIGNATURES", True)
+    body = ndjson(social_media("a"), social_media("b"))
+
+    *results, summary = post(client, body, **{"X-Hub-Signature": sign(body)})
+
+    assert [line["status"] for line in results] == ["success", "success"]
+    assert summary["summary"]["committed"] is True
+    assert summary["summary"]["signature_valid"] is True
+    assert stored_names() == ["a", "b"]
+
+def test_invalid_signature_is_rejected_before_any_processing(client, monkeypatch):
+    monkeypatch.setattr(webhooks, "VERIFY_SIGNATURES", True)
+    spec = event_registry.get("contact_form")
+    calls = []
+
+    async def recording_handler(data, db, commit):
+        calls.append(data)
+
+    monkeypatch.setattr(spec, "handler", recording_handler)
+    monkeypatch.setattr(webhooks, "AsyncSessionLocal", lambda: pytest.fail("sessão aberta antes da verificação"))
+    body = ndjson(*[{"event_type": "contact_form", "data": CONTACT}] * 10)
+
+    response = client.post(
+        "/api/webhooks/batch/stream", content=body,
+        headers={"Content-Type": "application/x-ndjson", "X-Hub-Signature": "sha256=" + "0" * 64}
+    )
+
+    assert response.status_code == 401
+    assert "summary" not in response.text and "index" not in response.text
+    assert calls == []
+    assert stored_names() == []
+
+@pytest.mark.parametrize("setting, status", [("WEBHOOK_STREAM_MAX_BYTES", 413), ("WEBHOOK_STREAM_MAX_LINE_BYTES", 400)])
+def test_oversized_body_is_rejected_before_processing(client, monkeypatch, setting, status):
+    monkeypatch.setattr(webhooks, setting, 200)
+    body = ndjson(social_media("a"), social_media("longo" * 20))
+
+    response = client.post("/api/webhooks/batch/stream", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == status
+    assert stored_names() == []
+
+def test_batch_exceeding_the_time_limit_is_rolled_back(client, monkeypatch):
+    spec = event_registry.get("contact_form")
+
+    async def slow_handler(data, db, commit):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(spec, "handler", slow_handler)
+    monkeypatch.setattr(webhooks, "WEBHOOK_STREAM_MAX_SECONDS", 0.2)
+
+    *results, summary = post(client, ndjson(
+        social_media("a"), social_media("b"), social_media("c"), {"event_type": "contact_form", "data": CONTACT}
+    ))
+
+    assert [line["index"] for line in results] == [0, 1, 2]
+    assert summary["summary"]["committed"] is False
+    assert summary["summary"]["error"] == "Lote NDJSON excedeu a duração máxima"
+    assert stored_names() == []
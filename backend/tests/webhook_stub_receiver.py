@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Receptor de webhooks para testar o envio aos assinantes.
+
+Sobe um servidor local que aceita as entregas enviadas pela API
+(services/outbound_webhooks.py), verifica a assinatura X-Hub-Signature
+com o segredo informado, descarta entregas repetidas pelo cabeçalho
+X-Webhook-Delivery e imprime cada evento recebido. Com --fail-rate,
+parte das entregas recebe 503 para exercitar as novas tentativas.
+
+Uso:
+    python tests/webhook_stub_receiver.py --secret <segredo> [--port 9000] [--fail-rate 0.2]
+
+Depois registre o receptor como assinante (a API deve rodar com
+WEBHOOK_OUTBOUND_ALLOW_PRIVATE=true, já que o receptor escuta em localhost):
+    curl -X POST http://localhost:8000/api/v1/webhooks/subscriptions/ \\
+         -H "Authorization: Bearer $WEBHOOK_ADMIN_TOKEN" \\
+         -H "Content-Type: application/json" \\
+         -d '{"url": "http://localhost:9000/hook", "secret": "<segredo>"}'
+
+A aplicação de build_app() também pode ser usada em processo, com
+httpx.ASGITransport, passando o transporte para outbound_dispatcher.start().
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def build_app(secret: str, fail_rate: float = 0.0) -> FastAPI:
+    """
+    Cria a aplicação do receptor.
+
+    Args:
+        secret: Segredo do assinante
+        fail_rate: Fração das entregas respondidas com 503
+
+    Returns:
+        Aplicação FastAPI; as entregas aceitas ficam em app.state.received
+    """
+    app = FastAPI()
+    app.state.received = []
+    app.state.seen = set()
+    app.state.rejected = 0
+
+    @app.post("/hook")
+    async def hook(request: Request):
+        body = await request.body()
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, request.headers.get("x-hub-signature", "")):
+            app.state.rejected += 1
+            print("assinatura inválida", file=sys.stderr)
+            return JSONResponse({"error": "assinatura inválida"}, status_code=401)
+        if random.random() < fail_rate:
+            return JSONResponse({"error": "falha simulada"}, status_code=503)
+
+        delivery_id = request.headers.get("x-webhook-delivery")
+        if delivery_id in app.state.seen:
+            return {"status": "duplicate"}
+        app.state.seen.add(delivery_id)
+        event = json.loads(body)
+        app.state.received.append(event)
+        print(f"{delivery_id} {event['event_type']} {json.dumps(event['data'], ensure_ascii=False)}")
+        return {"status": "ok"}
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--secret", required=True, help="Segredo do assinante")
+    parser.add_argument("--port", type=int, default=9000, help="Porta do servidor")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fração das entregas respondidas com 503")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(build_app(args.secret, args.fail_rate), host="127.0.0.1", port=args.port, log_level="warning")